@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import Rol, PerfilUsuario, HistorialAcceso
+from .models import Rol, PerfilUsuario, HistorialAcceso, ResumenAccesoDiario
 from .services import GestorUsuarios
 
 
@@ -41,13 +41,25 @@ admin.site.register(User, UserAdmin)
 
 @admin.register(HistorialAcceso)
 class HistorialAccesoAdmin(admin.ModelAdmin):
-    list_display = ['usuario', 'fecha_hora', 'ip_address', 'exitoso']
-    list_filter = ['exitoso', 'fecha_hora']
-    search_fields = ['usuario__username', 'ip_address']
-    readonly_fields = ['usuario', 'fecha_hora', 'ip_address', 'user_agent', 'exitoso']
+    list_display = ['usuario', 'username', 'evento', 'fecha_hora', 'ip_address', 'exitoso']
+    list_filter = ['exitoso', 'evento', 'fecha_hora']
+    search_fields = ['username', 'usuario__username', 'ip_address']
+    readonly_fields = ['usuario', 'username', 'evento', 'fecha_hora', 'ip_address', 'user_agent', 'exitoso']
+    list_select_related = ['usuario']
     
     def has_add_permission(self, request):
         return False
     
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
+
+
+@admin.register(ResumenAccesoDiario)
+class ResumenAccesoDiarioAdmin(admin.ModelAdmin):
+    list_display = ['fecha', 'username', 'evento', 'exitosos', 'fallidos']
+    list_filter = ['evento', 'fecha']
+    search_fields = ['username']
+    readonly_fields = ['fecha', 'usuario', 'username', 'evento', 'exitosos', 'fallidos']
+    
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,248 @@
+"""
+Auditoría de accesos (login y refresh de JWT) en HistorialAcceso.
+
+registrar_acceso() solo agrega el evento a un buffer en memoria: el login
+nunca espera un INSERT. Un hilo en segundo plano guarda el buffer con un
+bulk_create cuando junta AUDITORIA_ACCESOS_LOTE eventos o pasan
+AUDITORIA_ACCESOS_INTERVALO segundos, y resuelve en una sola consulta los
+usernames de los intentos fallidos.
+
+Si la base de datos no responde, los eventos quedan en el buffer hasta
+AUDITORIA_ACCESOS_MAXIMO; a partir de ahí se descartan los más antiguos
+(se cuentan en estadisticas()). Con AUDITORIA_ACCESOS_ASINCRONA = False se
+guarda cada evento en el momento (útil en tests y scripts).
+"""
+import atexit
+import ipaddress
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+LONGITUD_USER_AGENT = 500
+
+
+def _config(nombre, defecto):
+    return getattr(settings, nombre, defecto)
+
+
+def ip_cliente(request):
+    """IP del cliente (primera de X-Forwarded-For detrás del proxy)."""
+    reenviada = request.META.get('HTTP_X_FORWARDED_FOR')
+    ip = reenviada.split(',')[0].strip() if reenviada else request.META.get('REMOTE_ADDR')
+    try:
+        # Una IP inválida haría fallar el lote completo al guardarlo
+        return str(ipaddress.ip_address(ip)) if ip else None
+    except ValueError:
+        return None
+
+
+class _EscritorAuditoria:
+    """Buffer de eventos y el hilo que los guarda por lotes."""
+
+    def __init__(self):
+        self._reiniciar_proceso()
+        atexit.register(self.vaciar)
+
+    def _reiniciar_proceso(self):
+        # Los procesos hijos (fork) no heredan el hilo: arrancan con su propio buffer
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._buffer = deque()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self.escritos = 0
+        self.descartados = 0
+        self.errores = 0
+
+    def agregar(self, evento):
+        if self._pid != os.getpid():
+            self._reiniciar_proceso()
+        with self._lock:
+            maximo = _config('AUDITORIA_ACCESOS_MAXIMO', 10000)
+            while len(self._buffer) >= maximo:
+                self._buffer.popleft()
+                self.descartados += 1
+            self._buffer.append(evento)
+            lleno = len(self._buffer) >= _config('AUDITORIA_ACCESOS_LOTE', 200)
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ejecutar, name='auditoria-accesos', daemon=True)
+                self._hilo.start()
+        if lleno:
+            self._despertar.set()
+
+    def _ejecutar(self):
+        while True:
+            self._despertar.wait(_config('AUDITORIA_ACCESOS_INTERVALO', 2.0))
+            self._despertar.clear()
+            try:
+                self.vaciar()
+            finally:
+                # Conexiones de este hilo: no quedan abiertas entre lotes
+                connections.close_all()
+
+    def _tomar_lote(self):
+        with self._lock:
+            lote = list(self._buffer)
+            self._buffer.clear()
+        return lote
+
+    def vaciar(self):
+        """Guarda todos los eventos pendientes. Retorna cuántos se guardaron."""
+        lote = self._tomar_lote()
+        if not lote:
+            return 0
+        try:
+            guardar_eventos(lote)
+        except DatabaseError:
+            logger.exception('No se pudo guardar el historial de accesos (%s eventos)', len(lote))
+            with self._lock:
+                self.errores += 1
+                # Se reintentan en el próximo ciclo, antes que los nuevos
+                self._buffer.extendleft(reversed(lote))
+                maximo = _config('AUDITORIA_ACCESOS_MAXIMO', 10000)
+                while len(self._buffer) > maximo:
+                    self._buffer.popleft()
+                    self.descartados += 1
+            return 0
+        with self._lock:
+            self.escritos += len(lote)
+        return len(lote)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'pendientes': len(self._buffer),
+                'escritos': self.escritos,
+                'descartados': self.descartados,
+                'errores': self.errores,
+                'hilo_activo': bool(self._hilo and self._hilo.is_alive()),
+            }
+
+
+escritor = _EscritorAuditoria()
+
+
+def guardar_eventos(eventos):
+    """
+    Guarda una lista de eventos con un bulk_create. Los eventos sin usuario
+    se vinculan por username con una sola consulta.
+    """
+    from .models import HistorialAcceso
+
+    # Una consulta: ids de los usernames sin usuario y usuarios que siguen
+    # existiendo (uno borrado antes del guardado haría fallar el lote)
+    usernames = {e['username'] for e in eventos if not e.get('usuario_id') and e.get('username')}
+    user_ids = {e['usuario_id'] for e in eventos if e.get('usuario_id')}
+    filas = User.objects.filter(Q(username__in=usernames) | Q(pk__in=user_ids)).values_list('pk', 'username')
+    existentes = set()
+    ids = {}
+    for pk, username in filas:
+        existentes.add(pk)
+        ids[username] = pk
+
+    HistorialAcceso.objects.bulk_create(
+        [
+            HistorialAcceso(
+                usuario_id=(
+                    evento['usuario_id'] if evento.get('usuario_id') in existentes
+                    else ids.get(evento.get('username'))
+                ),
+                username=evento.get('username') or '',
+                evento=evento['evento'],
+                fecha_hora=evento['fecha_hora'],
+                ip_address=evento.get('ip_address'),
+                user_agent=evento.get('user_agent'),
+                exitoso=evento['exitoso'],
+            )
+            for evento in eventos
+        ],
+        batch_size=500,
+    )
+
+
+def registrar_acceso(request, evento, exitoso, usuario_id=None, username=''):
+    """
+    Registra un intento de login o refresh sin escribir en la base de datos
+    durante el request.
+
+    Args:
+        request: Request del intento (IP y user agent)
+        evento: 'LOGIN' o 'REFRESH'
+        exitoso: Si el intento fue exitoso
+        usuario_id: ID del usuario si se conoce
+        username: Username usado (se resuelve al guardar si falta usuario_id)
+    """
+    datos = {
+        'usuario_id': usuario_id,
+        'username': (username or '')[:150],
+        'evento': evento,
+        'fecha_hora': timezone.now(),
+        'ip_address': ip_cliente(request),
+        'user_agent': request.META.get('HTTP_USER_AGENT', '')[:LONGITUD_USER_AGENT],
+        'exitoso': exitoso,
+    }
+    if not _config('AUDITORIA_ACCESOS_ASINCRONA', True):
+        guardar_eventos([datos])
+        return
+    escritor.agregar(datos)
+
+
+def estadisticas():
+    return escritor.estadisticas()
+
+
+
+def consolidar_historial(dias, tamano_lote=5000, progreso=None):
+    """
+    Resume por día, usuario y evento los registros de HistorialAcceso
+    anteriores a hace `dias` días (desde la medianoche, para consolidar días
+    completos) en ResumenAccesoDiario y los borra por lotes.
+
+    Cada día se consolida en su propia transacción: si el proceso se corta,
+    los días ya consolidados no se vuelven a contar.
+
+    Returns:
+        (resúmenes creados, registros borrados)
+    """
+    from .models import HistorialAcceso, ResumenAccesoDiario
+
+    inicio_hoy = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    limite = inicio_hoy - timedelta(days=dias)
+    dias_antiguos = HistorialAcceso.objects.filter(fecha_hora__lt=limite).dates('fecha_hora', 'day')
+
+    creados = borrados = 0
+    for dia in list(dias_antiguos):
+        desde = timezone.make_aware(datetime.combine(dia, time.min))
+        registros = HistorialAcceso.objects.filter(fecha_hora__gte=desde, fecha_hora__lt=desde + timedelta(days=1))
+        grupos = (
+            registros.values('usuario_id', 'username', 'evento')
+            .annotate(
+                exitosos=Count('id', filter=Q(exitoso=True)),
+                fallidos=Count('id', filter=Q(exitoso=False)),
+            )
+            .order_by()
+        )
+        with transaction.atomic():
+            resumenes = ResumenAccesoDiario.objects.bulk_create([
+                ResumenAccesoDiario(fecha=dia, **grupo) for grupo in grupos
+            ])
+            creados += len(resumenes)
+            while True:
+                ids = list(registros.order_by('pk').values_list('pk', flat=True)[:tamano_lote])
+                if not ids:
+                    break
+                HistorialAcceso.objects.filter(pk__in=ids).delete()
+                borrados += len(ids)
+                if progreso:
+                    progreso(dia, borrados)
+    return creados, borrados
@@ -0,0 +1,110 @@
+"""
+Autenticación JWT sin un SELECT de auth_user por request.
+
+- CachedJWTAuthentication resuelve el usuario del token a través de la
+  caché de administracion.cache_usuarios (User con perfil, rol y
+  propietario ya cargados).
+- ClaimsJWTAuthentication, con los tokens emitidos por
+  administracion.tokens, entrega un UsuarioToken: expone id, username,
+  is_staff, rol, propietario_id, unidad_id y guardia_id desde el token, y
+  resuelve el User (por la misma caché) solo si la vista usa algún otro
+  atributo.
+"""
+from django.contrib.auth.models import User
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache_usuarios import resolver_usuario
+from .tokens import CLAIM_VERSION, CLAIMS, token_revocado
+
+
+class UsuarioToken(SimpleLazyObject):
+    """
+    Usuario autenticado por token. Los atributos que vienen en los claims
+    no consultan la base de datos; el resto carga el User la primera vez.
+    """
+
+    def __init__(self, token):
+        # simplejwt guarda el id como texto en el claim
+        user_id = User._meta.pk.to_python(token[api_settings.USER_ID_CLAIM])
+        claims = {claim: token.get(claim) for claim in CLAIMS}
+        # is_active: ClaimsJWTAuthentication ya verificó con token_revocado
+        # que el usuario está activo
+        claims.update(
+            id=user_id,
+            pk=user_id,
+            is_active=True,
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+        self.__dict__['claims'] = claims
+        super().__init__(lambda: resolver_usuario(user_id))
+
+    def __getattr__(self, name):
+        claims = self.__dict__['claims']
+        if name in claims:
+            return claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        return True
+
+    def __str__(self):
+        return self.__dict__['claims']['username'] or str(self.pk)
+
+    def __eq__(self, other):
+        if type(other) is UsuarioToken or isinstance(other, User):
+            return other.pk == self.pk
+        return super().__eq__(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def __setattr__(self, name, value):
+        if name in self.__dict__.get('claims', ()):
+            self.__dict__['claims'][name] = value
+        super().__setattr__(name, value)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication que resuelve el usuario a través de la caché."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('El token no contiene la identificación del usuario')
+
+        try:
+            user = resolver_usuario(User._meta.pk.to_python(user_id))
+        except User.DoesNotExist:
+            raise AuthenticationFailed('Usuario no encontrado', code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('Usuario inactivo', code='user_inactive')
+        return user
+
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    Autenticación sin consulta por request para tokens con claims de rol.
+    Los tokens emitidos antes (sin claim de versión) se resuelven con
+    CachedJWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if CLAIM_VERSION not in validated_token:
+            return super().get_user(validated_token)
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        if token_revocado(user_id, validated_token[CLAIM_VERSION]):
+            raise AuthenticationFailed('El token fue revocado, inicie sesión nuevamente', code='token_revoked')
+        return UsuarioToken(validated_token)
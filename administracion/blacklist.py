@@ -0,0 +1,226 @@
+"""
+Consulta y mantenimiento de la lista negra de refresh tokens.
+
+Con ROTATE_REFRESH_TOKENS y BLACKLIST_AFTER_ROTATION cada refresh agrega
+una fila a OutstandingToken y otra a BlacklistedToken, y simplejwt consulta
+BlacklistedToken (JOIN OutstandingToken) en cada refresh.
+
+esta_en_lista_negra(jti) resuelve la consulta en este orden:
+1. Marca en la caché: cada token agregado a la lista negra (signal
+   post_save de BlacklistedToken) queda marcado hasta que expira.
+2. Filtro de Bloom con los jti en lista negra no expirados, reconstruido
+   cada JWT_BLACKLIST_BLOOM_TTL segundos. Si el jti no está en el filtro,
+   no estaba en la lista al construirlo, y los agregados después tienen su
+   marca en la caché (paso 1): no hace falta consultar la base de datos.
+3. Si el filtro dice "quizás" (está o es un falso positivo), se consulta
+   la base de datos.
+
+El paso 2 solo es seguro si las marcas del paso 1 las ven todos los
+procesos (caché compartida y sin desalojo de claves), por lo que el filtro
+se usa únicamente con una caché compartida (JWT_BLACKLIST_BLOOM en
+settings; 'auto' lo activa cuando CACHE_BACKEND no es LocMemCache ni
+DummyCache).
+
+purgar_expirados() borra por lotes los tokens expirados (sus filas de
+BlacklistedToken se borran en cascada); lo ejecuta el comando
+purgar_tokens.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+PREFIJO_MARCA = 'jwt_lista_negra:'
+TASA_FALSOS_POSITIVOS = 0.01
+
+
+class FiltroBloom:
+    """Filtro de Bloom simple sobre un bytearray."""
+
+    def __init__(self, capacidad, tasa_falsos_positivos=TASA_FALSOS_POSITIVOS):
+        capacidad = max(capacidad, 1)
+        self.bits = max(8, int(-capacidad * math.log(tasa_falsos_positivos) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.bits / capacidad * math.log(2)))
+        self.datos = bytearray((self.bits + 7) // 8)
+
+    def _posiciones(self, valor):
+        digest = hashlib.blake2b(valor.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def agregar(self, valor):
+        for posicion in self._posiciones(valor):
+            self.datos[posicion >> 3] |= 1 << (posicion & 7)
+
+    def __contains__(self, valor):
+        return all(self.datos[posicion >> 3] & (1 << (posicion & 7)) for posicion in self._posiciones(valor))
+
+
+class _Metricas:
+    """Contadores de consultas a la lista negra y latencia de refresh en este proceso."""
+
+    MUESTRAS = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.consultas = {'marca_cache': 0, 'bloom_negativo': 0, 'base_datos': 0}
+            self.refresh_ms = []
+            self.refresh_total = 0
+
+    def registrar_consulta(self, origen):
+        with self._lock:
+            self.consultas[origen] += 1
+
+    def registrar_refresh(self, duracion_ms):
+        with self._lock:
+            self.refresh_total += 1
+            self.refresh_ms.append(duracion_ms)
+            if len(self.refresh_ms) > self.MUESTRAS:
+                del self.refresh_ms[:len(self.refresh_ms) - self.MUESTRAS]
+
+    def resumen(self):
+        with self._lock:
+            muestras = sorted(self.refresh_ms)
+            consultas = dict(self.consultas)
+            refresh_total = self.refresh_total
+
+        def percentil(p):
+            return round(muestras[min(len(muestras) - 1, int(len(muestras) * p))], 2) if muestras else None
+
+        return {
+            'consultas_lista_negra': consultas,
+            'refresh': {
+                'total': refresh_total,
+                'p50_ms': percentil(0.5),
+                'p95_ms': percentil(0.95),
+                'max_ms': round(muestras[-1], 2) if muestras else None,
+            },
+        }
+
+
+metricas = _Metricas()
+
+
+def bloom_habilitado():
+    valor = str(getattr(settings, 'JWT_BLACKLIST_BLOOM', 'auto')).lower()
+    if valor in ('1', 'true', 'yes', 'on'):
+        return True
+    if valor in ('0', 'false', 'no', 'off'):
+        return False
+    backend = settings.CACHES['default']['BACKEND']
+    return not backend.endswith(('LocMemCache', 'DummyCache'))
+
+
+def _ttl_bloom():
+    return getattr(settings, 'JWT_BLACKLIST_BLOOM_TTL', 300)
+
+
+class _BloomCompartido:
+    """Filtro de Bloom del proceso con su momento de construcción."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.filtro = None
+        self.construido = 0.0
+
+    def obtener(self):
+        if self.filtro is None or time.monotonic() - self.construido > _ttl_bloom():
+            with self._lock:
+                if self.filtro is None or time.monotonic() - self.construido > _ttl_bloom():
+                    self.filtro = self._construir()
+                    self.construido = time.monotonic()
+        return self.filtro
+
+    def descartar(self):
+        with self._lock:
+            self.filtro = None
+
+    def _construir(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        # Las marcas de la caché deben cubrir lo agregado durante la lectura
+        jtis = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).values_list('token__jti', flat=True)
+        jtis = list(jtis.iterator(chunk_size=5000))
+        filtro = FiltroBloom(int(len(jtis) * 1.5) + 1000)
+        for jti in jtis:
+            filtro.agregar(jti)
+        return filtro
+
+
+bloom = _BloomCompartido()
+
+
+def marcar(jti, expira):
+    """Marca un jti como en lista negra en la caché hasta que expira el token."""
+    segundos = int((expira - timezone.now()).total_seconds())
+    if segundos > 0:
+        cache.set(PREFIJO_MARCA + jti, True, segundos)
+
+
+def esta_en_lista_negra(jti):
+    """True si el refresh token con este jti está en la lista negra."""
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+    if cache.get(PREFIJO_MARCA + jti):
+        metricas.registrar_consulta('marca_cache')
+        return True
+
+    if bloom_habilitado() and jti not in bloom.obtener():
+        metricas.registrar_consulta('bloom_negativo')
+        return False
+
+    metricas.registrar_consulta('base_datos')
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def tamanos_tablas():
+    """Filas de las tablas de tokens (y cuántas ya expiraron)."""
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    ahora = timezone.now()
+    return {
+        'outstanding': OutstandingToken.objects.count(),
+        'outstanding_expirados': OutstandingToken.objects.filter(expires_at__lte=ahora).count(),
+        'blacklisted': BlacklistedToken.objects.count(),
+    }
+
+
+def purgar_expirados(margen=timedelta(0), tamano_lote=5000, progreso=None):
+    """
+    Borra por lotes los OutstandingToken expirados hace más de `margen`
+    (y en cascada sus BlacklistedToken), para no bloquear las tablas con un
+    solo DELETE grande.
+
+    Returns:
+        Cantidad de OutstandingToken borrados
+    """
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    limite = timezone.now() - margen
+    total = 0
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lte=limite)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:tamano_lote]
+        )
+        if not ids:
+            break
+        BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        OutstandingToken.objects.filter(pk__in=ids).delete()
+        total += len(ids)
+        if progreso:
+            progreso(total)
+    if total:
+        bloom.descartar()
+    return total
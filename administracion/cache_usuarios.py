@@ -0,0 +1,109 @@
+"""
+Caché de usuarios autenticados.
+
+Resolver el usuario de un JWT cuesta un SELECT de auth_user (y luego perfil,
+rol y propietario en muchas vistas). resolver_usuario() guarda en la caché
+el User con esas relaciones ya cargadas (sin el hash de la contraseña)
+durante AUTH_USER_CACHE_TTL segundos, de modo que las consolas de guardia y los propietarios que hacen
+muchas peticiones seguidas no consultan la base de datos en cada una.
+
+Los signals de administracion.signals borran la entrada al guardar el User,
+su perfil o su propietario, y GestorUsuarios.desactivar_usuario la borra de
+forma explícita. El TTL corto acota lo que queda desactualizado por cambios
+que no pasan por signals (update() masivos, cambios de Rol).
+"""
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+
+RELACIONES = ('perfil__rol', 'perfil__propietario')
+# Columnas que no se guardan en la caché: credenciales y URLs de borrado no
+# deben quedar copiadas en Redis/Memcached, y el texto de búsqueda no se usa.
+# Si una vista las lee, Django las carga de la base de datos en esa instancia.
+DIFERIDOS = (
+    'password',
+    'perfil__foto_delete_url',
+    'perfil__propietario__texto_busqueda',
+    'perfil__propietario__vector_busqueda',
+)
+
+
+class _Estadisticas:
+    """Aciertos y fallos de la caché en este proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.aciertos = 0
+            self.fallos = 0
+            self.invalidaciones = 0
+
+    def registrar(self, campo):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def resumen(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'invalidaciones': self.invalidaciones,
+                'ratio_aciertos': round(self.aciertos / total, 4) if total else None,
+                'ttl_segundos': _ttl(),
+            }
+
+
+estadisticas = _Estadisticas()
+
+
+def _ttl():
+    return getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+
+
+def _clave(user_id):
+    return f'usuario_auth:{user_id}'
+
+
+def cargar_usuario(user_id):
+    """Lee el User con perfil, rol y propietario (sin DIFERIDOS) en una consulta."""
+    return User.objects.select_related(*RELACIONES).defer(*DIFERIDOS).get(pk=user_id)
+
+
+def resolver_usuario(user_id):
+    """
+    Retorna el User (con perfil, rol y propietario) desde la caché o la
+    base de datos. Lanza User.DoesNotExist si no existe.
+    """
+    ttl = _ttl()
+    if ttl <= 0:
+        return cargar_usuario(user_id)
+
+    clave = _clave(user_id)
+    user = cache.get(clave)
+    if user is not None:
+        estadisticas.registrar('aciertos')
+        return user
+
+    estadisticas.registrar('fallos')
+    user = cargar_usuario(user_id)
+    cache.set(clave, user, ttl)
+    return user
+
+
+def invalidar_usuario(user_id):
+    """Borra el usuario de la caché (al confirmar la transacción actual)."""
+    if not user_id:
+        return
+    estadisticas.registrar('invalidaciones')
+    clave = _clave(user_id)
+    cache.delete(clave)
+    # También al confirmar: una petición concurrente pudo volver a cachear
+    # la versión anterior antes del COMMIT
+    transaction.on_commit(lambda: cache.delete(clave))
@@ -0,0 +1,131 @@
+"""
+Cálculo y guardado de contraseñas en lote.
+
+PBKDF2 es lento a propósito (cientos de milisegundos por contraseña), por
+lo que las cargas masivas de usuarios reparten el cálculo entre todos los
+núcleos con un ProcessPoolExecutor y luego guardan los hashes con
+bulk_update por lotes, en lugar de un set_password() + save() por usuario.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+
+# Por debajo de esta cantidad no compensa levantar procesos
+MINIMO_PARALELO = 8
+TAMANO_LOTE = 500
+
+
+def _inicializar_worker():
+    """Prepara Django en los procesos hijos (necesario con el método spawn)."""
+    import django
+    from django.apps import apps
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'condominio.settings')
+    if not apps.ready:
+        django.setup()
+
+
+@contextmanager
+def _pool(procesos):
+    """ProcessPoolExecutor con Django inicializado, o None si se trabaja en serie."""
+    if procesos <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_worker) as executor:
+        yield executor
+
+
+def _hashear(executor, passwords, procesos):
+    if executor is None or len(passwords) < MINIMO_PARALELO:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (procesos * 4))
+    return list(executor.map(make_password, passwords, chunksize=chunksize))
+
+
+def hashear_passwords(passwords, procesos=None):
+    """
+    Calcula make_password para cada contraseña, en paralelo si hay varias.
+
+    Args:
+        passwords: Lista de contraseñas en texto plano
+        procesos: Cantidad de procesos (por defecto, todos los núcleos)
+
+    Returns:
+        Lista de hashes en el mismo orden
+    """
+    passwords = list(passwords)
+    procesos = procesos or os.cpu_count() or 1
+    if len(passwords) < MINIMO_PARALELO:
+        procesos = 1
+    with _pool(procesos) as executor:
+        return _hashear(executor, passwords, procesos)
+
+
+def establecer_passwords(pares, procesos=None, tamano_lote=TAMANO_LOTE, progreso=None):
+    """
+    Cambia la contraseña de muchos usuarios.
+
+    Los hashes de cada lote se calculan en paralelo y se guardan con un
+    bulk_update (solo la columna password) en su propia transacción, de
+    modo que un corte a mitad de camino conserva los lotes ya guardados.
+
+    Args:
+        pares: Iterable de (user_id, password en texto plano)
+        procesos: Procesos para calcular los hashes (por defecto, todos los núcleos)
+        tamano_lote: Usuarios por lote
+        progreso: Función opcional progreso(procesados, total) llamada tras cada lote
+
+    Returns:
+        Cantidad de usuarios actualizados
+    """
+    pares = list(pares)
+    total = len(pares)
+    procesos = procesos or os.cpu_count() or 1
+    if total < MINIMO_PARALELO:
+        procesos = 1
+
+    actualizados = 0
+    with _pool(procesos) as executor:
+        for inicio in range(0, total, tamano_lote):
+            lote = pares[inicio:inicio + tamano_lote]
+            hashes = _hashear(executor, [password for _, password in lote], procesos)
+            usuarios = [User(pk=user_id, password=password) for (user_id, _), password in zip(lote, hashes)]
+            with transaction.atomic():
+                User.objects.bulk_update(usuarios, ['password'])
+            actualizados += len(usuarios)
+            if progreso:
+                progreso(actualizados, total)
+    return actualizados
+
+
+def resetear_passwords_propietarios(propietarios=None, requerir_cambio=False, **kwargs):
+    """
+    Restablece la contraseña de los usuarios propietarios a su documento de
+    identidad (la contraseña inicial del alta).
+
+    Args:
+        propietarios: QuerySet de Propietario (por defecto, todos)
+        requerir_cambio: Marca el perfil para forzar el cambio en el próximo login
+        **kwargs: procesos, tamano_lote y progreso de establecer_passwords
+
+    Returns:
+        Cantidad de usuarios actualizados
+    """
+    from gestion.models import Propietario
+    from .models import PerfilUsuario
+
+    if propietarios is None:
+        propietarios = Propietario.objects.all()
+    propietarios = propietarios.exclude(documento_identidad='')
+    pares = propietarios.order_by('user_id').values_list('user_id', 'documento_identidad')
+    actualizados = establecer_passwords(pares, **kwargs)
+
+    if requerir_cambio and actualizados:
+        PerfilUsuario.objects.filter(user_id__in=propietarios.values('user_id')).update(
+            cambio_password_requerido=True
+        )
+    return actualizados
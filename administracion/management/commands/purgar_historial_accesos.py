@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from administracion.auditoria import consolidar_historial
+
+
+class Command(BaseCommand):
+    help = (
+        'Resume por día los registros de HistorialAcceso más antiguos que la retención '
+        'y los borra por lotes. Pensado para ejecutarse periódicamente (cron, p. ej. una vez por día)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=settings.AUDITORIA_ACCESOS_RETENCION_DIAS,
+            help='Días de historial detallado que se conservan',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000, help='Registros borrados por lote')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Consolidando accesos de hace más de {options["dias"]} días...')
+
+        def progreso(dia, borrados):
+            self.stdout.write(f'  {dia}: {borrados} registros consolidados')
+
+        creados, borrados = consolidar_historial(options['dias'], tamano_lote=options['batch_size'], progreso=progreso)
+        self.stdout.write(self.style.SUCCESS(f'✓ {borrados} registros resumidos en {creados} resúmenes diarios'))
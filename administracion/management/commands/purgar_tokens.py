@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from administracion.blacklist import purgar_expirados, tamanos_tablas
+
+
+class Command(BaseCommand):
+    help = (
+        'Borra por lotes los refresh tokens expirados (OutstandingToken y BlacklistedToken). '
+        'Pensado para ejecutarse periódicamente (cron, p. ej. una vez por día)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Tokens borrados por lote')
+        parser.add_argument('--margen-horas', type=int, default=0, help='Solo tokens expirados hace más de estas horas')
+        parser.add_argument('--solo-metricas', action='store_true', help='Mostrar el tamaño de las tablas sin borrar')
+
+    def _mostrar_tablas(self, titulo):
+        tablas = tamanos_tablas()
+        self.stdout.write(
+            f'{titulo}: {tablas["outstanding"]} outstanding '
+            f'({tablas["outstanding_expirados"]} expirados), {tablas["blacklisted"]} en lista negra'
+        )
+
+    def handle(self, *args, **options):
+        self._mostrar_tablas('Antes')
+        if options['solo_metricas']:
+            return
+
+        def progreso(borrados):
+            self.stdout.write(f'  {borrados} tokens borrados')
+
+        borrados = purgar_expirados(
+            margen=timedelta(hours=options['margen_horas']),
+            tamano_lote=options['batch_size'],
+            progreso=progreso,
+        )
+        self._mostrar_tablas('Después')
+        self.stdout.write(self.style.SUCCESS(f'✓ {borrados} tokens expirados borrados'))
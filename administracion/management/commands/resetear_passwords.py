@@ -0,0 +1,38 @@
+import os
+
+from django.core.management.base import BaseCommand
+from gestion.models import Propietario
+from administracion.credenciales import TAMANO_LOTE, resetear_passwords_propietarios
+
+
+class Command(BaseCommand):
+    help = 'Restablece la contraseña de los propietarios a su documento de identidad'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--propietario', type=int, action='append', help='ID de propietario (se puede repetir)')
+        parser.add_argument('--edificio', help='Solo propietarios de unidades de este edificio')
+        parser.add_argument('--procesos', type=int, default=None, help='Procesos para calcular los hashes (por defecto, todos los núcleos)')
+        parser.add_argument('--batch-size', type=int, default=TAMANO_LOTE, help='Usuarios por lote')
+        parser.add_argument('--requerir-cambio', action='store_true', help='Forzar el cambio de contraseña en el próximo login')
+
+    def handle(self, *args, **options):
+        propietarios = Propietario.objects.all()
+        if options['propietario']:
+            propietarios = propietarios.filter(pk__in=options['propietario'])
+        if options['edificio']:
+            propietarios = propietarios.filter(unidad__edificio=options['edificio'])
+
+        procesos = options['procesos'] or os.cpu_count() or 1
+        self.stdout.write(f'Restableciendo contraseñas con {procesos} proceso(s)...')
+
+        def progreso(procesados, total):
+            self.stdout.write(f'  {procesados}/{total} usuarios')
+
+        actualizados = resetear_passwords_propietarios(
+            propietarios,
+            requerir_cambio=options['requerir_cambio'],
+            procesos=procesos,
+            tamano_lote=options['batch_size'],
+            progreso=progreso,
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ {actualizados} contraseñas restablecidas'))
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0003_perfilusuario_foto_delete_url_perfilusuario_foto_url'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='perfilusuario',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text='Se incrementa al cambiar el rol o el acceso; invalida los tokens emitidos antes'),
+        ),
+    ]
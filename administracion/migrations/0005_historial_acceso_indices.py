@@ -0,0 +1,78 @@
+# Generated by Django 5.1.12 on 2026-10-19 11:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0004_perfilusuario_token_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenAccesoDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('username', models.CharField(blank=True, max_length=150)),
+                ('evento', models.CharField(choices=[('LOGIN', 'Inicio de sesión'), ('REFRESH', 'Renovación de token')], default='LOGIN', max_length=10)),
+                ('exitosos', models.PositiveIntegerField(default=0)),
+                ('fallidos', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Resumen Diario de Accesos',
+                'verbose_name_plural': 'Resúmenes Diarios de Accesos',
+                'ordering': ['-fecha'],
+            },
+        ),
+        migrations.AddField(
+            model_name='historialacceso',
+            name='evento',
+            field=models.CharField(choices=[('LOGIN', 'Inicio de sesión'), ('REFRESH', 'Renovación de token')], default='LOGIN', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='historialacceso',
+            name='username',
+            field=models.CharField(blank=True, help_text='Username usado en el intento', max_length=150),
+        ),
+        migrations.AlterField(
+            model_name='historialacceso',
+            name='fecha_hora',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='historialacceso',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='historial_accesos', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='historialacceso',
+            index=models.Index(fields=['-fecha_hora'], name='historial_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historialacceso',
+            index=models.Index(fields=['usuario', '-fecha_hora'], name='historial_usuario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='historialacceso',
+            index=models.Index(fields=['exitoso', '-fecha_hora'], name='historial_exitoso_fecha_idx'),
+        ),
+        migrations.AddField(
+            model_name='resumenaccesodiario',
+            name='usuario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='resumen_accesos', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='resumenaccesodiario',
+            index=models.Index(fields=['-fecha'], name='resumen_acceso_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resumenaccesodiario',
+            index=models.Index(fields=['usuario', '-fecha'], name='resumen_acceso_usuario_idx'),
+        ),
+    ]
@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User, Group
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from condominio.dirty_fields import DirtyFieldsMixin
 
 class Rol(models.Model):
     """
@@ -30,7 +32,7 @@ class Rol(models.Model):
         return self.get_nombre_display()
 
 
-class PerfilUsuario(models.Model):
+class PerfilUsuario(DirtyFieldsMixin, models.Model):
     """
     Extensión del modelo User de Django para información adicional.
     Vincula usuarios con roles y propietarios.
@@ -59,6 +61,9 @@ class PerfilUsuario(models.Model):
     creado_automaticamente = models.BooleanField(default=False)
     cambio_password_requerido = models.BooleanField(default=False)
     
+    # Versión de los claims de rol en los JWT (administracion.tokens)
+    token_version = models.PositiveIntegerField(default=0, help_text='Se incrementa al cambiar el rol o el acceso; invalida los tokens emitidos antes')
+    
     class Meta:
         verbose_name = 'Perfil de Usuario'
         verbose_name_plural = 'Perfiles de Usuario'
@@ -71,9 +76,19 @@ class PerfilUsuario(models.Model):
 class HistorialAcceso(models.Model):
     """
     Registro de accesos al sistema para auditoría.
+    Lo escribe por lotes administracion.auditoria (login y refresh de JWT).
     """
-    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='historial_accesos')
-    fecha_hora = models.DateTimeField(auto_now_add=True)
+    EVENTOS_CHOICES = [
+        ('LOGIN', 'Inicio de sesión'),
+        ('REFRESH', 'Renovación de token'),
+    ]
+    
+    # Nulo en intentos fallidos con un username que no existe
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='historial_accesos', null=True, blank=True)
+    username = models.CharField(max_length=150, blank=True, help_text='Username usado en el intento')
+    evento = models.CharField(max_length=10, choices=EVENTOS_CHOICES, default='LOGIN')
+    # default en lugar de auto_now_add: conserva la hora del evento al guardarse por lotes
+    fecha_hora = models.DateTimeField(default=timezone.now)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True, null=True)
     exitoso = models.BooleanField(default=True)
@@ -82,9 +97,40 @@ class HistorialAcceso(models.Model):
         verbose_name = 'Historial de Acceso'
         verbose_name_plural = 'Historiales de Acceso'
         ordering = ['-fecha_hora']
+        indexes = [
+            models.Index(fields=['-fecha_hora'], name='historial_fecha_idx'),
+            models.Index(fields=['usuario', '-fecha_hora'], name='historial_usuario_fecha_idx'),
+            models.Index(fields=['exitoso', '-fecha_hora'], name='historial_exitoso_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        nombre = self.usuario.username if self.usuario_id else self.username
+        return f"{nombre} - {self.fecha_hora.strftime('%d/%m/%Y %H:%M')}"
+
+
+class ResumenAccesoDiario(models.Model):
+    """
+    Conteo diario de accesos por usuario y evento. Reemplaza a los registros
+    de HistorialAcceso más antiguos que la retención (purgar_historial_accesos).
+    """
+    fecha = models.DateField()
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resumen_accesos', null=True, blank=True)
+    username = models.CharField(max_length=150, blank=True)
+    evento = models.CharField(max_length=10, choices=HistorialAcceso.EVENTOS_CHOICES, default='LOGIN')
+    exitosos = models.PositiveIntegerField(default=0)
+    fallidos = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = 'Resumen Diario de Accesos'
+        verbose_name_plural = 'Resúmenes Diarios de Accesos'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(fields=['-fecha'], name='resumen_acceso_fecha_idx'),
+            models.Index(fields=['usuario', '-fecha'], name='resumen_acceso_usuario_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.usuario.username} - {self.fecha_hora.strftime('%d/%m/%Y %H:%M')}"
+        return f"{self.username} - {self.fecha} ({self.exitosos}/{self.fallidos})"
 
 
 # Signal para crear perfil automáticamente cuando se crea un User
@@ -98,9 +144,12 @@ def crear_perfil_usuario(sender, instance, created, **kwargs):
 
 
 @receiver(post_save, sender=User)
-def guardar_perfil_usuario(sender, instance, **kwargs):
+def guardar_perfil_usuario(sender, instance, created, **kwargs):
     """
-    Guarda el perfil cuando se actualiza el User.
+    Guarda el perfil cuando se actualiza el User, solo si ya estaba cargado
+    y tiene cambios. Los guardados que no tocan el perfil (ej: last_login
+    en cada login) no escriben en perfil.
     """
-    if hasattr(instance, 'perfil'):
-        instance.perfil.save()
+    if created or not sender.perfil.is_cached(instance):
+        return
+    instance.perfil.save()
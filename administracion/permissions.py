@@ -0,0 +1,70 @@
+"""
+Permisos por rol.
+
+Con ClaimsJWTAuthentication el rol viene en el token y los permisos no
+consultan la base de datos. Para usuarios autenticados de otra forma
+(sesión del admin, tests) el rol se lee del perfil.
+"""
+from rest_framework.permissions import BasePermission
+
+
+def _claims(user):
+    return user.__dict__.get('claims')
+
+
+def rol_usuario(user):
+    """Nombre del rol del usuario ('ADMIN', 'PROPIETARIO', ...) o None."""
+    claims = _claims(user)
+    if claims is not None:
+        return claims['rol']
+    perfil = getattr(user, 'perfil', None)
+    return perfil.rol.nombre if perfil and perfil.rol_id else None
+
+
+def propietario_usuario(user):
+    """ID del propietario vinculado al usuario o None."""
+    claims = _claims(user)
+    if claims is not None:
+        return claims['propietario_id']
+    from gestion.models import Propietario
+
+    propietario_id = Propietario.objects.filter(user_id=user.pk).values_list('pk', flat=True).first()
+    if propietario_id is None:
+        perfil = getattr(user, 'perfil', None)
+        propietario_id = perfil.propietario_id if perfil else None
+    return propietario_id
+
+
+class TieneRol(BasePermission):
+    """Permite el acceso a usuarios con alguno de los roles de `roles`."""
+    roles = ()
+    message = 'No tiene el rol requerido para esta acción'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return rol_usuario(user) in self.roles
+
+
+class EsAdministrador(TieneRol):
+    """Rol ADMIN o superusuario."""
+    roles = ('ADMIN',)
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_authenticated and request.user.is_superuser:
+            return True
+        return super().has_permission(request, view)
+
+
+class EsResidente(TieneRol):
+    roles = ('PROPIETARIO', 'INQUILINO')
+
+
+class EsGuardia(TieneRol):
+    roles = ('GUARDIA',)
+
+
+def con_roles(*roles):
+    """Clase de permiso para una combinación de roles. Ej: con_roles('ADMIN', 'GUARDIA')"""
+    return type('TieneRol_' + '_'.join(roles), (TieneRol,), {'roles': roles})
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Rol, PerfilUsuario, HistorialAcceso
+from condominio.media_proxy import MediaURLMixin
 
 
 class RolSerializer(serializers.ModelSerializer):
@@ -12,9 +13,9 @@ class RolSerializer(serializers.ModelSerializer):
         read_only_fields = ['fecha_creacion']
 
 
-class PerfilUsuarioSerializer(serializers.ModelSerializer):
+class PerfilUsuarioSerializer(MediaURLMixin, serializers.ModelSerializer):
     rol_display = serializers.CharField(source='rol.get_nombre_display', read_only=True)
-    propietario_nombre = serializers.CharField(source='propietario.nombre', read_only=True)
+    propietario_nombre = serializers.CharField(source='propietario.user.get_full_name', read_only=True)
     
     class Meta:
         model = PerfilUsuario
@@ -135,6 +136,6 @@ class HistorialAccesoSerializer(serializers.ModelSerializer):
         model = HistorialAcceso
         fields = [
             'id', 'usuario', 'usuario_username', 'usuario_nombre',
-            'fecha_hora', 'ip_address', 'user_agent', 'exitoso'
+            'username', 'evento', 'fecha_hora', 'ip_address', 'user_agent', 'exitoso'
         ]
         read_only_fields = fields
@@ -1,5 +1,7 @@
 from django.contrib.auth.models import User, Group
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from .cache_usuarios import invalidar_usuario
 from .models import Rol, PerfilUsuario
 import re
 
@@ -34,19 +36,85 @@ class GestorUsuarios:
         return primer_nombre
     
     @staticmethod
-    def generar_username_unico(nombre_base):
+    def generar_usernames_unicos(nombres_base, reservados=()):
+        """
+        Asigna usernames únicos para varios nombres base a la vez.
+
+        Trae con una sola consulta por prefijo (LIKE 'base%', que usa el
+        índice del username) los usernames existentes y elige en memoria el
+        primer sufijo libre, sin repetir nombres dentro del mismo lote.
+        Ej: ["juan", "juan", "ana"] -> ["juan3", "juan4", "ana"] si ya
+        existen "juan" y "juan2".
+
+        Args:
+            nombres_base: Lista de nombres base normalizados
+            reservados: Usernames a considerar ocupados aunque no estén en la base
+
+        Returns:
+            list: Usernames en el mismo orden que nombres_base
+        """
+        bases = sorted(set(nombres_base))
+        if not bases:
+            return []
+
+        existentes = set(reservados)
+        for inicio in range(0, len(bases), 200):
+            filtro = Q()
+            for base in bases[inicio:inicio + 200]:
+                filtro |= Q(username__startswith=base)
+            existentes.update(User.objects.filter(filtro).values_list('username', flat=True))
+
+        # Sufijos ocupados por base: "juan" -> 1, "juan7" -> 7. Se prueban
+        # todos los cortes porque la base puede terminar en dígitos (un
+        # documento): "1234" ocupa la base "1234" y "12345" también la "1234"
+        ocupados = {base: set() for base in bases}
+        for username in existentes:
+            for corte in range(len(username) + 1):
+                base, sufijo = username[:corte], username[corte:]
+                if base not in ocupados:
+                    continue
+                if not sufijo:
+                    ocupados[base].add(1)
+                elif sufijo.isdigit() and sufijo[0] != '0' and sufijo != '1':
+                    ocupados[base].add(int(sufijo))
+
+        siguiente = {base: 1 for base in bases}
+        usernames = []
+        for base in nombres_base:
+            sufijo = siguiente[base]
+            while sufijo in ocupados[base]:
+                sufijo += 1
+            ocupados[base].add(sufijo)
+            siguiente[base] = sufijo + 1
+            usernames.append(base if sufijo == 1 else f"{base}{sufijo}")
+        return usernames
+    
+    @staticmethod
+    def generar_username_unico(nombre_base, reservados=()):
         """
         Genera un username único agregando números si es necesario.
         Ej: "juan" -> "juan", "juan2", "juan3"...
         """
-        username = nombre_base
-        contador = 2
-        
-        while User.objects.filter(username=username).exists():
-            username = f"{nombre_base}{contador}"
-            contador += 1
-        
-        return username
+        return GestorUsuarios.generar_usernames_unicos([nombre_base], reservados)[0]
+    
+    @staticmethod
+    def crear_con_username_unico(nombre_base, crear, intentos=5):
+        """
+        Ejecuta crear(username) con un username libre. Si otro proceso tomó
+        el mismo username entre la consulta y el INSERT (IntegrityError por
+        la restricción única), reintenta con el siguiente sufijo.
+        """
+        descartados = set()
+        for _ in range(intentos):
+            username = GestorUsuarios.generar_username_unico(nombre_base, descartados)
+            try:
+                with transaction.atomic():
+                    return crear(username)
+            except IntegrityError:
+                if not User.objects.filter(username=username).exists():
+                    raise
+                descartados.add(username)
+        raise ValueError(f"No se pudo asignar un username libre para '{nombre_base}'")
     
     @staticmethod
     @transaction.atomic
@@ -72,8 +140,6 @@ class GestorUsuarios:
         if not nombre_base:
             raise ValueError("El propietario debe tener un nombre válido")
         
-        username = GestorUsuarios.generar_username_unico(nombre_base)
-        
         # La contraseña es el número de carnet/CI
         password = str(propietario.ci).strip()
         if not password:
@@ -88,8 +154,8 @@ class GestorUsuarios:
             }
         )
         
-        # Crear el usuario
-        user = User.objects.create_user(
+        # Crear el usuario con un username libre
+        user = GestorUsuarios.crear_con_username_unico(nombre_base, lambda username: User.objects.create_user(
             username=username,
             password=password,
             first_name=propietario.nombre.split()[0] if propietario.nombre else '',
@@ -98,7 +164,7 @@ class GestorUsuarios:
             is_active=True,
             is_staff=False,
             is_superuser=False
-        )
+        ))
         
         # Asignar al grupo
         user.groups.add(rol_propietario.django_group)
@@ -176,23 +242,45 @@ class GestorUsuarios:
         Cambia la contraseña del usuario y marca que ya no requiere cambio.
         """
         user.set_password(nueva_password)
-        user.save()
+        user.save(update_fields=['password'])
         
         if hasattr(user, 'perfil'):
             user.perfil.cambio_password_requerido = False
             user.perfil.save()
     
+    @staticmethod
+    def cambiar_passwords(pares, **kwargs):
+        """
+        Cambia la contraseña de muchos usuarios a la vez (hashes en paralelo
+        y guardado con bulk_update) y marca que ya no requieren cambio.
+
+        Args:
+            pares: Iterable de (user, nueva_password)
+            **kwargs: procesos, tamano_lote y progreso de establecer_passwords
+        """
+        from .credenciales import establecer_passwords
+
+        pares = [(user.pk, password) for user, password in pares]
+        actualizados = establecer_passwords(pares, **kwargs)
+        PerfilUsuario.objects.filter(user_id__in=[user_id for user_id, _ in pares]).update(
+            cambio_password_requerido=False
+        )
+        return actualizados
+    
     @staticmethod
     def desactivar_usuario(user):
         """
         Desactiva un usuario (no lo elimina).
         """
         user.is_active = False
-        user.save()
+        user.save(update_fields=['is_active'])
         
         if hasattr(user, 'perfil'):
             user.perfil.activo = False
             user.perfil.save()
+        
+        # Que las peticiones con su token dejen de resolverlo desde la caché
+        invalidar_usuario(user.pk)
     
     @staticmethod
     def activar_usuario(user):
@@ -200,7 +288,7 @@ class GestorUsuarios:
         Activa un usuario desactivado.
         """
         user.is_active = True
-        user.save()
+        user.save(update_fields=['is_active'])
         
         if hasattr(user, 'perfil'):
             user.perfil.activo = True
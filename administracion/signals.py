@@ -1,6 +1,119 @@
-from django.db.models.signals import post_save
+"""
+Invalidación de los claims de rol de los JWT (administracion.tokens) y de
+la caché de usuarios autenticados (administracion.cache_usuarios), y marca
+en la caché los refresh tokens agregados a la lista negra
+(administracion.blacklist).
+
+Cada cambio que altera los claims de un usuario incrementa su versión de
+token, lo que revoca los access tokens emitidos antes.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from gestion.models import Propietario, UnidadHabitacional
+from seguridad.models import Guardia
+from .blacklist import marcar
+from .cache_usuarios import invalidar_usuario
+from .models import PerfilUsuario
+from .tokens import invalidar_tokens
+
+CAMPOS_USER = {'is_active', 'is_staff', 'is_superuser'}
+CAMPOS_PERFIL = {'rol', 'propietario', 'activo'}
+
+
+@receiver(post_save, sender=User, dispatch_uid='cache_usuario_user_post_save')
+@receiver(post_delete, sender=User, dispatch_uid='cache_usuario_user_post_delete')
+def invalidar_cache_user(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_usuario(instance.pk)
+
+
+@receiver(post_save, sender=PerfilUsuario, dispatch_uid='cache_usuario_perfil_post_save')
+@receiver(post_delete, sender=PerfilUsuario, dispatch_uid='cache_usuario_perfil_post_delete')
+@receiver(post_save, sender=Propietario, dispatch_uid='cache_usuario_propietario_post_save')
+@receiver(post_delete, sender=Propietario, dispatch_uid='cache_usuario_propietario_post_delete')
+def invalidar_cache_relacionado(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_usuario(instance.user_id)
+
+
+@receiver(pre_save, sender=User, dispatch_uid='tokens_user_pre_save')
+def capturar_acceso_user(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not CAMPOS_USER & set(update_fields):
+        instance._acceso_anterior = None
+        return
+    instance._acceso_anterior = User.objects.filter(pk=instance.pk).values(*CAMPOS_USER).first()
+
+
+@receiver(post_save, sender=User, dispatch_uid='tokens_user_post_save')
+def invalidar_tokens_user(sender, instance, created, raw=False, **kwargs):
+    anterior = getattr(instance, '_acceso_anterior', None)
+    if raw or created or not anterior:
+        return
+    if any(anterior[campo] != getattr(instance, campo) for campo in CAMPOS_USER):
+        invalidar_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User, dispatch_uid='tokens_user_post_delete')
+def revocar_tokens_user(sender, instance, **kwargs):
+    invalidar_tokens(instance.pk, eliminado=True)
+
+
+@receiver(post_save, sender=PerfilUsuario, dispatch_uid='tokens_perfil_post_save')
+def invalidar_tokens_perfil(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created:
+        return
+    if update_fields is not None and not CAMPOS_PERFIL & set(update_fields):
+        return
+    invalidar_tokens(instance.user_id)
+
+
+@receiver(post_save, sender=Propietario, dispatch_uid='tokens_propietario_post_save')
+@receiver(post_save, sender=Guardia, dispatch_uid='tokens_guardia_post_save')
+def invalidar_tokens_alta(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        invalidar_tokens(instance.user_id)
+
+
+@receiver(post_delete, sender=Propietario, dispatch_uid='tokens_propietario_post_delete')
+@receiver(post_delete, sender=Guardia, dispatch_uid='tokens_guardia_post_delete')
+def invalidar_tokens_baja(sender, instance, **kwargs):
+    invalidar_tokens(instance.user_id)
+
+
+@receiver(pre_save, sender=UnidadHabitacional, dispatch_uid='tokens_unidad_pre_save')
+def capturar_propietario_unidad(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._propietario_anterior = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and 'propietario' not in update_fields:
+        return
+    instance._propietario_anterior = UnidadHabitacional.objects.filter(pk=instance.pk).values_list('propietario_id', flat=True).first()
+
+
+@receiver(post_save, sender=UnidadHabitacional, dispatch_uid='tokens_unidad_post_save')
+@receiver(post_delete, sender=UnidadHabitacional, dispatch_uid='tokens_unidad_post_delete')
+def invalidar_tokens_unidad(sender, instance, raw=False, **kwargs):
+    """Cambia el claim unidad_id del propietario nuevo y del anterior."""
+    if raw:
+        return
+    propietarios = {instance.propietario_id}
+    if kwargs.get('created') is False:
+        anterior = getattr(instance, '_propietario_anterior', None)
+        if anterior is None or anterior == instance.propietario_id:
+            return
+        propietarios.add(anterior)
+    for user_id in Propietario.objects.filter(pk__in=propietarios).values_list('user_id', flat=True):
+        invalidar_tokens(user_id)
+
 
-# Aquí puedes agregar signals personalizados en el futuro
-# Por ejemplo, para enviar emails cuando se crea un usuario, etc.
+@receiver(post_save, sender=BlacklistedToken, dispatch_uid='lista_negra_post_save')
+def marcar_token_lista_negra(sender, instance, created, raw=False, **kwargs):
+    # Se marca antes del COMMIT: ningún proceso debe aceptar el token
+    # mientras su filtro de Bloom todavía no lo incluye
+    if created and not raw:
+        marcar(instance.token.jti, instance.token.expires_at)
@@ -1,3 +1,119 @@
-from django.test import TestCase
+import time
 
-# Create your tests here.
+import jwt
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from administracion.cache_usuarios import resolver_usuario
+from administracion.models import HistorialAcceso, PerfilUsuario, Rol
+from condominio.pruebas import ConsultasAcotadasTestCase
+
+
+class ConsultasAdministracionTests(ConsultasAcotadasTestCase):
+    def test_roles(self):
+        self.assertConsultasAcotadas('/api/administracion/roles/', 1)
+        self.assertConsultasMaximas(f'/api/administracion/roles/{Rol.objects.first().pk}/', 1)
+
+    def test_usuarios(self):
+        self.assertConsultasAcotadas('/api/administracion/users/', 1)
+        self.assertConsultasMaximas(f'/api/administracion/users/{self.propietario.user_id}/', 1)
+
+    def test_usuarios_acciones_de_lectura(self):
+        self.assertConsultasMaximas('/api/administracion/users/me/', 1)
+        self.assertConsultasMaximas('/api/administracion/users/cache_autenticacion/', 0)
+        self.assertConsultasAcotadas('/api/administracion/users/tokens_metricas/', 3)
+
+    def test_usuarios_acciones_de_escritura(self):
+        base = f'/api/administracion/users/{self.propietario.user_id}'
+        self.assertConsultasMaximas(f'{base}/desactivar/', 10, metodo='post')
+        self.assertConsultasMaximas(f'{base}/activar/', 10, metodo='post')
+        self.assertConsultasMaximas(
+            f'{base}/cambiar_password/', 3, metodo='post',
+            data={'password_nueva': 'nueva1', 'password_confirmacion': 'nueva1'},
+        )
+        self.assertConsultasMaximas(f'{base}/asignar_rol/', 10, metodo='patch', data={'rol': 'PROPIETARIO'})
+
+    def test_crear_usuarios(self):
+        self.assertConsultasMaximas(
+            '/api/administracion/users/crear_staff/', 25, metodo='post', estado=201,
+            data={'username': 'guardia_nuevo', 'password': 'clave1', 'email': 'g@example.com', 'rol': 'GUARDIA'},
+        )
+        self.assertConsultasMaximas(
+            '/api/administracion/users/crear_propietario/', 25, metodo='post', estado=201,
+            data={
+                'username': 'propietario_nuevo', 'email': 'p@example.com', 'first_name': 'Ana',
+                'last_name': 'Rojas', 'documento_identidad': self.propietarios[1].documento_identidad,
+            },
+        )
+
+    def test_historial_accesos(self):
+        self.assertConsultasAcotadas('/api/administracion/historial-accesos/', 1)
+        self.assertConsultasAcotadas('/api/administracion/historial-accesos/?exitoso=false', 1)
+        self.assertConsultasMaximas(f'/api/administracion/historial-accesos/{HistorialAcceso.objects.first().pk}/', 1)
+        self.assertConsultasMaximas('/api/administracion/historial-accesos/auditoria/', 0)
+
+    def test_cache_usuarios_sin_password(self):
+        user_id = self.propietario.user_id
+        resolver_usuario(user_id)
+        cacheado = cache.get(f'usuario_auth:{user_id}')
+        self.assertIn('password', cacheado.get_deferred_fields())
+        self.assertIn('foto_delete_url', cacheado.perfil.get_deferred_fields())
+
+    def test_historial_accesos_rango_de_fechas(self):
+        hoy = timezone.localdate().isoformat()
+        url = '/api/administracion/historial-accesos/'
+        response = self.client.get(url, {'desde': hoy, 'hasta': hoy})
+        self.assertEqual(response.status_code, 200)
+        esperados = HistorialAcceso.objects.filter(fecha_hora__date=timezone.localdate()).count()
+        self.assertEqual(len(response.data), min(esperados, 500))
+        for fecha in ('2026-13-01', 'ayer'):
+            self.assertEqual(self.client.get(url, {'desde': fecha}).status_code, 400)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    AUDITORIA_ACCESOS_ASINCRONA=False,
+)
+class RevocacionTokensTests(APITestCase):
+    """Cambios hechos por otro proceso (sin signals ni caché) revocan el token."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('revocable', password='clave1')
+        respuesta = self.client.post('/api/token/', {'username': 'revocable', 'password': 'clave1'}, format='json')
+        self.refresh = respuesta.data['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {respuesta.data['access']}")
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 200)
+
+    def test_usuario_desactivado(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.clear()
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+    def test_version_de_token_cambiada(self):
+        PerfilUsuario.objects.filter(user=self.user).update(token_version=F('token_version') + 1)
+        cache.clear()
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+    def test_desactivar_en_este_proceso(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/user/me/').status_code, 401)
+
+    def test_refresh_fallido_no_se_atribuye_al_usuario(self):
+        falsificado = jwt.encode(
+            {'token_type': 'refresh', 'user_id': self.user.pk, 'username': 'revocable',
+             'exp': int(time.time()) + 60, 'jti': 'falso'},
+            'otra-clave', algorithm='HS256',
+        )
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': falsificado}, format='json').status_code, 401)
+        fallido = HistorialAcceso.objects.get(evento='REFRESH')
+        self.assertEqual((fallido.usuario_id, fallido.username, fallido.exitoso), (None, '', False))
+
+        self.assertEqual(self.client.post('/api/token/refresh/', {'refresh': self.refresh}, format='json').status_code, 200)
+        exitoso = HistorialAcceso.objects.get(evento='REFRESH', exitoso=True)
+        self.assertEqual((exitoso.usuario_id, exitoso.username), (self.user.pk, 'revocable'))
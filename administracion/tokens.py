@@ -0,0 +1,149 @@
+"""
+Claims de rol en los JWT.
+
+Los tokens se emiten con el rol del usuario, su propietario, unidad y
+guardia, y la versión de token de su perfil (claim `ver`). La autenticación
+(administracion.authentication) y los permisos (administracion.permissions)
+usan esos claims sin consultar la base de datos.
+
+Cuando cambia algo que afecta a los claims (rol, estado activo, staff, alta
+o baja como propietario o guardia) se incrementa PerfilUsuario.token_version:
+los tokens con otra versión se rechazan. Los refresh tokens vuelven a leer
+los claims de la base de datos al usarse, por lo que el nuevo access token
+ya sale con el rol actualizado.
+
+La versión vigente (o VERSION_REVOCADA si el usuario está inactivo o no
+existe) se lee de la base de datos y se guarda en la caché durante
+TOKEN_VERSION_CACHE_TTL segundos; una clave ausente nunca cuenta como "no
+revocado". invalidar_tokens borra la clave al confirmar: con una caché
+compartida (Redis o Memcached) el cambio llega a todos los procesos en el
+acto; con LocMemCache los demás workers lo ven al vencer el TTL.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import esta_en_lista_negra, metricas as metricas_tokens
+
+CLAIM_VERSION = 'ver'
+CLAIMS = ('username', 'rol', 'propietario_id', 'unidad_id', 'guardia_id', 'is_staff', 'is_superuser')
+VERSION_REVOCADA = -1
+
+
+def claims_usuario(user_id):
+    """
+    Claims de un usuario leídos con una sola consulta.
+    Retorna None si el usuario no existe.
+    """
+    fila = User.objects.filter(pk=user_id).values(
+        'username', 'is_staff', 'is_superuser',
+        'perfil__rol__nombre', 'perfil__token_version', 'perfil__propietario_id',
+        'propietario__id', 'propietario__unidad__id', 'guardia__id',
+    ).first()
+    if fila is None:
+        return None
+    return {
+        'username': fila['username'],
+        'rol': fila['perfil__rol__nombre'],
+        'propietario_id': fila['propietario__id'] or fila['perfil__propietario_id'],
+        'unidad_id': fila['propietario__unidad__id'],
+        'guardia_id': fila['guardia__id'],
+        'is_staff': fila['is_staff'],
+        'is_superuser': fila['is_superuser'],
+        CLAIM_VERSION: fila['perfil__token_version'] or 0,
+    }
+
+
+class RefreshTokenConRol(RefreshToken):
+    """
+    RefreshToken que lleva los claims de rol. Al crearse para un usuario y
+    al leerse de un token recibido (refresh) se cargan los claims actuales,
+    que el access token copia.
+    """
+
+    def __init__(self, token=None, verify=True):
+        super().__init__(token, verify)
+        if token is not None:
+            self._cargar_claims(self.payload.get(api_settings.USER_ID_CLAIM))
+
+    def check_blacklist(self):
+        # Marca en caché y filtro de Bloom antes de consultar la base de datos
+        if esta_en_lista_negra(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError('El token está en la lista negra')
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token._cargar_claims(user.pk)
+        return token
+
+    def _cargar_claims(self, user_id):
+        claims = claims_usuario(user_id) if user_id else None
+        if claims:
+            for claim, valor in claims.items():
+                self[claim] = valor
+
+
+class TokenConRolSerializer(TokenObtainPairSerializer):
+    token_class = RefreshTokenConRol
+
+
+class TokenRefreshConRolSerializer(TokenRefreshSerializer):
+    token_class = RefreshTokenConRol
+
+    def validate(self, attrs):
+        inicio = time.perf_counter()
+        try:
+            return super().validate(attrs)
+        finally:
+            metricas_tokens.registrar_refresh((time.perf_counter() - inicio) * 1000)
+
+
+def _clave_version(user_id):
+    return f'token_version:{user_id}'
+
+
+def _ttl_version():
+    return getattr(settings, 'TOKEN_VERSION_CACHE_TTL', 30)
+
+
+def version_vigente(user_id):
+    """Versión de token en la base de datos; VERSION_REVOCADA si el usuario está inactivo o no existe."""
+    fila = User.objects.filter(pk=user_id).values_list('is_active', 'perfil__token_version').first()
+    if fila is None or not fila[0]:
+        return VERSION_REVOCADA
+    return fila[1] or 0
+
+
+def token_revocado(user_id, version):
+    """True si la versión vigente del usuario no es la del token."""
+    clave = _clave_version(user_id)
+    actual = cache.get(clave)
+    if actual is None:
+        actual = version_vigente(user_id)
+        cache.set(clave, actual, _ttl_version())
+    return actual != version
+
+
+def invalidar_tokens(user_id, eliminado=False):
+    """
+    Incrementa la versión de token del usuario (salvo que se esté
+    eliminando) y borra la versión cacheada al confirmar la transacción.
+    """
+    from .models import PerfilUsuario
+
+    if not eliminado:
+        PerfilUsuario.objects.filter(user_id=user_id).update(token_version=F('token_version') + 1)
+    clave = _clave_version(user_id)
+    cache.delete(clave)
+    # También al confirmar: un request concurrente pudo cachear la versión
+    # anterior antes del COMMIT
+    transaction.on_commit(lambda: cache.delete(clave))
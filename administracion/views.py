@@ -1,15 +1,27 @@
+from datetime import datetime, time, timedelta
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.state import token_backend
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth.models import User
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from .models import Rol, PerfilUsuario, HistorialAcceso
+from .auditoria import registrar_acceso, estadisticas as estadisticas_auditoria
 from .serializers import (
     RolSerializer, PerfilUsuarioSerializer, UserSerializer,
     CrearUsuarioPropietarioSerializer, CrearUsuarioStaffSerializer,
     CambiarPasswordSerializer, HistorialAccesoSerializer
 )
 from .services import GestorUsuarios
+from .cache_usuarios import estadisticas as estadisticas_cache
+from . import blacklist
 from gestion.models import Propietario
 
 
@@ -58,7 +70,7 @@ class UserViewSet(viewsets.ModelViewSet):
                 'last_name': user.last_name,
                 'rol': rol,
                 'telefono': perfil.telefono,
-                'propietario_id': perfil.propietario.id if perfil.propietario else None,
+                'propietario_id': perfil.propietario_id,
             }, status=status.HTTP_200_OK)
         except PerfilUsuario.DoesNotExist:
             return Response({
@@ -72,6 +84,28 @@ class UserViewSet(viewsets.ModelViewSet):
                 'propietario_id': None,
             }, status=status.HTTP_200_OK)
     
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser], url_path='cache_autenticacion')
+    def cache_autenticacion(self, request):
+        """
+        Aciertos, fallos y ratio de la caché de usuarios autenticados de
+        este proceso.
+        GET /api/administracion/users/cache_autenticacion/
+        """
+        return Response(estadisticas_cache.resumen())
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAdminUser], url_path='tokens_metricas')
+    def tokens_metricas(self, request):
+        """
+        Tamaño de las tablas de tokens, origen de las consultas a la lista
+        negra y latencia de refresh de este proceso.
+        GET /api/administracion/users/tokens_metricas/
+        """
+        return Response({
+            **blacklist.metricas.resumen(),
+            'tablas': blacklist.tamanos_tablas(),
+            'bloom_habilitado': blacklist.bloom_habilitado(),
+        })
+    
     @action(detail=False, methods=['post'], permission_classes=[IsAdminUser])
     def crear_propietario(self, request):
         """
@@ -137,7 +171,7 @@ class UserViewSet(viewsets.ModelViewSet):
                     'username': user.username,
                     'password': serializer.validated_data['documento_identidad'],  # Devolver password
                     'email': user.email,
-                    'propietario': propietario.nombre
+                    'propietario': propietario.user.get_full_name()
                 }
             }, status=status.HTTP_201_CREATED)
         
@@ -307,22 +341,123 @@ class UserViewSet(viewsets.ModelViewSet):
 class HistorialAccesoViewSet(viewsets.ReadOnlyModelViewSet):
     """
     ViewSet de solo lectura para Historial de Accesos.
+    El listado devuelve los `limite` registros más recientes (por defecto 500).
     """
-    queryset = HistorialAcceso.objects.all().select_related('usuario', 'usuario__perfil')
+    queryset = HistorialAcceso.objects.all().select_related('usuario')
     serializer_class = HistorialAccesoSerializer
     permission_classes = [IsAdminUser]
+    LIMITE_DEFECTO = 500
+    LIMITE_MAXIMO = 5000
     
     def get_queryset(self):
         queryset = super().get_queryset()
+        params = self.request.query_params
         
         # Filtrar por usuario si se especifica
-        usuario_id = self.request.query_params.get('usuario')
+        usuario_id = params.get('usuario')
         if usuario_id:
             queryset = queryset.filter(usuario_id=usuario_id)
         
         # Filtrar por éxito
-        exitoso = self.request.query_params.get('exitoso')
+        exitoso = params.get('exitoso')
         if exitoso is not None:
             queryset = queryset.filter(exitoso=exitoso.lower() == 'true')
         
+        # Filtrar por evento (LOGIN / REFRESH)
+        evento = params.get('evento')
+        if evento:
+            queryset = queryset.filter(evento=evento.upper())
+        
+        # Rango de fechas (inclusivo) como límites de fecha_hora para usar sus índices
+        desde = self._fecha(params, 'desde')
+        if desde:
+            queryset = queryset.filter(fecha_hora__gte=self._inicio_del_dia(desde))
+        hasta = self._fecha(params, 'hasta')
+        if hasta:
+            queryset = queryset.filter(fecha_hora__lt=self._inicio_del_dia(hasta + timedelta(days=1)))
+        
         return queryset
+
+    @staticmethod
+    def _fecha(params, nombre):
+        valor = params.get(nombre)
+        if not valor:
+            return None
+        try:
+            fecha = parse_date(valor)
+        except ValueError:
+            fecha = None
+        if fecha is None:
+            raise ValidationError({nombre: 'Fecha inválida, use el formato YYYY-MM-DD'})
+        return fecha
+
+    @staticmethod
+    def _inicio_del_dia(fecha):
+        return timezone.make_aware(datetime.combine(fecha, time.min))
+    
+    def list(self, request, *args, **kwargs):
+        try:
+            limite = int(request.query_params.get('limite', self.LIMITE_DEFECTO))
+        except ValueError:
+            return Response({'error': 'limite debe ser un número'}, status=status.HTTP_400_BAD_REQUEST)
+        limite = max(1, min(limite, self.LIMITE_MAXIMO))
+        queryset = self.filter_queryset(self.get_queryset())[:limite]
+        return Response(self.get_serializer(queryset, many=True).data)
+    
+    @action(detail=False, methods=['get'])
+    def auditoria(self, request):
+        """
+        Estado del escritor de auditoría de este proceso (pendientes,
+        escritos, descartados).
+        GET /api/administracion/historial-accesos/auditoria/
+        """
+        return Response(estadisticas_auditoria())
+
+
+class _AuditoriaTokenMixin:
+    """
+    Registra en HistorialAcceso (por lotes, en segundo plano) cada intento
+    de obtener o renovar un token. Replica TokenViewBase.post para conocer
+    el usuario del intento.
+    """
+    evento = None
+    
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        try:
+            serializer.is_valid(raise_exception=True)
+        except TokenError as e:
+            self._registrar(request, serializer, False)
+            raise InvalidToken(e.args[0])
+        except APIException:
+            self._registrar(request, serializer, False)
+            raise
+        self._registrar(request, serializer, True)
+        return Response(serializer.validated_data, status=status.HTTP_200_OK)
+    
+    def _registrar(self, request, serializer, exitoso):
+        usuario_id, username = self.identificar(request, serializer, exitoso)
+        registrar_acceso(request, self.evento, exitoso, usuario_id=usuario_id, username=username)
+
+
+class TokenObtainAuditadoView(_AuditoriaTokenMixin, TokenObtainPairView):
+    evento = 'LOGIN'
+    
+    def identificar(self, request, serializer, exitoso):
+        user = getattr(serializer, 'user', None)
+        username = request.data.get('username')
+        return (user.pk if user else None), (username if isinstance(username, str) else '')
+
+
+class TokenRefreshAuditadoView(_AuditoriaTokenMixin, TokenRefreshView):
+    evento = 'REFRESH'
+    
+    def identificar(self, request, serializer, exitoso):
+        # Un refresh fallido puede traer un token falsificado: sus claims no
+        # se verificaron, así que el intento se registra sin usuario
+        if not exitoso:
+            return None, ''
+        # El access emitido por el serializer ya está firmado por nosotros
+        payload = token_backend.decode(serializer.validated_data['access'])
+        user_id = User._meta.pk.to_python(payload[jwt_settings.USER_ID_CLAIM])
+        return user_id, payload.get('username') or ''
@@ -1,3 +1,17 @@
-from django.test import TestCase
+from areas_comunes.models import AreaComun, ReservaAreaComun
+from condominio.pruebas import ConsultasAcotadasTestCase
 
-# Create your tests here.
+
+class ConsultasAreasComunesTests(ConsultasAcotadasTestCase):
+    def test_areas(self):
+        self.assertConsultasAcotadas('/api/areas/', 1)
+        self.assertConsultasMaximas(f'/api/areas/{AreaComun.objects.first().pk}/', 1)
+
+    def test_reservas(self):
+        self.assertConsultasAcotadas('/api/reservas/', 1)
+        self.assertConsultasMaximas(f'/api/reservas/{ReservaAreaComun.objects.first().pk}/', 1)
+
+    def test_confirmar_y_cancelar(self):
+        reserva = ReservaAreaComun.objects.first()
+        self.assertConsultasMaximas(f'/api/reservas/{reserva.pk}/confirm/', 3, metodo='patch')
+        self.assertConsultasMaximas(f'/api/reservas/{reserva.pk}/cancelar/', 3, metodo='patch')
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.12 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('comunicacion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comunicado',
+            name='imagen_delete_url',
+            field=models.URLField(blank=True, help_text='URL para eliminar imagen de ImgBB', max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='comunicado',
+            name='imagen_url',
+            field=models.URLField(blank=True, help_text='URL de imagen en ImgBB', max_length=500, null=True),
+        ),
+    ]
@@ -23,6 +23,8 @@ class Comunicado(models.Model):
     fecha_publicacion = models.DateTimeField(auto_now_add=True)
     activo = models.BooleanField(default=True)
     imagen = models.ImageField(upload_to='comunicados/', null=True, blank=True)
+    imagen_url = models.URLField(max_length=500, blank=True, null=True, help_text='URL de imagen en ImgBB')
+    imagen_delete_url = models.URLField(max_length=500, blank=True, null=True, help_text='URL para eliminar imagen de ImgBB')
     
     def __str__(self):
         return f"{self.titulo} - {self.get_tipo_display()}"
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Comunicado
+from condominio.media_proxy import MediaURLMixin
 
 
-class ComunicadoSerializer(serializers.ModelSerializer):
+class ComunicadoSerializer(MediaURLMixin, serializers.ModelSerializer):
     autor_nombre = serializers.SerializerMethodField(read_only=True)
     
     class Meta:
@@ -1,3 +1,8 @@
-from django.test import TestCase
+from comunicacion.models import Comunicado
+from condominio.pruebas import ConsultasAcotadasTestCase
 
-# Create your tests here.
+
+class ConsultasComunicacionTests(ConsultasAcotadasTestCase):
+    def test_comunicados(self):
+        self.assertConsultasAcotadas('/api/comunicados/', 1)
+        self.assertConsultasMaximas(f'/api/comunicados/{Comunicado.objects.first().pk}/', 1)
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import ImagenPendienteEliminacion
+
+
+@admin.register(ImagenPendienteEliminacion)
+class ImagenPendienteEliminacionAdmin(admin.ModelAdmin):
+    list_display = ['delete_url', 'modelo', 'intentos', 'proximo_intento', 'abandonada', 'fecha_creacion']
+    list_filter = ['modelo', ('abandonada', admin.EmptyFieldListFilter)]
+    search_fields = ['delete_url', 'ultimo_error']
+    readonly_fields = ['fecha_creacion']
@@ -0,0 +1,498 @@
+"""
+Pruebas de carga HTTP contra un servidor en ejecución.
+
+Cada usuario virtual es un hilo con su propia sesión HTTP que elige un
+escenario según los pesos configurados, lo ejecuta y espera un tiempo de
+pausa aleatorio. Escenarios:
+
+- consola_guardia: el polling de la consola de guardia (estadísticas de
+  placas con los últimos reconocimientos, comunicaciones pendientes, visitas
+  programadas de hoy y la consulta de una placa).
+- rafaga_placas: un guardia envía una ráfaga de fotos a recognize_plate
+  (residentes, visitas programadas y placas desconocidas).
+- panel_propietario: el panel de un propietario (perfil, expensas, visitas,
+  comunicados, reservas e historial de pagos).
+- reserva: un propietario reserva un área común.
+- pago: un propietario reserva, crea el payment intent y lo confirma.
+
+Los usuarios son los que crea generar_datos (`{prefijo}_000001`,
+`{prefijo}_guardia_001`, ...). Plate Recognizer, Stripe e ImgBB tienen que
+apuntar a servidores falsos (ver condominio/fake_externos.py y
+condominio/fake_imgbb.py); prueba_carga --servicios-falsos los levanta.
+
+Por endpoint se reporta throughput, latencia p50/p95/p99 y tasa de error;
+comparar() marca las regresiones respecto de un resultado guardado.
+"""
+import io
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+
+import requests
+
+ESCENARIOS = {}
+PESOS_POR_DEFECTO = {
+    'consola_guardia': 40,
+    'rafaga_placas': 10,
+    'panel_propietario': 35,
+    'reserva': 10,
+    'pago': 5,
+}
+TARJETA_PRUEBA = '4242424242424242'
+# Muestras por endpoint para que un percentil sea comparable entre corridas
+MUESTRAS_MINIMAS = {'p95_ms': 20, 'p99_ms': 100}
+
+
+def escenario(funcion):
+    ESCENARIOS[funcion.__name__] = funcion
+    return funcion
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano de una lista ordenada."""
+    if not ordenados:
+        return None
+    rango = math.ceil(p / 100 * len(ordenados))
+    return ordenados[max(0, min(len(ordenados), rango) - 1)]
+
+
+def imagen_jpeg():
+    """JPEG chico para las fotos de placas (el servidor valida el tipo y el tamaño)."""
+    from PIL import Image
+
+    salida = io.BytesIO()
+    Image.new('RGB', (320, 120), (200, 200, 200)).save(salida, 'JPEG', quality=70)
+    return salida.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Mediciones
+# ---------------------------------------------------------------------------
+
+class Mediciones:
+    """Requests, latencias y errores por endpoint de un usuario virtual (sin locks)."""
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.latencias = defaultdict(list)
+        self.errores = defaultdict(lambda: defaultdict(int))
+
+    def registrar(self, endpoint, duracion_ms, error=None):
+        """`duracion_ms` es None si no hubo respuesta (timeout, conexión)."""
+        self.requests[endpoint] += 1
+        if duracion_ms is not None:
+            self.latencias[endpoint].append(duracion_ms)
+        if error is not None:
+            self.errores[endpoint][error] += 1
+
+    def agregar(self, otras):
+        for endpoint, cantidad in otras.requests.items():
+            self.requests[endpoint] += cantidad
+            self.latencias[endpoint].extend(otras.latencias.get(endpoint, ()))
+            for error, errores in otras.errores.get(endpoint, {}).items():
+                self.errores[endpoint][error] += errores
+
+    def resumen(self, segundos):
+        """Dict endpoint -> métricas, con 'TOTAL' al final."""
+        endpoints = {}
+        todas = []
+        for endpoint in sorted(self.requests):
+            latencias = sorted(self.latencias.get(endpoint, ()))
+            errores = dict(self.errores.get(endpoint, {}))
+            endpoints[endpoint] = self._metricas(latencias, self.requests[endpoint], sum(errores.values()), segundos)
+            endpoints[endpoint]['errores'] = errores
+            todas.extend(latencias)
+        todas.sort()
+        total_errores = sum(sum(errores.values()) for errores in self.errores.values())
+        endpoints['TOTAL'] = self._metricas(todas, sum(self.requests.values()), total_errores, segundos)
+        return endpoints
+
+    @staticmethod
+    def _metricas(latencias, cantidad, errores, segundos):
+        return {
+            'requests': cantidad,
+            'rps': round(cantidad / segundos, 2) if segundos else None,
+            'tasa_error': round(errores / cantidad, 4) if cantidad else 0.0,
+            'p50_ms': _redondear(percentil(latencias, 50)),
+            'p95_ms': _redondear(percentil(latencias, 95)),
+            'p99_ms': _redondear(percentil(latencias, 99)),
+            'promedio_ms': _redondear(sum(latencias) / len(latencias)) if latencias else None,
+            'max_ms': _redondear(latencias[-1]) if latencias else None,
+        }
+
+
+def _redondear(valor):
+    return round(valor, 1) if valor is not None else None
+
+
+# ---------------------------------------------------------------------------
+# Cliente HTTP
+# ---------------------------------------------------------------------------
+
+class ErrorEscenario(Exception):
+    """El escenario no puede continuar (el request ya quedó registrado como error)."""
+
+
+class Cliente:
+    """Sesión HTTP autenticada de un usuario que registra cada request."""
+
+    def __init__(self, base_url, username, password, mediciones, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.mediciones = mediciones
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.datos_usuario = None
+
+    def login(self):
+        respuesta = self.request(
+            'post', '/api/token/', json={'username': self.username, 'password': self.password}, autenticar=False,
+        )
+        self.session.headers['Authorization'] = f"Bearer {respuesta.json()['access']}"
+
+    def request(self, metodo, ruta, nombre=None, esperado=(200,), autenticar=True, **kwargs):
+        """
+        Ejecuta y mide el request. `nombre` agrupa las mediciones (por
+        defecto 'METODO ruta', sin parámetros de query).
+
+        Raises:
+            ErrorEscenario: Si falla o responde con un estado no esperado
+        """
+        if autenticar and 'Authorization' not in self.session.headers:
+            self.login()
+        nombre = nombre or f'{metodo.upper()} {ruta}'
+        inicio = time.perf_counter()
+        try:
+            respuesta = self.session.request(metodo, self.base_url + ruta, timeout=self.timeout, **kwargs)
+        except requests.Timeout:
+            self.mediciones.registrar(nombre, None, 'timeout')
+            raise ErrorEscenario(f'{nombre}: timeout')
+        except requests.RequestException as e:
+            self.mediciones.registrar(nombre, None, 'conexion')
+            raise ErrorEscenario(f'{nombre}: {e}')
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+        if respuesta.status_code == 401 and autenticar:
+            # Token vencido: se vuelve a autenticar una vez
+            self.session.headers.pop('Authorization', None)
+            self.login()
+            return self.request(metodo, ruta, nombre, esperado, autenticar=False, **kwargs)
+        if respuesta.status_code not in esperado:
+            self.mediciones.registrar(nombre, duracion_ms, str(respuesta.status_code))
+            raise ErrorEscenario(f'{nombre}: {respuesta.status_code} {respuesta.text[:200]}')
+        self.mediciones.registrar(nombre, duracion_ms)
+        return respuesta
+
+    def get(self, ruta, **kwargs):
+        return self.request('get', ruta, **kwargs)
+
+    def post(self, ruta, **kwargs):
+        return self.request('post', ruta, **kwargs)
+
+    def usuario(self):
+        """Datos de /api/user/me/ (se piden una vez por sesión)."""
+        if self.datos_usuario is None:
+            self.datos_usuario = self.get('/api/user/me/').json()
+        return self.datos_usuario
+
+
+# ---------------------------------------------------------------------------
+# Escenarios
+# ---------------------------------------------------------------------------
+
+class UsuarioVirtual:
+    """Estado de un hilo: sus sesiones de guardia y de propietario y su azar."""
+
+    def __init__(self, prueba, numero):
+        self.prueba = prueba
+        self.rng = random.Random(prueba.semilla * 1000 + numero)
+        self.mediciones = Mediciones()
+        self.guardia = prueba.cliente(prueba.username_guardia(numero), self.mediciones)
+        self.propietario = prueba.cliente(prueba.username_propietario(self.rng), self.mediciones)
+
+
+@escenario
+def consola_guardia(usuario):
+    cliente = usuario.guardia
+    hoy = date.today().isoformat()
+    cliente.get('/api/seguridad/plate-recognition-logs/stats/')
+    cliente.get('/api/seguridad/comunicaciones/', params={'estado': 'pendiente'})
+    cliente.get('/api/seguridad/visitas/', params={'fecha_visita': hoy, 'estado': 'programada'})
+    placa = usuario.prueba.placa(usuario.rng)
+    cliente.get('/api/seguridad/plate-recognition-logs/', params={'plate_number': placa})
+
+
+@escenario
+def rafaga_placas(usuario):
+    cliente = usuario.guardia
+    for _ in range(usuario.prueba.rafaga):
+        placa = usuario.prueba.placa(usuario.rng)
+        cliente.post(
+            '/api/seguridad/visitas/recognize_plate/', esperado=(201,),
+            files={'image': (f'{placa}.jpg', usuario.prueba.imagen, 'image/jpeg')},
+        )
+
+
+@escenario
+def panel_propietario(usuario):
+    cliente = usuario.propietario
+    propietario_id = cliente.usuario()['propietario_id']
+    filtro = {'propietario': propietario_id}
+    cliente.get('/api/user/me/')
+    cliente.get('/api/expensas/', params=filtro)
+    cliente.get('/api/seguridad/visitas/', params=filtro)
+    cliente.get('/api/comunicados/', params={'activo': 'true'})
+    cliente.get('/api/reservas/', params=filtro)
+    cliente.get('/api/pagos/historial/', params=filtro)
+
+
+def _reservar(usuario):
+    cliente = usuario.propietario
+    propietario_id = cliente.usuario()['propietario_id']
+    area = usuario.rng.choice(usuario.prueba.areas(cliente))
+    apertura = int(area['horario_apertura'][:2])
+    cierre = int(area['horario_cierre'][:2])
+    inicio = usuario.rng.randrange(apertura, max(apertura + 1, cierre - 1))
+    respuesta = cliente.post('/api/reservas/', esperado=(201,), json={
+        'propietario': propietario_id,
+        'area': area['id'],
+        'fecha': (date.today() + timedelta(days=usuario.rng.randrange(1, 60))).isoformat(),
+        'hora_inicio': f'{inicio:02d}:00',
+        'hora_fin': f'{min(inicio + 2, 23):02d}:00',
+        'num_personas': usuario.rng.randrange(1, max(2, min(area['capacidad'], 10))),
+    })
+    return respuesta.json()
+
+
+@escenario
+def reserva(usuario):
+    _reservar(usuario)
+
+
+@escenario
+def pago(usuario):
+    cliente = usuario.propietario
+    reserva_creada = _reservar(usuario)
+    intent = cliente.post('/api/pagos/create-payment-intent/', json={
+        'reserva_id': reserva_creada['id'],
+        'amount': reserva_creada['costo_total'],
+    }).json()
+    cliente.post('/api/pagos/confirm-payment/', json={
+        'payment_intent_id': intent['payment_intent_id'],
+        'card_number': TARJETA_PRUEBA,
+        'exp_month': '12',
+        'exp_year': '30',
+        'cvc': '123',
+    })
+
+
+# ---------------------------------------------------------------------------
+# Ejecución
+# ---------------------------------------------------------------------------
+
+class PruebaCarga:
+    """
+    Args:
+        base_url: URL del servidor (http://127.0.0.1:8000)
+        pesos: Dict escenario -> peso relativo
+        usuarios: Usuarios virtuales (hilos) concurrentes
+        duracion: Segundos de medición
+        rampa: Segundos en los que se van iniciando los usuarios
+        pausa_ms: Pausa máxima entre escenarios de un usuario (aleatoria 0..pausa_ms)
+        prefijo: Prefijo de los usuarios de generar_datos
+        password: Contraseña de esos usuarios
+        propietarios: Cantidad de propietarios generados ({prefijo}_000001 ...)
+        guardias: Cantidad de guardias generados
+        rafaga: Fotos por ráfaga de rafaga_placas
+        semilla: Semilla de las decisiones aleatorias
+        timeout: Timeout por request en segundos
+    """
+
+    def __init__(self, base_url, pesos=None, usuarios=10, duracion=60, rampa=0, pausa_ms=500, prefijo='sim',
+                 password=None, propietarios=200, guardias=3, rafaga=10, semilla=42, timeout=30):
+        if not password:
+            raise ValueError('Se requiere --password: la contraseña usada en generar_datos')
+        pesos = pesos or PESOS_POR_DEFECTO
+        desconocidos = set(pesos) - set(ESCENARIOS)
+        if desconocidos:
+            raise ValueError(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}. "
+                             f"Disponibles: {', '.join(ESCENARIOS)}")
+        self.base_url = base_url
+        self.pesos = pesos
+        self.usuarios = usuarios
+        self.duracion = duracion
+        self.rampa = rampa
+        self.pausa_ms = pausa_ms
+        self.prefijo = prefijo
+        self.password = password
+        self.propietarios = propietarios
+        self.guardias = guardias
+        self.rafaga = rafaga
+        self.semilla = semilla
+        self.timeout = timeout
+        self.imagen = imagen_jpeg()
+        self.errores_escenario = defaultdict(int)
+        self._lock = threading.Lock()
+        self._placas = None
+        self._areas = None
+
+    def configuracion(self):
+        """Parámetros que tienen que coincidir para comparar dos resultados."""
+        return {
+            'pesos': self.pesos, 'usuarios': self.usuarios, 'duracion': self.duracion,
+            'pausa_ms': self.pausa_ms, 'propietarios': self.propietarios, 'rafaga': self.rafaga,
+        }
+
+    def cliente(self, username, mediciones):
+        return Cliente(self.base_url, username, self.password, mediciones, self.timeout)
+
+    def username_guardia(self, numero):
+        return f'{self.prefijo}_guardia_{numero % self.guardias + 1:03d}'
+
+    def username_propietario(self, rng):
+        return f'{self.prefijo}_{rng.randrange(self.propietarios) + 1:06d}'
+
+    def preparar(self):
+        """
+        Verifica los usuarios y carga las placas registradas y las de visitas
+        de hoy (sin medir).
+        """
+        mediciones = Mediciones()
+        guardia = self.cliente(self.username_guardia(0), mediciones)
+        try:
+            # El último propietario y el último guardia tienen que existir
+            self.cliente(f'{self.prefijo}_{self.propietarios:06d}', mediciones).login()
+            self.cliente(self.username_guardia(self.guardias - 1), mediciones).login()
+            residentes = [v['placa'] for v in guardia.get('/api/vehiculos/').json()]
+            visitas = [
+                v['placa_vehiculo'] for v in guardia.get(
+                    '/api/seguridad/visitas/', params={'fecha_visita': date.today().isoformat(), 'estado': 'programada'},
+                ).json()
+                if v.get('placa_vehiculo')
+            ]
+        except ErrorEscenario as e:
+            raise ValueError(
+                f'No se pudo preparar la prueba: {e}. ¿Coinciden --prefijo, --password, --propietarios '
+                'y --guardias con los de generar_datos?'
+            )
+        self._placas = (residentes, visitas)
+
+    def placa(self, rng):
+        """Placa de un residente (70%), de una visita de hoy (10%) o desconocida."""
+        residentes, visitas = self._placas
+        azar = rng.random()
+        if azar < 0.7 and residentes:
+            return rng.choice(residentes)
+        if azar < 0.8 and visitas:
+            return rng.choice(visitas)
+        letras = ''.join(rng.choices('BCDFGHJKLMNPRSTVWXYZ', k=3))
+        return f'{rng.randrange(1000, 9999)}{letras}'
+
+    def areas(self, cliente):
+        with self._lock:
+            if self._areas is None:
+                self._areas = cliente.get('/api/areas/', params={'activa': 'true'}).json()
+            if not self._areas:
+                raise ErrorEscenario('No hay áreas comunes activas')
+            return self._areas
+
+    def ejecutar(self):
+        """
+        Ejecuta la prueba.
+
+        Returns:
+            Dict con configuración, duración real, errores por escenario y
+            métricas por endpoint
+        """
+        if self._placas is None:
+            self.preparar()
+        nombres = list(self.pesos)
+        pesos = [self.pesos[nombre] for nombre in nombres]
+        virtuales = [UsuarioVirtual(self, numero) for numero in range(self.usuarios)]
+        inicio = time.perf_counter()
+        fin = inicio + self.rampa + self.duracion
+
+        def trabajar(usuario, demora):
+            time.sleep(demora)
+            while time.perf_counter() < fin:
+                nombre = usuario.rng.choices(nombres, pesos)[0]
+                try:
+                    ESCENARIOS[nombre](usuario)
+                except ErrorEscenario:
+                    with self._lock:
+                        self.errores_escenario[nombre] += 1
+                if self.pausa_ms:
+                    time.sleep(usuario.rng.uniform(0, self.pausa_ms) / 1000)
+
+        hilos = [
+            threading.Thread(target=trabajar, args=(usuario, self.rampa * numero / self.usuarios), daemon=True)
+            for numero, usuario in enumerate(virtuales)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        segundos = time.perf_counter() - inicio
+
+        mediciones = Mediciones()
+        for usuario in virtuales:
+            mediciones.agregar(usuario.mediciones)
+        return {
+            'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'configuracion': self.configuracion(),
+            'segundos': round(segundos, 1),
+            'errores_escenario': dict(self.errores_escenario),
+            'endpoints': mediciones.resumen(segundos),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Comparación con la línea base
+# ---------------------------------------------------------------------------
+
+def comparar(actual, base, tolerancia=0.3, tolerancia_errores=0.01, margen_ms=25):
+    """
+    Compara dos resultados de PruebaCarga.ejecutar().
+
+    Es regresión que p95 o p99 de un endpoint crezca más de `tolerancia`
+    (y más de `margen_ms`, para no marcar ruido en endpoints de pocos ms),
+    que su tasa de error suba más de `tolerancia_errores`, o que el
+    throughput total caiga más de `tolerancia`. Los percentiles solo se
+    comparan con suficientes muestras en ambas mediciones.
+
+    Returns:
+        Lista de (endpoint, métrica, valor base, valor actual)
+    """
+    regresiones = []
+    for endpoint, metricas in actual['endpoints'].items():
+        anterior = base['endpoints'].get(endpoint)
+        if anterior is None:
+            continue
+        muestras = min(metricas['requests'], anterior['requests'])
+        for clave, minimo in MUESTRAS_MINIMAS.items():
+            antes, ahora = anterior.get(clave), metricas.get(clave)
+            # Los percentiles de TOTAL dependen de la mezcla de endpoints
+            if endpoint == 'TOTAL' or muestras < minimo or antes is None or ahora is None:
+                continue
+            if ahora > antes * (1 + tolerancia) and ahora - antes > margen_ms:
+                regresiones.append((endpoint, clave, antes, ahora))
+        if metricas['tasa_error'] - anterior['tasa_error'] > tolerancia_errores:
+            regresiones.append((endpoint, 'tasa_error', anterior['tasa_error'], metricas['tasa_error']))
+    antes, ahora = base['endpoints']['TOTAL']['rps'], actual['endpoints']['TOTAL']['rps']
+    if antes and ahora < antes * (1 - tolerancia):
+        regresiones.append(('TOTAL', 'rps', antes, ahora))
+    return regresiones
+
+
+def guardar(resultado, ruta):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(resultado, archivo, ensure_ascii=False, indent=2)
+
+
+def cargar(ruta):
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
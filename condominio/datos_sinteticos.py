@@ -0,0 +1,678 @@
+"""
+Datos sintéticos del condominio para pruebas de carga y benchmarks.
+
+GeneradorDatos crea torres con sus unidades, propietarios (con usuario y
+perfil), vehículos, mascotas, guardias, expensas con sus pagos, visitas con
+su registro de ingreso, reconocimientos de placa, áreas comunes con
+reservas y pagos con Stripe, comunicados y reportes de mantenimiento,
+repartidos entre `desde` y `hasta`.
+
+- Todo se escribe con bulk_create por lotes, una transacción por lote. Así
+  no se envían los signals: no se generan QR ni se sube nada a ImgBB, y
+  los campos auto_now/auto_now_add se desactivan mientras se genera para
+  guardar las fechas históricas.
+- Las tablas derivadas que mantienen esos signals se recalculan al final:
+  texto de búsqueda, resumen financiero mensual, riesgo por propietario y
+  caché del dashboard.
+- Con la misma semilla y la misma fecha `hasta` los datos son idénticos
+  entre corridas (incluidos UUIDs y códigos), para comparar benchmarks.
+- Todas las contraseñas comparten un único hash: calcular uno por usuario
+  llevaría más tiempo que generar el resto de los datos.
+"""
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, time as hora, timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+NOMBRES = [
+    'Juan', 'María', 'José', 'Ana', 'Luis', 'Carmen', 'Carlos', 'Rosa', 'Jorge', 'Patricia',
+    'Miguel', 'Sofía', 'Fernando', 'Lucía', 'Ricardo', 'Daniela', 'Marco', 'Gabriela', 'Diego',
+    'Valeria', 'Andrés', 'Paola', 'Sergio', 'Camila', 'Alejandro', 'Verónica', 'Roberto', 'Mónica',
+]
+APELLIDOS = [
+    'Mamani', 'Quispe', 'Flores', 'Rojas', 'Vargas', 'Gutiérrez', 'Fernández', 'López', 'Choque',
+    'Condori', 'Pérez', 'Torrez', 'Rodríguez', 'Medina', 'Mendoza', 'Guzmán', 'Salazar', 'Suárez',
+    'Justiniano', 'Ortiz', 'Romero', 'Aguilar', 'Soliz', 'Vaca', 'Méndez', 'Castro', 'Camacho',
+]
+MARCAS_MODELOS = {
+    'Toyota': ['Corolla', 'Yaris', 'RAV4', 'Hilux', 'Land Cruiser', 'Rush'],
+    'Suzuki': ['Swift', 'Vitara', 'Jimny', 'Baleno'],
+    'Nissan': ['Sentra', 'Versa', 'Frontier', 'X-Trail'],
+    'Hyundai': ['Accent', 'Tucson', 'Santa Fe', 'Creta'],
+    'Kia': ['Rio', 'Sportage', 'Sorento', 'Picanto'],
+    'Volkswagen': ['Gol', 'Polo', 'Amarok', 'Tiguan'],
+    'Chevrolet': ['Onix', 'Tracker', 'S10', 'Spark'],
+    'Mitsubishi': ['L200', 'Outlander', 'Montero'],
+}
+PESO_MARCAS = [30, 15, 12, 10, 10, 8, 8, 7]
+COLORES = ['Blanco', 'Plata', 'Gris', 'Negro', 'Rojo', 'Azul', 'Verde', 'Beige']
+PESO_COLORES = [25, 20, 18, 15, 8, 8, 3, 3]
+TIPOS_VEHICULO = ['sedan', 'suv', 'pickup', 'hatchback', 'camioneta', 'van']
+PESO_TIPOS_VEHICULO = [30, 30, 15, 15, 7, 3]
+RAZAS = {
+    'perro': ['Mestizo', 'Labrador', 'Poodle', 'Pastor Alemán', 'Chihuahua', 'Golden Retriever'],
+    'gato': ['Mestizo', 'Siamés', 'Persa'],
+    'ave': ['Canario', 'Loro', 'Periquito'],
+    'otro': ['Conejo', 'Hámster', 'Tortuga'],
+}
+AREAS = [
+    # nombre, capacidad, apertura, cierre, tarifa por hora, tipo de cobro, peso en reservas
+    ('Piscina', 30, hora(8), hora(20), Decimal('30.00'), 'por_hora', 25),
+    ('Gimnasio', 15, hora(6), hora(22), Decimal('10.00'), 'por_hora', 30),
+    ('Salón de eventos', 80, hora(10), hora(23), Decimal('150.00'), 'pago_unico', 15),
+    ('Parrillero', 20, hora(11), hora(22), Decimal('50.00'), 'pago_unico', 20),
+    ('Cancha múltiple', 12, hora(7), hora(22), Decimal('40.00'), 'por_hora', 10),
+]
+TIPOS_REPORTE = ['mantenimiento', 'ruido', 'limpieza', 'incumplimiento', 'seguridad', 'otro']
+PESO_TIPOS_REPORTE = [40, 20, 15, 10, 8, 7]
+UBICACIONES = ['Hall de ingreso', 'Ascensor', 'Estacionamiento', 'Escaleras', 'Piscina', 'Jardín', 'Pasillo']
+TITULOS_COMUNICADO = {
+    'aviso': ['Corte de agua programado', 'Mantenimiento de ascensores', 'Fumigación de áreas comunes'],
+    'noticia': ['Nuevas cámaras de seguridad', 'Resultados de la asamblea', 'Mejoras en el gimnasio'],
+    'evento': ['Asamblea general de copropietarios', 'Feria familiar', 'Campeonato de fulbito'],
+    'urgente': ['Fuga de gas en el sótano', 'Corte de energía', 'Alerta de seguridad'],
+}
+# Reconocimientos de placa por hora del día (picos de entrada y salida)
+PESO_HORAS = [1, 1, 1, 1, 1, 2, 6, 12, 14, 8, 5, 5, 7, 8, 6, 5, 6, 9, 13, 12, 8, 5, 3, 2]
+# Propensión de pago: (proporción de propietarios, probabilidad de pagar una expensa vencida)
+PERFILES_PAGO = [(0.80, 0.98), (0.15, 0.80), (0.05, 0.35)]
+CUOTA_POR_TIPO = {'departamento': Decimal('450.00'), 'casa': Decimal('700.00'), 'penthouse': Decimal('1100.00')}
+MAXIMO_VISITAS_PLACA = 100000
+
+
+def _lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+@contextmanager
+def sin_auto_now(*modelos):
+    """Desactiva auto_now y auto_now_add de los modelos dentro del bloque."""
+    campos = [
+        campo for modelo in modelos for campo in modelo._meta.concrete_fields
+        if getattr(campo, 'auto_now', False) or getattr(campo, 'auto_now_add', False)
+    ]
+    originales = [(campo, campo.auto_now, campo.auto_now_add) for campo in campos]
+    for campo in campos:
+        campo.auto_now = campo.auto_now_add = False
+    try:
+        yield
+    finally:
+        for campo, auto_now, auto_now_add in originales:
+            campo.auto_now, campo.auto_now_add = auto_now, auto_now_add
+
+
+class GeneradorDatos:
+    """
+    Args:
+        torres: Cantidad de torres
+        unidades_por_torre: Unidades (y propietarios) por torre
+        anios: Años de historia hasta `hasta`
+        reconocimientos: Total de reconocimientos de placa (por defecto 100 por unidad)
+        semilla: Semilla del generador aleatorio
+        hasta: Última fecha con datos (por defecto hoy)
+        prefijo: Prefijo de usernames, documentos y referencias generados
+        password: Contraseña de todos los usuarios generados
+        tamano_lote: Filas por bulk_create
+        progreso: Callable(tabla, filas) llamado después de cada lote
+    """
+
+    def __init__(self, torres=4, unidades_por_torre=50, anios=2, reconocimientos=None, semilla=42,
+                 hasta=None, prefijo='sim', password=None, tamano_lote=5000, progreso=None):
+        if not password:
+            raise ValueError('Se requiere la contraseña de los usuarios generados')
+        self.torres = torres
+        self.unidades_por_torre = unidades_por_torre
+        self.total_unidades = torres * unidades_por_torre
+        self.reconocimientos = self.total_unidades * 100 if reconocimientos is None else reconocimientos
+        self.semilla = semilla
+        self.rng = random.Random(semilla)
+        self.hasta = hasta or timezone.localdate()
+        self.desde = self.hasta - timedelta(days=round(365 * anios))
+        self.dias = (self.hasta - self.desde).days + 1
+        self.prefijo = prefijo
+        self.password = password
+        self.tamano_lote = tamano_lote
+        self.progreso = progreso
+        self.conteos = {}
+        self._inicio = timezone.make_aware(datetime.combine(self.desde, hora.min))
+        # (pk, propietario_pk, unidad_pk, tipo de unidad, fecha de registro, perfil de pago)
+        self.propietarios = []
+        self.guardias = []
+        self.vehiculos = []
+        self.visitas_con_placa = []
+
+    # ------------------------------------------------------------------
+    # Utilidades
+    # ------------------------------------------------------------------
+
+    def _uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _fecha_hora(self, dia, desde_hora=0, hasta_hora=24):
+        """Fecha y hora aleatoria del día `dia` (índice desde self.desde)."""
+        segundos = self.rng.randrange(desde_hora * 3600, hasta_hora * 3600)
+        return self._inicio + timedelta(days=dia, seconds=segundos)
+
+    def _dia(self, desde=0):
+        return self.rng.randrange(desde, self.dias)
+
+    def _nombre(self):
+        return self.rng.choice(NOMBRES), f'{self.rng.choice(APELLIDOS)} {self.rng.choice(APELLIDOS)}'
+
+    def _telefono(self):
+        return f'{self.rng.choice("67")}{self.rng.randrange(1000000, 9999999)}'
+
+    def _insertar(self, modelo, objetos, tabla=None, despues=None):
+        """bulk_create por lotes; `despues(lote)` recibe cada lote ya guardado (con pk)."""
+        tabla = tabla or modelo._meta.verbose_name_plural
+        total = 0
+        for lote in _lotes(objetos, self.tamano_lote):
+            with transaction.atomic():
+                modelo.objects.bulk_create(lote)
+            total += len(lote)
+            if self.progreso:
+                self.progreso(tabla, total)
+            if despues:
+                despues(lote)
+        self.conteos[tabla] = self.conteos.get(tabla, 0) + total
+        return total
+
+    def _meses(self):
+        meses = []
+        actual = self.desde.replace(day=1)
+        while actual <= self.hasta:
+            meses.append(actual)
+            actual = (actual + timedelta(days=32)).replace(day=1)
+        return meses
+
+    # ------------------------------------------------------------------
+    # Generación
+    # ------------------------------------------------------------------
+
+    def verificar_prefijo(self):
+        if User.objects.filter(username__startswith=f'{self.prefijo}_').exists():
+            raise ValueError(
+                f'Ya existen usuarios con el prefijo "{self.prefijo}_". '
+                'Use otro prefijo o vacíe la base de datos (manage.py flush).'
+            )
+
+    def generar(self):
+        """Genera todos los datos. Retorna filas creadas por tabla."""
+        from administracion.models import PerfilUsuario
+        from areas_comunes.models import AreaComun, ReservaAreaComun
+        from comunicacion.models import Comunicado
+        from finanzas.models import Expensa, Pago
+        from gestion.models import Mascota, Propietario, UnidadHabitacional, Vehiculo
+        from mantenimiento.models import Reporte
+        from pagos.models import Pago as PagoStripe
+        from seguridad.models import Guardia, PlateRecognitionLog, RegistroVisita, Visita
+
+        self.verificar_prefijo()
+        modelos = (
+            User, PerfilUsuario, Propietario, UnidadHabitacional, Vehiculo, Mascota, Guardia, Expensa,
+            Pago, Visita, RegistroVisita, PlateRecognitionLog, AreaComun, ReservaAreaComun, PagoStripe,
+            Comunicado, Reporte,
+        )
+        self._pk_inicial = {
+            modelo: modelo.objects.aggregate(maximo=Max('pk'))['maximo'] or 0 for modelo in modelos
+        }
+        self._hash = make_password(self.password)
+
+        with sin_auto_now(*modelos):
+            self._generar_propietarios()
+            self._generar_guardias()
+            self._generar_vehiculos_y_mascotas()
+            self._generar_expensas()
+            self._generar_visitas()
+            self._generar_reconocimientos()
+            self._generar_reservas()
+            self._generar_comunicados()
+            self._generar_reportes()
+        return self.conteos
+
+    def _generar_propietarios(self):
+        from administracion.models import PerfilUsuario, Rol
+        from gestion.models import Propietario, UnidadHabitacional
+
+        rol, _ = Rol.objects.get_or_create(
+            nombre='PROPIETARIO',
+            defaults={
+                'descripcion': 'Propietario de unidad habitacional',
+                'django_group': Group.objects.get_or_create(name='Propietarios')[0],
+            },
+        )
+        perfiles_pago = [perfil for perfil, _ in PERFILES_PAGO]
+        probabilidades_pago = [probabilidad for _, probabilidad in PERFILES_PAGO]
+        pisos = max(1, -(-self.unidades_por_torre // 4))
+
+        filas = []
+        for numero in range(self.total_unidades):
+            torre, posicion = divmod(numero, self.unidades_por_torre)
+            piso, puerta = divmod(posicion, 4)
+            # Las unidades se incorporan durante el primer tercio del período
+            registro = self._fecha_hora(self.rng.randrange(0, max(1, self.dias // 3)), 8, 20)
+            nombre, apellido = self._nombre()
+            documento = f'{self.prefijo.upper()}{numero + 1:07d}'
+            if piso == pisos - 1 and puerta == 0:
+                tipo = 'penthouse'
+            else:
+                tipo = 'casa' if self.rng.random() < 0.05 else 'departamento'
+            filas.append({
+                'user': User(
+                    username=f'{self.prefijo}_{numero + 1:06d}', password=self._hash, first_name=nombre,
+                    last_name=apellido, email=f'{self.prefijo}.{numero + 1}@example.com', date_joined=registro,
+                ),
+                'propietario': Propietario(
+                    documento_identidad=documento, telefono=self._telefono(), fecha_registro=registro,
+                ),
+                'unidad': UnidadHabitacional(
+                    numero=f'{chr(65 + torre % 26)}-{piso + 1}{puerta + 1:02d}', edificio=f'Torre {chr(65 + torre % 26)}',
+                    tipo=tipo, piso=piso + 1, caracteristicas='',
+                ),
+                'pago': self.rng.choices(probabilidades_pago, perfiles_pago)[0],
+            })
+
+        for lote in _lotes(filas, self.tamano_lote):
+            with transaction.atomic():
+                users = User.objects.bulk_create([fila['user'] for fila in lote])
+                User.groups.through.objects.bulk_create([
+                    User.groups.through(user_id=user.pk, group_id=rol.django_group_id) for user in users
+                ])
+                for fila, user in zip(lote, users):
+                    fila['propietario'].user = user
+                Propietario.objects.bulk_create([fila['propietario'] for fila in lote])
+                PerfilUsuario.objects.bulk_create([
+                    PerfilUsuario(
+                        user=fila['user'], rol=rol, propietario=fila['propietario'],
+                        telefono=fila['propietario'].telefono, creado_automaticamente=True,
+                        fecha_creacion=fila['propietario'].fecha_registro,
+                        ultima_actualizacion=fila['propietario'].fecha_registro,
+                    )
+                    for fila in lote
+                ])
+                for fila in lote:
+                    fila['unidad'].propietario = fila['propietario']
+                UnidadHabitacional.objects.bulk_create([fila['unidad'] for fila in lote])
+            for fila in lote:
+                self.propietarios.append((
+                    fila['propietario'].pk, fila['unidad'].pk, fila['unidad'].tipo,
+                    fila['propietario'].fecha_registro, fila['pago'],
+                ))
+            if self.progreso:
+                self.progreso('propietarios', len(self.propietarios))
+        for tabla in ('usuarios', 'propietarios', 'unidades'):
+            self.conteos[tabla] = len(filas)
+
+    def _generar_guardias(self):
+        from seguridad.models import Guardia
+
+        cantidad = max(3, self.total_unidades // 60)
+        usuarios = []
+        for numero in range(cantidad):
+            nombre, apellido = self._nombre()
+            usuarios.append(User(
+                username=f'{self.prefijo}_guardia_{numero + 1:03d}', password=self._hash, first_name=nombre,
+                last_name=apellido, date_joined=self._inicio,
+            ))
+        with transaction.atomic():
+            User.objects.bulk_create(usuarios)
+            guardias = Guardia.objects.bulk_create([
+                Guardia(
+                    user=user, documento_identidad=f'{self.prefijo.upper()}G{numero + 1:05d}',
+                    telefono=self._telefono(), turno=('mañana', 'tarde', 'noche')[numero % 3],
+                    activo=self.rng.random() < 0.9, fecha_contratacion=self.desde,
+                )
+                for numero, user in enumerate(usuarios)
+            ])
+        self.guardias = [guardia.pk for guardia in guardias]
+        self.conteos['guardias'] = len(guardias)
+        self.conteos['usuarios'] += len(usuarios)
+
+    def _generar_vehiculos_y_mascotas(self):
+        from gestion.models import Mascota, Vehiculo
+
+        marcas = list(MARCAS_MODELOS)
+        tipos_mascota = list(RAZAS)
+        vehiculos = []
+        mascotas = []
+        secuencia = 0
+        for propietario_pk, unidad_pk, _tipo, registro, _pago in self.propietarios:
+            for _ in range(self.rng.choices((0, 1, 2, 3), (25, 50, 20, 5))[0]):
+                # Placas bolivianas: 4 dígitos y 3 letras, únicas por secuencia
+                numero, letras = divmod(secuencia, 26 ** 3)
+                secuencia += 1
+                placa = f'{1000 + numero % 9000}{chr(65 + letras // 676)}{chr(65 + letras // 26 % 26)}{chr(65 + letras % 26)}'
+                marca = self.rng.choices(marcas, PESO_MARCAS)[0]
+                vehiculos.append(Vehiculo(
+                    propietario_id=propietario_pk, unidad_id=unidad_pk, placa=placa, marca=marca,
+                    modelo=self.rng.choice(MARCAS_MODELOS[marca]),
+                    color=self.rng.choices(COLORES, PESO_COLORES)[0],
+                    tipo=self.rng.choices(TIPOS_VEHICULO, PESO_TIPOS_VEHICULO)[0],
+                    año=self.rng.randrange(self.hasta.year - 20, self.hasta.year + 1),
+                    activo=self.rng.random() < 0.95, fecha_registro=registro,
+                ))
+            for _ in range(self.rng.choices((0, 1, 2), (60, 30, 10))[0]):
+                tipo = self.rng.choices(tipos_mascota, (60, 30, 5, 5))[0]
+                mascotas.append(Mascota(
+                    propietario_id=propietario_pk, nombre=self.rng.choice(('Max', 'Luna', 'Rocky', 'Nala', 'Toby', 'Kira', 'Simba')),
+                    tipo=tipo, raza=self.rng.choice(RAZAS[tipo]), fecha_registro=registro,
+                ))
+
+        self._insertar(Vehiculo, vehiculos, 'vehiculos')
+        self.vehiculos = [(v.pk, v.placa, v.unidad_id, v.propietario_id) for v in vehiculos if v.activo]
+        self._insertar(Mascota, mascotas, 'mascotas')
+
+    def _generar_expensas(self):
+        from finanzas.models import Expensa, Pago
+
+        meses = self._meses()
+        hoy = self.hasta
+        metodos = ('transferencia', 'tarjeta', 'efectivo')
+
+        def expensas():
+            for propietario_pk, _unidad_pk, tipo, registro, probabilidad_pago in self.propietarios:
+                cuota = CUOTA_POR_TIPO[tipo]
+                for mes in meses:
+                    if mes < registro.date().replace(day=1):
+                        continue
+                    vencimiento = mes.replace(day=10)
+                    multas = Decimal(self.rng.choice((50, 100, 200))) if self.rng.random() < 0.05 else Decimal('0')
+                    otros = Decimal(self.rng.randrange(20, 150)) if self.rng.random() < 0.10 else Decimal('0')
+                    # Las expensas aún no vencidas se pagan con menos frecuencia
+                    probabilidad = probabilidad_pago if vencimiento < hoy else probabilidad_pago * 0.4
+                    pagada = self.rng.random() < probabilidad
+                    fecha_pago = None
+                    if pagada:
+                        dia_pago = mes + timedelta(days=self.rng.choices((0, 5, 9, 20), (20, 40, 30, 10))[0] + self.rng.randrange(0, 5))
+                        dia_pago = min(dia_pago, hoy)
+                        fecha_pago = timezone.make_aware(datetime.combine(dia_pago, hora(self.rng.randrange(8, 21))))
+                    yield Expensa(
+                        propietario_id=propietario_pk, mes_referencia=mes.strftime('%Y-%m'),
+                        monto_total=cuota + multas + otros, cuota_basica=cuota, multas=multas, otros=otros,
+                        fecha_emision=mes, fecha_vencimiento=vencimiento, pagada=pagada, fecha_pago=fecha_pago,
+                    )
+
+        pagos = []
+
+        def pagos_del_lote(lote):
+            for expensa in lote:
+                if expensa.pagada:
+                    pagos.append(Pago(
+                        expensa_id=expensa.pk, monto=expensa.monto_total,
+                        metodo_pago=self.rng.choices(metodos, (60, 25, 15))[0],
+                        referencia=f'{self.prefijo.upper()}-EXP-{expensa.pk}', fecha_pago=expensa.fecha_pago,
+                        verificado=self.rng.random() < 0.97,
+                    ))
+            self._insertar(Pago, pagos, 'pagos de expensas')
+            pagos.clear()
+
+        self._insertar(Expensa, expensas(), 'expensas', despues=pagos_del_lote)
+
+    def _generar_visitas(self):
+        from seguridad.models import RegistroVisita, Visita
+
+        hoy_indice = self.dias - 1
+        visitas_por_unidad = max(1, round(3 * self.dias / 30))
+        vistas = [0]
+
+        def visitas():
+            for propietario_pk, unidad_pk, _tipo, _registro, _pago in self.propietarios:
+                for _ in range(self.rng.randrange(visitas_por_unidad // 2, visitas_por_unidad * 3 // 2 + 1)):
+                    # Algunas visitas programadas para la próxima semana
+                    dia = self.rng.randrange(0, self.dias + 7)
+                    inicio = self.rng.randrange(8, 20)
+                    if dia > hoy_indice:
+                        estado = 'programada'
+                    elif dia == hoy_indice:
+                        estado = self.rng.choice(('programada', 'en_progreso'))
+                    else:
+                        estado = self.rng.choices(('finalizada', 'cancelada'), (88, 12))[0]
+                    nombre, apellido = self._nombre()
+                    con_auto = self.rng.random() < 0.45
+                    visita = Visita(
+                        propietario_id=propietario_pk, nombre_visitante=f'{nombre} {apellido}',
+                        documento_identidad=str(self.rng.randrange(1000000, 99999999)), telefono=self._telefono(),
+                        fecha_visita=self.desde + timedelta(days=dia), hora_inicio=hora(inicio),
+                        hora_fin=hora(min(23, inicio + self.rng.randrange(1, 6))),
+                        placa_vehiculo=f'{self.rng.randrange(1000, 9999)}{"".join(self.rng.choices("ABCDEFGHJKLMNPRSTUVWXYZ", k=3))}' if con_auto else '',
+                        codigo_acceso=str(self._uuid()), estado=estado,
+                        fecha_creacion=self._fecha_hora(max(0, min(dia, hoy_indice) - self.rng.randrange(0, 4)), 7, 22),
+                    )
+                    visita._unidad_pk = unidad_pk
+                    yield visita
+
+        registros = []
+
+        def registros_del_lote(lote):
+            for visita in lote:
+                if visita.estado in ('finalizada', 'en_progreso'):
+                    dia = (visita.fecha_visita - self.desde).days
+                    entrada = self._fecha_hora(dia, visita.hora_inicio.hour, visita.hora_inicio.hour + 1)
+                    salida = None
+                    if visita.estado == 'finalizada':
+                        salida = entrada + timedelta(minutes=self.rng.randrange(20, 300))
+                    registros.append(RegistroVisita(
+                        visita_id=visita.pk, hora_entrada=entrada, hora_salida=salida,
+                        guardia_registro=f'{self.prefijo}_guardia_{self.rng.randrange(len(self.guardias)) + 1:03d}',
+                        observaciones='',
+                    ))
+                if visita.placa_vehiculo and visita.estado != 'cancelada':
+                    # Muestreo de reservorio: acota la memoria con muchas visitas
+                    dato = (visita.pk, visita.placa_vehiculo, visita._unidad_pk, (visita.fecha_visita - self.desde).days)
+                    vistas[0] += 1
+                    if len(self.visitas_con_placa) < MAXIMO_VISITAS_PLACA:
+                        self.visitas_con_placa.append(dato)
+                    else:
+                        indice = self.rng.randrange(vistas[0])
+                        if indice < MAXIMO_VISITAS_PLACA:
+                            self.visitas_con_placa[indice] = dato
+            self._insertar(RegistroVisita, registros, 'registros de visitas')
+            registros.clear()
+
+        self._insertar(Visita, visitas(), 'visitas', despues=registros_del_lote)
+
+    def _generar_reconocimientos(self):
+        from seguridad.models import PlateRecognitionLog
+
+        horas = list(range(24))
+        confianzas = ('high', 'medium', 'low')
+        rangos_confianza = {'high': (85, 100), 'medium': (60, 85), 'low': (20, 60)}
+        visitas = self.visitas_con_placa
+        vehiculos = self.vehiculos
+        guardias = self.guardias
+        rng = self.rng
+
+        def reconocimientos():
+            for _ in range(self.reconocimientos):
+                confianza = rng.choices(confianzas, (80, 15, 5))[0]
+                tipo = rng.choices(('residente', 'visita', 'desconocido', 'proveedor'), (70, 18, 8, 4))[0]
+                vehiculo_pk = unidad_pk = visita_pk = None
+                if tipo == 'residente' and vehiculos:
+                    vehiculo_pk, placa, unidad_pk, _ = rng.choice(vehiculos)
+                    dia = rng.randrange(self.dias)
+                elif tipo == 'visita' and visitas:
+                    visita_pk, placa, unidad_pk, dia = rng.choice(visitas)
+                    dia = min(dia, self.dias - 1)
+                else:
+                    tipo = 'desconocido' if tipo == 'residente' or tipo == 'visita' else tipo
+                    placa = f'{rng.randrange(1000, 9999)}{"".join(rng.choices("ABCDEFGHJKLMNPRSTUVWXYZ", k=3))}'
+                    dia = rng.randrange(self.dias)
+                registrado = vehiculo_pk is not None
+                # Algunos residentes quedan restringidos (mora) y la placa
+                # de baja confianza se revisa a mano
+                permitido = (registrado and rng.random() < 0.97) or (visita_pk is not None and rng.random() < 0.9)
+                fecha = self._inicio + timedelta(
+                    days=dia, hours=rng.choices(horas, PESO_HORAS)[0], seconds=rng.randrange(3600),
+                )
+                yield PlateRecognitionLog(
+                    plate_number=placa, plate_region='bo', vehicle_type='car', image='',
+                    confidence=confianza, confidence_score=round(rng.uniform(*rangos_confianza[confianza]), 2),
+                    vehiculo_id=vehiculo_pk, unidad_id=unidad_pk, visita_id=visita_pk,
+                    guardia_id=rng.choice(guardias), is_registered=registrado, tipo_acceso=tipo,
+                    acceso_permitido=permitido, acceso_automatico=registrado and permitido and confianza == 'high',
+                    fecha_reconocimiento=fecha,
+                )
+
+        self._insertar(PlateRecognitionLog, reconocimientos(), 'reconocimientos de placa')
+
+    def _generar_reservas(self):
+        from areas_comunes.models import AreaComun, ReservaAreaComun
+        from pagos.models import Pago as PagoStripe
+
+        areas = AreaComun.objects.bulk_create([
+            AreaComun(
+                nombre=nombre, descripcion=f'{nombre} del condominio', capacidad=capacidad,
+                horario_apertura=apertura, horario_cierre=cierre, tarifa_hora=tarifa, tipo_cobro=tipo_cobro,
+            )
+            for nombre, capacidad, apertura, cierre, tarifa, tipo_cobro, _peso in AREAS
+        ])
+        self.conteos['áreas comunes'] = len(areas)
+        pesos = [peso for *_datos, peso in AREAS]
+        hoy_indice = self.dias - 1
+        reservas_por_unidad = max(1, round(3 * self.dias / 365))
+
+        def reservas():
+            for propietario_pk, _unidad_pk, _tipo, _registro, _pago in self.propietarios:
+                for _ in range(self.rng.randrange(0, reservas_por_unidad * 2 + 1)):
+                    area = self.rng.choices(areas, pesos)[0]
+                    dia = self.rng.randrange(0, self.dias + 30)
+                    duracion = self.rng.randrange(1, 5)
+                    ultima = max(area.horario_apertura.hour, area.horario_cierre.hour - duracion)
+                    inicio = self.rng.randrange(area.horario_apertura.hour, ultima + 1)
+                    if dia > hoy_indice:
+                        estado = self.rng.choices(('pendiente', 'confirmada', 'cancelada'), (40, 50, 10))[0]
+                    else:
+                        estado = self.rng.choices(('completada', 'cancelada', 'confirmada'), (80, 15, 5))[0]
+                    costo = area.tarifa_hora * duracion if area.tipo_cobro == 'por_hora' else area.tarifa_hora
+                    yield ReservaAreaComun(
+                        propietario_id=propietario_pk, area=area, fecha=self.desde + timedelta(days=dia),
+                        hora_inicio=hora(inicio), hora_fin=hora(min(23, inicio + duracion)),
+                        num_personas=self.rng.randrange(1, min(area.capacidad, 20) + 1), costo_total=costo,
+                        estado=estado, codigo_reserva=str(self._uuid()),
+                        fecha_reserva=self._fecha_hora(max(0, min(dia, hoy_indice) - self.rng.randrange(1, 15)), 7, 23),
+                    )
+
+        pagos = []
+
+        def pagos_del_lote(lote):
+            for reserva in lote:
+                if reserva.estado in ('confirmada', 'completada') and self.rng.random() < 0.7:
+                    completado = reserva.fecha_reserva + timedelta(minutes=self.rng.randrange(1, 30))
+                    pagos.append(PagoStripe(
+                        propietario_id=reserva.propietario_id, reserva_id=reserva.pk, tipo_pago='reserva',
+                        monto=reserva.costo_total, payment_intent_id=f'pi_{self.prefijo}_{reserva.pk}',
+                        payment_method_id=f'pm_{self.prefijo}_{reserva.pk}', charge_id=f'ch_{self.prefijo}_{reserva.pk}',
+                        estado='completado', descripcion=f'Reserva {reserva.area.nombre}',
+                        metadata={'reserva_id': reserva.pk}, fecha_creacion=reserva.fecha_reserva,
+                        fecha_actualizacion=completado, fecha_completado=completado,
+                    ))
+            self._insertar(PagoStripe, pagos, 'pagos con Stripe')
+            pagos.clear()
+
+        self._insertar(ReservaAreaComun, reservas(), 'reservas', despues=pagos_del_lote)
+
+    def _generar_comunicados(self):
+        from comunicacion.models import Comunicado
+
+        # bulk_create: con auto_now_add desactivado, el perfil que crea el
+        # signal de User quedaría sin fecha
+        [autor] = User.objects.bulk_create([User(
+            username=f'{self.prefijo}_admin', password=self._hash, first_name='Administración',
+            is_staff=True, date_joined=self._inicio,
+        )])
+        self.conteos['usuarios'] += 1
+        tipos = list(TITULOS_COMUNICADO)
+        comunicados = []
+        for semana in range(0, self.dias, 7):
+            for _ in range(self.rng.choices((0, 1, 2), (20, 60, 20))[0]):
+                tipo = self.rng.choices(tipos, (45, 25, 20, 10))[0]
+                dia = min(self.dias - 1, semana + self.rng.randrange(7))
+                comunicados.append(Comunicado(
+                    titulo=self.rng.choice(TITULOS_COMUNICADO[tipo]), contenido='Se informa a los copropietarios...',
+                    tipo=tipo, prioridad=4 if tipo == 'urgente' else self.rng.randrange(1, 4), autor=autor,
+                    fecha_publicacion=self._fecha_hora(dia, 8, 20), activo=self.dias - dia <= 60,
+                ))
+        self._insertar(Comunicado, comunicados, 'comunicados')
+
+    def _generar_reportes(self):
+        from mantenimiento.models import Reporte
+
+        reportes_por_unidad = max(1, round(self.dias / 365))
+
+        def reportes():
+            for propietario_pk, _unidad_pk, _tipo, _registro, _pago in self.propietarios:
+                for _ in range(self.rng.choices((0, reportes_por_unidad, reportes_por_unidad * 2), (45, 40, 15))[0]):
+                    dia = self._dia()
+                    tipo = self.rng.choices(TIPOS_REPORTE, PESO_TIPOS_REPORTE)[0]
+                    antiguedad = self.dias - dia
+                    if antiguedad > 30:
+                        estado = self.rng.choices(('resuelto', 'rechazado', 'en_proceso', 'pendiente'), (75, 10, 10, 5))[0]
+                    else:
+                        estado = self.rng.choices(('pendiente', 'en_proceso', 'resuelto'), (50, 30, 20))[0]
+                    yield Reporte(
+                        propietario_id=propietario_pk, tipo=tipo, titulo=f'{tipo.capitalize()} en {self.rng.choice(UBICACIONES).lower()}',
+                        descripcion='Reporte generado para pruebas de carga.', ubicacion=self.rng.choice(UBICACIONES),
+                        fecha_reporte=self._fecha_hora(dia, 6, 23), estado=estado,
+                        prioridad=self.rng.choices((1, 2, 3, 4, 5), (10, 25, 35, 20, 10))[0],
+                    )
+
+        self._insertar(Reporte, reportes(), 'reportes')
+
+    # ------------------------------------------------------------------
+    # Tablas derivadas
+    # ------------------------------------------------------------------
+
+    def recalcular_derivados(self):
+        """
+        Recalcula lo que mantienen los signals que bulk_create no envía.
+
+        Returns:
+            Dict con filas reindexadas, filas del resumen financiero y
+            propietarios con riesgo recalculado
+        """
+        from condominio.search import BUSQUEDA_REGISTRY, reindexar
+        from finanzas.resumen import reconstruir
+        from gestion.dashboard import invalidar_resumen
+        from gestion.riesgos import recalcular
+
+        reindexadas = 0
+        for spec in BUSQUEDA_REGISTRY:
+            modelo = spec.get_model()
+            inicial = self._pk_inicial.get(modelo, 0)
+            reindexadas += reindexar(modelo, spec.campos, Q(pk__gt=inicial), batch_size=self.tamano_lote)
+
+        meses = [mes.strftime('%Y-%m') for mes in self._meses()]
+        resumen = reconstruir(meses)
+        # Se recalculan todos: filtrar por una lista de cientos de miles de
+        # ids excede el límite de parámetros de SQLite
+        riesgo = recalcular(tamano_lote=min(self.tamano_lote, 1000))
+        invalidar_resumen()
+        return {'busqueda': reindexadas, 'resumen_financiero': resumen, 'riesgo': riesgo}
+
+
+def generar(progreso=None, recalcular=True, **opciones):
+    """
+    Genera los datos y, si `recalcular`, las tablas derivadas.
+
+    Returns:
+        (filas por tabla, resultado de recalcular_derivados o None, segundos)
+    """
+    inicio = time.perf_counter()
+    generador = GeneradorDatos(progreso=progreso, **opciones)
+    conteos = generador.generar()
+    derivados = generador.recalcular_derivados() if recalcular else None
+    return conteos, derivados, time.perf_counter() - inicio
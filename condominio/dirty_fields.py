@@ -0,0 +1,99 @@
+"""
+Guardado de solo los campos modificados.
+
+DirtyFieldsMixin guarda los valores de los campos al cargar la instancia de
+la base de datos (y después de cada save). Al llamar a save() sin
+update_fields sobre una instancia existente:
+- si ningún campo cambió, no se ejecuta el UPDATE ni se envían
+  pre_save/post_save;
+- si hay cambios, se guarda con update_fields = campos modificados (más los
+  auto_now), de modo que los receivers pueden ignorar guardados que no
+  tocan sus campos.
+
+Debe ir antes de models.Model en las bases del modelo.
+"""
+import copy
+
+from django.db import models
+
+
+def _valor(field, instance):
+    """Valor comparable de un campo (el nombre para archivos)."""
+    valor = getattr(instance, field.attname)
+    if isinstance(field, models.FileField):
+        return valor.name or None
+    if isinstance(valor, (dict, list)):
+        return copy.deepcopy(valor)
+    return valor
+
+
+class DirtyFieldsMixin:
+    """
+    Mixin para modelos que solo escriben (y solo disparan signals) cuando
+    cambió algún campo.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._guardar_originales()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._guardar_originales(fields)
+
+    def _guardar_originales(self, fields=None):
+        originales = self.__dict__.setdefault('_valores_originales', {})
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            originales[field.attname] = _valor(field, self)
+
+    def get_dirty_fields(self):
+        """
+        Nombres de los campos que cambiaron desde que la instancia se cargó
+        o se guardó por última vez. Los campos diferidos no cuentan.
+        """
+        originales = self.__dict__.get('_valores_originales', {})
+        dirty = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if field.attname not in originales:
+                dirty.append(field.name)
+                continue
+            if isinstance(field, models.FileField):
+                archivo = getattr(self, field.attname)
+                if archivo and not archivo._committed:
+                    dirty.append(field.name)
+                    continue
+            if _valor(field, self) != originales[field.attname]:
+                dirty.append(field.name)
+        return dirty
+
+    def is_dirty(self):
+        return bool(self.get_dirty_fields())
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            dirty = self.get_dirty_fields()
+            if not dirty:
+                return
+            auto_now = [
+                field.name for field in self._meta.concrete_fields
+                if getattr(field, 'auto_now', False) and field.name not in dirty
+            ]
+            kwargs['update_fields'] = dirty + auto_now
+        elif kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = list(kwargs['update_fields'])
+
+        super().save(*args, **kwargs)
+        self._guardar_originales(kwargs.get('update_fields'))
@@ -0,0 +1,208 @@
+"""
+Servidor falso de Plate Recognizer y Stripe para pruebas de carga sin conexión.
+
+Plate Recognizer (POST /v1/plate-reader/): la placa leída es el nombre del
+archivo subido ('2345ABC.jpg' -> '2345ABC'); un nombre que empieza con
+'sin-placa' responde sin resultados.
+
+Stripe: crea y confirma PaymentIntents y crea PaymentMethods con la misma
+forma de respuesta que la API. La tarjeta 4000000000000002 se rechaza como
+en el modo de prueba de Stripe.
+
+Uso (lo levanta python manage.py prueba_carga --servicios-falsos):
+    PLATE_RECOGNIZER_API_URL=http://127.0.0.1:8766/v1/plate-reader/ PLATE_RECOGNIZER_API_KEY=fake
+    STRIPE_API_BASE=http://127.0.0.1:8766 STRIPE_SECRET_KEY=sk_test_fake
+"""
+import json
+import random
+import secrets
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import PurePath
+from urllib.parse import parse_qs, urlparse
+
+TARJETA_RECHAZADA = '4000000000000002'
+
+
+class FakeExternosServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms=0, jitter_ms=0, failure_rate=0.0):
+        super().__init__(address, FakeExternosHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.payment_intents = {}
+        self.lock = threading.Lock()
+        self.stats = {'plate_reader': 0, 'payment_intents': 0, 'confirmaciones': 0, 'failures': 0}
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def plate_reader_url(self):
+        return f'{self.base_url}/v1/plate-reader/'
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+    def contar(self, clave):
+        with self.lock:
+            self.stats[clave] += 1
+
+
+class FakeExternosHandler(BaseHTTPRequestHandler):
+    server: FakeExternosServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _simulate(self):
+        """Aplica la latencia configurada; retorna True si se debe fallar."""
+        delay = self.server.latency_ms + random.uniform(0, self.server.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if self.server.failure_rate and random.random() < self.server.failure_rate:
+            self.server.contar('failures')
+            self._json(500, {'error': {'type': 'api_error', 'message': 'Fallo simulado'}})
+            return True
+        return False
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _cuerpo(self):
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        partes = urlparse(self.path).path.strip('/').split('/')
+        cuerpo = self._cuerpo()
+        if self._simulate():
+            return
+        if partes == ['v1', 'plate-reader']:
+            return self._plate_reader(cuerpo)
+        form = {clave: valores[0] for clave, valores in parse_qs(cuerpo.decode('utf-8')).items()}
+        if partes == ['v1', 'payment_intents']:
+            return self._crear_payment_intent(form)
+        if partes == ['v1', 'payment_methods']:
+            return self._crear_payment_method(form)
+        if len(partes) == 4 and partes[:2] == ['v1', 'payment_intents'] and partes[3] == 'confirm':
+            return self._confirmar_payment_intent(partes[2], form)
+        self._json(404, {'error': {'type': 'invalid_request_error', 'message': 'Ruta desconocida'}})
+
+    def do_GET(self):
+        partes = urlparse(self.path).path.strip('/').split('/')
+        if len(partes) == 3 and partes[:2] == ['v1', 'payment_intents']:
+            with self.server.lock:
+                intent = self.server.payment_intents.get(partes[2])
+            if intent:
+                return self._json(200, intent)
+        self._json(404, {'error': {'type': 'invalid_request_error', 'message': 'No such payment_intent'}})
+
+    # ------------------------------------------------------------------
+    # Plate Recognizer
+    # ------------------------------------------------------------------
+
+    def _plate_reader(self, cuerpo):
+        self.server.contar('plate_reader')
+        if not self.headers.get('Authorization', '').startswith('Token '):
+            return self._json(403, {'detail': 'Authentication credentials were not provided.'})
+        mensaje = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode('latin-1') + cuerpo
+        )
+        nombre = next(
+            (parte.get_filename() for parte in mensaje.iter_parts() if parte.get_param('name', header='content-disposition') == 'upload'),
+            None,
+        )
+        if not nombre:
+            return self._json(400, {'upload': ['No file was submitted.']})
+        placa = PurePath(nombre).stem.lower()
+        resultados = []
+        if not placa.startswith('sin-placa'):
+            resultados.append({
+                'plate': placa,
+                'score': round(random.uniform(0.72, 0.99), 3),
+                'region': {'code': 'bo', 'score': 0.9},
+                'vehicle': {'type': 'Sedan', 'score': 0.8},
+                'box': {'xmin': 10, 'ymin': 10, 'xmax': 110, 'ymax': 50},
+            })
+        self._json(201, {
+            'processing_time': round(random.uniform(40, 120), 1),
+            'results': resultados,
+            'filename': nombre,
+            'version': 1,
+            'camera_id': None,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        })
+
+    # ------------------------------------------------------------------
+    # Stripe
+    # ------------------------------------------------------------------
+
+    def _crear_payment_intent(self, form):
+        self.server.contar('payment_intents')
+        try:
+            monto = int(form['amount'])
+        except (KeyError, ValueError):
+            return self._json(400, {'error': {'type': 'invalid_request_error', 'message': 'Missing required param: amount.'}})
+        intent_id = f'pi_{secrets.token_hex(12)}'
+        intent = {
+            'id': intent_id,
+            'object': 'payment_intent',
+            'amount': monto,
+            'currency': form.get('currency', 'usd'),
+            'client_secret': f'{intent_id}_secret_{secrets.token_hex(12)}',
+            'status': 'requires_payment_method',
+            'created': int(time.time()),
+            'metadata': {clave[9:-1]: valor for clave, valor in form.items() if clave.startswith('metadata[')},
+            'payment_method': None,
+            'charges': {'object': 'list', 'data': []},
+        }
+        with self.server.lock:
+            self.server.payment_intents[intent_id] = intent
+        self._json(200, intent)
+
+    def _crear_payment_method(self, form):
+        numero = form.get('card[number]', '')
+        if len(numero) < 12:
+            return self._json(402, {'error': {'type': 'card_error', 'code': 'invalid_number', 'message': 'Your card number is incorrect.'}})
+        self._json(200, {
+            'id': f'pm_{secrets.token_hex(12)}_{numero[-4:]}',
+            'object': 'payment_method',
+            'type': 'card',
+            'card': {'brand': 'visa', 'last4': numero[-4:], 'exp_month': int(form.get('card[exp_month]', 1)),
+                     'exp_year': int(form.get('card[exp_year]', 2030))},
+        })
+
+    def _confirmar_payment_intent(self, intent_id, form):
+        self.server.contar('confirmaciones')
+        with self.server.lock:
+            intent = self.server.payment_intents.get(intent_id)
+        if intent is None:
+            return self._json(404, {'error': {'type': 'invalid_request_error', 'message': f'No such payment_intent: {intent_id}'}})
+        payment_method = form.get('payment_method', '')
+        if payment_method.endswith(TARJETA_RECHAZADA[-4:]):
+            return self._json(402, {'error': {
+                'type': 'card_error', 'code': 'card_declined', 'decline_code': 'generic_decline',
+                'message': 'Your card was declined.', 'payment_intent': intent,
+            }})
+        with self.server.lock:
+            intent.update({
+                'status': 'succeeded',
+                'payment_method': payment_method,
+                'latest_charge': f'ch_{secrets.token_hex(12)}',
+            })
+            intent['charges'] = {'object': 'list', 'data': [{'id': intent['latest_charge'], 'object': 'charge'}]}
+        self._json(200, intent)
@@ -0,0 +1,156 @@
+"""
+Servidor falso de ImgBB para pruebas y benchmarks sin conexión.
+
+Implementa POST /1/upload con la misma respuesta JSON que ImgBB, las URLs
+de eliminación y la descarga de imágenes, guardando los archivos en disco.
+Permite simular latencia y fallos.
+
+Uso:
+    python manage.py fake_imgbb --port 8765 --latency-ms 200 --failure-rate 0.05
+    IMGBB_API_URL=http://127.0.0.1:8765/1/upload IMGBB_API_KEY=fake
+"""
+import base64
+import binascii
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeImgBBServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, storage_dir, latency_ms=0, jitter_ms=0, failure_rate=0.0):
+        super().__init__(address, FakeImgBBHandler)
+        self.storage_dir = storage_dir
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.images = {}
+        self.lock = threading.Lock()
+        self.stats = {'uploads': 0, 'deletes': 0, 'failures': 0}
+        os.makedirs(storage_dir, exist_ok=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    @property
+    def upload_url(self):
+        return f'{self.base_url}/1/upload'
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class FakeImgBBHandler(BaseHTTPRequestHandler):
+    server: FakeImgBBServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _simulate(self):
+        """Aplica la latencia configurada; retorna True si se debe fallar."""
+        delay = self.server.latency_ms + random.uniform(0, self.server.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        if self.server.failure_rate and random.random() < self.server.failure_rate:
+            with self.server.lock:
+                self.server.stats['failures'] += 1
+            self._json(500, {'status_code': 500, 'error': {'message': 'Fallo simulado'}, 'success': False})
+            return True
+        return False
+
+    def _json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/1/upload':
+            return self._json(404, {'success': False})
+        if self._simulate():
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        if not form.get('key'):
+            return self._json(400, {'status_code': 400, 'error': {'message': 'Empty API key'}, 'success': False})
+        try:
+            data = base64.b64decode(form['image'][0])
+        except (KeyError, binascii.Error):
+            return self._json(400, {'status_code': 400, 'error': {'message': 'Invalid image'}, 'success': False})
+
+        image_id = secrets.token_hex(4)
+        delete_hash = secrets.token_hex(16)
+        name = form.get('name', [image_id])[0]
+        with open(os.path.join(self.server.storage_dir, image_id), 'wb') as f:
+            f.write(data)
+        with self.server.lock:
+            self.server.images[image_id] = delete_hash
+            self.server.stats['uploads'] += 1
+
+        base = self.server.base_url
+        url = f'{base}/i/{image_id}/{name}.jpg'
+        self._json(200, {
+            'data': {
+                'id': image_id,
+                'title': name,
+                'url_viewer': f'{base}/{image_id}',
+                'url': url,
+                'display_url': url,
+                'size': len(data),
+                'time': int(time.time()),
+                'expiration': 0,
+                'image': {'filename': f'{name}.jpg', 'name': name, 'url': url},
+                'thumb': {'url': f'{base}/i/{image_id}/thumb.jpg'},
+                'medium': {'url': f'{base}/i/{image_id}/medium.jpg'},
+                'delete_url': f'{base}/{image_id}/{delete_hash}',
+            },
+            'success': True,
+            'status': 200,
+        })
+
+    def do_GET(self):
+        parts = urlparse(self.path).path.strip('/').split('/')
+        if parts[0] == 'i' and len(parts) >= 2:
+            return self._serve_image(parts[1])
+        if len(parts) == 2:
+            return self._delete(*parts)
+        self._json(404, {'success': False})
+
+    def _serve_image(self, image_id):
+        path = os.path.join(self.server.storage_dir, os.path.basename(image_id))
+        if not os.path.exists(path):
+            return self._json(404, {'success': False})
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _delete(self, image_id, delete_hash):
+        if self._simulate():
+            return
+        with self.server.lock:
+            if self.server.images.get(image_id) != delete_hash:
+                return self._json(404, {'success': False})
+            del self.server.images[image_id]
+            self.server.stats['deletes'] += 1
+        try:
+            os.remove(os.path.join(self.server.storage_dir, image_id))
+        except OSError:
+            pass
+        self._json(200, {'success': True})
@@ -0,0 +1,385 @@
+"""
+Motor de sincronización de imágenes con ImgBB.
+
+Todas las imágenes que se suben a ImgBB se describen en IMAGE_REGISTRY.
+A partir de ese registro se manejan la subida automática (post_save),
+la eliminación remota diferida (pre_delete + ImagenPendienteEliminacion),
+la migración masiva de imágenes existentes y la verificación de consistencia.
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, pre_delete
+from django.utils import timezone
+
+from .imgbb_service import imgbb_service
+from .transacciones import LoteEnCommit, lote_en_commit
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ImageSpec:
+    """
+    Describe un campo de imagen que se sincroniza con ImgBB.
+
+    Attributes:
+        key: Nombre corto usado por los comandos (ej: 'visitas')
+        model: Modelo en formato 'app_label.Modelo'
+        file_field: Campo ImageField/FileField con el archivo local
+        url_field: Campo donde se guarda la URL de ImgBB
+        delete_url_field: Campo donde se guarda la URL de eliminación
+        folder: Tipo de carpeta de ImgBBService.FOLDERS
+        name_template: Plantilla del nombre, recibe la instancia como `obj`
+        related: Relaciones que usa name_template (para select_related)
+    """
+    key: str
+    model: str
+    file_field: str
+    url_field: str
+    delete_url_field: str
+    folder: str
+    name_template: str
+    related: Tuple[str, ...] = ()
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def build_name(self, instance) -> str:
+        return self.name_template.format(obj=instance)
+
+    def pending_filter(self) -> Q:
+        """Filas con archivo local pero sin URL en ImgBB."""
+        return (
+            Q(**{f'{self.file_field}__isnull': False})
+            & ~Q(**{self.file_field: ''})
+            & (Q(**{f'{self.url_field}__isnull': True}) | Q(**{self.url_field: ''}))
+        )
+
+
+IMAGE_REGISTRY: List[ImageSpec] = [
+    ImageSpec('visitas', 'seguridad.Visita', 'qr_code', 'qr_code_url', 'qr_code_delete_url', 'qrcodes_visitas', 'qr_visita_{obj.codigo_acceso}'),
+    ImageSpec('registros', 'seguridad.RegistroVisita', 'foto_entrada', 'foto_entrada_url', 'foto_entrada_delete_url', 'fotos_visitas', 'foto_visita_{obj.visita.codigo_acceso}_{obj.id}', ('visita',)),
+    ImageSpec('placas', 'seguridad.PlateRecognitionLog', 'image', 'image_url', 'image_delete_url', 'plate_recognition', 'plate_{obj.plate_number}_{obj.id}'),
+    ImageSpec('usuarios', 'administracion.PerfilUsuario', 'foto', 'foto_url', 'foto_delete_url', 'usuarios/fotos', 'usuario_{obj.user.username}_{obj.id}', ('user',)),
+    ImageSpec('vehiculos', 'gestion.Vehiculo', 'foto_vehiculo', 'foto_vehiculo_url', 'foto_vehiculo_delete_url', 'vehiculos', 'vehiculo_{obj.placa}_{obj.id}'),
+    ImageSpec('mascotas', 'gestion.Mascota', 'foto', 'foto_url', 'foto_delete_url', 'mascotas', 'mascota_{obj.nombre}_{obj.id}'),
+    ImageSpec('comunicados', 'comunicacion.Comunicado', 'imagen', 'imagen_url', 'imagen_delete_url', 'comunicados', 'comunicado_{obj.id}'),
+    ImageSpec('reportes', 'mantenimiento.Reporte', 'foto', 'foto_url', 'foto_delete_url', 'reportes', 'reporte_{obj.id}'),
+]
+
+
+def get_specs(key: Optional[str] = None) -> List[ImageSpec]:
+    """Retorna las entradas del registro, filtradas por key si se indica."""
+    if key in (None, 'all'):
+        return list(IMAGE_REGISTRY)
+    specs = [spec for spec in IMAGE_REGISTRY if spec.key == key]
+    if not specs:
+        raise ValueError(f"No existe una entrada de imagen con key '{key}'")
+    return specs
+
+
+def specs_for_model(model) -> List[ImageSpec]:
+    """Entradas del registro que corresponden a un modelo."""
+    label = model._meta.label
+    return [spec for spec in IMAGE_REGISTRY if spec.model == label]
+
+
+def _upload(spec: ImageSpec, instance) -> Dict[str, str]:
+    """
+    Sube la imagen de una instancia y retorna los campos a actualizar.
+    Retorna un dict vacío si no hay nada que subir o si falla.
+    """
+    archivo = getattr(instance, spec.file_field)
+    if not archivo or getattr(instance, spec.url_field):
+        return {}
+
+    try:
+        result = imgbb_service.upload_image(
+            image_file=archivo,
+            folder_type=spec.folder,
+            name=spec.build_name(instance)
+        )
+    except Exception as e:
+        logger.error(f"Error al subir {spec.key} {instance.pk} a ImgBB: {str(e)}")
+        return {}
+
+    if not result:
+        return {}
+
+    logger.info(f"Imagen de {spec.key} {instance.pk} subida a ImgBB: {result['url']}")
+    return {
+        spec.url_field: result['url'],
+        spec.delete_url_field: result['delete_url'],
+    }
+
+
+def upload_instance_images(instance, specs: Optional[Iterable[ImageSpec]] = None) -> Dict[str, str]:
+    """
+    Sube todas las imágenes pendientes de una instancia.
+
+    Los campos de todas las entradas se escriben en un único UPDATE
+    (sin disparar post_save de nuevo) y se reflejan en la instancia.
+
+    Returns:
+        Dict con los campos actualizados
+    """
+    if specs is None:
+        specs = specs_for_model(type(instance))
+
+    updates = {}
+    for spec in specs:
+        updates.update(_upload(spec, instance))
+
+    if updates:
+        type(instance)._default_manager.filter(pk=instance.pk).update(**updates)
+        for field, value in updates.items():
+            setattr(instance, field, value)
+
+    return updates
+
+
+def collect_delete_urls(instance, specs: Optional[Iterable[ImageSpec]] = None) -> List[str]:
+    """URLs de eliminación de ImgBB asociadas a una instancia."""
+    if specs is None:
+        specs = specs_for_model(type(instance))
+    return [
+        getattr(instance, spec.delete_url_field)
+        for spec in specs
+        if getattr(instance, spec.delete_url_field)
+    ]
+
+
+def delete_remote_images(delete_urls: Iterable[str], min_interval: float = 0) -> Dict[str, bool]:
+    """Elimina un lote de imágenes de ImgBB reutilizando la conexión."""
+    delete_urls = [url for url in dict.fromkeys(delete_urls) if url]
+    if not delete_urls:
+        return {}
+    return imgbb_service.delete_images(delete_urls, min_interval=min_interval)
+
+
+def record_pending_deletions(urls: Iterable[Tuple[str, str]]) -> int:
+    """
+    Registra URLs de eliminación (delete_url, modelo) en la tabla de
+    pendientes con un solo INSERT. No hace ninguna llamada a ImgBB.
+    """
+    from .models import ImagenPendienteEliminacion
+
+    pendientes = [
+        ImagenPendienteEliminacion(delete_url=url, modelo=modelo)
+        for url, modelo in dict(urls).items()
+        if url
+    ]
+    if not pendientes:
+        return 0
+    ImagenPendienteEliminacion.objects.bulk_create(pendientes, ignore_conflicts=True)
+    return len(pendientes)
+
+
+class _DeleteBatch(LoteEnCommit):
+    """
+    URLs de eliminación (delete_url, modelo) de un savepoint. Se registran
+    como pendientes en un solo INSERT cuando la transacción se confirma; si
+    el savepoint o la transacción se revierten, no se registra nada.
+    """
+
+    descripcion = 'imágenes pendientes de eliminación'
+
+    def procesar(self, urls):
+        record_pending_deletions(urls)
+
+
+def process_pending_deletions(
+    batch_size: int = 100,
+    rate_limit: float = 5,
+    max_attempts: int = 5,
+    lease: timedelta = timedelta(minutes=10),
+    retention: timedelta = timedelta(days=30),
+) -> Dict[str, int]:
+    """
+    Procesa un lote de imágenes pendientes de eliminación en ImgBB.
+
+    Las filas se reservan en una transacción corta (moviendo su
+    proximo_intento), y las llamadas HTTP se hacen fuera de la transacción
+    para no retener bloqueos mientras se espera la red. Las fallidas se
+    reintentan con backoff exponencial hasta max_attempts; después quedan
+    marcadas como abandonadas (con un aviso en el log) y se purgan cuando
+    pasa `retention`.
+
+    Args:
+        batch_size: Máximo de filas a procesar
+        rate_limit: Máximo de peticiones por segundo a ImgBB (0 = sin límite)
+        max_attempts: Intentos antes de abandonar una fila
+        lease: Tiempo que una fila queda reservada para este proceso
+        retention: Tiempo que se conserva una fila abandonada
+
+    Returns:
+        Dict con la cantidad de eliminadas, fallidas, abandonadas y purgadas
+    """
+    from .models import ImagenPendienteEliminacion
+
+    ahora = timezone.now()
+    vigentes = ImagenPendienteEliminacion.objects.filter(abandonada__isnull=True)
+    # Filas que ya superaban max_attempts (p. ej. si se bajó el límite)
+    abandonadas = _abandonar(vigentes.filter(intentos__gte=max_attempts), ahora)
+    purgadas, _ = ImagenPendienteEliminacion.objects.filter(abandonada__lt=ahora - retention).delete()
+    if purgadas:
+        logger.info(f"Purgadas {purgadas} imágenes abandonadas con más de {retention.days} días")
+
+    with transaction.atomic():
+        pendientes = list(
+            vigentes
+            .select_for_update(skip_locked=True)
+            .filter(proximo_intento__lte=ahora)
+            .order_by('proximo_intento')[:batch_size]
+        )
+        ImagenPendienteEliminacion.objects.filter(
+            pk__in=[p.pk for p in pendientes]
+        ).update(proximo_intento=ahora + lease)
+
+    resultado = {'eliminadas': 0, 'fallidas': 0, 'abandonadas': abandonadas, 'purgadas': purgadas}
+    if not pendientes:
+        return resultado
+
+    min_interval = 1 / rate_limit if rate_limit else 0
+    resultados = delete_remote_images([p.delete_url for p in pendientes], min_interval=min_interval)
+
+    eliminadas = [p.pk for p in pendientes if resultados.get(p.delete_url)]
+    fallidas = [p for p in pendientes if not resultados.get(p.delete_url)]
+
+    ImagenPendienteEliminacion.objects.filter(pk__in=eliminadas).delete()
+
+    ahora = timezone.now()
+    for pendiente in fallidas:
+        pendiente.intentos += 1
+        pendiente.ultimo_error = 'Error al eliminar imagen de ImgBB'
+        pendiente.proximo_intento = ahora + timedelta(minutes=2 ** pendiente.intentos)
+    ImagenPendienteEliminacion.objects.bulk_update(
+        fallidas, ['intentos', 'ultimo_error', 'proximo_intento']
+    )
+    abandonadas += _abandonar(
+        ImagenPendienteEliminacion.objects.filter(
+            pk__in=[p.pk for p in fallidas if p.intentos >= max_attempts]
+        ),
+        ahora,
+    )
+
+    resultado.update(eliminadas=len(eliminadas), fallidas=len(fallidas), abandonadas=abandonadas)
+    return resultado
+
+
+def _abandonar(queryset, ahora) -> int:
+    """Marca las filas como abandonadas y las registra en el log."""
+    filas = list(queryset.values_list('pk', 'modelo', 'delete_url'))
+    for _pk, modelo, delete_url in filas:
+        logger.warning(f"Se abandonó la eliminación en ImgBB de {modelo} {delete_url} tras agotar los intentos")
+    if filas:
+        queryset.model.objects.filter(pk__in=[f[0] for f in filas]).update(abandonada=ahora)
+    return len(filas)
+
+
+def backfill(spec: ImageSpec, batch_size: int = 50, stdout=None) -> Tuple[int, int]:
+    """
+    Sube a ImgBB las imágenes locales que aún no tienen URL.
+
+    Las filas se leen en streaming y las URLs se escriben con bulk_update
+    por lotes, en lugar de un UPDATE por fila.
+
+    Returns:
+        Tupla (migrados, total)
+    """
+    model = spec.get_model()
+    queryset = model._default_manager.filter(spec.pending_filter())
+    if spec.related:
+        queryset = queryset.select_related(*spec.related)
+
+    total = queryset.count()
+    migrados = 0
+    lote = []
+    fields = [spec.url_field, spec.delete_url_field]
+
+    for instance in queryset.iterator(chunk_size=batch_size):
+        updates = _upload(spec, instance)
+        if not updates:
+            if stdout:
+                stdout.write(f'✗ Error en {spec.key} {instance.pk}')
+            continue
+        for field, value in updates.items():
+            setattr(instance, field, value)
+        lote.append(instance)
+        if stdout:
+            stdout.write(f'✓ {spec.key} {instance.pk} migrado')
+        if len(lote) >= batch_size:
+            model._default_manager.bulk_update(lote, fields)
+            migrados += len(lote)
+            lote = []
+
+    if lote:
+        model._default_manager.bulk_update(lote, fields)
+        migrados += len(lote)
+
+    return migrados, total
+
+
+def verify(spec: ImageSpec) -> Dict[str, int]:
+    """
+    Revisa la consistencia entre archivos locales y URLs de ImgBB.
+
+    Returns:
+        Dict con el total de filas, subidas, pendientes y sin delete_url
+    """
+    model = spec.get_model()
+    queryset = model._default_manager.all()
+    has_url = Q(**{f'{spec.url_field}__isnull': False}) & ~Q(**{spec.url_field: ''})
+    no_delete_url = Q(**{f'{spec.delete_url_field}__isnull': True}) | Q(**{spec.delete_url_field: ''})
+
+    return {
+        'total': queryset.count(),
+        'subidas': queryset.filter(has_url).count(),
+        'pendientes': queryset.filter(spec.pending_filter()).count(),
+        'sin_delete_url': queryset.filter(has_url & no_delete_url).count(),
+    }
+
+
+def _post_save_receiver(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Sube las imágenes pendientes de la instancia guardada."""
+    if raw:
+        return
+    specs = specs_for_model(sender)
+    # Guardados parciales que no tocan el archivo no tienen nada que subir
+    if update_fields is not None:
+        specs = [spec for spec in specs if spec.file_field in update_fields]
+        if not specs:
+            return
+    upload_instance_images(instance, specs)
+
+
+def _pre_delete_receiver(sender, instance, using=None, **kwargs):
+    """Registra las imágenes de la instancia como pendientes de eliminación."""
+    urls = collect_delete_urls(instance)
+    if not urls:
+        return
+    using = using or 'default'
+    if transaction.get_connection(using).in_atomic_block:
+        lote_en_commit(_DeleteBatch, using).agregar((url, sender._meta.label) for url in urls)
+    else:
+        record_pending_deletions((url, sender._meta.label) for url in urls)
+
+
+def connect_signals():
+    """Conecta los receivers del motor para cada modelo del registro."""
+    for label in dict.fromkeys(spec.model for spec in IMAGE_REGISTRY):
+        model = apps.get_model(label)
+        post_save.connect(
+            _post_save_receiver, sender=model,
+            dispatch_uid=f'imgbb_upload_{label}'
+        )
+        pre_delete.connect(
+            _pre_delete_receiver, sender=model,
+            dispatch_uid=f'imgbb_delete_{label}'
+        )
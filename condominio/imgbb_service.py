@@ -3,9 +3,10 @@ Servicio de integración con ImgBB para almacenar imágenes en la nube.
 Organiza las imágenes en diferentes álbumes/carpetas según su tipo.
 """
 import base64
+import time
 import requests
 from django.conf import settings
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,13 +28,23 @@ class ImgBBService:
         'usuarios/fotos': 'condominio_usuarios',
         'vehiculos': 'condominio_vehiculos',
         'mascotas': 'condominio_mascotas',
+        'comunicados': 'condominio_comunicados',
+        'reportes': 'condominio_reportes',
     }
     
     def __init__(self):
-        self.api_key = getattr(settings, 'IMGBB_API_KEY', None)
         if not self.api_key:
             logger.warning("IMGBB_API_KEY no configurada en settings")
     
+    @property
+    def api_key(self) -> Optional[str]:
+        return getattr(settings, 'IMGBB_API_KEY', None)
+    
+    @property
+    def api_url(self) -> str:
+        """URL de subida; IMGBB_API_URL permite apuntar a un servidor falso local."""
+        return getattr(settings, 'IMGBB_API_URL', None) or self.API_URL
+    
     def upload_image(
         self, 
         image_file, 
@@ -86,7 +97,7 @@ class ImgBBService:
             }
             
             # Realizar la petición
-            response = requests.post(self.API_URL, data=data, timeout=30)
+            response = requests.post(self.api_url, data=data, timeout=30)
             response.raise_for_status()
             
             result = response.json()
@@ -135,6 +146,35 @@ class ImgBBService:
             logger.error(f"Error al eliminar imagen de ImgBB: {str(e)}")
             return False
     
+    def delete_images(self, delete_urls: Iterable[str], min_interval: float = 0) -> Dict[str, bool]:
+        """
+        Elimina varias imágenes de ImgBB reutilizando una sola conexión.
+        
+        Args:
+            delete_urls: URLs de eliminación proporcionadas por ImgBB
+            min_interval: Segundos mínimos entre peticiones (límite de tasa)
+            
+        Returns:
+            Dict {delete_url: True/False} con el resultado de cada eliminación
+        """
+        resultados = {}
+        ultima = 0.0
+        with requests.Session() as session:
+            for delete_url in delete_urls:
+                espera = min_interval - (time.monotonic() - ultima)
+                if espera > 0:
+                    time.sleep(espera)
+                ultima = time.monotonic()
+                try:
+                    response = session.get(delete_url, timeout=10)
+                    response.raise_for_status()
+                    logger.info(f"Imagen eliminada de ImgBB: {delete_url}")
+                    resultados[delete_url] = True
+                except Exception as e:
+                    logger.error(f"Error al eliminar imagen de ImgBB: {str(e)}")
+                    resultados[delete_url] = False
+        return resultados
+    
     @staticmethod
     def get_folder_type_from_upload_path(upload_path: str) -> str:
         """
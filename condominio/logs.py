@@ -0,0 +1,177 @@
+"""
+Logging estructurado y no bloqueante.
+
+- ColaHandler: el hilo del request solo pone el registro en una cola
+  acotada; un QueueListener lo escribe en stdout desde otro hilo. Si la cola
+  se llena, el registro se descarta (y se cuenta) en lugar de bloquear.
+- JSONFormatter: una línea JSON por registro con fecha, nivel, logger,
+  mensaje, request_id y los campos pasados en `extra`. Los mensajes y campos
+  largos se truncan a LOG_MAX_LONGITUD caracteres.
+- RequestIdMiddleware + RequestIdFilter: cada request recibe un id (el
+  header X-Request-ID si viene, o uno nuevo), que se devuelve en la respuesta
+  y se agrega a todos los logs emitidos durante el request: vistas, servicios
+  que llaman a APIs externas y signal handlers.
+
+La configuración (LOGGING, niveles por módulo con LOG_NIVELES) está en
+condominio/settings.py.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+import uuid
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+from django.core.signals import request_finished
+
+request_id_actual = contextvars.ContextVar('request_id', default=None)
+
+MAX_LONGITUD = 2000
+TAMANO_COLA = 10000
+
+# Atributos propios de LogRecord: lo demás vino en `extra`
+_ATRIBUTOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+_REQUEST_ID_VALIDO = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def truncar(valor, longitud=MAX_LONGITUD):
+    """Texto (o representación) de `valor` recortado a `longitud` caracteres."""
+    texto = valor if isinstance(valor, str) else json.dumps(valor, ensure_ascii=False, default=str)
+    if len(texto) <= longitud:
+        return texto
+    return f'{texto[:longitud]}... ({len(texto) - longitud} caracteres más)'
+
+
+class RequestIdFilter(logging.Filter):
+    """Agrega record.request_id (None fuera de un request)."""
+
+    def filter(self, record):
+        record.request_id = request_id_actual.get()
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    def __init__(self, max_longitud=MAX_LONGITUD, **kwargs):
+        super().__init__(**kwargs)
+        self.max_longitud = max_longitud
+
+    def format(self, record):
+        datos = {
+            'fecha': datetime.fromtimestamp(record.created).astimezone().isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': truncar(record.getMessage(), self.max_longitud),
+            'request_id': getattr(record, 'request_id', None),
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD and not clave.startswith('_'):
+                datos[clave] = self._campo(valor)
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        elif record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+    def _campo(self, valor):
+        if isinstance(valor, (int, float, bool, type(None))):
+            return valor
+        if isinstance(valor, (dict, list, tuple)):
+            # Se mantiene como objeto si no hay que truncarlo
+            texto = json.dumps(valor, ensure_ascii=False, default=str)
+            return valor if len(texto) <= self.max_longitud else truncar(texto, self.max_longitud)
+        return truncar(str(valor), self.max_longitud)
+
+
+class TextoFormatter(logging.Formatter):
+    """Formato legible para desarrollo, con el request_id."""
+
+    def __init__(self, max_longitud=MAX_LONGITUD, **kwargs):
+        super().__init__('%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s', **kwargs)
+        self.max_longitud = max_longitud
+
+    def formatMessage(self, record):
+        record.message = truncar(record.message, self.max_longitud)
+        if not hasattr(record, 'request_id'):
+            record.request_id = None
+        return super().formatMessage(record)
+
+
+class ColaHandler(QueueHandler):
+    """
+    QueueHandler con su propio QueueListener hacia stdout.
+
+    Args:
+        formato: 'json' o 'texto'
+        max_longitud: Largo máximo de mensajes y campos
+        tamano_cola: Registros en espera antes de empezar a descartar
+    """
+
+    def __init__(self, formato='json', max_longitud=MAX_LONGITUD, tamano_cola=TAMANO_COLA):
+        super().__init__(queue.Queue(maxsize=tamano_cola))
+        self.descartados = 0
+        self._lock_descartados = threading.Lock()
+        salida = logging.StreamHandler(sys.stdout)
+        formatter = JSONFormatter if formato == 'json' else TextoFormatter
+        salida.setFormatter(formatter(max_longitud=max_longitud))
+        self.max_longitud = max_longitud
+        self.listener = QueueListener(self.queue, salida, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    def prepare(self, record):
+        # Se resuelve el mensaje y la excepción en el hilo que loguea (los
+        # argumentos pueden cambiar después) y se trunca antes de encolar
+        record = logging.makeLogRecord(vars(record))
+        record.msg = truncar(record.getMessage(), self.max_longitud)
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock_descartados:
+                self.descartados += 1
+
+
+class RequestIdMiddleware:
+    """Asigna un id a cada request para correlacionar sus logs."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recibido = request.headers.get('X-Request-ID', '')
+        request_id = recibido if _REQUEST_ID_VALIDO.match(recibido) else uuid.uuid4().hex
+        request.request_id = request_id
+        # Se limpia en request_finished: django.request loguea los errores
+        # después de que la respuesta sale de la cadena de middlewares
+        request_id_actual.set(request_id)
+        response = self.get_response(request)
+        response['X-Request-ID'] = request_id
+        return response
+
+
+def _limpiar_request_id(**kwargs):
+    request_id_actual.set(None)
+
+
+request_finished.connect(_limpiar_request_id, dispatch_uid='limpiar_request_id')
+
+
+def niveles_por_modulo(texto):
+    """'pagos=DEBUG,seguridad=WARNING' -> {'pagos': {'level': 'DEBUG'}, ...}"""
+    loggers = {}
+    for parte in filter(None, (p.strip() for p in texto.split(','))):
+        modulo, _, nivel = parte.partition('=')
+        if modulo and nivel:
+            loggers[modulo.strip()] = {'level': nivel.strip().upper()}
+    return loggers
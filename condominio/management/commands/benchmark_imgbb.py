@@ -0,0 +1,168 @@
+"""
+Benchmark del camino de subida de imágenes contra el servidor falso de ImgBB.
+
+Mide ImgBBService.upload_image, los receivers de post_save y el backfill de
+migrate_images_to_imgbb para varios tamaños de imagen, y compara el
+resultado contra una línea base guardada para detectar regresiones.
+"""
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+from condominio.fake_imgbb import FakeImgBBServer
+from condominio.image_sync import backfill, get_specs
+from condominio.imgbb_service import imgbb_service
+from seguridad.models import PlateRecognitionLog
+
+METRICAS = ['p50_ms', 'p95_ms', 'peak_kb']
+
+
+class Command(BaseCommand):
+    help = 'Mide throughput, latencia y memoria del camino de subida a ImgBB'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10,100,1000', help='Tamaños de imagen en KB separados por coma')
+        parser.add_argument('--iterations', type=int, default=20, help='Repeticiones por escenario y tamaño')
+        parser.add_argument('--latency-ms', type=float, default=0, help='Latencia simulada del servidor falso')
+        parser.add_argument('--baseline', default=str(settings.BASE_DIR / 'benchmarks' / 'imgbb_baseline.json'))
+        parser.add_argument('--save-baseline', action='store_true', help='Guarda el resultado como nueva línea base')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Degradación permitida respecto a la línea base (0.25 = 25%%)')
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options['sizes'].split(',') if s.strip()]
+        iteraciones = options['iterations']
+
+        with tempfile.TemporaryDirectory() as tmp:
+            server = FakeImgBBServer(
+                ('127.0.0.1', 0),
+                storage_dir=os.path.join(tmp, 'imgbb'),
+                latency_ms=options['latency_ms'],
+            )
+            server.start_in_thread()
+            try:
+                with override_settings(
+                    IMGBB_API_URL=server.upload_url,
+                    IMGBB_API_KEY='benchmark',
+                    MEDIA_ROOT=os.path.join(tmp, 'media'),
+                ):
+                    resultados = {}
+                    for size_kb in sizes:
+                        data = os.urandom(size_kb * 1024)
+                        resultados[f'upload_{size_kb}kb'] = self.medir(
+                            lambda: self.escenario_upload(data), iteraciones
+                        )
+                        resultados[f'signal_{size_kb}kb'] = self.medir(
+                            lambda: self.escenario_signal(data), iteraciones
+                        )
+                        resultados[f'backfill_{size_kb}kb'] = self.escenario_backfill(data, iteraciones)
+            finally:
+                server.shutdown()
+                server.server_close()
+
+        self.imprimir(resultados)
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(options['baseline']), exist_ok=True)
+            with open(options['baseline'], 'w', encoding='utf-8') as f:
+                json.dump(resultados, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {options['baseline']}"))
+        elif os.path.exists(options['baseline']):
+            self.comparar(resultados, options['baseline'], options['tolerance'])
+
+    def medir(self, funcion, iteraciones):
+        """Ejecuta la función N veces y retorna latencias, throughput y pico de memoria."""
+        tiempos = []
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            t0 = time.perf_counter()
+            funcion()
+            tiempos.append((time.perf_counter() - t0) * 1000)
+        total = time.perf_counter() - inicio
+        _actual, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return self.resumen(tiempos, total, pico)
+
+    @staticmethod
+    def resumen(tiempos, total, pico):
+        tiempos = sorted(tiempos)
+        return {
+            'p50_ms': round(statistics.median(tiempos), 2),
+            'p95_ms': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 2),
+            'ops_s': round(len(tiempos) / total, 2) if total else 0,
+            'peak_kb': round(pico / 1024, 1),
+        }
+
+    def escenario_upload(self, data):
+        if not imgbb_service.upload_image(BytesIO(data), 'plate_recognition', name='benchmark'):
+            raise CommandError('La subida al servidor falso falló')
+
+    def escenario_signal(self, data):
+        with transaction.atomic():
+            PlateRecognitionLog.objects.create(
+                plate_number='BENCH01',
+                image=ContentFile(data, name='benchmark.jpg'),
+                confidence='high',
+            )
+            transaction.set_rollback(True)
+
+    def escenario_backfill(self, data, iteraciones):
+        spec = get_specs('placas')[0]
+        nombre = default_storage.save('plate_recognition/benchmark.jpg', ContentFile(data))
+        with transaction.atomic():
+            PlateRecognitionLog.objects.bulk_create([
+                PlateRecognitionLog(plate_number='BENCH01', image=nombre, confidence='high')
+                for _ in range(iteraciones)
+            ])
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            migrados, _total = backfill(spec)
+            total = time.perf_counter() - inicio
+            _actual, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            transaction.set_rollback(True)
+        default_storage.delete(nombre)
+        if migrados < iteraciones:
+            raise CommandError(f'Backfill incompleto: {migrados}/{iteraciones}')
+        por_fila = total * 1000 / iteraciones
+        return {
+            'p50_ms': round(por_fila, 2),
+            'p95_ms': round(por_fila, 2),
+            'ops_s': round(iteraciones / total, 2) if total else 0,
+            'peak_kb': round(pico / 1024, 1),
+        }
+
+    def imprimir(self, resultados):
+        self.stdout.write(f"{'escenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>10}{'pico KB':>12}")
+        for nombre, r in resultados.items():
+            self.stdout.write(f"{nombre:<22}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['ops_s']:>10}{r['peak_kb']:>12}")
+
+    def comparar(self, resultados, ruta, tolerancia):
+        with open(ruta, encoding='utf-8') as f:
+            base = json.load(f)
+
+        regresiones = []
+        for nombre, r in resultados.items():
+            if nombre not in base:
+                continue
+            for metrica in METRICAS:
+                anterior = base[nombre].get(metrica)
+                if anterior and r[metrica] > anterior * (1 + tolerancia):
+                    regresiones.append(f'{nombre}.{metrica}: {anterior} -> {r[metrica]}')
+
+        if regresiones:
+            for regresion in regresiones:
+                self.stdout.write(self.style.ERROR(f'✗ {regresion}'))
+            raise CommandError(f'{len(regresiones)} regresiones respecto a la línea base')
+        self.stdout.write(self.style.SUCCESS('Sin regresiones respecto a la línea base'))
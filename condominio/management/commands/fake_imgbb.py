@@ -0,0 +1,35 @@
+"""
+Levanta el servidor falso de ImgBB para desarrollo y pruebas sin conexión.
+"""
+from django.core.management.base import BaseCommand
+from condominio.fake_imgbb import FakeImgBBServer
+
+
+class Command(BaseCommand):
+    help = 'Levanta un servidor local que imita la API de ImgBB'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--storage-dir', default='fake_imgbb_storage', help='Directorio donde se guardan las imágenes')
+        parser.add_argument('--latency-ms', type=float, default=0, help='Latencia fija por petición')
+        parser.add_argument('--jitter-ms', type=float, default=0, help='Latencia aleatoria adicional (0..jitter)')
+        parser.add_argument('--failure-rate', type=float, default=0, help='Proporción de peticiones que fallan con 500 (0-1)')
+
+    def handle(self, *args, **options):
+        server = FakeImgBBServer(
+            (options['host'], options['port']),
+            storage_dir=options['storage_dir'],
+            latency_ms=options['latency_ms'],
+            jitter_ms=options['jitter_ms'],
+            failure_rate=options['failure_rate'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Servidor falso de ImgBB en {server.upload_url}'))
+        self.stdout.write(f'Configura IMGBB_API_URL={server.upload_url} e IMGBB_API_KEY con cualquier valor')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Subidas: {server.stats['uploads']}, eliminaciones: {server.stats['deletes']}, fallos: {server.stats['failures']}")
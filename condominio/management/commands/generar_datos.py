@@ -0,0 +1,74 @@
+"""
+Genera datos sintéticos del condominio para pruebas de carga.
+
+    python manage.py generar_datos --password <clave> --torres 10 --unidades-por-torre 100 --anios 3 --reconocimientos 1000000
+
+Crea miles de usuarios con una misma contraseña, así que solo se ejecuta
+con DEBUG o pasando --forzar.
+Con la misma --semilla y --hasta los datos son idénticos entre corridas.
+Ver condominio/datos_sinteticos.py.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from condominio.datos_sinteticos import generar
+
+
+class Command(BaseCommand):
+    help = 'Genera torres, propietarios, visitas, reconocimientos de placa, expensas y demás datos sintéticos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--torres', type=int, default=4, help='Cantidad de torres')
+        parser.add_argument('--unidades-por-torre', type=int, default=50, help='Unidades (y propietarios) por torre')
+        parser.add_argument('--anios', type=float, default=2, help='Años de historia')
+        parser.add_argument('--reconocimientos', type=int, help='Reconocimientos de placa (por defecto 100 por unidad)')
+        parser.add_argument('--semilla', type=int, default=42, help='Semilla del generador aleatorio')
+        parser.add_argument('--hasta', type=date.fromisoformat, help='Última fecha con datos YYYY-MM-DD (por defecto hoy)')
+        parser.add_argument('--prefijo', default='sim', help='Prefijo de usernames y documentos generados')
+        parser.add_argument('--password', required=True, help='Contraseña de todos los usuarios generados')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Filas por bulk_create')
+        parser.add_argument('--sin-derivados', action='store_true',
+                            help='No recalcular búsqueda, resumen financiero ni riesgo al terminar')
+        parser.add_argument('--forzar', action='store_true', help='Ejecutar aunque DEBUG esté desactivado')
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['forzar']:
+            raise CommandError(
+                'generar_datos crea usuarios con una contraseña conocida: '
+                'solo se ejecuta con DEBUG activado o con --forzar'
+            )
+        if options['torres'] < 1 or options['unidades_por_torre'] < 1:
+            raise CommandError('--torres y --unidades-por-torre deben ser mayores a 0')
+
+        def progreso(tabla, filas):
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {tabla}: {filas}')
+
+        try:
+            conteos, derivados, duracion = generar(
+                progreso=progreso,
+                recalcular=not options['sin_derivados'],
+                torres=options['torres'],
+                unidades_por_torre=options['unidades_por_torre'],
+                anios=options['anios'],
+                reconocimientos=options['reconocimientos'],
+                semilla=options['semilla'],
+                hasta=options['hasta'],
+                prefijo=options['prefijo'],
+                password=options['password'],
+                tamano_lote=options['batch_size'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for tabla, filas in conteos.items():
+            self.stdout.write(f'  {tabla}: {filas}')
+        if derivados:
+            self.stdout.write(
+                f"  texto de búsqueda: {derivados['busqueda']} filas, "
+                f"resumen financiero: {derivados['resumen_financiero']} filas, "
+                f"riesgo: {derivados['riesgo']} propietarios"
+            )
+        total = sum(conteos.values())
+        self.stdout.write(self.style.SUCCESS(f'✓ {total} filas generadas en {duracion:.1f} s'))
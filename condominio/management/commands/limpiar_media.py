@@ -0,0 +1,182 @@
+"""
+Limpieza de archivos media locales huérfanos o ya subidos a ImgBB.
+"""
+import os
+import re
+import tarfile
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import FileField
+from django.utils import timezone
+
+from condominio.image_sync import IMAGE_REGISTRY
+
+# Sufijo que agrega Django al evitar colisiones: captured-plate_By9kA2a.jpg
+SUFIJO_DJANGO = re.compile(r'^(?P<base>.+)_[A-Za-z0-9]{7}(?P<ext>\.[^.]+)$')
+
+
+class Command(BaseCommand):
+    help = (
+        'Reporta, archiva o elimina archivos media locales que no están '
+        'referenciados en la base de datos o que ya fueron subidos a ImgBB'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--action', choices=['report', 'archive', 'delete'], default='report',
+            help='Qué hacer con los candidatos (por defecto solo reporta)'
+        )
+        parser.add_argument(
+            '--orphan-days', type=int, default=7,
+            help='Edad mínima en días de un archivo huérfano para procesarlo'
+        )
+        parser.add_argument(
+            '--offloaded-days', type=int, default=30,
+            help='Edad mínima en días de un archivo ya subido a ImgBB para procesarlo (-1 = nunca)'
+        )
+        parser.add_argument(
+            '--archive-dir', type=str, default='media_archive',
+            help='Directorio donde se guardan los .tar.gz con --action archive'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Filas por lote al leer referencias de la base de datos'
+        )
+
+    def handle(self, *args, **options):
+        location = os.path.abspath(default_storage.location)
+        roots = self.get_media_roots(location)
+        referenciados, subidos = self.get_referenced_paths(options['chunk_size'])
+
+        ahora = time.time()
+        limite_huerfano = ahora - options['orphan_days'] * 86400
+        limite_subido = ahora - options['offloaded_days'] * 86400 if options['offloaded_days'] >= 0 else None
+
+        tamanos = defaultdict(int)
+        candidatos = []
+        resumen = defaultdict(lambda: [0, 0])
+
+        for root in roots:
+            for entry in self.scan(root):
+                stat = entry.stat(follow_symlinks=False)
+                tamanos[root] += stat.st_size
+                relativo = os.path.relpath(entry.path, location).replace(os.sep, '/')
+
+                if relativo in subidos:
+                    categoria = 'subido'
+                    procesar = limite_subido is not None and stat.st_mtime < limite_subido
+                elif relativo in referenciados:
+                    continue
+                else:
+                    categoria = 'duplicado' if self.is_suffixed_duplicate(entry) else 'huerfano'
+                    procesar = stat.st_mtime < limite_huerfano
+
+                resumen[categoria][0] += 1
+                resumen[categoria][1] += stat.st_size
+                if procesar:
+                    candidatos.append((entry.path, relativo, stat.st_size, categoria))
+
+        self.stdout.write('Tamaño por directorio:')
+        for root in roots:
+            self.stdout.write(f'  {os.path.relpath(root, location)}: {self.format_size(tamanos[root])}')
+
+        for categoria, (cantidad, tamano) in sorted(resumen.items()):
+            self.stdout.write(f'{categoria}: {cantidad} archivos, {self.format_size(tamano)}')
+
+        total = sum(c[2] for c in candidatos)
+        self.stdout.write(f'Candidatos según la política de edad: {len(candidatos)} ({self.format_size(total)})')
+
+        if options['action'] == 'report':
+            for _path, relativo, tamano, categoria in candidatos:
+                self.stdout.write(f'  [{categoria}] {relativo} ({self.format_size(tamano)})')
+            return
+
+        if options['action'] == 'archive' and candidatos:
+            archivo = self.archive(candidatos, options['archive_dir'])
+            self.stdout.write(f'Archivados en {archivo}')
+
+        for path, relativo, _tamano, _categoria in candidatos:
+            try:
+                os.remove(path)
+            except OSError as e:
+                self.stdout.write(self.style.ERROR(f'✗ No se pudo eliminar {relativo}: {str(e)}'))
+
+        self.stdout.write(self.style.SUCCESS(f'Liberados {self.format_size(total)}'))
+
+    def get_file_fields(self):
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, FileField):
+                    yield model, field
+
+    def get_media_roots(self, location):
+        """Directorios upload_to de todos los FileField/ImageField."""
+        roots = set()
+        for _model, field in self.get_file_fields():
+            if isinstance(field.upload_to, str) and field.upload_to:
+                directorio = field.upload_to.split('%')[0].strip('/')
+                if directorio:
+                    roots.add(os.path.join(location, directorio.split('/')[0]))
+        roots = sorted(r for r in roots if os.path.isdir(r))
+        if not roots:
+            raise CommandError('No se encontraron directorios media para analizar')
+        return roots
+
+    def get_referenced_paths(self, chunk_size):
+        """
+        Lee en streaming todas las columnas de archivo y retorna dos sets:
+        rutas referenciadas y rutas referenciadas cuya imagen ya está en ImgBB.
+        """
+        urls = {(spec.model, spec.file_field): spec.url_field for spec in IMAGE_REGISTRY}
+        referenciados = set()
+        subidos = set()
+
+        for model, field in self.get_file_fields():
+            url_field = urls.get((model._meta.label, field.name))
+            queryset = model._default_manager.exclude(**{field.name: ''}).exclude(**{f'{field.name}__isnull': True})
+
+            if url_field:
+                filas = queryset.values_list(field.name, url_field).iterator(chunk_size=chunk_size)
+                for nombre, url in filas:
+                    (subidos if url else referenciados).add(nombre)
+            else:
+                filas = queryset.values_list(field.name, flat=True).iterator(chunk_size=chunk_size)
+                referenciados.update(filas)
+
+        return referenciados, subidos
+
+    def scan(self, path):
+        """Recorre recursivamente un directorio con os.scandir."""
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self.scan(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+    def is_suffixed_duplicate(self, entry):
+        match = SUFIJO_DJANGO.match(entry.name)
+        if not match:
+            return False
+        original = os.path.join(os.path.dirname(entry.path), match['base'] + match['ext'])
+        return os.path.exists(original)
+
+    def archive(self, candidatos, archive_dir):
+        os.makedirs(archive_dir, exist_ok=True)
+        nombre = os.path.join(archive_dir, f"media_{timezone.now().strftime('%Y%m%d_%H%M%S')}.tar.gz")
+        with tarfile.open(nombre, 'w:gz') as tar:
+            for path, relativo, _tamano, _categoria in candidatos:
+                tar.add(path, arcname=relativo)
+        return nombre
+
+    @staticmethod
+    def format_size(size):
+        for unidad in ['B', 'KB', 'MB', 'GB']:
+            if size < 1024:
+                return f'{size:.1f} {unidad}'
+            size /= 1024
+        return f'{size:.1f} TB'
@@ -0,0 +1,45 @@
+"""
+Procesa las imágenes de ImgBB pendientes de eliminación.
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from condominio.image_sync import process_pending_deletions
+
+
+class Command(BaseCommand):
+    help = 'Elimina en ImgBB, por lotes y con límite de tasa, las imágenes de registros ya eliminados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Filas por lote')
+        parser.add_argument('--rate-limit', type=float, default=5, help='Peticiones por segundo a ImgBB (0 = sin límite)')
+        parser.add_argument('--max-intentos', type=int, default=5, help='Intentos antes de abandonar una imagen')
+        parser.add_argument('--retencion-dias', type=int, default=30, help='Días que se conservan las imágenes abandonadas')
+        parser.add_argument('--loop', action='store_true', help='Ejecutar continuamente como worker')
+        parser.add_argument('--interval', type=float, default=30, help='Segundos de espera cuando no hay pendientes (con --loop)')
+
+    def handle(self, *args, **options):
+        while True:
+            resultado = process_pending_deletions(
+                batch_size=options['batch_size'],
+                rate_limit=options['rate_limit'],
+                max_attempts=options['max_intentos'],
+                retention=timedelta(days=options['retencion_dias']),
+            )
+            procesadas = resultado['eliminadas'] + resultado['fallidas']
+            if procesadas:
+                self.stdout.write(
+                    f"Eliminadas: {resultado['eliminadas']}, fallidas: {resultado['fallidas']}"
+                )
+            if resultado['abandonadas'] or resultado['purgadas']:
+                self.stdout.write(self.style.WARNING(
+                    f"Abandonadas: {resultado['abandonadas']}, purgadas: {resultado['purgadas']}"
+                ))
+
+            if not options['loop']:
+                break
+            if procesadas < options['batch_size']:
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS('Procesamiento completado'))
@@ -0,0 +1,195 @@
+"""
+Prueba de carga HTTP con reporte de latencias por endpoint.
+
+    python manage.py generar_datos --password <clave>
+    python manage.py prueba_carga --servicios-falsos --imprimir-entorno   # variables para el servidor
+    <variables> python manage.py runserver --noreload   (o gunicorn)
+    python manage.py prueba_carga --servicios-falsos --password <clave> --usuarios 20 --duracion 60 --guardar-base carga_base.json
+    python manage.py prueba_carga --servicios-falsos --password <clave> --usuarios 20 --duracion 60 --comparar carga_base.json
+
+Para comparar corridas, regenerar los mismos datos antes de cada una (flush +
+generar_datos con la misma --semilla y --hasta: las reservas, pagos y
+reconocimientos que crea la prueba agrandan las listas) y medir al menos 60 s.
+Las fotos de recognize_plate quedan en MEDIA_ROOT/plate_recognition/ del servidor.
+Ver condominio/carga.py.
+"""
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from condominio.carga import ESCENARIOS, PESOS_POR_DEFECTO, PruebaCarga, cargar, comparar, guardar
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta escenarios de carga contra un servidor y reporta throughput, latencias y errores por endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='URL del servidor')
+        parser.add_argument('--escenario', action='append', dest='escenarios', metavar='NOMBRE[=PESO]',
+                            help=f"Escenario y peso (repetible). Disponibles: {', '.join(PESOS_POR_DEFECTO)}")
+        parser.add_argument('--usuarios', type=int, default=10, help='Usuarios virtuales concurrentes')
+        parser.add_argument('--duracion', type=float, default=60, help='Segundos de medición')
+        parser.add_argument('--rampa', type=float, default=0, help='Segundos para iniciar todos los usuarios')
+        parser.add_argument('--pausa-ms', type=float, default=500, help='Pausa máxima entre escenarios')
+        parser.add_argument('--rafaga', type=int, default=10, help='Fotos por ráfaga de reconocimiento de placas')
+        parser.add_argument('--prefijo', default='sim', help='Prefijo usado en generar_datos')
+        parser.add_argument('--password', help='Contraseña usada en generar_datos (requerida salvo con --imprimir-entorno)')
+        parser.add_argument('--propietarios', type=int, default=200, help='Propietarios generados (torres x unidades)')
+        parser.add_argument('--guardias', type=int, default=3, help='Guardias generados')
+        parser.add_argument('--semilla', type=int, default=42)
+        parser.add_argument('--timeout', type=float, default=30, help='Timeout por request en segundos')
+        parser.add_argument('--servicios-falsos', action='store_true',
+                            help='Levantar ImgBB, Plate Recognizer y Stripe falsos durante la prueba')
+        parser.add_argument('--puerto-imgbb', type=int, default=8765)
+        parser.add_argument('--puerto-externos', type=int, default=8766)
+        parser.add_argument('--latencia-externos-ms', type=float, default=0,
+                            help='Latencia simulada de los servicios falsos')
+        parser.add_argument('--imprimir-entorno', action='store_true',
+                            help='Solo mostrar las variables de entorno del servidor para los servicios falsos')
+        parser.add_argument('--guardar-base', metavar='ARCHIVO', help='Guardar el resultado como línea base (JSON)')
+        parser.add_argument('--comparar', metavar='ARCHIVO', help='Comparar con una línea base y fallar si hay regresiones')
+        parser.add_argument('--tolerancia', type=float, default=0.3,
+                            help='Aumento relativo de p95/p99 (o caída de throughput) tolerado')
+        parser.add_argument('--tolerancia-errores', type=float, default=0.01, help='Aumento tolerado de la tasa de error')
+        parser.add_argument('--margen-ms', type=float, default=25, help='Aumento absoluto de p95/p99 que se ignora')
+        parser.add_argument('--json', metavar='ARCHIVO', help='Guardar el resultado completo en JSON')
+
+    def handle(self, *args, **options):
+        if options['imprimir_entorno']:
+            for variable, valor in self._entorno(options).items():
+                self.stdout.write(f'{variable}={valor}')
+            return
+
+        base = cargar(options['comparar']) if options['comparar'] else None
+        try:
+            prueba = PruebaCarga(
+                options['url'],
+                pesos=self._pesos(options['escenarios']),
+                usuarios=options['usuarios'],
+                duracion=options['duracion'],
+                rampa=options['rampa'],
+                pausa_ms=options['pausa_ms'],
+                prefijo=options['prefijo'],
+                password=options['password'],
+                propietarios=options['propietarios'],
+                guardias=options['guardias'],
+                rafaga=options['rafaga'],
+                semilla=options['semilla'],
+                timeout=options['timeout'],
+            )
+            servidores = self._levantar_servicios_falsos(options) if options['servicios_falsos'] else []
+            try:
+                prueba.preparar()
+                self.stdout.write(
+                    f"{options['usuarios']} usuarios durante {options['duracion']:g} s contra {options['url']}..."
+                )
+                resultado = prueba.ejecutar()
+            finally:
+                self._detener(servidores)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self._reporte(resultado)
+        if options['json']:
+            guardar(resultado, options['json'])
+        if options['guardar_base']:
+            guardar(resultado, options['guardar_base'])
+            self.stdout.write(self.style.SUCCESS(f"✓ Línea base guardada en {options['guardar_base']}"))
+        if base is not None:
+            self._comparar(resultado, base, options)
+
+    @staticmethod
+    def _pesos(escenarios):
+        if not escenarios:
+            return None
+        pesos = {}
+        for escenario in escenarios:
+            nombre, _, peso = escenario.partition('=')
+            if nombre not in ESCENARIOS:
+                raise CommandError(f"Escenario desconocido: {nombre}. Disponibles: {', '.join(ESCENARIOS)}")
+            try:
+                pesos[nombre] = float(peso) if peso else PESOS_POR_DEFECTO[nombre]
+            except ValueError:
+                raise CommandError(f'Peso inválido: {escenario}')
+        return pesos
+
+    @staticmethod
+    def _entorno(options):
+        imgbb = f"http://127.0.0.1:{options['puerto_imgbb']}"
+        externos = f"http://127.0.0.1:{options['puerto_externos']}"
+        return {
+            'IMGBB_API_URL': f'{imgbb}/1/upload',
+            'IMGBB_API_KEY': 'fake',
+            'PLATE_RECOGNIZER_API_URL': f'{externos}/v1/plate-reader/',
+            'PLATE_RECOGNIZER_API_KEY': 'fake',
+            'STRIPE_API_BASE': externos,
+            'STRIPE_SECRET_KEY': 'sk_test_fake',
+        }
+
+    def _levantar_servicios_falsos(self, options):
+        from condominio.fake_externos import FakeExternosServer
+        from condominio.fake_imgbb import FakeImgBBServer
+
+        directorio = tempfile.mkdtemp(prefix='fake_imgbb_')
+        latencia = options['latencia_externos_ms']
+        try:
+            imgbb = FakeImgBBServer(('127.0.0.1', options['puerto_imgbb']), storage_dir=directorio, latency_ms=latencia)
+            externos = FakeExternosServer(('127.0.0.1', options['puerto_externos']), latency_ms=latencia)
+        except OSError as e:
+            shutil.rmtree(directorio, ignore_errors=True)
+            raise CommandError(f'No se pudieron levantar los servicios falsos: {e}')
+        imgbb.directorio_temporal = directorio
+        for servidor in (imgbb, externos):
+            servidor.start_in_thread()
+        self.stdout.write(f'Servicios falsos en {imgbb.base_url} y {externos.base_url}. El servidor necesita:')
+        for variable, valor in self._entorno(options).items():
+            self.stdout.write(f'  {variable}={valor}')
+        return [imgbb, externos]
+
+    def _detener(self, servidores):
+        for servidor in servidores:
+            servidor.shutdown()
+            servidor.server_close()
+            self.stdout.write(f'  {type(servidor).__name__}: {servidor.stats}')
+            if hasattr(servidor, 'directorio_temporal'):
+                shutil.rmtree(servidor.directorio_temporal, ignore_errors=True)
+
+    def _reporte(self, resultado):
+        columnas = ('requests', 'rps', 'tasa_error', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')
+        endpoints = resultado['endpoints']
+        ancho = max(len(endpoint) for endpoint in endpoints)
+        self.stdout.write('')
+        self.stdout.write(f"{'endpoint':<{ancho}}  " + '  '.join(f'{c:>10}' for c in columnas))
+        for endpoint, metricas in endpoints.items():
+            valores = []
+            for columna in columnas:
+                valor = metricas[columna]
+                if valor is None:
+                    valor = '-'
+                elif columna == 'tasa_error':
+                    valor = f'{valor:.2%}'
+                valores.append(f'{valor:>10}')
+            linea = f'{endpoint:<{ancho}}  ' + '  '.join(valores)
+            self.stdout.write(self.style.ERROR(linea) if metricas['tasa_error'] else linea)
+            if metricas.get('errores'):
+                detalle = ', '.join(f'{error}: {cantidad}' for error, cantidad in sorted(metricas['errores'].items()))
+                self.stdout.write(f'{"":<{ancho}}  errores: {detalle}')
+        if resultado['errores_escenario']:
+            detalle = ', '.join(f'{nombre}: {cantidad}' for nombre, cantidad in sorted(resultado['errores_escenario'].items()))
+            self.stdout.write(self.style.WARNING(f'Escenarios interrumpidos por errores: {detalle}'))
+        self.stdout.write(f"Duración: {resultado['segundos']} s")
+
+    def _comparar(self, resultado, base, options):
+        if base['configuracion'] != resultado['configuracion']:
+            self.stdout.write(self.style.WARNING(
+                f"La línea base se midió con otra configuración: {base['configuracion']}"
+            ))
+        regresiones = comparar(
+            resultado, base, tolerancia=options['tolerancia'], tolerancia_errores=options['tolerancia_errores'],
+            margen_ms=options['margen_ms'],
+        )
+        for endpoint, metrica, antes, ahora in regresiones:
+            self.stdout.write(self.style.ERROR(f'✗ {endpoint} {metrica}: {antes} -> {ahora}'))
+        if regresiones:
+            raise CommandError(f"{len(regresiones)} regresiones respecto de {options['comparar']}")
+        self.stdout.write(self.style.SUCCESS(f"✓ Sin regresiones respecto de {options['comparar']} ({base['fecha']})"))
@@ -0,0 +1,27 @@
+"""
+Recalcula el texto de búsqueda de los modelos de BUSQUEDA_REGISTRY, por
+ejemplo después de cargas masivas con bulk_create o queryset.update().
+"""
+from django.core.management.base import BaseCommand, CommandError
+from condominio.search import BUSQUEDA_REGISTRY, reindexar
+
+
+class Command(BaseCommand):
+    help = 'Recalcula texto_busqueda de propietarios, unidades, vehículos y expensas'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models', help='Modelo app_label.Modelo (repetible, por defecto todos)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        specs = BUSQUEDA_REGISTRY
+        if options['models']:
+            specs = [spec for spec in BUSQUEDA_REGISTRY if spec.model in options['models']]
+            if len(specs) != len(options['models']):
+                disponibles = ', '.join(spec.model for spec in BUSQUEDA_REGISTRY)
+                raise CommandError(f'Modelo desconocido. Disponibles: {disponibles}')
+
+        for spec in specs:
+            total = reindexar(spec.get_model(), spec.campos, batch_size=options['batch_size'])
+            self.stdout.write(f'{spec.model}: {total} filas actualizadas')
+        self.stdout.write(self.style.SUCCESS('Reindexación completada'))
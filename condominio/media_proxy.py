@@ -0,0 +1,377 @@
+"""
+Proxy local de imágenes remotas (ImgBB) con caché LRU en disco.
+
+Cada imagen se descarga una sola vez y se sirve desde disco con ETag,
+Last-Modified, soporte de Range y cabeceras de caché de larga duración,
+de modo que las consolas de guardia y la app móvil reciben 304 o lecturas
+locales en lugar de volver a pedir la imagen a ImgBB.
+
+Las URLs del proxy las firma build_media_url y vencen tras
+MEDIA_PROXY_URL_TTL segundos: el endpoint no exige token (las etiquetas
+<img> no lo envían), pero solo sirve imágenes que la API entregó hace poco.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+import requests
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_GET
+import logging
+
+from .image_sync import specs_for_model
+
+logger = logging.getLogger(__name__)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class DiskLRUCache:
+    """
+    Caché en disco acotada por tamaño. El orden LRU se basa en el mtime de
+    cada archivo, que se actualiza en cada lectura.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # clave -> [lock, cantidad de hilos que lo usan]; se borra al quedar en 0
+        self._key_locks: Dict[str, list] = {}
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key[:2], key)
+        return base, base + '.json'
+
+    @contextmanager
+    def key_lock(self, key: str):
+        """Serializa la descarga de una misma clave entre los hilos del proceso."""
+        with self._lock:
+            entrada = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            entrada[1] += 1
+        try:
+            with entrada[0]:
+                yield
+        finally:
+            with self._lock:
+                entrada[1] -= 1
+                if not entrada[1]:
+                    del self._key_locks[key]
+
+    def remove(self, key: str):
+        """Descarta la entrada (p. ej. si su archivo desapareció)."""
+        for p in self._paths(key):
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Retorna los metadatos de la entrada (con 'path') o None."""
+        path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        meta['path'] = path
+        return meta
+
+    def put(self, key: str, chunks, meta: Dict) -> Dict:
+        """Guarda el contenido de forma atómica y aplica la política LRU."""
+        path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        sufijo = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+        tmp_path, tmp_meta_path = path + sufijo, meta_path + sufijo
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+
+            meta = dict(meta, size=size, etag=f'"{digest.hexdigest()[:32]}"')
+            with open(tmp_meta_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, path)
+            os.replace(tmp_meta_path, meta_path)
+        except BaseException:
+            # Descarga cortada, disco lleno, etc.: no dejar temporales huérfanos
+            for p in (tmp_path, tmp_meta_path):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            raise
+
+        self._add_size(size)
+        meta['path'] = path
+        return meta
+
+    def _entries(self):
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(('.json', '.tmp')):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _add_size(self, size: int):
+        with self._lock:
+            if self._size is None:
+                self._size = sum(s for _p, _m, s in self._entries())
+            else:
+                self._size += size
+            if self._size <= self.max_bytes:
+                return
+            self._size = self._evict()
+
+    def _evict(self) -> int:
+        """Elimina las entradas menos usadas hasta quedar en el 90% del límite."""
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        total = sum(e[2] for e in entries)
+        objetivo = self.max_bytes * 0.9
+        for path, _mtime, size in entries:
+            if total <= objetivo:
+                break
+            for p in (path, path + '.json'):
+                try:
+                    os.remove(p)
+                except OSError:
+                    pass
+            total -= size
+        return total
+
+
+_cache: Optional[DiskLRUCache] = None
+
+
+def get_cache() -> DiskLRUCache:
+    global _cache
+    if _cache is None:
+        _cache = DiskLRUCache(settings.MEDIA_PROXY_CACHE_DIR, settings.MEDIA_PROXY_MAX_BYTES)
+    return _cache
+
+
+def is_allowed(url: str) -> bool:
+    parsed = urlparse(url)
+    return parsed.scheme in ('http', 'https') and parsed.hostname in settings.MEDIA_PROXY_ALLOWED_HOSTS
+
+
+def _firma(url: str, expira: int) -> str:
+    return salted_hmac('condominio.media_proxy', f'{url}|{expira}').hexdigest()
+
+
+def firma_valida(url: str, expira: str, firma: str) -> bool:
+    """Verifica la firma de una URL del proxy y que no haya vencido."""
+    try:
+        expira = int(expira)
+    except (TypeError, ValueError):
+        return False
+    return expira >= time.time() and constant_time_compare(firma, _firma(url, expira))
+
+
+def build_media_url(request, url: Optional[str]) -> Optional[str]:
+    """
+    Retorna la URL firmada del proxy para una imagen remota si el proxy
+    está habilitado; en otro caso retorna la URL original.
+    """
+    if not url or not settings.MEDIA_PROXY_ENABLED or not is_allowed(url):
+        return url
+    # El vencimiento se redondea a múltiplos del TTL para que la URL no
+    # cambie en cada respuesta y el navegador pueda reutilizar su caché;
+    # vale entre una y dos veces el TTL.
+    ttl = settings.MEDIA_PROXY_URL_TTL
+    expira = (int(time.time()) // ttl + 2) * ttl
+    params = {'url': url, 'exp': expira, 'firma': _firma(url, expira)}
+    proxy_url = f"{reverse('media_proxy')}?{urlencode(params)}"
+    return request.build_absolute_uri(proxy_url) if request else proxy_url
+
+
+def url_original(url: Optional[str]) -> Optional[str]:
+    """
+    Si `url` es una URL firmada del proxy retorna la imagen remota que
+    envuelve; en otro caso la retorna sin cambios.
+    """
+    if not url or not settings.MEDIA_PROXY_ENABLED:
+        return url
+    parsed = urlparse(url)
+    if parsed.path != reverse('media_proxy'):
+        return url
+    params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+    remota = params.get('url', '')
+    if is_allowed(remota) and firma_valida(remota, params.get('exp'), params.get('firma', '')):
+        return remota
+    return url
+
+
+class MediaURLMixin:
+    """
+    Mixin de ModelSerializer que expone, para cada imagen del modelo en
+    IMAGE_REGISTRY, el campo `url_field` con la URL firmada del proxy (o la
+    URL local si la imagen aún no se subió a ImgBB). Si el campo es
+    editable, una URL del proxy recibida de vuelta se guarda como la
+    URL original de ImgBB.
+    """
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        request = self.context.get('request')
+        for spec in specs_for_model(type(instance)):
+            url = getattr(instance, spec.url_field)
+            if url:
+                data[spec.url_field] = build_media_url(request, url)
+            else:
+                archivo = getattr(instance, spec.file_field)
+                data[spec.url_field] = (
+                    request.build_absolute_uri(archivo.url) if archivo and request else None
+                )
+        return data
+
+    def to_internal_value(self, data):
+        validated = super().to_internal_value(data)
+        for spec in specs_for_model(self.Meta.model):
+            if validated.get(spec.url_field):
+                validated[spec.url_field] = url_original(validated[spec.url_field])
+        return validated
+
+
+def _fetch(cache: DiskLRUCache, key: str, url: str) -> Dict:
+    max_bytes = settings.MEDIA_PROXY_MAX_FILE_BYTES
+    response = requests.get(url, stream=True, timeout=15)
+    response.raise_for_status()
+
+    def chunks():
+        total = 0
+        for chunk in response.iter_content(64 * 1024):
+            total += len(chunk)
+            if total > max_bytes:
+                raise ValueError(f'La imagen supera {max_bytes} bytes')
+            yield chunk
+
+    last_modified = parse_http_date_safe(response.headers.get('Last-Modified', '')) or int(time.time())
+    try:
+        return cache.put(key, chunks(), {
+            'url': url,
+            'content_type': response.headers.get('Content-Type', 'application/octet-stream'),
+            'last_modified': last_modified,
+        })
+    finally:
+        response.close()
+
+
+def _parse_range(header: str, size: int):
+    """Retorna (inicio, fin) inclusivos, None si no aplica o 'invalid'."""
+    match = RANGE_RE.match(header.strip())
+    if not match or size == 0:
+        return None
+    start, end = match.groups()
+    if start == '':
+        if end == '':
+            return None
+        start = max(size - int(end), 0)
+        end = size - 1
+    else:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    if start > end or start >= size:
+        return 'invalid'
+    return start, end
+
+
+def _obtener(cache: DiskLRUCache, key: str, url: str) -> Optional[Dict]:
+    """Metadatos de la entrada, descargándola si falta; None si falla la descarga."""
+    meta = cache.get(key)
+    if meta is None:
+        with cache.key_lock(key):
+            meta = cache.get(key)
+            if meta is None:
+                try:
+                    meta = _fetch(cache, key, url)
+                except Exception as e:
+                    logger.error(f"Error al obtener imagen remota {url}: {str(e)}")
+    return meta
+
+
+@require_GET
+def media_proxy(request):
+    """
+    Sirve una imagen remota desde la caché local.
+    GET /api/media/proxy/?url=https://i.ibb.co/...&exp=...&firma=...
+    """
+    url = request.GET.get('url', '')
+    if not url:
+        return HttpResponseBadRequest('Parámetro url requerido')
+    if not is_allowed(url):
+        return HttpResponseForbidden('Host no permitido')
+    if not firma_valida(url, request.GET.get('exp'), request.GET.get('firma', '')):
+        return HttpResponseForbidden('Firma inválida o vencida')
+
+    cache = get_cache()
+    key = cache.key_for(url)
+    meta = _obtener(cache, key, url)
+    if meta is None:
+        return HttpResponse('No se pudo obtener la imagen', status=502)
+
+    conditional = get_conditional_response(
+        request, etag=meta['etag'], last_modified=meta['last_modified']
+    )
+    if conditional is not None:
+        response = conditional
+    else:
+        try:
+            f = open(meta['path'], 'rb')
+        except FileNotFoundError:
+            # La política LRU lo eliminó entre get() y open(): volver a descargarlo
+            cache.remove(key)
+            meta = _obtener(cache, key, url)
+            if meta is None:
+                return HttpResponse('No se pudo obtener la imagen', status=502)
+            f = open(meta['path'], 'rb')
+
+        size = meta['size']
+        rango = _parse_range(request.headers.get('Range', ''), size)
+        if rango == 'invalid':
+            f.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+        if rango:
+            start, end = rango
+            f.seek(start)
+            response = HttpResponse(f.read(end - start + 1), status=206, content_type=meta['content_type'])
+            f.close()
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            response = FileResponse(f, content_type=meta['content_type'])
+            response['Content-Length'] = size
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = meta['etag']
+    response['Last-Modified'] = http_date(meta['last_modified'])
+    response['Cache-Control'] = f'public, max-age={settings.MEDIA_PROXY_MAX_AGE}, immutable'
+    return response
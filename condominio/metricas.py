@@ -0,0 +1,518 @@
+"""
+Métricas en formato Prometheus (GET /metrics).
+
+Cada proceso acumula sus contadores, histogramas y gauges en memoria
+(Registro) y cada METRICAS_INTERVALO segundos escribe una instantánea en
+METRICAS_DIR/<pid>.json. /metrics la atiende un solo worker de gunicorn:
+escribe la suya, lee la de todos los demás y las suma, de modo que el
+resultado cubre todos los workers (con hasta METRICAS_INTERVALO segundos de
+atraso para los otros).
+
+Los contadores e histogramas de workers que ya terminaron se acumulan en
+METRICAS_DIR/finalizados.json (para que los contadores no retrocedan) y sus
+gauges se descartan.
+
+Métricas:
+- http_request_duracion_segundos{metodo, ruta, status}: latencia por ruta de DRF
+- db_consultas_por_request / db_tiempo_por_request_segundos {ruta}
+- http_saliente_duracion_segundos / http_saliente_errores_total {servicio}:
+  Plate Recognizer, ImgBB y Stripe (todas usan requests)
+- gunicorn_requests_en_curso, gunicorn_workers, gunicorn_saturacion
+- colas: eventos de auditoría pendientes en memoria e imágenes pendientes de
+  eliminar en ImgBB (las abandonadas se cuentan aparte)
+- cachés: caché de usuarios autenticados y lista negra de JWT
+
+Se activa con METRICAS_HABILITADAS; deshabilitado, el middleware no se
+instala (MiddlewareNotUsed) y /metrics responde 404. /metrics exige
+'Authorization: Bearer <METRICAS_TOKEN>' y responde 404 mientras
+METRICAS_TOKEN esté vacío, para no exponer rutas y volúmenes sin querer.
+"""
+import atexit
+import fcntl
+import hmac
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+from .perfilador import Medicion
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+BUCKETS_SALIENTE = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+SERVICIOS = (
+    ('platerecognizer', 'plate_recognizer'),
+    ('imgbb', 'imgbb'),
+    ('ibb.co', 'imgbb'),
+    ('stripe.com', 'stripe'),
+)
+
+ARCHIVO_FINALIZADOS = 'finalizados.json'
+
+
+def _habilitadas():
+    return getattr(settings, 'METRICAS_HABILITADAS', False)
+
+
+def _directorio():
+    return getattr(settings, 'METRICAS_DIR', None)
+
+
+# ---------------------------------------------------------------------------
+# Registro del proceso
+# ---------------------------------------------------------------------------
+
+class _Metrica:
+    def __init__(self, registro, nombre, tipo, ayuda, buckets=None):
+        self.registro = registro
+        self.nombre = nombre
+        self.tipo = tipo
+        self.ayuda = ayuda
+        self.buckets = buckets
+
+
+class Contador(_Metrica):
+    def inc(self, valor=1, **etiquetas):
+        self.registro.sumar(self.nombre, etiquetas, valor)
+
+
+class Gauge(_Metrica):
+    def set(self, valor, **etiquetas):
+        self.registro.fijar(self.nombre, etiquetas, valor)
+
+    def inc(self, valor=1, **etiquetas):
+        self.registro.sumar(self.nombre, etiquetas, valor)
+
+    def dec(self, valor=1, **etiquetas):
+        self.registro.sumar(self.nombre, etiquetas, -valor)
+
+
+class Histograma(_Metrica):
+    def observar(self, valor, **etiquetas):
+        self.registro.observar(self.nombre, self.buckets, etiquetas, valor)
+
+
+class Registro:
+    """
+    Métricas de este proceso. Los valores se guardan por nombre y por tupla
+    de etiquetas; los histogramas como [conteos por bucket..., suma, total].
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.definiciones = {}
+        self.recolectores = []
+        self._reiniciar_proceso()
+
+    def _reiniciar_proceso(self):
+        # Tras un fork, el hijo empieza de cero: lo del padre ya está en su archivo
+        self._pid = os.getpid()
+        self._valores = {}
+        self._hilo = None
+
+    def _registrar(self, clase, nombre, tipo, ayuda, buckets=None):
+        metrica = clase(self, nombre, tipo, ayuda, buckets)
+        self.definiciones[nombre] = metrica
+        return metrica
+
+    def contador(self, nombre, ayuda):
+        return self._registrar(Contador, nombre, 'counter', ayuda)
+
+    def gauge(self, nombre, ayuda):
+        return self._registrar(Gauge, nombre, 'gauge', ayuda)
+
+    def histograma(self, nombre, ayuda, buckets=BUCKETS_LATENCIA):
+        return self._registrar(Histograma, nombre, 'histogram', ayuda, tuple(buckets))
+
+    def recolector(self, funcion):
+        """
+        Registra una función que retorna [(nombre, etiquetas, valor)] con el
+        valor actual de métricas que otros módulos ya llevan (se evalúa al
+        escribir la instantánea).
+        """
+        self.recolectores.append(funcion)
+        return funcion
+
+    def _serie(self, nombre, etiquetas):
+        if self._pid != os.getpid():
+            self._reiniciar_proceso()
+        self._asegurar_hilo()
+        return self._valores.setdefault(nombre, {}), tuple(sorted(etiquetas.items()))
+
+    def sumar(self, nombre, etiquetas, valor):
+        with self._lock:
+            series, clave = self._serie(nombre, etiquetas)
+            series[clave] = series.get(clave, 0) + valor
+
+    def fijar(self, nombre, etiquetas, valor):
+        with self._lock:
+            series, clave = self._serie(nombre, etiquetas)
+            series[clave] = valor
+
+    def observar(self, nombre, buckets, etiquetas, valor):
+        with self._lock:
+            series, clave = self._serie(nombre, etiquetas)
+            datos = series.get(clave)
+            if datos is None:
+                datos = series[clave] = [0] * (len(buckets) + 2)
+            for i, limite in enumerate(buckets):
+                if valor <= limite:
+                    datos[i] += 1
+            datos[-2] += valor
+            datos[-1] += 1
+
+    def instantanea(self):
+        """Valores actuales del proceso, en un dict serializable a JSON."""
+        recolectados = []
+        for funcion in self.recolectores:
+            try:
+                recolectados.extend(funcion())
+            except Exception:
+                continue
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reiniciar_proceso()
+            valores = {
+                nombre: [[list(clave), list(v) if isinstance(v, list) else v] for clave, v in series.items()]
+                for nombre, series in self._valores.items()
+            }
+        for nombre, etiquetas, valor in recolectados:
+            valores.setdefault(nombre, []).append([sorted(etiquetas.items()), valor])
+        return {'pid': os.getpid(), 'valores': valores}
+
+    # Escritura periódica de la instantánea -----------------------------------
+
+    def _asegurar_hilo(self):
+        if self._hilo is not None or not _directorio():
+            return
+        self._hilo = threading.Thread(target=self._ejecutar, name='metricas', daemon=True)
+        self._hilo.start()
+
+    def _ejecutar(self):
+        while True:
+            time.sleep(getattr(settings, 'METRICAS_INTERVALO', 5))
+            try:
+                self.escribir()
+            except OSError:
+                continue
+
+    def escribir(self):
+        directorio = _directorio()
+        if not directorio:
+            return
+        os.makedirs(directorio, exist_ok=True)
+        destino = os.path.join(directorio, f'{os.getpid()}.json')
+        temporal = f'{destino}.tmp'
+        with open(temporal, 'w') as archivo:
+            json.dump(self.instantanea(), archivo)
+        os.replace(temporal, destino)
+
+
+registro = Registro()
+atexit.register(lambda: registro.escribir() if registro._hilo else None)
+
+
+# ---------------------------------------------------------------------------
+# Métricas
+# ---------------------------------------------------------------------------
+
+latencia_http = registro.histograma(
+    'http_request_duracion_segundos', 'Latencia de los requests por ruta', BUCKETS_LATENCIA,
+)
+consultas_request = registro.histograma(
+    'db_consultas_por_request', 'Consultas SQL por request', BUCKETS_CONSULTAS,
+)
+tiempo_db_request = registro.histograma(
+    'db_tiempo_por_request_segundos', 'Tiempo en la base de datos por request', BUCKETS_LATENCIA,
+)
+latencia_saliente = registro.histograma(
+    'http_saliente_duracion_segundos', 'Latencia de las llamadas HTTP salientes', BUCKETS_SALIENTE,
+)
+errores_saliente = registro.contador(
+    'http_saliente_errores_total', 'Llamadas HTTP salientes fallidas (excepción o status >= 400)',
+)
+en_curso = registro.gauge('gunicorn_requests_en_curso', 'Requests en curso')
+registro.gauge('gunicorn_workers', 'Workers con métricas activos')
+registro.gauge('gunicorn_saturacion', 'Requests en curso / (workers * hilos por worker)')
+registro.gauge('auditoria_accesos_pendientes', 'Eventos de auditoría en memoria sin guardar')
+registro.contador('auditoria_accesos_escritos_total', 'Eventos de auditoría guardados')
+registro.contador('auditoria_accesos_descartados_total', 'Eventos de auditoría descartados')
+registro.gauge('imagenes_pendientes_eliminacion', 'Imágenes de ImgBB pendientes de eliminar')
+registro.gauge('imagenes_eliminacion_abandonadas', 'Imágenes de ImgBB que agotaron sus intentos de eliminación')
+registro.contador('cache_usuarios_total', 'Consultas a la caché de usuarios autenticados por resultado')
+registro.contador('jwt_lista_negra_consultas_total', 'Consultas a la lista negra de JWT por origen')
+
+
+@registro.recolector
+def _recolectar_auditoria():
+    from administracion.auditoria import estadisticas
+    datos = estadisticas()
+    return [
+        ('auditoria_accesos_pendientes', {}, datos['pendientes']),
+        ('auditoria_accesos_escritos_total', {}, datos['escritos']),
+        ('auditoria_accesos_descartados_total', {}, datos['descartados']),
+    ]
+
+
+@registro.recolector
+def _recolectar_caches():
+    from administracion.blacklist import metricas as metricas_lista_negra
+    from administracion.cache_usuarios import estadisticas as estadisticas_usuarios
+    usuarios = estadisticas_usuarios.resumen()
+    consultas = metricas_lista_negra.resumen()['consultas_lista_negra']
+    return [
+        ('cache_usuarios_total', {'resultado': 'acierto'}, usuarios['aciertos']),
+        ('cache_usuarios_total', {'resultado': 'fallo'}, usuarios['fallos']),
+    ] + [
+        ('jwt_lista_negra_consultas_total', {'origen': origen}, total)
+        for origen, total in consultas.items()
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Instrumentación de HTTP saliente
+# ---------------------------------------------------------------------------
+
+_instalado = False
+_lock_instalacion = threading.Lock()
+
+
+def servicio_de(url):
+    host = urlparse(url).hostname or ''
+    for fragmento, servicio in SERVICIOS:
+        if fragmento in host:
+            return servicio
+    return 'otro'
+
+
+def instalar():
+    """Mide requests.Session.send (una sola vez)."""
+    global _instalado
+    with _lock_instalacion:
+        if _instalado:
+            return
+        try:
+            import requests
+        except ImportError:
+            _instalado = True
+            return
+        original = requests.Session.send
+
+        def send(self, request, **kwargs):
+            servicio = servicio_de(request.url)
+            inicio = time.perf_counter()
+            try:
+                response = original(self, request, **kwargs)
+            except Exception:
+                errores_saliente.inc(servicio=servicio, tipo='excepcion')
+                raise
+            finally:
+                latencia_saliente.observar(time.perf_counter() - inicio, servicio=servicio)
+            if response.status_code >= 400:
+                errores_saliente.inc(servicio=servicio, tipo=f'http_{response.status_code // 100}xx')
+            return response
+
+        requests.Session.send = send
+        _instalado = True
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def ruta_metrica(request):
+    """Patrón de URL de la ruta; las URLs sin ruta se agrupan para acotar las etiquetas."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.route:
+        return 'sin_ruta'
+    return match.route.lstrip('^').rstrip('$')
+
+
+class MetricasMiddleware:
+    def __init__(self, get_response):
+        if not _habilitadas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        instalar()
+
+    def __call__(self, request):
+        medicion = Medicion()
+        en_curso.inc()
+        inicio = time.perf_counter()
+        status = 500
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(medicion))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            en_curso.dec()
+            ruta = ruta_metrica(request)
+            latencia_http.observar(time.perf_counter() - inicio, metodo=request.method, ruta=ruta, status=str(status))
+            consultas_request.observar(medicion.consultas, ruta=ruta)
+            tiempo_db_request.observar(medicion.db_ms / 1000, ruta=ruta)
+
+
+# ---------------------------------------------------------------------------
+# Agregación entre procesos y exposición
+# ---------------------------------------------------------------------------
+
+def _proceso_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _sumar(destino, valores, incluir_gauges=True):
+    for nombre, series in valores.items():
+        definicion = registro.definiciones.get(nombre)
+        if definicion is None or (definicion.tipo == 'gauge' and not incluir_gauges):
+            continue
+        acumulado = destino.setdefault(nombre, {})
+        for etiquetas, valor in series:
+            clave = tuple(tuple(par) for par in etiquetas)
+            if isinstance(valor, list):
+                previo = acumulado.get(clave)
+                acumulado[clave] = [a + b for a, b in zip(previo, valor)] if previo else list(valor)
+            else:
+                acumulado[clave] = acumulado.get(clave, 0) + valor
+
+
+def _leer(ruta):
+    try:
+        with open(ruta) as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _agregar_procesos():
+    """Suma las instantáneas de todos los workers (y la de los finalizados)."""
+    directorio = _directorio()
+    if not directorio:
+        total = {}
+        _sumar(total, registro.instantanea()['valores'])
+        return total, 1
+
+    registro.escribir()
+    total = {}
+    vivos = 0
+    with open(os.path.join(directorio, '.lock'), 'a') as candado:
+        fcntl.flock(candado, fcntl.LOCK_EX)
+        ruta_finalizados = os.path.join(directorio, ARCHIVO_FINALIZADOS)
+        finalizados = _leer(ruta_finalizados) or {'valores': {}}
+        acumulado_finalizados = {}
+        _sumar(acumulado_finalizados, finalizados['valores'], incluir_gauges=False)
+        cambio = False
+        for nombre in os.listdir(directorio):
+            if not nombre.endswith('.json') or nombre == ARCHIVO_FINALIZADOS:
+                continue
+            ruta = os.path.join(directorio, nombre)
+            datos = _leer(ruta)
+            if datos is None:
+                continue
+            if _proceso_vivo(datos['pid']):
+                vivos += 1
+                _sumar(total, datos['valores'])
+            else:
+                _sumar(acumulado_finalizados, datos['valores'], incluir_gauges=False)
+                os.remove(ruta)
+                cambio = True
+        if cambio:
+            serializado = {
+                nombre: [[list(clave), valor] for clave, valor in series.items()]
+                for nombre, series in acumulado_finalizados.items()
+            }
+            temporal = f'{ruta_finalizados}.tmp'
+            with open(temporal, 'w') as archivo:
+                json.dump({'valores': serializado}, archivo)
+            os.replace(temporal, ruta_finalizados)
+    for nombre, series in acumulado_finalizados.items():
+        _sumar(total, {nombre: [[list(clave), valor] for clave, valor in series.items()]})
+    return total, vivos
+
+
+def _valores_globales(total, workers, descontar=0):
+    """Gauges que no dependen de un proceso: workers, saturación y colas en la base de datos."""
+    from django.db.models import Count, Q
+
+    from condominio.models import ImagenPendienteEliminacion
+
+    en_curso_total = max(sum(total.get('gunicorn_requests_en_curso', {}).values()) - descontar, 0)
+    capacidad = max(workers, 1) * getattr(settings, 'GUNICORN_THREADS', 1)
+    total['gunicorn_workers'] = {(): workers}
+    total['gunicorn_saturacion'] = {(): round(en_curso_total / capacidad, 4)}
+    total['gunicorn_requests_en_curso'] = {(): en_curso_total}
+    abandonadas = Count('pk', filter=Q(abandonada__isnull=False))
+    colas = ImagenPendienteEliminacion.objects.aggregate(total=Count('pk'), abandonadas=abandonadas)
+    total['imagenes_pendientes_eliminacion'] = {(): colas['total'] - colas['abandonadas']}
+    total['imagenes_eliminacion_abandonadas'] = {(): colas['abandonadas']}
+
+
+def _etiquetas(clave, extra=()):
+    pares = list(clave) + list(extra)
+    if not pares:
+        return ''
+    texto = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pares
+    )
+    return '{' + texto + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exponer(descontar_en_curso=0):
+    """
+    Texto en formato de exposición de Prometheus (0.0.4).
+    descontar_en_curso excluye de los requests en curso al propio scrape.
+    """
+    total, workers = _agregar_procesos()
+    _valores_globales(total, workers, descontar_en_curso)
+    lineas = []
+    for nombre, definicion in registro.definiciones.items():
+        series = total.get(nombre)
+        if not series:
+            continue
+        lineas.append(f'# HELP {nombre} {definicion.ayuda}')
+        lineas.append(f'# TYPE {nombre} {definicion.tipo}')
+        for clave, valor in sorted(series.items()):
+            if definicion.tipo != 'histogram':
+                lineas.append(f'{nombre}{_etiquetas(clave)} {_numero(valor)}')
+                continue
+            for limite, conteo in zip(definicion.buckets, valor):
+                lineas.append(f'{nombre}_bucket{_etiquetas(clave, [("le", _numero(limite))])} {conteo}')
+            lineas.append(f'{nombre}_bucket{_etiquetas(clave, [("le", "+Inf")])} {valor[-1]}')
+            lineas.append(f'{nombre}_sum{_etiquetas(clave)} {_numero(valor[-2])}')
+            lineas.append(f'{nombre}_count{_etiquetas(clave)} {valor[-1]}')
+    return '\n'.join(lineas) + '\n'
+
+
+def vista_metricas(request):
+    """
+    GET /metrics con Authorization: Bearer <METRICAS_TOKEN>. Sin token
+    configurado responde 404 como si las métricas estuvieran deshabilitadas.
+    """
+    token = getattr(settings, 'METRICAS_TOKEN', '')
+    if not _habilitadas() or not token:
+        raise Http404
+    autorizacion = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(autorizacion.encode(), f'Bearer {token}'.encode()):
+        return HttpResponse('No autorizado', status=401, content_type='text/plain')
+    return HttpResponse(exponer(descontar_en_curso=1), content_type='text/plain; version=0.0.4; charset=utf-8')
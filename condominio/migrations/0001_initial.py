@@ -0,0 +1,31 @@
+# Generated by Django 5.1.12 on 2026-10-19 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImagenPendienteEliminacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delete_url', models.URLField(max_length=500, unique=True)),
+                ('modelo', models.CharField(blank=True, help_text='Modelo de origen (app_label.Modelo)', max_length=100)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True)),
+                ('proximo_intento', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Imagen pendiente de eliminación',
+                'verbose_name_plural': 'Imágenes pendientes de eliminación',
+                'ordering': ['proximo_intento'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.12 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('condominio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagenpendienteeliminacion',
+            name='abandonada',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Fecha en que se agotaron los intentos; ya no se reintenta y se purga tras la retención', null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class ImagenPendienteEliminacion(models.Model):
+    """
+    Imagen de ImgBB cuyo registro local ya fue eliminado y que está
+    pendiente de eliminarse en ImgBB. Se procesa en lotes con el comando
+    procesar_eliminaciones_imgbb; las que agotan sus intentos quedan
+    marcadas como abandonadas (para revisarlas) hasta que se purgan.
+    """
+    delete_url = models.URLField(max_length=500, unique=True)
+    modelo = models.CharField(max_length=100, blank=True, help_text='Modelo de origen (app_label.Modelo)')
+    intentos = models.PositiveIntegerField(default=0)
+    ultimo_error = models.TextField(blank=True)
+    proximo_intento = models.DateTimeField(auto_now_add=True, db_index=True)
+    abandonada = models.DateTimeField(
+        null=True, blank=True, db_index=True,
+        help_text='Fecha en que se agotaron los intentos; ya no se reintenta y se purga tras la retención',
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Imagen pendiente de eliminación'
+        verbose_name_plural = 'Imágenes pendientes de eliminación'
+        ordering = ['proximo_intento']
+
+    def __str__(self):
+        return f"{self.modelo} - {self.delete_url}"
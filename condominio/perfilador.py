@@ -0,0 +1,317 @@
+"""
+Perfilador de requests: consultas SQL, tiempos y HTTP saliente por endpoint.
+
+PerfiladorMiddleware mide en cada request:
+- cantidad de consultas SQL, tiempo total en la base de datos y la consulta
+  más lenta (execute_wrapper sobre cada conexión);
+- tiempo en serializers de DRF (propiedad .data del serializer de nivel
+  superior, incluidas las consultas que dispara);
+- llamadas HTTP salientes con requests (ImgBB, Plate Recognizer) y su tiempo.
+
+Los resultados se devuelven en el header Server-Timing, se registran en el
+logger 'condominio.perfilador' y se acumulan por ruta en este proceso
+(GET /api/perfilador/ para administradores, DELETE lo reinicia).
+
+Se activa con PERFILADOR_HABILITADO. Desactivado, el middleware lanza
+MiddlewareNotUsed al iniciar y Django lo quita de la cadena: no tiene costo
+por request. PERFILADOR_MUESTREO (0 a 1) permite medir solo una fracción de
+los requests en producción.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger('condominio.perfilador')
+
+LONGITUD_SQL = 300
+MUESTRAS_POR_RUTA = 500
+
+_medicion_actual = contextvars.ContextVar('perfilador_medicion', default=None)
+
+
+class Medicion:
+    """Métricas de un request."""
+
+    __slots__ = (
+        'consultas', 'db_ms', 'sql_lenta', 'sql_lenta_ms',
+        'serializacion_ms', 'http_llamadas', 'http_ms', '_profundidad_serializer',
+    )
+
+    def __init__(self):
+        self.consultas = 0
+        self.db_ms = 0.0
+        self.sql_lenta = None
+        self.sql_lenta_ms = 0.0
+        self.serializacion_ms = 0.0
+        self.http_llamadas = 0
+        self.http_ms = 0.0
+        self._profundidad_serializer = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper de Django
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = (time.perf_counter() - inicio) * 1000
+            self.consultas += 1
+            self.db_ms += duracion
+            if duracion >= self.sql_lenta_ms:
+                self.sql_lenta_ms = duracion
+                self.sql_lenta = sql
+
+
+# ---------------------------------------------------------------------------
+# Instrumentación de serializers y HTTP saliente (se instala una vez)
+# ---------------------------------------------------------------------------
+
+_instalado = False
+_lock_instalacion = threading.Lock()
+
+
+def _medir_propiedad_data(clase):
+    original = clase.data
+
+    def data(self):
+        medicion = _medicion_actual.get()
+        if medicion is None or medicion._profundidad_serializer:
+            return original.fget(self)
+        medicion._profundidad_serializer += 1
+        inicio = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            medicion._profundidad_serializer -= 1
+            medicion.serializacion_ms += (time.perf_counter() - inicio) * 1000
+
+    clase.data = property(data)
+
+
+def _medir_http(session_cls):
+    original = session_cls.send
+
+    def send(self, request, **kwargs):
+        medicion = _medicion_actual.get()
+        if medicion is None:
+            return original(self, request, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return original(self, request, **kwargs)
+        finally:
+            medicion.http_llamadas += 1
+            medicion.http_ms += (time.perf_counter() - inicio) * 1000
+
+    session_cls.send = send
+
+
+def instalar():
+    """Instrumenta los serializers de DRF y requests.Session (una sola vez)."""
+    global _instalado
+    with _lock_instalacion:
+        if _instalado:
+            return
+        from rest_framework import serializers
+        _medir_propiedad_data(serializers.Serializer)
+        _medir_propiedad_data(serializers.ListSerializer)
+        try:
+            import requests
+        except ImportError:
+            pass
+        else:
+            _medir_http(requests.Session)
+        _instalado = True
+
+
+# ---------------------------------------------------------------------------
+# Acumulado por ruta
+# ---------------------------------------------------------------------------
+
+class _EstadisticasRuta:
+    __slots__ = ('requests', 'total_ms', 'max_ms', 'consultas', 'max_consultas', 'db_ms',
+                 'serializacion_ms', 'http_llamadas', 'http_ms', 'sql_lenta', 'sql_lenta_ms', 'muestras')
+
+    def __init__(self):
+        self.requests = 0
+        self.total_ms = self.max_ms = self.db_ms = self.serializacion_ms = self.http_ms = 0.0
+        self.consultas = self.max_consultas = self.http_llamadas = 0
+        self.sql_lenta = None
+        self.sql_lenta_ms = 0.0
+        self.muestras = []
+
+    def agregar(self, medicion, duracion_ms):
+        self.requests += 1
+        self.total_ms += duracion_ms
+        self.max_ms = max(self.max_ms, duracion_ms)
+        self.consultas += medicion.consultas
+        self.max_consultas = max(self.max_consultas, medicion.consultas)
+        self.db_ms += medicion.db_ms
+        self.serializacion_ms += medicion.serializacion_ms
+        self.http_llamadas += medicion.http_llamadas
+        self.http_ms += medicion.http_ms
+        if medicion.sql_lenta and medicion.sql_lenta_ms >= self.sql_lenta_ms:
+            self.sql_lenta_ms = medicion.sql_lenta_ms
+            self.sql_lenta = medicion.sql_lenta[:LONGITUD_SQL]
+        self.muestras.append(duracion_ms)
+        if len(self.muestras) > MUESTRAS_POR_RUTA:
+            del self.muestras[:len(self.muestras) - MUESTRAS_POR_RUTA]
+
+    def resumen(self):
+        muestras = sorted(self.muestras)
+        n = self.requests
+
+        def percentil(p):
+            return round(muestras[min(len(muestras) - 1, int(len(muestras) * p))], 2) if muestras else None
+
+        return {
+            'requests': n,
+            'promedio_ms': round(self.total_ms / n, 2),
+            'p95_ms': percentil(0.95),
+            'max_ms': round(self.max_ms, 2),
+            'consultas_promedio': round(self.consultas / n, 2),
+            'consultas_max': self.max_consultas,
+            'db_promedio_ms': round(self.db_ms / n, 2),
+            'serializacion_promedio_ms': round(self.serializacion_ms / n, 2),
+            'http_llamadas': self.http_llamadas,
+            'http_promedio_ms': round(self.http_ms / n, 2),
+            'sql_mas_lenta': self.sql_lenta,
+            'sql_mas_lenta_ms': round(self.sql_lenta_ms, 2),
+        }
+
+
+class _Reporte:
+    """Estadísticas por ruta (método + patrón de URL) en este proceso."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rutas = {}
+
+    def registrar(self, ruta, medicion, duracion_ms):
+        with self._lock:
+            estadisticas = self._rutas.get(ruta)
+            if estadisticas is None:
+                estadisticas = self._rutas[ruta] = _EstadisticasRuta()
+            estadisticas.agregar(medicion, duracion_ms)
+
+    def reiniciar(self):
+        with self._lock:
+            self._rutas = {}
+
+    def resumen(self, orden='consultas_promedio'):
+        with self._lock:
+            rutas = {ruta: estadisticas.resumen() for ruta, estadisticas in self._rutas.items()}
+        return dict(sorted(rutas.items(), key=lambda item: item[1].get(orden) or 0, reverse=True))
+
+
+reporte = _Reporte()
+
+
+def ruta_request(request):
+    """
+    'GET api/propietarios/<pk>/'; las URLs que no resolvieron (404, media)
+    se agrupan en 'GET sin_ruta' para que el reporte no crezca sin límite.
+    """
+    match = getattr(request, 'resolver_match', None)
+    if match is None or not match.route:
+        return f'{request.method} sin_ruta'
+    # Las rutas de los routers de DRF son regex: se quitan los anclajes
+    return f"{request.method} {match.route.lstrip('^').rstrip('$')}"
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+class PerfiladorMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFILADOR_HABILITADO', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.muestreo = getattr(settings, 'PERFILADOR_MUESTREO', 1.0)
+        self.umbral_consultas = getattr(settings, 'PERFILADOR_UMBRAL_CONSULTAS', 30)
+        self.umbral_ms = getattr(settings, 'PERFILADOR_UMBRAL_MS', 1000)
+        instalar()
+
+    def __call__(self, request):
+        if self.muestreo < 1 and random.random() >= self.muestreo:
+            return self.get_response(request)
+
+        medicion = Medicion()
+        token = _medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(medicion))
+                response = self.get_response(request)
+        finally:
+            _medicion_actual.reset(token)
+        duracion_ms = (time.perf_counter() - inicio) * 1000
+
+        ruta = ruta_request(request)
+        reporte.registrar(ruta, medicion, duracion_ms)
+        # Se agrega al header que haya puesto una vista u otro middleware
+        response['Server-Timing'] = ', '.join(filter(None, [
+            response.get('Server-Timing'), self._server_timing(medicion, duracion_ms),
+        ]))
+        self._log(ruta, response.status_code, medicion, duracion_ms)
+        return response
+
+    @staticmethod
+    def _server_timing(medicion, duracion_ms):
+        partes = [
+            f'db;dur={medicion.db_ms:.1f};desc="{medicion.consultas} consultas"',
+            f'ser;dur={medicion.serializacion_ms:.1f};desc="serializers"',
+        ]
+        if medicion.http_llamadas:
+            partes.append(f'http;dur={medicion.http_ms:.1f};desc="{medicion.http_llamadas} llamadas"')
+        partes.append(f'total;dur={duracion_ms:.1f}')
+        return ', '.join(partes)
+
+    def _log(self, ruta, status, medicion, duracion_ms):
+        datos = {
+            'ruta': ruta,
+            'status': status,
+            'duracion_ms': round(duracion_ms, 2),
+            'consultas': medicion.consultas,
+            'db_ms': round(medicion.db_ms, 2),
+            'sql_lenta_ms': round(medicion.sql_lenta_ms, 2),
+            'serializacion_ms': round(medicion.serializacion_ms, 2),
+            'http_llamadas': medicion.http_llamadas,
+            'http_ms': round(medicion.http_ms, 2),
+        }
+        lento = medicion.consultas > self.umbral_consultas or duracion_ms > self.umbral_ms
+        if lento and medicion.sql_lenta:
+            datos['sql_lenta'] = medicion.sql_lenta[:LONGITUD_SQL]
+        logger.log(
+            logging.WARNING if lento else logging.INFO,
+            ' '.join(f'{clave}={valor}' for clave, valor in datos.items()),
+            extra={'perfilador': datos},
+        )
+
+
+class ReportePerfiladorView(APIView):
+    """
+    Estadísticas por ruta de este proceso, ordenadas por consultas promedio
+    (?orden=promedio_ms, p95_ms, db_promedio_ms, ...).
+    GET /api/perfilador/        DELETE /api/perfilador/ (reinicia)
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        orden = request.query_params.get('orden', 'consultas_promedio')
+        return Response(reporte.resumen(orden))
+
+    def delete(self, request):
+        reporte.reiniciar()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,193 @@
+"""
+Utilidades para los tests de cantidad de consultas SQL.
+
+sembrar(n) crea n propietarios con datos en todas las apps (unidad,
+vehículos, mascota, expensas y pagos, visitas con registro, reconocimientos
+de placa, reservas, pagos con Stripe, reportes, comunicados e historial de
+accesos), de modo que cada serializer recorra todas sus relaciones.
+
+ConsultasAcotadasTestCase mide un endpoint, siembra más filas y lo vuelve a
+medir: la cantidad de consultas tiene que ser la misma (no depende de la
+cantidad de filas, es decir, no hay N+1) y no superar un máximo.
+"""
+import io
+import itertools
+from datetime import time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+_secuencia = itertools.count(1)
+
+
+def _siguiente():
+    return next(_secuencia)
+
+
+def _url_imgbb(nombre):
+    # Con la URL ya cargada no se genera el archivo ni se sube a ImgBB
+    return f'https://i.ibb.co/prueba/{nombre}.png'
+
+
+def sembrar(n, autor=None):
+    """
+    Crea n propietarios con todos sus datos relacionados.
+
+    Args:
+        n: Cantidad de propietarios
+        autor: Usuario autor de los comunicados (por defecto, el propietario)
+
+    Returns:
+        Lista de propietarios creados
+    """
+    from administracion.models import HistorialAcceso
+    from areas_comunes.models import AreaComun, ReservaAreaComun
+    from comunicacion.models import Comunicado
+    from finanzas.models import Expensa, Pago
+    from gestion.models import Mascota, Propietario, UnidadHabitacional, Vehiculo
+    from gestion.riesgos import recalcular as recalcular_riesgos
+    from mantenimiento.models import Reporte
+    from pagos.models import Pago as PagoStripe
+    from seguridad.models import ComunicacionGuardia, Guardia, PlateRecognitionLog, RegistroVisita, Visita
+
+    hoy = timezone.localdate()
+    numero = _siguiente()
+    usuario_guardia = User.objects.create_user(f'guardia{numero}', first_name='Guardia', last_name=str(numero))
+    guardia = Guardia.objects.create(
+        user=usuario_guardia, documento_identidad=f'G{numero}', telefono='70000000',
+        turno='mañana', fecha_contratacion=hoy,
+    )
+    area = AreaComun.objects.create(
+        nombre=f'Área {numero}', descripcion='', capacidad=20, horario_apertura=time(8),
+        horario_cierre=time(22), tarifa_hora=Decimal('50.00'),
+    )
+
+    propietarios = []
+    for _ in range(n):
+        i = _siguiente()
+        user = User.objects.create_user(f'prop{i}', email=f'prop{i}@example.com', first_name='Prop', last_name=str(i))
+        propietario = Propietario.objects.create(user=user, documento_identidad=f'CI{i}', telefono='70000000')
+        unidad = UnidadHabitacional.objects.create(
+            propietario=propietario, numero=str(100 + i), edificio=f'Torre {i % 3}', tipo='departamento', piso=i % 10,
+        )
+        vehiculos = [
+            Vehiculo.objects.create(
+                propietario=propietario, unidad=unidad, placa=f'{i}{letra}ABC', marca='Toyota',
+                modelo='Corolla', color='Gris', tipo='sedan',
+            )
+            for letra in 'AB'
+        ]
+        Mascota.objects.create(propietario=propietario, nombre=f'Firulais {i}', tipo='perro')
+
+        for meses, pagada in ((1, True), (0, False)):
+            emision = hoy - timedelta(days=30 * meses)
+            expensa = Expensa.objects.create(
+                propietario=propietario, mes_referencia=emision.strftime('%Y-%m'),
+                monto_total=Decimal('500.00'), cuota_basica=Decimal('500.00'),
+                fecha_emision=emision, fecha_vencimiento=emision + timedelta(days=10), pagada=pagada,
+            )
+            if pagada:
+                Pago.objects.create(
+                    expensa=expensa, monto=expensa.monto_total, metodo_pago='transferencia',
+                    referencia=f'REF{i}', verificado=True,
+                )
+
+        visita = Visita.objects.create(
+            propietario=propietario, nombre_visitante=f'Visitante {i}', documento_identidad=f'V{i}',
+            fecha_visita=hoy, hora_inicio=time(9), hora_fin=time(18), placa_vehiculo=f'{i}VIS',
+            qr_code=f'qrcodes_visitas/qr_{i}.png', qr_code_url=_url_imgbb(f'qr_{i}'),
+        )
+        RegistroVisita.objects.create(visita=visita, hora_entrada=timezone.now(), guardia_registro=guardia.user.username)
+        ComunicacionGuardia.objects.create(propietario=propietario, guardia=guardia, tipo='chat', mensaje='Consulta')
+        PlateRecognitionLog.objects.create(
+            plate_number=vehiculos[0].placa, image=f'plate_recognition/{i}a.jpg', image_url=_url_imgbb(f'{i}a'),
+            confidence='high',
+            confidence_score=95.0, vehiculo=vehiculos[0], unidad=unidad, guardia=guardia,
+            is_registered=True, tipo_acceso='residente', acceso_permitido=True,
+        )
+        PlateRecognitionLog.objects.create(
+            plate_number=visita.placa_vehiculo, image=f'plate_recognition/{i}b.jpg', image_url=_url_imgbb(f'{i}b'),
+            confidence='low',
+            visita=visita, guardia=guardia, tipo_acceso='visita',
+        )
+
+        reserva = ReservaAreaComun.objects.create(
+            propietario=propietario, area=area, fecha=hoy, hora_inicio=time(10), hora_fin=time(12),
+            costo_total=Decimal('100.00'),
+        )
+        PagoStripe.objects.create(
+            propietario=propietario, reserva=reserva, monto=reserva.costo_total,
+            payment_intent_id=f'pi_{i}', descripcion='Reserva',
+        )
+        Reporte.objects.create(
+            propietario=propietario, tipo='otro', titulo=f'Reporte {i}', descripcion='', ubicacion='Hall',
+            prioridad=5,
+        )
+        Comunicado.objects.create(titulo=f'Comunicado {i}', contenido='', tipo='aviso', autor=autor or user)
+        HistorialAcceso.objects.create(usuario=user, username=user.username, exitoso=True)
+        HistorialAcceso.objects.create(username=f'desconocido{i}', exitoso=False)
+        propietarios.append(propietario)
+
+    # En los tests no se ejecutan los on_commit que recalculan el riesgo
+    recalcular_riesgos(p.pk for p in propietarios)
+    return propietarios
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    AUDITORIA_ACCESOS_ASINCRONA=False,
+)
+class ConsultasAcotadasTestCase(APITestCase):
+    """
+    TestCase con datos sembrados y un administrador autenticado.
+
+    FILAS propietarios se siembran una vez por clase; assertConsultasAcotadas
+    agrega FILAS_EXTRA más dentro del test para comparar.
+    """
+    FILAS = 3
+    FILAS_EXTRA = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('inicializar_roles', stdout=io.StringIO())
+        cls.admin = User.objects.create_superuser('admin_consultas', 'admin@example.com', 'x')
+        cls.propietarios = sembrar(cls.FILAS, autor=cls.admin)
+        cls.propietario = cls.propietarios[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def contar_consultas(self, url, metodo='get', data=None, estado=200):
+        """Ejecuta el request y retorna la cantidad de consultas SQL."""
+        cache.clear()
+        with CaptureQueriesContext(connection) as contexto:
+            response = getattr(self.client, metodo)(url, data, format='json')
+        self.assertEqual(response.status_code, estado, f'{metodo.upper()} {url}: {response.content[:500]}')
+        return len(contexto.captured_queries)
+
+    def assertConsultasAcotadas(self, url, maximo, **kwargs):
+        """
+        Verifica que el request consulte la misma cantidad de veces con FILAS y
+        con FILAS + FILAS_EXTRA propietarios, y no más de `maximo`.
+        """
+        antes = self.contar_consultas(url, **kwargs)
+        sembrar(self.FILAS_EXTRA, autor=self.admin)
+        despues = self.contar_consultas(url, **kwargs)
+        self.assertEqual(
+            antes, despues,
+            f'{url}: las consultas crecen con las filas ({antes} -> {despues}), posible N+1',
+        )
+        self.assertLessEqual(despues, maximo, f'{url}: {despues} consultas (máximo {maximo})')
+
+    def assertConsultasMaximas(self, url, maximo, **kwargs):
+        """Verifica que un request (detalle o acción) no supere `maximo` consultas."""
+        consultas = self.contar_consultas(url, **kwargs)
+        self.assertLessEqual(consultas, maximo, f'{url}: {consultas} consultas (máximo {maximo})')
@@ -0,0 +1,192 @@
+"""
+Búsqueda indexada para los ViewSets con muchos registros.
+
+Cada modelo de BUSQUEDA_REGISTRY guarda en `texto_busqueda` el texto de sus
+campos de búsqueda (incluidos los de modelos relacionados, como el nombre
+del usuario del propietario) en minúsculas y sin tildes. Los signals lo
+mantienen al guardar el modelo o los modelos de los que toma campos.
+
+En PostgreSQL la migración crea además:
+- un índice GIN con pg_trgm sobre texto_busqueda, que permite resolver
+  LIKE '%termino%' (placas o nombres parciales) sin recorrer la tabla;
+- una columna `vector_busqueda` (tsvector, configuración spanish) que
+  mantiene un trigger, con su índice GIN, para coincidencias por raíz de
+  palabra ("departamentos" encuentra "departamento").
+
+En SQLite (tests y desarrollo) se usa solo el LIKE sobre texto_busqueda.
+"""
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from django.apps import apps
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections
+from django.db.models import Q
+from django.db.models.signals import post_save
+from rest_framework.filters import SearchFilter
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONFIG_BUSQUEDA = 'spanish'
+
+
+@dataclass(frozen=True)
+class BusquedaSpec:
+    """
+    Describe el texto de búsqueda de un modelo.
+
+    Attributes:
+        model: Modelo en formato 'app_label.Modelo'
+        campos: Campos (o rutas a campos relacionados) que forman el texto
+    """
+    model: str
+    campos: Tuple[str, ...]
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+
+BUSQUEDA_REGISTRY: List[BusquedaSpec] = [
+    BusquedaSpec('gestion.Propietario', ('user__first_name', 'user__last_name', 'documento_identidad', 'telefono')),
+    BusquedaSpec('gestion.UnidadHabitacional', ('numero', 'edificio', 'propietario__user__first_name', 'propietario__user__last_name')),
+    BusquedaSpec('gestion.Vehiculo', ('placa', 'marca', 'modelo', 'color')),
+    BusquedaSpec('finanzas.Expensa', ('mes_referencia', 'propietario__user__first_name', 'propietario__user__last_name')),
+]
+
+
+def get_spec(model) -> BusquedaSpec:
+    label = model._meta.label
+    return next((spec for spec in BUSQUEDA_REGISTRY if spec.model == label), None)
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes y con espacios simples."""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def construir_texto(valores: Iterable) -> str:
+    """
+    Texto de búsqueda de una fila. Los valores con guiones o espacios (como
+    placas) se agregan también compactados para que 'abc123' encuentre
+    'ABC-123'.
+    """
+    partes = []
+    for valor in valores:
+        texto = normalizar(str(valor)) if valor is not None else ''
+        if not texto:
+            continue
+        partes.append(texto)
+        compacto = re.sub(r'[\s\-.]', '', texto)
+        if compacto != texto:
+            partes.append(compacto)
+    return ' '.join(partes)
+
+
+def reindexar(model, campos: Tuple[str, ...], filtro: Q = None, batch_size: int = 1000) -> int:
+    """
+    Recalcula texto_busqueda de las filas indicadas, escribiendo solo las
+    que cambiaron.
+
+    Returns:
+        Cantidad de filas actualizadas
+    """
+    queryset = model._default_manager.order_by('pk')
+    if filtro is not None:
+        queryset = queryset.filter(filtro)
+
+    filas = queryset.values_list('pk', 'texto_busqueda', *campos).iterator(chunk_size=batch_size)
+    cambios = []
+    total = 0
+    for pk, actual, *valores in filas:
+        texto = construir_texto(valores)
+        if texto != actual:
+            cambios.append(model(pk=pk, texto_busqueda=texto))
+        if len(cambios) >= batch_size:
+            model._default_manager.bulk_update(cambios, ['texto_busqueda'])
+            total += len(cambios)
+            cambios = []
+    if cambios:
+        model._default_manager.bulk_update(cambios, ['texto_busqueda'])
+        total += len(cambios)
+    return total
+
+
+def _dependencias() -> Dict[type, List[Tuple[BusquedaSpec, str, set]]]:
+    """
+    Para cada modelo que aporta campos a un texto de búsqueda, retorna
+    (spec, ruta hasta ese modelo, campos observados). La ruta vacía
+    corresponde al propio modelo.
+    """
+    dependencias = {}
+    for spec in BUSQUEDA_REGISTRY:
+        model = spec.get_model()
+        for campo in spec.campos:
+            *ruta, nombre = campo.split('__')
+            origen = model
+            for paso in ruta:
+                origen = origen._meta.get_field(paso).related_model
+            entradas = dependencias.setdefault(origen, [])
+            prefijo = '__'.join(ruta)
+            existente = next((e for e in entradas if e[0] is spec and e[1] == prefijo), None)
+            if existente:
+                existente[2].add(nombre)
+            else:
+                entradas.append((spec, prefijo, {nombre}))
+    return dependencias
+
+
+_DEPENDENCIAS: Dict[type, List[Tuple[BusquedaSpec, str, set]]] = {}
+
+
+def _post_save_receiver(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    for spec, prefijo, observados in _DEPENDENCIAS.get(sender, []):
+        # Guardados parciales (ej: last_login del usuario) que no tocan
+        # los campos de búsqueda no requieren reindexar
+        if update_fields is not None and not observados.intersection(update_fields):
+            continue
+        filtro = Q(pk=instance.pk) if not prefijo else Q(**{prefijo: instance.pk})
+        try:
+            reindexar(spec.get_model(), spec.campos, filtro)
+        except Exception as e:
+            logger.error(f"Error al actualizar texto de búsqueda de {spec.model}: {str(e)}")
+
+
+def connect_signals():
+    """Conecta los receivers para los modelos que aportan texto de búsqueda."""
+    _DEPENDENCIAS.clear()
+    _DEPENDENCIAS.update(_dependencias())
+    for model in _DEPENDENCIAS:
+        post_save.connect(
+            _post_save_receiver, sender=model,
+            dispatch_uid=f'busqueda_{model._meta.label}'
+        )
+
+
+class BusquedaFilter(SearchFilter):
+    """
+    SearchFilter que, para los modelos de BUSQUEDA_REGISTRY, busca cada
+    término en texto_busqueda (y en vector_busqueda en PostgreSQL) en lugar
+    de combinar LIKE sobre varias columnas y tablas unidas. Para el resto
+    de modelos se comporta como SearchFilter.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        spec = get_spec(queryset.model)
+        if spec is None:
+            return super().filter_queryset(request, queryset, view)
+
+        terminos = normalizar(' '.join(self.get_search_terms(request))).split()
+        postgres = connections[queryset.db].vendor == 'postgresql'
+        for termino in terminos:
+            condicion = Q(texto_busqueda__contains=termino)
+            if postgres:
+                condicion |= Q(vector_busqueda=SearchQuery(termino, config=CONFIG_BUSQUEDA))
+            queryset = queryset.filter(condicion)
+        return queryset
@@ -15,6 +15,7 @@ import dj_database_url
 from decouple import config
 from datetime import timedelta
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -62,6 +63,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
     # Módulos del sistema
+    'condominio',
     'administracion',
     'gestion',
     'finanzas',
@@ -73,6 +75,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Id del request para correlacionar los logs (condominio.logs)
+    'condominio.logs.RequestIdMiddleware',
+    # Para medir el request completo; sin costo si están deshabilitados
+    'condominio.perfilador.PerfiladorMiddleware',
+    'condominio.metricas.MetricasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -115,6 +122,16 @@ DATABASES = {
 }
 
 
+# Cache
+# Con varios workers de gunicorn usar un backend compartido (ej: FileBasedCache)
+# para que la invalidación por signals llegue a todos los procesos.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='condominio'),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -169,12 +186,15 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    # Tokens con rol, propietario, unidad y guardia (administracion.tokens)
+    'TOKEN_OBTAIN_SERIALIZER': 'administracion.tokens.TokenConRolSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'administracion.tokens.TokenRefreshConRolSerializer',
 }
 
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'administracion.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
@@ -225,15 +245,140 @@ CSRF_TRUSTED_ORIGINS = [
 
 
 IMGBB_API_KEY = config('IMGBB_API_KEY', default=None)
+# Permite usar el servidor falso local (python manage.py fake_imgbb)
+IMGBB_API_URL = config('IMGBB_API_URL', default='https://api.imgbb.com/1/upload')
 # Alias para compatibilidad
 
 # ============================================
 # CONFIGURACIÓN DE PLATE RECOGNIZER
 # ============================================
 PLATE_RECOGNIZER_API_KEY = config('PLATE_RECOGNIZER_API_KEY', default='')
+# Permite usar el servidor falso local (python manage.py prueba_carga --servicios-falsos)
+PLATE_RECOGNIZER_API_URL = config('PLATE_RECOGNIZER_API_URL', default='https://api.platerecognizer.com/v1/plate-reader/')
 
 # ============================================
 # CONFIGURACIÓN DE STRIPE
 # ============================================
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY', default='')
-STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
\ No newline at end of file
+STRIPE_PUBLISHABLE_KEY = config('STRIPE_PUBLISHABLE_KEY', default='')
+# Vacío usa la API real; para el servidor falso local: http://127.0.0.1:8766
+STRIPE_API_BASE = config('STRIPE_API_BASE', default='')
+# ============================================
+# PROXY LOCAL DE IMÁGENES (caché de ImgBB)
+# ============================================
+MEDIA_PROXY_ENABLED = config('MEDIA_PROXY_ENABLED', default=False, cast=bool)
+MEDIA_PROXY_CACHE_DIR = config('MEDIA_PROXY_CACHE_DIR', default=str(BASE_DIR / 'media_cache'))
+MEDIA_PROXY_MAX_BYTES = config('MEDIA_PROXY_MAX_BYTES', default=512 * 1024 * 1024, cast=int)
+MEDIA_PROXY_MAX_FILE_BYTES = config('MEDIA_PROXY_MAX_FILE_BYTES', default=10 * 1024 * 1024, cast=int)
+MEDIA_PROXY_MAX_AGE = 60 * 60 * 24 * 365
+# Las URLs firmadas del proxy vencen entre 1 y 2 veces este valor (segundos)
+MEDIA_PROXY_URL_TTL = config('MEDIA_PROXY_URL_TTL', default=60 * 60 * 24, cast=int)
+MEDIA_PROXY_ALLOWED_HOSTS = ['i.ibb.co', 'ibb.co']
+
+# ============================================
+# IMPORTACIÓN DE PROPIETARIOS (gestion.importacion)
+# ============================================
+# Filas máximas por archivo en POST /api/propietarios/importar/; los
+# archivos más grandes se importan con python manage.py importar_propietarios
+IMPORTACION_MAX_FILAS = config('IMPORTACION_MAX_FILAS', default=2000, cast=int)
+
+# ============================================
+# CACHÉ DE USUARIOS AUTENTICADOS (administracion.cache_usuarios)
+# ============================================
+# Segundos que un usuario resuelto por JWT (con perfil, rol y propietario)
+# queda en caché. 0 desactiva la caché.
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60, cast=int)
+# Segundos que se cachea la versión de token vigente (y si el usuario está
+# activo) de cada usuario. Con LocMemCache es la demora máxima con la que un
+# worker ve una revocación hecha en otro proceso.
+TOKEN_VERSION_CACHE_TTL = config('TOKEN_VERSION_CACHE_TTL', default=30, cast=int)
+
+# ============================================
+# LISTA NEGRA DE JWT (administracion.blacklist)
+# ============================================
+# Filtro de Bloom delante de la consulta a la lista negra: 'auto' lo activa
+# solo con una caché compartida (Redis/Memcached); True/False lo fuerzan.
+JWT_BLACKLIST_BLOOM = config('JWT_BLACKLIST_BLOOM', default='auto')
+# Segundos entre reconstrucciones del filtro en cada proceso
+JWT_BLACKLIST_BLOOM_TTL = config('JWT_BLACKLIST_BLOOM_TTL', default=300, cast=int)
+
+# ============================================
+# AUDITORÍA DE ACCESOS (administracion.auditoria)
+# ============================================
+# Los login y refresh se guardan en HistorialAcceso por lotes desde un hilo
+# en segundo plano: al juntar AUDITORIA_ACCESOS_LOTE eventos o cada
+# AUDITORIA_ACCESOS_INTERVALO segundos.
+AUDITORIA_ACCESOS_ASINCRONA = config('AUDITORIA_ACCESOS_ASINCRONA', default=True, cast=bool)
+AUDITORIA_ACCESOS_LOTE = config('AUDITORIA_ACCESOS_LOTE', default=200, cast=int)
+AUDITORIA_ACCESOS_INTERVALO = config('AUDITORIA_ACCESOS_INTERVALO', default=2.0, cast=float)
+# Eventos máximos en memoria si la base de datos no responde
+AUDITORIA_ACCESOS_MAXIMO = config('AUDITORIA_ACCESOS_MAXIMO', default=10000, cast=int)
+# Días de historial detallado antes de resumirlo (purgar_historial_accesos)
+AUDITORIA_ACCESOS_RETENCION_DIAS = config('AUDITORIA_ACCESOS_RETENCION_DIAS', default=90, cast=int)
+
+# ============================================
+# PERFILADOR DE REQUESTS (condominio.perfilador)
+# ============================================
+# Consultas SQL, tiempo de base de datos, serializers y HTTP saliente por
+# request: header Server-Timing, logger 'condominio.perfilador' y reporte por
+# ruta en /api/perfilador/. Deshabilitado no agrega costo por request.
+PERFILADOR_HABILITADO = config('PERFILADOR_HABILITADO', default=False, cast=bool)
+# Fracción de requests medidos (0 a 1)
+PERFILADOR_MUESTREO = config('PERFILADOR_MUESTREO', default=1.0, cast=float)
+# Por encima de estos umbrales el request se registra como WARNING con su SQL más lenta
+PERFILADOR_UMBRAL_CONSULTAS = config('PERFILADOR_UMBRAL_CONSULTAS', default=30, cast=int)
+PERFILADOR_UMBRAL_MS = config('PERFILADOR_UMBRAL_MS', default=1000, cast=int)
+
+# ============================================
+# MÉTRICAS PROMETHEUS (condominio.metricas)
+# ============================================
+# GET /metrics con latencia por ruta, consultas por request, llamadas a
+# Plate Recognizer / ImgBB / Stripe, colas y saturación de gunicorn.
+METRICAS_HABILITADAS = config('METRICAS_HABILITADAS', default=False, cast=bool)
+# /metrics exige 'Authorization: Bearer <token>'; vacío, /metrics responde 404
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+# Directorio compartido por los workers de gunicorn (vacío: solo este proceso)
+METRICAS_DIR = config('METRICAS_DIR', default=os.path.join(tempfile.gettempdir(), 'condominio_metricas'))
+# Segundos entre escrituras de la instantánea de cada worker
+METRICAS_INTERVALO = config('METRICAS_INTERVALO', default=5, cast=int)
+# Hilos por worker de gunicorn (--threads), para calcular la saturación
+GUNICORN_THREADS = config('GUNICORN_THREADS', default=1, cast=int)
+
+# ============================================
+# LOGGING (condominio.logs)
+# ============================================
+# Logs en una línea JSON por registro (LOG_FORMATO=texto para desarrollo),
+# escritos en stdout desde un hilo aparte a través de una cola, con el
+# request_id de cada request. Niveles por módulo con
+# LOG_NIVELES=pagos=DEBUG,seguridad=WARNING
+from condominio.logs import niveles_por_modulo  # noqa: E402
+
+LOG_NIVEL = config('LOG_NIVEL', default='INFO')
+LOG_FORMATO = config('LOG_FORMATO', default='json')
+LOG_MAX_LONGITUD = config('LOG_MAX_LONGITUD', default=2000, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'condominio.logs.RequestIdFilter'},
+    },
+    'handlers': {
+        'cola': {
+            'class': 'condominio.logs.ColaHandler',
+            'filters': ['request_id'],
+            'formato': LOG_FORMATO,
+            'max_longitud': LOG_MAX_LONGITUD,
+        },
+    },
+    'root': {
+        'handlers': ['cola'],
+        'level': LOG_NIVEL,
+    },
+    'loggers': {
+        'django': {'handlers': ['cola'], 'level': 'INFO', 'propagate': False},
+        'django.server': {'handlers': ['cola'], 'level': 'INFO', 'propagate': False},
+        'django.db.backends': {'level': 'WARNING'},
+        **niveles_por_modulo(config('LOG_NIVELES', default='')),
+    },
+}
@@ -0,0 +1,166 @@
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import include, path
+from django.utils import timezone
+
+from condominio import media_proxy
+from condominio.image_sync import process_pending_deletions
+from condominio.media_proxy import DiskLRUCache, _firma
+from condominio.metricas import _valores_globales
+from condominio.models import ImagenPendienteEliminacion
+from condominio.pruebas import sembrar
+from gestion.models import Mascota
+from gestion.serializers import MascotaSerializer
+
+URL = 'https://i.ibb.co/prueba/foto.png'
+
+# Con MEDIA_PROXY_ENABLED desactivado condominio.urls no registra el proxy
+urlpatterns = [
+    path('', include('condominio.urls')),
+    path('api/media/proxy/', media_proxy.media_proxy, name='media_proxy'),
+]
+
+
+class _RespuestaImgbb:
+    headers = {'Content-Type': 'image/png'}
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, _tamano):
+        yield b'contenido'
+
+    def close(self):
+        pass
+
+
+class MediaProxyTests(SimpleTestCase):
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        ajustes = override_settings(MEDIA_PROXY_CACHE_DIR=directorio.name)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        self.addCleanup(setattr, media_proxy, '_cache', None)
+        media_proxy._cache = None
+
+    def pedir(self, **params):
+        return media_proxy.media_proxy(RequestFactory().get('/api/media/proxy/', params))
+
+    def firmada(self, expira=None):
+        expira = expira or int(time.time()) + 60
+        return {'url': URL, 'exp': expira, 'firma': _firma(URL, expira)}
+
+    def test_requiere_firma_vigente(self):
+        self.assertEqual(self.pedir(url=URL).status_code, 403)
+        self.assertEqual(self.pedir(**dict(self.firmada(), firma='x')).status_code, 403)
+        self.assertEqual(self.pedir(**self.firmada(int(time.time()) - 1)).status_code, 403)
+        otra = dict(self.firmada(), url='https://i.ibb.co/prueba/otra.png')
+        self.assertEqual(self.pedir(**otra).status_code, 403)
+
+    @mock.patch('condominio.media_proxy.requests.get', return_value=_RespuestaImgbb())
+    def test_archivo_desalojado_se_vuelve_a_descargar(self, descargar):
+        response = self.pedir(**self.firmada())
+        self.assertEqual(b''.join(response.streaming_content), b'contenido')
+
+        # El LRU borra el archivo entre get() y open()
+        get = DiskLRUCache.get
+        leidos = []
+
+        def get_desalojado(cache, key):
+            meta = get(cache, key)
+            if not leidos:
+                leidos.append(key)
+                cache.remove(key)
+            return meta
+
+        with mock.patch.object(DiskLRUCache, 'get', get_desalojado):
+            response = self.pedir(**self.firmada())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'contenido')
+        self.assertEqual(descargar.call_count, 2)
+
+
+@override_settings(MEDIA_PROXY_ENABLED=True, ROOT_URLCONF='condominio.tests', ALLOWED_HOSTS=['api.condominio.com'])
+class MediaURLMixinTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(1)
+
+    def test_url_firmada_y_de_vuelta(self):
+        Mascota.objects.update(foto_url=URL)
+        mascota = Mascota.objects.select_related('propietario__user', 'propietario__unidad').get()
+        request = RequestFactory().get('/api/mascotas/', HTTP_HOST='api.condominio.com')
+        foto_url = MascotaSerializer(mascota, context={'request': request}).data['foto_url']
+        self.assertTrue(foto_url.startswith('http://api.condominio.com/api/media/proxy/?'))
+
+        # Un cliente que reenvía la URL del proxy guarda la URL original de ImgBB
+        serializer = MascotaSerializer(mascota, data={'foto_url': foto_url}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data['foto_url'], URL)
+
+
+class EliminacionImagenesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        sembrar(2)
+
+    def test_eliminar_imagenes_savepoint_revertido(self):
+        conservada, eliminada = Mascota.objects.order_by('pk')[:2]
+        for mascota in (conservada, eliminada):
+            Mascota.objects.filter(pk=mascota.pk).update(foto_delete_url=f'https://ibb.co/borrar/{mascota.pk}')
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Mascota.objects.get(pk=eliminada.pk).delete()
+            try:
+                with transaction.atomic():
+                    Mascota.objects.get(pk=conservada.pk).delete()
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(
+            list(ImagenPendienteEliminacion.objects.values_list('delete_url', flat=True)),
+            [f'https://ibb.co/borrar/{eliminada.pk}'],
+        )
+
+    @mock.patch('condominio.image_sync.delete_remote_images', side_effect=lambda urls, **_: dict.fromkeys(urls, False))
+    def test_abandonadas_se_reportan_y_purgan(self, _eliminar):
+        ImagenPendienteEliminacion.objects.create(delete_url='https://ibb.co/borrar/1', modelo='gestion.Mascota')
+        ImagenPendienteEliminacion.objects.create(delete_url='https://ibb.co/borrar/2', modelo='gestion.Mascota')
+
+        with self.assertLogs('condominio.image_sync', 'WARNING') as logs:
+            resultado = process_pending_deletions(max_attempts=1)
+        self.assertEqual((resultado['fallidas'], resultado['abandonadas']), (2, 2))
+        self.assertIn('https://ibb.co/borrar/1', logs.output[0])
+
+        # No se vuelven a intentar y no cuentan como pendientes
+        ImagenPendienteEliminacion.objects.update(proximo_intento=timezone.now())
+        self.assertEqual(process_pending_deletions(max_attempts=5)['fallidas'], 0)
+        ImagenPendienteEliminacion.objects.create(delete_url='https://ibb.co/borrar/3')
+        total = {}
+        _valores_globales(total, 1)
+        self.assertEqual(total['imagenes_pendientes_eliminacion'], {(): 1})
+        self.assertEqual(total['imagenes_eliminacion_abandonadas'], {(): 2})
+
+        ImagenPendienteEliminacion.objects.filter(delete_url='https://ibb.co/borrar/1').update(
+            abandonada=timezone.now() - timedelta(days=31)
+        )
+        with mock.patch('condominio.image_sync.delete_remote_images', return_value={'https://ibb.co/borrar/3': True}):
+            self.assertEqual(process_pending_deletions()['purgadas'], 1)
+        self.assertEqual(
+            list(ImagenPendienteEliminacion.objects.values_list('delete_url', flat=True)),
+            ['https://ibb.co/borrar/2'],
+        )
+
+
+class GenerarDatosTests(SimpleTestCase):
+    def test_requiere_debug_o_forzar_y_password(self):
+        with self.assertRaisesMessage(CommandError, '--forzar'):
+            call_command('generar_datos', '--password', 'clave')
+        with self.assertRaisesMessage(CommandError, '--password'):
+            call_command('generar_datos', '--forzar')
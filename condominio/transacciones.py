@@ -0,0 +1,94 @@
+"""
+Lotes de trabajo que se ejecutan al confirmar la transacción.
+
+Los signals que se disparan muchas veces en una transacción (eliminar
+imágenes, recalcular riesgos) acumulan sus elementos en un LoteEnCommit y
+los procesan juntos después del COMMIT:
+
+    lote_en_commit(_DeleteBatch, using).agregar(urls)
+
+Se registra un lote (y un callback on_commit) por cada savepoint con
+elementos. Si un savepoint se revierte, Django descarta sus callbacks y con
+ellos los elementos agregados dentro; los lotes que sobreviven comparten el
+conjunto de elementos ya procesados, de modo que al confirmar cada
+elemento se procesa una sola vez. Fuera de un bloque atómico el lote se
+procesa de inmediato.
+"""
+import logging
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class _Grupo:
+    """Lotes de una misma transacción; se cierra al empezar a procesarlos."""
+
+    def __init__(self):
+        self.procesados = set()
+        self.cerrado = False
+
+
+class LoteEnCommit:
+    """
+    Elementos pendientes de un savepoint. Las subclases implementan
+    procesar(elementos); los errores se registran en el log y no llegan a
+    quien confirmó la transacción.
+    """
+
+    descripcion = 'lote'
+
+    def __init__(self, grupo=None):
+        self.elementos = {}
+        self.grupo = grupo or _Grupo()
+
+    def agregar(self, elementos):
+        self.elementos.update(dict.fromkeys(elementos))
+
+    def flush(self):
+        self.grupo.cerrado = True
+        elementos = [e for e in self.elementos if e not in self.grupo.procesados]
+        self.elementos = {}
+        self.grupo.procesados.update(elementos)
+        if not elementos:
+            return
+        try:
+            self.procesar(elementos)
+        except Exception as e:
+            logger.error(f"Error al procesar {self.descripcion}: {str(e)}")
+
+    def procesar(self, elementos):
+        raise NotImplementedError
+
+
+class _Inmediato:
+    """Lote de uso único fuera de un bloque atómico."""
+
+    def __init__(self, lote):
+        self.lote = lote
+
+    def agregar(self, elementos):
+        self.lote.agregar(elementos)
+        self.lote.flush()
+
+
+def lote_en_commit(clase, using='default'):
+    """
+    Retorna el lote de `clase` del savepoint actual, registrándolo en
+    on_commit la primera vez.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        return _Inmediato(clase())
+
+    savepoints = set(connection.savepoint_ids)
+    grupo = None
+    for sids, func, _robust in connection.run_on_commit:
+        lote = getattr(func, '__self__', None)
+        if type(lote) is clase and not lote.grupo.cerrado:
+            if set(sids) == savepoints:
+                return lote
+            grupo = lote.grupo
+    lote = clase(grupo)
+    transaction.on_commit(lote.flush, using=using)
+    return lote
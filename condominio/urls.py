@@ -2,18 +2,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
-from administracion.views import UserViewSet
+from administracion.views import UserViewSet, TokenObtainAuditadoView, TokenRefreshAuditadoView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
 
     # 🔐 AUTH
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/token/', TokenObtainAuditadoView.as_view(), name='token_obtain_pair'),
+    path('api/token/refresh/', TokenRefreshAuditadoView.as_view(), name='token_refresh'),
     path('api/user/me/', UserViewSet.as_view({'get': 'me'}), name='user_me'),
 
     # ✅ PAGOS SIEMPRE ARRIBA (ANTES DE LOS path('api/', include(...)))
@@ -31,6 +27,21 @@ urlpatterns = [
     path('api/', include('mantenimiento.urls')),
 ]
 
+# Proxy local de imágenes de ImgBB (opcional)
+if settings.MEDIA_PROXY_ENABLED:
+    from condominio.media_proxy import media_proxy
+    urlpatterns += [path('api/media/proxy/', media_proxy, name='media_proxy')]
+
+# Reporte del perfilador de requests (opcional)
+if settings.PERFILADOR_HABILITADO:
+    from condominio.perfilador import ReportePerfiladorView
+    urlpatterns += [path('api/perfilador/', ReportePerfiladorView.as_view(), name='perfilador')]
+
+# Métricas Prometheus (opcional)
+if settings.METRICAS_HABILITADAS:
+    from condominio.metricas import vista_metricas
+    urlpatterns += [path('metrics', vista_metricas, name='metricas')]
+
 # Servir archivos media en desarrollo
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
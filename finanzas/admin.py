@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import ResumenFinancieroMensual
 
-# Register your models here.
+
+@admin.register(ResumenFinancieroMensual)
+class ResumenFinancieroMensualAdmin(admin.ModelAdmin):
+    list_display = ['mes', 'edificio', 'facturado', 'cobrado', 'pendiente', 'expensas_pagadas', 'expensas_vencidas', 'fecha_actualizacion']
+    list_filter = ['edificio']
+    search_fields = ['mes']
+    readonly_fields = [f.name for f in ResumenFinancieroMensual._meta.fields]
@@ -0,0 +1,38 @@
+"""
+Reconstruye o verifica el libro ResumenFinancieroMensual a partir de las
+tablas de expensas y pagos.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from finanzas.models import Expensa
+from finanzas.resumen import reconstruir, verificar
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el resumen financiero mensual o verifica su consistencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mes', action='append', dest='meses', help='Mes YYYY-MM a procesar (repetible)')
+        parser.add_argument('--desde', help='Procesar los meses con expensas desde YYYY-MM')
+        parser.add_argument('--verificar', action='store_true', help='Solo reportar diferencias, sin modificar')
+
+    def handle(self, *args, **options):
+        meses = options['meses']
+        if options['desde']:
+            meses = list(
+                Expensa.objects.filter(mes_referencia__gte=options['desde'])
+                .order_by().values_list('mes_referencia', flat=True).distinct()
+            ) + (meses or [])
+
+        if options['verificar']:
+            diferencias = verificar(meses)
+            for mes, edificio, campo, esperado, actual in diferencias:
+                self.stdout.write(self.style.ERROR(
+                    f"✗ {mes} {edificio or '-'} {campo}: esperado {esperado}, actual {actual}"
+                ))
+            if diferencias:
+                raise CommandError(f'{len(diferencias)} diferencias en el resumen financiero')
+            self.stdout.write(self.style.SUCCESS('Resumen financiero consistente'))
+            return
+
+        filas = reconstruir(meses)
+        self.stdout.write(self.style.SUCCESS(f'Resumen financiero reconstruido: {filas} filas'))
@@ -0,0 +1,80 @@
+# Generated by Django 5.1.12 on 2026-10-19 11:05
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def poblar_resumen(apps, schema_editor):
+    """Calcula el libro desde las expensas y pagos existentes (finanzas.resumen.calcular)."""
+    Expensa = apps.get_model('finanzas', 'Expensa')
+    Pago = apps.get_model('finanzas', 'Pago')
+    ResumenFinancieroMensual = apps.get_model('finanzas', 'ResumenFinancieroMensual')
+
+    hoy = timezone.now().date()
+    resultado = defaultdict(dict)
+    filas = (
+        Expensa.objects.order_by()
+        .values('mes_referencia', edificio=Coalesce(F('propietario__unidad__edificio'), Value('')))
+        .annotate(
+            facturado=Sum('monto_total'),
+            cobrado=Sum('monto_total', filter=Q(pagada=True)),
+            pendiente=Sum('monto_total', filter=Q(pagada=False)),
+            expensas_emitidas=Count('id'),
+            expensas_pagadas=Count('id', filter=Q(pagada=True)),
+            expensas_vencidas=Count('id', filter=Q(pagada=False, fecha_vencimiento__lt=hoy)),
+        )
+    )
+    for fila in filas:
+        clave = (fila.pop('mes_referencia'), fila.pop('edificio'))
+        resultado[clave].update({campo: valor or 0 for campo, valor in fila.items()})
+
+    filas = (
+        Pago.objects.filter(verificado=True).order_by()
+        .values(mes=F('expensa__mes_referencia'), edificio=Coalesce(F('expensa__propietario__unidad__edificio'), Value('')))
+        .annotate(total=Sum('monto'))
+    )
+    for fila in filas:
+        resultado[(fila['mes'], fila['edificio'])]['pagos_verificados'] = fila['total'] or Decimal('0')
+
+    ResumenFinancieroMensual.objects.bulk_create([
+        ResumenFinancieroMensual(mes=mes, edificio=edificio, **valores)
+        for (mes, edificio), valores in sorted(resultado.items())
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenFinancieroMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.CharField(max_length=7)),
+                ('edificio', models.CharField(blank=True, help_text='Vacío para unidades sin edificio o sin unidad', max_length=50)),
+                ('facturado', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cobrado', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pendiente', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('pagos_verificados', models.DecimalField(decimal_places=2, default=0, help_text='Suma de pagos verificados', max_digits=14)),
+                ('expensas_emitidas', models.IntegerField(default=0)),
+                ('expensas_pagadas', models.IntegerField(default=0)),
+                ('expensas_vencidas', models.IntegerField(default=0, help_text='Impagas con vencimiento pasado a la fecha de actualización')),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Resumen financiero mensual',
+                'verbose_name_plural': 'Resúmenes financieros mensuales',
+                'ordering': ['mes', 'edificio'],
+                'constraints': [models.UniqueConstraint(fields=('mes', 'edificio'), name='resumen_financiero_mes_edificio')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.1.12 on 2026-10-19 11:11
+
+import re
+import unicodedata
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Copia de condominio.search al crear las columnas: la migración no depende
+# del código de la aplicación, que puede cambiar después
+CONFIG_BUSQUEDA = 'spanish'
+APP = 'finanzas'
+CAMPOS = {
+    'Expensa': ('mes_referencia', 'propietario__user__first_name', 'propietario__user__last_name'),
+}
+TABLAS = ['finanzas_expensa']
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.lower().split())
+
+
+def _texto(valores):
+    partes = []
+    for valor in valores:
+        texto = _normalizar(str(valor)) if valor is not None else ''
+        if not texto:
+            continue
+        partes.append(texto)
+        compacto = re.sub(r'[\s\-.]', '', texto)
+        if compacto != texto:
+            partes.append(compacto)
+    return ' '.join(partes)
+
+
+def poblar_texto(apps, schema_editor):
+    """Calcula texto_busqueda de las filas existentes."""
+    for nombre, campos in CAMPOS.items():
+        modelo = apps.get_model(APP, nombre)
+        filas = modelo.objects.order_by('pk').values_list('pk', *campos).iterator(chunk_size=1000)
+        cambios = []
+        for pk, *valores in filas:
+            texto = _texto(valores)
+            if texto:
+                cambios.append(modelo(pk=pk, texto_busqueda=texto))
+            if len(cambios) >= 1000:
+                modelo.objects.bulk_update(cambios, ['texto_busqueda'])
+                cambios = []
+        if cambios:
+            modelo.objects.bulk_update(cambios, ['texto_busqueda'])
+
+
+def crear_indices(apps, schema_editor):
+    """Solo en PostgreSQL: pg_trgm, índices GIN y el trigger que mantiene vector_busqueda."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for tabla in TABLAS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {tabla}_texto_trgm '
+            f'ON {tabla} USING gin (texto_busqueda gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {tabla}_vector_gin ON {tabla} USING gin (vector_busqueda)'
+        )
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {tabla}_vector_busqueda ON {tabla}')
+        schema_editor.execute(
+            f'CREATE TRIGGER {tabla}_vector_busqueda BEFORE INSERT OR UPDATE OF texto_busqueda '
+            f'ON {tabla} FOR EACH ROW EXECUTE FUNCTION '
+            f"tsvector_update_trigger(vector_busqueda, 'pg_catalog.{CONFIG_BUSQUEDA}', texto_busqueda)"
+        )
+        schema_editor.execute(
+            f"UPDATE {tabla} SET vector_busqueda = to_tsvector('pg_catalog.{CONFIG_BUSQUEDA}', texto_busqueda)"
+        )
+
+
+def eliminar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for tabla in TABLAS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {tabla}_vector_busqueda ON {tabla}')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {tabla}_vector_gin')
+        schema_editor.execute(f'DROP INDEX IF EXISTS {tabla}_texto_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finanzas', '0002_resumenfinancieromensual'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expensa',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Texto normalizado para búsqueda (condominio.search)'),
+        ),
+        migrations.AddField(
+            model_name='expensa',
+            name='vector_busqueda',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(poblar_texto, migrations.RunPython.noop),
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
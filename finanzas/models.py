@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.contrib.postgres.search import SearchVectorField
 from gestion.models import Propietario
 
 class Expensa(models.Model):
@@ -13,10 +14,18 @@ class Expensa(models.Model):
     fecha_vencimiento = models.DateField()
     pagada = models.BooleanField(default=False)
     fecha_pago = models.DateTimeField(null=True, blank=True)
+    texto_busqueda = models.TextField(blank=True, default='', editable=False, help_text='Texto normalizado para búsqueda (condominio.search)')
+    vector_busqueda = SearchVectorField(null=True, editable=False)
     
     def __str__(self):
         return f"Expensa {self.mes_referencia} - {self.propietario.user.get_full_name()}"
 
+    def save(self, *args, **kwargs):
+        # pre_save bloquea la fila para leer su aporte anterior al libro
+        # financiero (finanzas.signals); el bloqueo dura hasta post_save
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
 class Pago(models.Model):
     METODO_PAGO = (
         ('tarjeta', 'Tarjeta de Crédito/Débito'),
@@ -34,3 +43,37 @@ class Pago(models.Model):
     
     def __str__(self):
         return f"Pago {self.referencia} - {self.monto}"
+
+    def save(self, *args, **kwargs):
+        # Ver Expensa.save
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class ResumenFinancieroMensual(models.Model):
+    """
+    Totales de expensas y pagos por mes y edificio, mantenidos de forma
+    incremental por los signals de Expensa y Pago (ver finanzas.resumen).
+    Los totales del mes son la suma de las filas de todos sus edificios.
+    """
+    mes = models.CharField(max_length=7)  # Formato: YYYY-MM
+    edificio = models.CharField(max_length=50, blank=True, help_text='Vacío para unidades sin edificio o sin unidad')
+    facturado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cobrado = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pendiente = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    pagos_verificados = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text='Suma de pagos verificados')
+    expensas_emitidas = models.IntegerField(default=0)
+    expensas_pagadas = models.IntegerField(default=0)
+    expensas_vencidas = models.IntegerField(default=0, help_text='Impagas con vencimiento pasado a la fecha de actualización')
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Resumen financiero mensual'
+        verbose_name_plural = 'Resúmenes financieros mensuales'
+        ordering = ['mes', 'edificio']
+        constraints = [
+            models.UniqueConstraint(fields=['mes', 'edificio'], name='resumen_financiero_mes_edificio'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes} {self.edificio or '-'}: {self.facturado}"
@@ -0,0 +1,212 @@
+"""
+Mantenimiento del libro ResumenFinancieroMensual.
+
+Cada expensa aporta a la fila (mes_referencia, edificio de la unidad del
+propietario) su monto facturado, cobrado o pendiente y sus contadores; cada
+pago verificado aporta su monto a pagos_verificados. Los signals calculan el
+aporte anterior y el nuevo de la fila modificada y aplican solo la diferencia
+con UPDATE ... SET campo = campo + delta, dentro de la misma transacción que
+el cambio cuando el llamador es atómico.
+
+Las expensas_vencidas reflejan la fecha de la última actualización, por lo
+que conviene reconstruir los meses abiertos cada noche:
+    python manage.py reconstruir_resumen_financiero --desde 2025-01
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from gestion.dashboard import invalidar_mes
+from .models import Expensa, Pago, ResumenFinancieroMensual
+
+CAMPOS_MONTO = ['facturado', 'cobrado', 'pendiente', 'pagos_verificados']
+CAMPOS_CONTADOR = ['expensas_emitidas', 'expensas_pagadas', 'expensas_vencidas']
+CAMPOS = CAMPOS_MONTO + CAMPOS_CONTADOR
+
+EDIFICIO = Coalesce(F('propietario__unidad__edificio'), Value(''))
+EDIFICIO_PAGO = Coalesce(F('expensa__propietario__unidad__edificio'), Value(''))
+
+
+def _vacio():
+    return {campo: Decimal('0') if campo in CAMPOS_MONTO else 0 for campo in CAMPOS}
+
+
+def aporte_expensa(pk, hoy=None, bloquear=False):
+    """
+    Lee la expensa y retorna ((mes, edificio), aportes) o None si no existe.
+    Con bloquear=True la lee con SELECT ... FOR UPDATE (requiere transacción),
+    para que otro guardado concurrente no aplique la misma diferencia.
+    """
+    expensas = Expensa.objects.select_for_update(of=('self',)) if bloquear else Expensa.objects
+    fila = (
+        expensas.filter(pk=pk)
+        .values('mes_referencia', 'monto_total', 'pagada', 'fecha_vencimiento', edificio=EDIFICIO)
+        .first()
+    )
+    if not fila:
+        return None
+
+    hoy = hoy or timezone.now().date()
+    monto = fila['monto_total']
+    aportes = _vacio()
+    aportes['facturado'] = monto
+    aportes['expensas_emitidas'] = 1
+    if fila['pagada']:
+        aportes['cobrado'] = monto
+        aportes['expensas_pagadas'] = 1
+    else:
+        aportes['pendiente'] = monto
+        aportes['expensas_vencidas'] = int(fila['fecha_vencimiento'] < hoy)
+    return (fila['mes_referencia'], fila['edificio']), aportes
+
+
+def aporte_pago(pk, bloquear=False):
+    """
+    Lee el pago y retorna ((mes, edificio), aportes) si está verificado,
+    None en caso contrario. bloquear como en aporte_expensa.
+    """
+    pagos = Pago.objects.select_for_update(of=('self',)) if bloquear else Pago.objects
+    fila = (
+        pagos.filter(pk=pk, verificado=True)
+        .values('monto', mes=F('expensa__mes_referencia'), edificio=EDIFICIO_PAGO)
+        .first()
+    )
+    if not fila:
+        return None
+    aportes = _vacio()
+    aportes['pagos_verificados'] = fila['monto']
+    return (fila['mes'], fila['edificio']), aportes
+
+
+def aplicar(anterior, nuevo):
+    """
+    Resta el aporte anterior y suma el nuevo en las filas del libro e
+    invalida el histórico del dashboard de los meses modificados (el del
+    aporte anterior incluido si la expensa cambió de mes).
+    Cualquiera de los dos puede ser None (alta o baja).
+    """
+    deltas = defaultdict(_vacio)
+    for aporte, signo in ((anterior, -1), (nuevo, 1)):
+        if aporte is None:
+            continue
+        clave, valores = aporte
+        for campo, valor in valores.items():
+            deltas[clave][campo] += signo * valor
+
+    with transaction.atomic():
+        for (mes, edificio), valores in deltas.items():
+            cambios = {campo: F(campo) + valor for campo, valor in valores.items() if valor}
+            if not cambios:
+                continue
+            ResumenFinancieroMensual.objects.get_or_create(mes=mes, edificio=edificio)
+            ResumenFinancieroMensual.objects.filter(mes=mes, edificio=edificio).update(
+                fecha_actualizacion=timezone.now(), **cambios
+            )
+            invalidar_mes(mes)
+
+
+def calcular(meses=None, hoy=None):
+    """
+    Calcula el libro desde las tablas de expensas y pagos con dos consultas
+    agrupadas. Retorna {(mes, edificio): valores}.
+    """
+    hoy = hoy or timezone.now().date()
+    expensas = Expensa.objects.all()
+    pagos = Pago.objects.filter(verificado=True)
+    if meses is not None:
+        expensas = expensas.filter(mes_referencia__in=meses)
+        pagos = pagos.filter(expensa__mes_referencia__in=meses)
+
+    resultado = defaultdict(_vacio)
+    filas = (
+        expensas.order_by()
+        .values('mes_referencia', edificio=EDIFICIO)
+        .annotate(
+            facturado=Sum('monto_total'),
+            cobrado=Sum('monto_total', filter=Q(pagada=True)),
+            pendiente=Sum('monto_total', filter=Q(pagada=False)),
+            expensas_emitidas=Count('id'),
+            expensas_pagadas=Count('id', filter=Q(pagada=True)),
+            expensas_vencidas=Count('id', filter=Q(pagada=False, fecha_vencimiento__lt=hoy)),
+        )
+    )
+    for fila in filas:
+        valores = resultado[(fila['mes_referencia'], fila['edificio'])]
+        for campo in CAMPOS:
+            if campo in fila:
+                valores[campo] = fila[campo] or valores[campo]
+
+    filas = (
+        pagos.order_by()
+        .values(mes=F('expensa__mes_referencia'), edificio=EDIFICIO_PAGO)
+        .annotate(total=Sum('monto'))
+    )
+    for fila in filas:
+        resultado[(fila['mes'], fila['edificio'])]['pagos_verificados'] = fila['total'] or Decimal('0')
+
+    return dict(resultado)
+
+
+def reconstruir(meses=None):
+    """
+    Reemplaza las filas del libro (de los meses indicados o de todos)
+    por los valores calculados desde las tablas de origen.
+
+    Returns:
+        Cantidad de filas creadas
+    """
+    calculado = calcular(meses)
+    with transaction.atomic():
+        filas = ResumenFinancieroMensual.objects.all()
+        if meses is not None:
+            filas = filas.filter(mes__in=meses)
+        afectados = set(filas.values_list('mes', flat=True)) | {mes for mes, _edificio in calculado}
+        filas.delete()
+        ResumenFinancieroMensual.objects.bulk_create([
+            ResumenFinancieroMensual(mes=mes, edificio=edificio, **valores)
+            for (mes, edificio), valores in sorted(calculado.items())
+        ])
+    for mes in afectados:
+        invalidar_mes(mes)
+    return len(calculado)
+
+
+def verificar(meses=None):
+    """
+    Compara el libro con los valores calculados desde las tablas de origen.
+
+    Returns:
+        Lista de (mes, edificio, campo, esperado, actual) con las diferencias
+    """
+    calculado = calcular(meses)
+    filas = ResumenFinancieroMensual.objects.all()
+    if meses is not None:
+        filas = filas.filter(mes__in=meses)
+    actual = {(f['mes'], f['edificio']): f for f in filas.values('mes', 'edificio', *CAMPOS)}
+
+    diferencias = []
+    for clave in sorted(set(calculado) | set(actual)):
+        esperado = calculado.get(clave, _vacio())
+        fila = actual.get(clave, _vacio())
+        for campo in CAMPOS:
+            if esperado[campo] != fila[campo]:
+                diferencias.append((*clave, campo, esperado[campo], fila[campo]))
+    return diferencias
+
+
+def totales_por_mes(meses):
+    """
+    Totales de cada mes sumando sus edificios, leídos del libro.
+    Retorna {mes: valores} solo para los meses con filas.
+    """
+    filas = (
+        ResumenFinancieroMensual.objects.filter(mes__in=meses)
+        .order_by()
+        .values('mes')
+        .annotate(**{f'total_{campo}': Sum(campo) for campo in CAMPOS})
+    )
+    return {fila['mes']: {campo: fila[f'total_{campo}'] for campo in CAMPOS} for fila in filas}
@@ -0,0 +1,92 @@
+"""
+Signals que mantienen ResumenFinancieroMensual al guardar o eliminar
+expensas y pagos. Ver finanzas.resumen.
+"""
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from gestion.models import UnidadHabitacional
+from .models import Expensa, Pago
+from .resumen import aplicar, aporte_expensa, aporte_pago, reconstruir
+
+
+@receiver(pre_save, sender=Expensa, dispatch_uid='resumen_expensa_pre_save')
+@receiver(pre_delete, sender=Expensa, dispatch_uid='resumen_expensa_pre_delete')
+def capturar_aporte_expensa(sender, instance, raw=False, **kwargs):
+    """
+    Guarda en la instancia el aporte que tenía antes del cambio, bloqueando
+    la fila dentro de la transacción de Expensa.save (o del borrado).
+    """
+    if raw:
+        return
+    instance._aporte_resumen = aporte_expensa(instance.pk, bloquear=True) if instance.pk else None
+
+
+@receiver(post_save, sender=Expensa, dispatch_uid='resumen_expensa_post_save')
+def actualizar_resumen_expensa(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    aplicar(getattr(instance, '_aporte_resumen', None), aporte_expensa(instance.pk))
+
+
+@receiver(post_delete, sender=Expensa, dispatch_uid='resumen_expensa_post_delete')
+def descontar_resumen_expensa(sender, instance, **kwargs):
+    aplicar(getattr(instance, '_aporte_resumen', None), None)
+
+
+@receiver(pre_save, sender=Pago, dispatch_uid='resumen_pago_pre_save')
+@receiver(pre_delete, sender=Pago, dispatch_uid='resumen_pago_pre_delete')
+def capturar_aporte_pago(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance._aporte_resumen = aporte_pago(instance.pk, bloquear=True) if instance.pk else None
+
+
+@receiver(post_save, sender=Pago, dispatch_uid='resumen_pago_post_save')
+def actualizar_resumen_pago(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    aplicar(getattr(instance, '_aporte_resumen', None), aporte_pago(instance.pk))
+
+
+@receiver(post_delete, sender=Pago, dispatch_uid='resumen_pago_post_delete')
+def descontar_resumen_pago(sender, instance, **kwargs):
+    aplicar(getattr(instance, '_aporte_resumen', None), None)
+
+
+@receiver(pre_save, sender=UnidadHabitacional, dispatch_uid='resumen_unidad_pre_save')
+def capturar_edificio_unidad(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {'edificio', 'propietario'} & set(update_fields):
+        instance._edificio_anterior = {'edificio': instance.edificio, 'propietario_id': instance.propietario_id}
+        return
+    anterior = UnidadHabitacional.objects.filter(pk=instance.pk).values('edificio', 'propietario_id').first() if instance.pk else None
+    instance._edificio_anterior = anterior or {'edificio': '', 'propietario_id': instance.propietario_id}
+
+
+@receiver(post_save, sender=UnidadHabitacional, dispatch_uid='resumen_unidad_post_save')
+@receiver(post_delete, sender=UnidadHabitacional, dispatch_uid='resumen_unidad_post_delete')
+def reasignar_edificio_unidad(sender, instance, raw=False, **kwargs):
+    """
+    Si cambia el edificio o el propietario de la unidad, reconstruye los
+    meses con expensas de los propietarios afectados.
+    """
+    if raw:
+        return
+    anterior = getattr(instance, '_edificio_anterior', None)
+    eliminada = 'created' not in kwargs
+    if anterior and not eliminada and anterior == {'edificio': instance.edificio, 'propietario_id': instance.propietario_id}:
+        return
+    propietarios = {instance.propietario_id}
+    if anterior:
+        propietarios.add(anterior['propietario_id'])
+    meses = list(
+        Expensa.objects.filter(propietario_id__in=propietarios)
+        .order_by().values_list('mes_referencia', flat=True).distinct()
+    )
+    if meses:
+        # Al confirmar, para que en borrados en cascada ya se hayan
+        # descontado las expensas eliminadas del mismo propietario
+        transaction.on_commit(lambda: reconstruir(meses))
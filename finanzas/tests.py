@@ -1,3 +1,15 @@
-from django.test import TestCase
+from condominio.pruebas import ConsultasAcotadasTestCase
+from finanzas.models import Expensa, Pago
 
-# Create your tests here.
+
+class ConsultasFinanzasTests(ConsultasAcotadasTestCase):
+    def test_expensas(self):
+        self.assertConsultasAcotadas('/api/expensas/', 1)
+        self.assertConsultasMaximas(f'/api/expensas/{Expensa.objects.first().pk}/', 1)
+
+    def test_pagos(self):
+        self.assertConsultasAcotadas('/api/pagos/', 1)
+        self.assertConsultasMaximas(f'/api/pagos/{Pago.objects.first().pk}/', 1)
+
+    def test_verificar_pago(self):
+        self.assertConsultasMaximas(f'/api/pagos/{Pago.objects.first().pk}/verificar/', 20, metodo='post')
@@ -3,15 +3,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from condominio.search import BusquedaFilter
+from django.db import transaction
+from django.utils import timezone
 from .models import Expensa, Pago
 from .serializers import ExpensaSerializer, PagoSerializer
 
 
 class ExpensaViewSet(viewsets.ModelViewSet):
-    queryset = Expensa.objects.all().select_related('propietario__user', 'propietario__unidad')
+    queryset = Expensa.objects.all().select_related('propietario__user', 'propietario__unidad').defer('texto_busqueda', 'vector_busqueda')
     serializer_class = ExpensaSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BusquedaFilter, filters.OrderingFilter]
     filterset_fields = ['propietario', 'pagada', 'mes_referencia']
     search_fields = ['mes_referencia', 'propietario__user__first_name', 'propietario__user__last_name']
     ordering_fields = ['fecha_emision', 'fecha_vencimiento', 'monto_total']
@@ -31,14 +34,17 @@ class PagoViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def verificar(self, request, pk=None):
         pago = self.get_object()
-        pago.verificado = True
-        pago.save()
         
-        # Marcar expensa como pagada
-        expensa = pago.expensa
-        expensa.pagada = True
-        from django.utils import timezone
-        expensa.fecha_pago = timezone.now()
-        expensa.save()
+        # El pago, la expensa y el resumen financiero se actualizan juntos
+        with transaction.atomic():
+            pago = Pago.objects.select_for_update().get(pk=pago.pk)
+            pago.verificado = True
+            pago.save(update_fields=['verificado'])
+            
+            # Marcar expensa como pagada
+            expensa = Expensa.objects.select_for_update().get(pk=pago.expensa_id)
+            expensa.pagada = True
+            expensa.fecha_pago = timezone.now()
+            expensa.save(update_fields=['pagada', 'fecha_pago'])
         
         return Response({'status': 'Pago verificado'}, status=status.HTTP_200_OK)
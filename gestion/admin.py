@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Propietario, UnidadHabitacional, Vehiculo, Mascota
+from .models import Propietario, UnidadHabitacional, Vehiculo, Mascota, PrediccionFinanciera, RiesgoPropietario
 
 
 @admin.register(Propietario)
@@ -44,3 +44,17 @@ class MascotaAdmin(admin.ModelAdmin):
     def get_propietario(self, obj):
         return obj.propietario.user.get_full_name()
     get_propietario.short_description = 'Propietario'
+
+
+@admin.register(PrediccionFinanciera)
+class PrediccionFinancieraAdmin(admin.ModelAdmin):
+    list_display = ['fecha_calculo', 'horizonte', 'meses_historia', 'duracion_ms']
+    readonly_fields = ['fecha_calculo', 'horizonte', 'meses_historia', 'duracion_ms', 'datos']
+
+
+@admin.register(RiesgoPropietario)
+class RiesgoPropietarioAdmin(admin.ModelAdmin):
+    list_display = ['propietario', 'puntaje', 'nivel', 'expensas_impagas', 'deuda_total', 'accesos_denegados', 'reportes_abiertos', 'fecha_actualizacion']
+    list_filter = ['nivel']
+    search_fields = ['propietario__user__first_name', 'propietario__user__last_name', 'propietario__documento_identidad']
+    list_select_related = ['propietario__user']
@@ -0,0 +1,166 @@
+"""
+Cálculo y caché de los datos de los endpoints del dashboard.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+import logging
+
+logger = logging.getLogger(__name__)
+
+RESUMEN_TTL = 300
+# Los meses cerrados se invalidan al cambiar el libro financiero; el TTL
+# acota el desfase cuando el cambio llega por update()/bulk_create o desde
+# otro proceso con una caché por proceso (LocMemCache)
+HISTORICO_MES_TTL = 60 * 60
+
+# Contadores del proceso para observar la efectividad de la caché
+stats = {'hits': 0, 'misses': 0, 'query_ms_total': 0.0}
+
+
+def count_many(**querysets):
+    """
+    Cuenta varios querysets en una sola consulta:
+    SELECT (SELECT COUNT(*) FROM (...)), (SELECT COUNT(*) FROM (...)), ...
+
+    Returns:
+        Dict {alias: cantidad}
+    """
+    partes = []
+    params = []
+    for alias, queryset in querysets.items():
+        sql, sql_params = queryset.order_by().values('pk').query.sql_with_params()
+        partes.append(f'(SELECT COUNT(*) FROM ({sql}) AS {alias}_q)')
+        params.extend(sql_params)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(partes)}", params)
+        fila = cursor.fetchone()
+    return dict(zip(querysets.keys(), fila))
+
+
+def resumen_cache_key(fecha=None):
+    fecha = fecha or timezone.now().date()
+    return f'dashboard:resumen:{fecha.isoformat()}'
+
+
+def calcular_resumen():
+    """Calcula los totales del resumen general con una sola consulta."""
+    from finanzas.models import Expensa
+    from mantenimiento.models import Reporte
+    from seguridad.models import Visita
+    from .models import Propietario, UnidadHabitacional, Vehiculo
+
+    hoy = timezone.now().date()
+    return count_many(
+        total_unidades=UnidadHabitacional.objects.all(),
+        total_propietarios=Propietario.objects.all(),
+        total_vehiculos=Vehiculo.objects.all(),
+        expensas_pendientes=Expensa.objects.filter(pagada=False),
+        reportes_pendientes=Reporte.objects.filter(estado='pendiente'),
+        visitas_hoy=Visita.objects.filter(fecha_visita=hoy, estado='programada'),
+    )
+
+
+def get_resumen():
+    """
+    Retorna el resumen desde la caché, calculándolo si no está.
+
+    Returns:
+        Tupla (datos, hit, query_ms)
+    """
+    key = resumen_cache_key()
+    datos = cache.get(key)
+    if datos is not None:
+        stats['hits'] += 1
+        return datos, True, 0.0
+
+    inicio = time.perf_counter()
+    datos = calcular_resumen()
+    query_ms = (time.perf_counter() - inicio) * 1000
+
+    cache.set(key, datos, RESUMEN_TTL)
+    stats['misses'] += 1
+    stats['query_ms_total'] += query_ms
+    return datos, False, query_ms
+
+
+def invalidar_resumen():
+    cache.delete(resumen_cache_key())
+
+
+def meses_hasta(fecha, cantidad):
+    """
+    Lista de meses calendario 'YYYY-MM' terminando en el mes de `fecha`,
+    del más antiguo al más reciente.
+    """
+    indice = fecha.year * 12 + fecha.month - 1
+    return [
+        f'{i // 12:04d}-{i % 12 + 1:02d}'
+        for i in range(indice - cantidad + 1, indice + 1)
+    ]
+
+
+def mes_cache_key(mes):
+    return f'dashboard:finanzas:mes:{mes}'
+
+
+def calcular_meses(meses):
+    """
+    Facturado, cobrado y morosidad de varios meses leyendo el libro
+    ResumenFinancieroMensual (una fila por mes y edificio).
+    """
+    from finanzas.resumen import totales_por_mes
+
+    totales = totales_por_mes(meses)
+    return {mes: _datos_mes(mes, totales.get(mes)) for mes in meses}
+
+
+def _datos_mes(mes, fila):
+    if not fila:
+        return {'mes': mes, 'facturado': 0.0, 'cobrado': 0.0, 'total_expensas': 0, 'expensas_pagadas': 0, 'tasa_morosidad': 0}
+    total = fila['expensas_emitidas']
+    pagadas = fila['expensas_pagadas']
+    return {
+        'mes': mes,
+        'facturado': float(fila['facturado'] or 0),
+        'cobrado': float(fila['cobrado'] or 0),
+        'total_expensas': total,
+        'expensas_pagadas': pagadas,
+        'tasa_morosidad': round((total - pagadas) / total * 100, 2) if total else 0,
+    }
+
+
+def get_historico_finanzas(cantidad):
+    """
+    Histórico mensual de los últimos `cantidad` meses calendario.
+
+    Los meses cerrados se guardan en caché por HISTORICO_MES_TTL y se
+    invalidan cuando cambia su fila del libro financiero; el mes en curso
+    se calcula siempre. Todos los meses faltantes se calculan en la
+    misma consulta.
+    """
+    meses = meses_hasta(timezone.now(), cantidad)
+    mes_actual = meses[-1]
+
+    cacheados = cache.get_many([mes_cache_key(m) for m in meses[:-1]])
+    datos = {m: cacheados[mes_cache_key(m)] for m in meses[:-1] if mes_cache_key(m) in cacheados}
+    faltantes = [m for m in meses if m not in datos]
+
+    calculados = calcular_meses(faltantes)
+    cache.set_many({mes_cache_key(m): calculados[m] for m in faltantes if m != mes_actual}, HISTORICO_MES_TTL)
+    datos.update(calculados)
+
+    return [datos[m] for m in meses]
+
+
+def invalidar_mes(mes):
+    """
+    Borra el mes ahora y al confirmar la transacción, para que un request
+    concurrente no vuelva a cachear los valores anteriores al cambio.
+    """
+    clave = mes_cache_key(mes)
+    cache.delete(clave)
+    transaction.on_commit(lambda: cache.delete(clave))
@@ -0,0 +1,419 @@
+"""
+Importación masiva de propietarios, unidades y vehículos desde CSV o XLSX.
+
+Las filas se leen en streaming y se procesan por lotes:
+1. Cada fila se valida con las reglas de los modelos (full_clean sin
+   consultas de unicidad).
+2. Los duplicados se resuelven con una consulta por lote y tabla
+   (documentos, usernames y placas existentes) y con los valores ya vistos
+   en el archivo. Los usernames que se generan se asignan para todo el lote
+   con GestorUsuarios.generar_usernames_unicos.
+3. Las contraseñas se calculan en paralelo (administracion.credenciales).
+4. User, PerfilUsuario, Propietario, UnidadHabitacional y Vehiculo se
+   insertan con bulk_create dentro de una transacción por lote. Si el lote
+   choca con una restricción de unicidad (otra importación concurrente),
+   se reintenta fila por fila y se reportan solo las filas que fallan.
+
+Columnas (la primera fila es el encabezado): first_name (o nombre),
+last_name (o apellido), documento_identidad (o ci), telefono, email,
+username, password, unidad, edificio, tipo_unidad, piso, placa, marca,
+modelo, color, tipo_vehiculo, anio. Sin username ni password se usa el
+documento de identidad, como en el alta individual; si ese username ya
+está tomado se le agrega el primer sufijo libre (documento2, ...).
+"""
+import csv
+import io
+import time
+import unicodedata
+
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .models import Propietario, UnidadHabitacional, Vehiculo
+
+ALIAS_COLUMNAS = {
+    'nombre': 'first_name',
+    'nombres': 'first_name',
+    'apellido': 'last_name',
+    'apellidos': 'last_name',
+    'documento': 'documento_identidad',
+    'ci': 'documento_identidad',
+    'carnet': 'documento_identidad',
+    'correo': 'email',
+    'numero_unidad': 'unidad',
+    'ano': 'anio',
+}
+
+
+def normalizar_columna(nombre):
+    nombre = unicodedata.normalize('NFKD', str(nombre or '')).encode('ascii', 'ignore').decode()
+    nombre = '_'.join(nombre.strip().lower().split())
+    return ALIAS_COLUMNAS.get(nombre, nombre)
+
+
+def leer_filas(archivo, nombre_archivo):
+    """
+    Itera las filas de un archivo CSV o XLSX como (numero_fila, dict).
+    El número de fila es el del archivo (el encabezado es la fila 1).
+    """
+    if nombre_archivo.lower().endswith('.xlsx'):
+        yield from _leer_xlsx(archivo)
+    else:
+        yield from _leer_csv(archivo)
+
+
+def _leer_csv(archivo):
+    texto = archivo if isinstance(archivo, io.TextIOBase) else io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+
+    lector = csv.reader(texto, dialecto)
+    encabezado = [normalizar_columna(c) for c in next(lector, [])]
+    for numero, valores in enumerate(lector, start=2):
+        if any(v.strip() for v in valores):
+            yield numero, dict(zip(encabezado, (v.strip() for v in valores)))
+
+
+def _leer_xlsx(archivo):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError('Para importar archivos XLSX instala openpyxl (pip install openpyxl)')
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezado = [normalizar_columna(c) for c in next(filas, ())]
+        for numero, valores in enumerate(filas, start=2):
+            valores = ['' if v is None else str(v).strip() for v in valores]
+            if any(valores):
+                yield numero, dict(zip(encabezado, valores))
+    finally:
+        libro.close()
+
+
+def _errores(excepcion):
+    return {campo: ' '.join(mensajes) for campo, mensajes in excepcion.message_dict.items()}
+
+
+def _entero(fila, campo, errores):
+    valor = fila.get(campo, '')
+    if not valor:
+        return None
+    try:
+        return int(float(valor))
+    except ValueError:
+        errores[campo] = 'Debe ser un número entero.'
+        return None
+
+
+def validar_fila(fila):
+    """
+    Construye (sin guardar) las instancias de una fila y las valida.
+
+    Returns:
+        (datos, errores): datos con user, password, propietario, unidad y
+        vehiculo; errores como {campo: mensaje}
+    """
+    errores = {}
+    documento = fila.get('documento_identidad', '')
+
+    user = User(
+        username=fila.get('username') or documento,
+        email=fila.get('email', ''),
+        first_name=fila.get('first_name', ''),
+        last_name=fila.get('last_name', ''),
+    )
+    propietario = Propietario(documento_identidad=documento, telefono=fila.get('telefono', ''))
+    unidad = None
+    vehiculo = None
+
+    if not user.first_name:
+        errores['first_name'] = 'Este campo es obligatorio.'
+
+    if fila.get('unidad'):
+        unidad = UnidadHabitacional(
+            numero=fila['unidad'],
+            edificio=fila.get('edificio', ''),
+            tipo=fila.get('tipo_unidad') or 'departamento',
+            piso=_entero(fila, 'piso', errores),
+        )
+
+    if fila.get('placa'):
+        vehiculo = Vehiculo(
+            placa=fila['placa'].upper(),
+            marca=fila.get('marca', ''),
+            modelo=fila.get('modelo', ''),
+            color=fila.get('color', ''),
+            tipo=fila.get('tipo_vehiculo') or None,
+            año=_entero(fila, 'anio', errores),
+        )
+
+    validaciones = [
+        (user, ['password']),
+        (propietario, ['user']),
+        (unidad, ['propietario']),
+        (vehiculo, ['propietario', 'unidad']),
+    ]
+    for instancia, excluir in validaciones:
+        if instancia is None:
+            continue
+        try:
+            instancia.full_clean(exclude=excluir, validate_unique=False)
+        except ValidationError as e:
+            for campo, mensaje in _errores(e).items():
+                errores.setdefault(campo, mensaje)
+
+    datos = {
+        'user': user,
+        'username_generado': not fila.get('username'),
+        'password': fila.get('password') or documento,
+        'propietario': propietario,
+        'unidad': unidad,
+        'vehiculo': vehiculo,
+    }
+    return datos, errores
+
+
+class Importador:
+    """
+    Importa filas por lotes y acumula el reporte.
+
+    Args:
+        tamano_lote: Filas por lote (consultas de duplicados e inserción)
+        procesos: Procesos para calcular contraseñas (por defecto, todos los núcleos)
+        solo_validar: Valida y busca duplicados sin guardar nada
+    """
+
+    def __init__(self, tamano_lote=500, procesos=None, solo_validar=False):
+        self.tamano_lote = tamano_lote
+        self.procesos = procesos
+        self.solo_validar = solo_validar
+        self.documentos = set()
+        self.usernames = set()
+        self.placas = set()
+        self.reporte = {
+            'total_filas': 0,
+            'validos': 0,
+            'creados': 0,
+            'omitidos': 0,
+            'con_errores': 0,
+            'errores': [],
+            'omitidas': [],
+        }
+        self._rol = None
+
+    def importar(self, filas):
+        """
+        Procesa todas las filas y retorna el reporte.
+        """
+        inicio = time.perf_counter()
+        lote = []
+        for numero, fila in filas:
+            self.reporte['total_filas'] += 1
+            lote.append((numero, fila))
+            if len(lote) >= self.tamano_lote:
+                self._procesar_lote(lote)
+                lote = []
+        if lote:
+            self._procesar_lote(lote)
+
+        if self.reporte['creados']:
+            from .dashboard import invalidar_resumen
+            invalidar_resumen()
+
+        self.reporte['duracion_s'] = round(time.perf_counter() - inicio, 2)
+        return self.reporte
+
+    def _error(self, numero, fila, errores):
+        self.reporte['con_errores'] += 1
+        self.reporte['errores'].append({
+            'fila': numero,
+            'documento_identidad': fila.get('documento_identidad', ''),
+            'errores': errores,
+        })
+
+    def _procesar_lote(self, lote):
+        validas = []
+        for numero, fila in lote:
+            datos, errores = validar_fila(fila)
+            if errores:
+                self._error(numero, fila, errores)
+            else:
+                validas.append((numero, fila, datos))
+
+        documentos = [d['propietario'].documento_identidad for _, _, d in validas]
+        usernames = [d['user'].username for _, _, d in validas if not d['username_generado']]
+        placas = [d['vehiculo'].placa for _, _, d in validas if d['vehiculo']]
+
+        documentos_existentes = set(
+            Propietario.objects.filter(documento_identidad__in=documentos).values_list('documento_identidad', flat=True)
+        )
+        usernames_existentes = set(
+            User.objects.filter(username__in=usernames).values_list('username', flat=True)
+        ) if usernames else set()
+        placas_existentes = set(
+            Vehiculo.objects.filter(placa__in=placas).values_list('placa', flat=True)
+        ) if placas else set()
+
+        pendientes = []
+        for numero, fila, datos in validas:
+            documento = datos['propietario'].documento_identidad
+            if documento in documentos_existentes:
+                self.reporte['omitidos'] += 1
+                self.reporte['omitidas'].append({
+                    'fila': numero, 'documento_identidad': documento, 'motivo': 'El propietario ya existe',
+                })
+            else:
+                pendientes.append((numero, fila, datos))
+        self._asignar_usernames([datos for _, _, datos in pendientes])
+
+        nuevas = []
+        for numero, fila, datos in pendientes:
+            documento = datos['propietario'].documento_identidad
+            username = datos['user'].username
+            placa = datos['vehiculo'].placa if datos['vehiculo'] else None
+
+            errores = {}
+            if documento in self.documentos:
+                errores['documento_identidad'] = 'Duplicado en el archivo.'
+            if username in usernames_existentes:
+                errores['username'] = 'Ya existe un usuario con este username.'
+            elif username in self.usernames:
+                errores['username'] = 'Duplicado en el archivo.'
+            if placa and placa in placas_existentes:
+                errores['placa'] = 'Ya existe un vehículo con esta placa.'
+            elif placa and placa in self.placas:
+                errores['placa'] = 'Duplicada en el archivo.'
+
+            self.documentos.add(documento)
+            self.usernames.add(username)
+            if placa:
+                self.placas.add(placa)
+
+            if errores:
+                self._error(numero, fila, errores)
+            else:
+                nuevas.append((numero, fila, datos))
+
+        self.reporte['validos'] += len(nuevas)
+        if not nuevas or self.solo_validar:
+            return
+
+        from administracion.credenciales import hashear_passwords
+
+        # Las contraseñas se calculan fuera de la transacción
+        hashes = hashear_passwords([datos['password'] for _, _, datos in nuevas], self.procesos)
+        for (_, _, datos), password in zip(nuevas, hashes):
+            datos['user'].password = password
+
+        try:
+            self._insertar([datos for _, _, datos in nuevas])
+        except IntegrityError:
+            self._insertar_por_fila(nuevas)
+            return
+        except Exception as e:
+            self.reporte['validos'] -= len(nuevas)
+            for numero, fila, _ in nuevas:
+                self._error(numero, fila, {'__all__': f'No se pudo guardar el lote: {str(e)}'})
+            return
+        self.reporte['creados'] += len(nuevas)
+
+    def _asignar_usernames(self, filas):
+        """
+        Asigna a las filas sin username uno libre a partir del documento,
+        con una consulta por prefijo para todo el lote.
+        """
+        from administracion.services import GestorUsuarios
+
+        generadas = [datos for datos in filas if datos['username_generado']]
+        if not generadas:
+            return
+        reservados = self.usernames | {datos['user'].username for datos in filas if not datos['username_generado']}
+        usernames = GestorUsuarios.generar_usernames_unicos(
+            [datos['user'].username for datos in generadas], reservados
+        )
+        for datos, username in zip(generadas, usernames):
+            datos['user'].username = username
+
+    def _insertar_por_fila(self, nuevas):
+        """Inserta cada fila en su propia transacción y reporta las que fallan."""
+        for numero, fila, datos in nuevas:
+            # El bulk_create revertido pudo dejar asignadas las claves primarias
+            for instancia in (datos['user'], datos['propietario'], datos['unidad'], datos['vehiculo']):
+                if instancia is not None:
+                    instancia.pk = None
+                    instancia._state.adding = True
+            try:
+                self._insertar([datos])
+            except IntegrityError as e:
+                self.reporte['validos'] -= 1
+                self._error(numero, fila, {'__all__': f'No se pudo guardar la fila: {str(e)}'})
+            else:
+                self.reporte['creados'] += 1
+
+    def _get_rol(self):
+        from administracion.models import Rol
+
+        if self._rol is None:
+            self._rol, _ = Rol.objects.get_or_create(
+                nombre='PROPIETARIO',
+                defaults={
+                    'descripcion': 'Propietario de unidad habitacional',
+                    'django_group': Group.objects.get_or_create(name='Propietarios')[0]
+                }
+            )
+        return self._rol
+
+    def _insertar(self, filas):
+        from administracion.models import PerfilUsuario
+        from condominio.search import get_spec, reindexar
+
+        rol = self._get_rol()
+        with transaction.atomic():
+            users = User.objects.bulk_create([datos['user'] for datos in filas])
+            User.groups.through.objects.bulk_create([
+                User.groups.through(user_id=user.pk, group_id=rol.django_group_id) for user in users
+            ])
+
+            for datos, user in zip(filas, users):
+                datos['propietario'].user = user
+            propietarios = Propietario.objects.bulk_create([datos['propietario'] for datos in filas])
+
+            PerfilUsuario.objects.bulk_create([
+                PerfilUsuario(
+                    user=datos['user'],
+                    rol=rol,
+                    propietario=datos['propietario'],
+                    telefono=datos['propietario'].telefono,
+                    creado_automaticamente=True,
+                    cambio_password_requerido=True,
+                )
+                for datos in filas
+            ])
+
+            unidades = []
+            for datos in filas:
+                if datos['unidad']:
+                    datos['unidad'].propietario = datos['propietario']
+                    unidades.append(datos['unidad'])
+            UnidadHabitacional.objects.bulk_create(unidades)
+
+            vehiculos = []
+            for datos in filas:
+                if datos['vehiculo']:
+                    datos['vehiculo'].propietario = datos['propietario']
+                    datos['vehiculo'].unidad = datos['unidad']
+                    vehiculos.append(datos['vehiculo'])
+            Vehiculo.objects.bulk_create(vehiculos)
+
+            # bulk_create no envía signals: texto de búsqueda en lote
+            for modelo, instancias in ((Propietario, propietarios), (UnidadHabitacional, unidades), (Vehiculo, vehiculos)):
+                if instancias:
+                    reindexar(modelo, get_spec(modelo).campos, Q(pk__in=[i.pk for i in instancias]))
@@ -0,0 +1,29 @@
+"""
+Entrena el motor de predicciones y guarda el resultado para el dashboard.
+Pensado para ejecutarse cada noche (cron).
+"""
+from django.core.management.base import BaseCommand
+from gestion.predicciones import generar
+
+
+class Command(BaseCommand):
+    help = 'Calcula las predicciones de cobranza y las guarda para dashboard_predicciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizonte', type=int, default=6, help='Meses a proyectar')
+        parser.add_argument('--historia', type=int, default=36, help='Meses de historia para entrenar')
+        parser.add_argument('--conservar', type=int, default=30, help='Predicciones anteriores a conservar')
+
+    def handle(self, *args, **options):
+        prediccion = generar(
+            horizonte=options['horizonte'],
+            meses_historia=options['historia'],
+            conservar=options['conservar'],
+        )
+        datos = prediccion.datos
+        self.stdout.write(
+            f"Ingresos proyectados ({datos['horizonte']} meses): {datos['ingresos_proyectados']}, "
+            f"morosidad esperada: {datos['morosidad_esperada']}%, "
+            f"propietarios en riesgo: {datos['total_en_riesgo']}"
+        )
+        self.stdout.write(self.style.SUCCESS(f'Predicciones calculadas en {prediccion.duracion_ms:.0f} ms'))
@@ -0,0 +1,50 @@
+"""
+Importa propietarios, unidades y vehículos desde un archivo CSV o XLSX.
+
+Uso:
+    python manage.py importar_propietarios torre_b.csv
+    python manage.py importar_propietarios torre_b.xlsx --validar --reporte errores.json
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from gestion.importacion import Importador, leer_filas
+
+
+class Command(BaseCommand):
+    help = 'Importa propietarios, unidades y vehículos en lote desde CSV o XLSX'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo .csv o .xlsx')
+        parser.add_argument('--batch-size', type=int, default=500, help='Filas por lote')
+        parser.add_argument('--procesos', type=int, default=None, help='Procesos para calcular contraseñas (por defecto, todos los núcleos)')
+        parser.add_argument('--validar', action='store_true', help='Solo validar, sin guardar')
+        parser.add_argument('--reporte', help='Guardar el reporte completo en este archivo JSON')
+
+    def handle(self, *args, **options):
+        importador = Importador(
+            tamano_lote=options['batch_size'],
+            procesos=options['procesos'],
+            solo_validar=options['validar'],
+        )
+        try:
+            with open(options['archivo'], 'rb') as archivo:
+                reporte = importador.importar(leer_filas(archivo, options['archivo']))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in reporte['errores'][:50]:
+            detalle = '; '.join(f'{campo}: {mensaje}' for campo, mensaje in error['errores'].items())
+            self.stdout.write(self.style.ERROR(f"✗ Fila {error['fila']} ({error['documento_identidad']}): {detalle}"))
+        if len(reporte['errores']) > 50:
+            self.stdout.write(f"... y {len(reporte['errores']) - 50} filas más con errores")
+
+        if options['reporte']:
+            with open(options['reporte'], 'w', encoding='utf-8') as f:
+                json.dump(reporte, f, indent=2, ensure_ascii=False)
+
+        self.stdout.write(
+            f"Filas: {reporte['total_filas']}, válidas: {reporte['validos']}, creadas: {reporte['creados']}, "
+            f"omitidas (ya existían): {reporte['omitidos']}, con errores: {reporte['con_errores']}"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Importación completada en {reporte['duracion_s']} s"))
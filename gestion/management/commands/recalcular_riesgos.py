@@ -0,0 +1,22 @@
+"""
+Recalcula la tabla de riesgo de todos los propietarios (o de algunos).
+Pensado para ejecutarse cada noche (cron).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from gestion.riesgos import recalcular
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los indicadores y el puntaje de riesgo de los propietarios'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--propietario', type=int, action='append', dest='propietarios', help='ID de propietario (repetible)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Propietarios por lote')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        total = recalcular(options['propietarios'], tamano_lote=options['batch_size'])
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(f'Riesgo recalculado para {total} propietarios en {duracion:.1f} s'))
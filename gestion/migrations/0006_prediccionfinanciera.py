@@ -0,0 +1,29 @@
+# Generated by Django 5.1.12 on 2026-10-19 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0005_propietario_meses_mora_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrediccionFinanciera',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_calculo', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('horizonte', models.PositiveIntegerField(help_text='Meses proyectados')),
+                ('meses_historia', models.PositiveIntegerField(help_text='Meses de historia usados para entrenar')),
+                ('duracion_ms', models.FloatField(default=0)),
+                ('datos', models.JSONField(default=dict)),
+            ],
+            options={
+                'verbose_name': 'Predicción financiera',
+                'verbose_name_plural': 'Predicciones financieras',
+                'ordering': ['-fecha_calculo'],
+            },
+        ),
+    ]
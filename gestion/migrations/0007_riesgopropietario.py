@@ -0,0 +1,119 @@
+# Generated by Django 5.1.12 on 2026-10-19 11:09
+
+from datetime import timedelta
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+# Copia de gestion.riesgos al crear la tabla: (peso, tope) por indicador
+PESOS = {
+    'expensas_vencidas': (35, 6),
+    'dias_mora': (25, 180),
+    'deuda_total': (20, 5000),
+    'accesos_denegados': (10, 5),
+    'reportes_abiertos': (10, 3),
+}
+
+
+def poblar_riesgos(apps, schema_editor):
+    """Calcula el riesgo de todos los propietarios existentes (gestion.riesgos.recalcular)."""
+    Propietario = apps.get_model('gestion', 'Propietario')
+    RiesgoPropietario = apps.get_model('gestion', 'RiesgoPropietario')
+    Expensa = apps.get_model('finanzas', 'Expensa')
+    Reporte = apps.get_model('mantenimiento', 'Reporte')
+    PlateRecognitionLog = apps.get_model('seguridad', 'PlateRecognitionLog')
+
+    hoy = timezone.localdate()
+    indicadores = {
+        pk: {
+            'expensas_impagas': 0, 'expensas_vencidas': 0, 'vencimiento_mas_antiguo': None,
+            'deuda_total': Decimal('0'), 'accesos_denegados': 0, 'reportes_abiertos': 0,
+        }
+        for pk in Propietario.objects.values_list('pk', flat=True)
+    }
+    if not indicadores:
+        return
+
+    filas = (
+        Expensa.objects.filter(pagada=False).order_by().values('propietario_id')
+        .annotate(
+            impagas=Count('id'),
+            vencidas=Count('id', filter=Q(fecha_vencimiento__lt=hoy)),
+            mas_antiguo=Min('fecha_vencimiento'),
+            deuda=Sum('monto_total'),
+        )
+    )
+    for fila in filas:
+        datos = indicadores[fila['propietario_id']]
+        datos['expensas_impagas'] = fila['impagas']
+        datos['expensas_vencidas'] = fila['vencidas']
+        datos['vencimiento_mas_antiguo'] = fila['mas_antiguo']
+        datos['deuda_total'] = fila['deuda'] or Decimal('0')
+
+    filas = (
+        PlateRecognitionLog.objects.filter(
+            unidad__isnull=False,
+            acceso_permitido=False,
+            fecha_reconocimiento__gte=timezone.now() - timedelta(days=90),
+        )
+        .order_by().values('unidad__propietario_id').annotate(total=Count('id'))
+    )
+    for fila in filas:
+        indicadores[fila['unidad__propietario_id']]['accesos_denegados'] = fila['total']
+
+    filas = (
+        Reporte.objects.filter(estado__in=['pendiente', 'en_proceso'])
+        .order_by().values('propietario_id').annotate(total=Count('id'))
+    )
+    for fila in filas:
+        indicadores[fila['propietario_id']]['reportes_abiertos'] = fila['total']
+
+    riesgos = []
+    for pk, datos in indicadores.items():
+        vencimiento = datos['vencimiento_mas_antiguo']
+        valores = dict(datos, dias_mora=(hoy - vencimiento).days if vencimiento and vencimiento < hoy else 0)
+        puntaje = round(sum(
+            peso * min(float(valores[campo] or 0) / tope, 1) for campo, (peso, tope) in PESOS.items()
+        ), 2)
+        nivel = 'alto' if puntaje >= 60 else 'medio' if puntaje >= 30 else 'bajo'
+        riesgos.append(RiesgoPropietario(propietario_id=pk, puntaje=puntaje, nivel=nivel, **datos))
+    RiesgoPropietario.objects.bulk_create(riesgos, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0006_prediccionfinanciera'),
+        ('finanzas', '0001_initial'),
+        ('mantenimiento', '0002_alter_reporte_descripcion_alter_reporte_propietario_and_more'),
+        ('seguridad', '0002_platerecognitionlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RiesgoPropietario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('expensas_impagas', models.IntegerField(default=0)),
+                ('expensas_vencidas', models.IntegerField(default=0)),
+                ('vencimiento_mas_antiguo', models.DateField(blank=True, help_text='Vencimiento de la expensa impaga más antigua', null=True)),
+                ('deuda_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('accesos_denegados', models.IntegerField(default=0, help_text='Reconocimientos de placa denegados en los últimos días')),
+                ('reportes_abiertos', models.IntegerField(default=0)),
+                ('puntaje', models.FloatField(default=0, help_text='0-100')),
+                ('nivel', models.CharField(choices=[('bajo', 'Bajo'), ('medio', 'Medio'), ('alto', 'Alto')], default='bajo', max_length=10)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('propietario', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='riesgo', to='gestion.propietario')),
+            ],
+            options={
+                'verbose_name': 'Riesgo de propietario',
+                'verbose_name_plural': 'Riesgos de propietarios',
+                'ordering': ['-puntaje'],
+                'indexes': [models.Index(fields=['-puntaje'], name='riesgo_puntaje_idx'), models.Index(fields=['nivel', '-puntaje'], name='riesgo_nivel_puntaje_idx'), models.Index(fields=['expensas_impagas'], name='riesgo_impagas_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_riesgos, migrations.RunPython.noop),
+    ]
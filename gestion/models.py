@@ -1,7 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from condominio.dirty_fields import DirtyFieldsMixin
 
-class Propietario(models.Model):
+class Propietario(DirtyFieldsMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     documento_identidad = models.CharField(max_length=20, unique=True)
     telefono = models.CharField(max_length=15)
@@ -11,10 +13,13 @@ class Propietario(models.Model):
     meses_mora = models.IntegerField(default=0, help_text='Cantidad de meses en mora')
     restringido_por_mora = models.BooleanField(default=False, help_text='Restricción de acceso por mora')
     
+    texto_busqueda = models.TextField(blank=True, default='', editable=False, help_text='Texto normalizado para búsqueda (condominio.search)')
+    vector_busqueda = SearchVectorField(null=True, editable=False)
+    
     def __str__(self):
         return f"{self.user.get_full_name()} - {self.documento_identidad}"
 
-class UnidadHabitacional(models.Model):
+class UnidadHabitacional(DirtyFieldsMixin, models.Model):
     TIPO_UNIDAD = (
         ('casa', 'Casa'),
         ('departamento', 'Departamento'),
@@ -27,11 +32,13 @@ class UnidadHabitacional(models.Model):
     tipo = models.CharField(max_length=20, choices=TIPO_UNIDAD)
     piso = models.IntegerField(null=True, blank=True)
     caracteristicas = models.TextField(blank=True)
+    texto_busqueda = models.TextField(blank=True, default='', editable=False, help_text='Texto normalizado para búsqueda (condominio.search)')
+    vector_busqueda = SearchVectorField(null=True, editable=False)
     
     def __str__(self):
         return f"{self.tipo} {self.numero} - {self.edificio}"
 
-class Vehiculo(models.Model):
+class Vehiculo(DirtyFieldsMixin, models.Model):
     TIPO_VEHICULO_CHOICES = [
         ('sedan', 'Sedán'),
         ('suv', 'SUV'),
@@ -57,6 +64,8 @@ class Vehiculo(models.Model):
     foto_vehiculo_url = models.URLField(max_length=500, blank=True, null=True, help_text='URL de foto en ImgBB')
     foto_vehiculo_delete_url = models.URLField(max_length=500, blank=True, null=True, help_text='URL para eliminar foto de ImgBB')
     activo = models.BooleanField(default=True)
+    texto_busqueda = models.TextField(blank=True, default='', editable=False, help_text='Texto normalizado para búsqueda (condominio.search)')
+    vector_busqueda = SearchVectorField(null=True, editable=False)
     fecha_registro = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -65,7 +74,7 @@ class Vehiculo(models.Model):
     def __str__(self):
         return f"{self.placa} - {self.marca} {self.modelo}"
 
-class Mascota(models.Model):
+class Mascota(DirtyFieldsMixin, models.Model):
     TIPO_MASCOTA = (
         ('perro', 'Perro'),
         ('gato', 'Gato'),
@@ -84,3 +93,62 @@ class Mascota(models.Model):
     
     def __str__(self):
         return f"{self.nombre} - {self.tipo}"
+
+
+class PrediccionFinanciera(models.Model):
+    """
+    Resultado precalculado del motor de predicciones (gestion.predicciones).
+    Lo genera cada noche el comando calcular_predicciones y el endpoint
+    dashboard_predicciones lee la fila más reciente.
+    """
+    fecha_calculo = models.DateTimeField(auto_now_add=True, db_index=True)
+    horizonte = models.PositiveIntegerField(help_text='Meses proyectados')
+    meses_historia = models.PositiveIntegerField(help_text='Meses de historia usados para entrenar')
+    duracion_ms = models.FloatField(default=0)
+    datos = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['-fecha_calculo']
+        verbose_name = 'Predicción financiera'
+        verbose_name_plural = 'Predicciones financieras'
+
+    def __str__(self):
+        return f"Predicción {self.fecha_calculo:%Y-%m-%d %H:%M} ({self.horizonte} meses)"
+
+
+class RiesgoPropietario(models.Model):
+    """
+    Indicadores de riesgo por propietario, mantenidos por gestion.riesgos:
+    se recalculan por propietario cuando cambian sus expensas, pagos,
+    reportes o accesos denegados, y completos con el comando
+    recalcular_riesgos.
+    """
+    NIVEL_CHOICES = (
+        ('bajo', 'Bajo'),
+        ('medio', 'Medio'),
+        ('alto', 'Alto'),
+    )
+
+    propietario = models.OneToOneField(Propietario, on_delete=models.CASCADE, related_name='riesgo')
+    expensas_impagas = models.IntegerField(default=0)
+    expensas_vencidas = models.IntegerField(default=0)
+    vencimiento_mas_antiguo = models.DateField(null=True, blank=True, help_text='Vencimiento de la expensa impaga más antigua')
+    deuda_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    accesos_denegados = models.IntegerField(default=0, help_text='Reconocimientos de placa denegados en los últimos días')
+    reportes_abiertos = models.IntegerField(default=0)
+    puntaje = models.FloatField(default=0, help_text='0-100')
+    nivel = models.CharField(max_length=10, choices=NIVEL_CHOICES, default='bajo')
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-puntaje']
+        verbose_name = 'Riesgo de propietario'
+        verbose_name_plural = 'Riesgos de propietarios'
+        indexes = [
+            models.Index(fields=['-puntaje'], name='riesgo_puntaje_idx'),
+            models.Index(fields=['nivel', '-puntaje'], name='riesgo_nivel_puntaje_idx'),
+            models.Index(fields=['expensas_impagas'], name='riesgo_impagas_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.propietario_id} - {self.nivel} ({self.puntaje:.1f})"
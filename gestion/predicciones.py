@@ -0,0 +1,270 @@
+"""
+Motor de predicciones de cobranza para el dashboard.
+
+Carga el historial de expensas en arreglos de NumPy con una sola consulta y
+ajusta, de forma vectorizada:
+
+- Por propietario: la probabilidad de pagar con atraso (o no pagar) una
+  expensa vencida y el atraso promedio en días. Las observaciones pesan
+  menos cuanto más antiguas son (vida media VIDA_MEDIA_MESES) y se suavizan
+  hacia la tasa global del condominio para propietarios con poca historia.
+- Del condominio: la tendencia lineal del monto facturado por mes.
+
+Con eso proyecta ingresos, morosidad esperada y propietarios en riesgo para
+los próximos meses. El resultado se guarda en PrediccionFinanciera con el
+comando calcular_predicciones para que el endpoint solo lea una fila.
+"""
+import time
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+VIDA_MEDIA_MESES = 6
+PESO_PREVIO = 3.0          # observaciones equivalentes de la tasa global
+UMBRAL_RIESGO = 0.5
+MAX_EN_RIESGO = 20
+MESES_ACTIVO = 3           # meses sin expensas para considerar inactivo a un propietario
+
+
+def indice_mes(mes):
+    """'YYYY-MM' -> número de mes absoluto."""
+    return int(mes[:4]) * 12 + int(mes[5:7]) - 1
+
+
+def nombre_mes(indice):
+    return f'{indice // 12:04d}-{indice % 12 + 1:02d}'
+
+
+def cargar_historial(desde_mes):
+    """
+    Carga las expensas desde `desde_mes` (índice absoluto) en arreglos.
+
+    Returns:
+        Dict de arreglos: propietario, mes, monto, vencimiento, pago
+        (ordinales de fecha; pago = -1 si no está pagada) y pagada
+    """
+    from finanzas.models import Expensa
+
+    filas = Expensa.objects.filter(mes_referencia__gte=nombre_mes(desde_mes)).values_list(
+        'propietario_id', 'mes_referencia', 'monto_total', 'fecha_vencimiento', 'pagada', 'fecha_pago'
+    ).order_by()
+
+    propietario, mes, monto, vencimiento, pagada, pago = [], [], [], [], [], []
+    for prop_id, mes_ref, monto_total, fecha_venc, esta_pagada, fecha_pago in filas.iterator(chunk_size=5000):
+        propietario.append(prop_id)
+        mes.append(indice_mes(mes_ref))
+        monto.append(float(monto_total))
+        vencimiento.append(fecha_venc.toordinal())
+        pagada.append(esta_pagada)
+        pago.append(timezone.localdate(fecha_pago).toordinal() if esta_pagada and fecha_pago else -1)
+
+    return {
+        'propietario': np.array(propietario, dtype=np.int64),
+        'mes': np.array(mes, dtype=np.int64),
+        'monto': np.array(monto, dtype=np.float64),
+        'vencimiento': np.array(vencimiento, dtype=np.int64),
+        'pagada': np.array(pagada, dtype=bool),
+        'pago': np.array(pago, dtype=np.int64),
+    }
+
+
+def ajustar_propietarios(h, hoy, mes_actual):
+    """
+    Modelo de atraso por propietario.
+
+    Returns:
+        (ids, probabilidad_mora, atraso_promedio, deuda, facturacion_mensual, tasa_global)
+    """
+    ids, inv = np.unique(h['propietario'], return_inverse=True)
+    n = len(ids)
+
+    hoy_ord = hoy.toordinal()
+    # Expensas pagadas sin fecha de pago se consideran pagadas al vencimiento
+    pago = np.where(h['pagada'] & (h['pago'] < 0), h['vencimiento'], h['pago'])
+    evaluable = h['pagada'] | (h['vencimiento'] < hoy_ord)
+    atraso = np.where(h['pagada'], pago - h['vencimiento'], hoy_ord - h['vencimiento'])
+    atraso = np.clip(atraso, 0, None)
+    tarde = atraso > 0
+
+    peso = np.power(0.5, (mes_actual - h['mes']) / VIDA_MEDIA_MESES) * evaluable
+    peso_total = np.bincount(inv, weights=peso, minlength=n)
+    peso_tarde = np.bincount(inv, weights=peso * tarde, minlength=n)
+    peso_atraso = np.bincount(inv, weights=peso * atraso, minlength=n)
+
+    tasa_global = peso_tarde.sum() / peso.sum() if peso.sum() else 0.0
+    atraso_global = peso_atraso.sum() / peso.sum() if peso.sum() else 0.0
+
+    probabilidad = (peso_tarde + PESO_PREVIO * tasa_global) / (peso_total + PESO_PREVIO)
+    atraso_promedio = (peso_atraso + PESO_PREVIO * atraso_global) / (peso_total + PESO_PREVIO)
+
+    deuda = np.bincount(inv, weights=h['monto'] * ~h['pagada'], minlength=n)
+    recientes = h['mes'] > mes_actual - MESES_ACTIVO
+    facturacion = np.bincount(inv, weights=h['monto'] * recientes, minlength=n) / MESES_ACTIVO
+
+    return ids, probabilidad, atraso_promedio, deuda, facturacion, tasa_global
+
+
+def tendencia_facturacion(h, desde_mes, mes_actual, horizonte):
+    """
+    Serie mensual de facturado/cobrado y proyección lineal del facturado.
+
+    Returns:
+        (facturado, cobrado, proyeccion) con la serie desde `desde_mes`
+    """
+    largo = mes_actual - desde_mes + 1
+    posicion = h['mes'] - desde_mes
+    validos = (posicion >= 0) & (posicion < largo)
+    facturado = np.bincount(posicion[validos], weights=h['monto'][validos], minlength=largo)
+    cobrado = np.bincount(posicion[validos], weights=(h['monto'] * h['pagada'])[validos], minlength=largo)
+
+    # Ajustar solo con los meses que tienen facturación (el mes en curso
+    # puede no haberse emitido todavía)
+    con_datos = np.flatnonzero(facturado)
+    futuros = np.arange(largo, largo + horizonte)
+    if len(con_datos) >= 3:
+        pendiente, ordenada = np.polyfit(con_datos, facturado[con_datos], 1)
+        proyeccion = np.clip(ordenada + pendiente * futuros, 0, None)
+    else:
+        proyeccion = np.full(horizonte, facturado[con_datos].mean() if len(con_datos) else 0.0)
+    return facturado, cobrado, proyeccion
+
+
+def clasificar_tendencia(facturado, cobrado, meses=6):
+    """Pendiente de la tasa de cobro de los últimos meses en puntos por mes."""
+    con_datos = facturado[-meses:] > 0
+    if con_datos.sum() < 3:
+        return 'estable'
+    tasa = (cobrado[-meses:][con_datos] / facturado[-meses:][con_datos]) * 100
+    pendiente = np.polyfit(np.arange(len(tasa)), tasa, 1)[0]
+    if pendiente > 1:
+        return 'mejorando'
+    if pendiente < -1:
+        return 'empeorando'
+    return 'estable'
+
+
+def calcular_predicciones(horizonte=6, meses_historia=36, hoy=None):
+    """
+    Entrena los modelos y retorna las predicciones como dict serializable.
+    """
+    from .models import Propietario, UnidadHabitacional
+
+    hoy = hoy or timezone.localdate()
+    mes_actual = hoy.year * 12 + hoy.month - 1
+    desde_mes = mes_actual - meses_historia + 1
+
+    h = cargar_historial(desde_mes)
+    ids, probabilidad, atraso, deuda, facturacion, tasa_global = ajustar_propietarios(h, hoy, mes_actual)
+    facturado, cobrado, proyeccion = tendencia_facturacion(h, desde_mes, mes_actual, horizonte)
+
+    activos = facturacion > 0
+    base = facturacion[activos].sum()
+    tasa_cobro = float((facturacion[activos] * (1 - probabilidad[activos])).sum() / base) if base else 1 - tasa_global
+    morosos_esperados = float(probabilidad[activos].sum())
+
+    proyectados = []
+    for k, monto in enumerate(proyeccion):
+        ingresos = float(monto) * tasa_cobro
+        proyectados.append({
+            'mes': nombre_mes(mes_actual + 1 + k),
+            'facturado': round(float(monto), 2),
+            'ingresos': round(ingresos, 2),
+            'morosidad': round(float(monto) - ingresos, 2),
+        })
+
+    en_riesgo = np.flatnonzero(activos & (probabilidad >= UMBRAL_RIESGO))
+    total_en_riesgo = len(en_riesgo)
+    en_riesgo = en_riesgo[np.argsort(-probabilidad[en_riesgo], kind='stable')][:MAX_EN_RIESGO]
+    nombres = {
+        p.pk: p.user.get_full_name() or p.user.username
+        for p in Propietario.objects.filter(pk__in=ids[en_riesgo].tolist()).select_related('user')
+    }
+    propietarios_riesgo = [
+        {
+            'propietario_id': int(ids[i]),
+            'nombre': nombres.get(int(ids[i]), ''),
+            'probabilidad_mora': round(float(probabilidad[i]), 3),
+            'atraso_promedio_dias': round(float(atraso[i]), 1),
+            'deuda_pendiente': round(float(deuda[i]), 2),
+        }
+        for i in en_riesgo
+    ]
+
+    total_unidades = UnidadHabitacional.objects.count()
+    unidades_activas = UnidadHabitacional.objects.filter(propietario_id__in=ids[activos].tolist()).count()
+
+    tendencia = clasificar_tendencia(facturado, cobrado)
+    morosidad_pct = round((1 - tasa_cobro) * 100, 2)
+    alertas = []
+    if tendencia == 'empeorando':
+        alertas.append('La tasa de cobro viene bajando en los últimos meses')
+    if morosidad_pct > 20:
+        alertas.append(f'Morosidad esperada de {morosidad_pct}% para los próximos meses')
+    if total_en_riesgo:
+        alertas.append(f'{total_en_riesgo} propietarios con alta probabilidad de mora')
+    if len(proyeccion) > 1 and proyeccion[-1] < proyeccion[0] * 0.9:
+        alertas.append('La facturación proyectada disminuye más de 10%')
+
+    return {
+        'generado': timezone.now().isoformat(),
+        'horizonte': horizonte,
+        'tendencia_pagos': tendencia,
+        'ocupacion_proyectada': round(unidades_activas / total_unidades * 100, 2) if total_unidades else 0,
+        'ingresos_proyectados': round(sum(p['ingresos'] for p in proyectados), 2),
+        'morosidad_esperada': morosidad_pct,
+        'morosos_esperados': round(morosos_esperados, 1),
+        'proyeccion': proyectados,
+        'total_en_riesgo': total_en_riesgo,
+        'propietarios_en_riesgo': propietarios_riesgo,
+        'alertas_futuras': alertas,
+    }
+
+
+def generar(horizonte=6, meses_historia=36, conservar=30):
+    """
+    Calcula y guarda las predicciones, conservando las últimas `conservar`.
+
+    Returns:
+        PrediccionFinanciera creada
+    """
+    from .models import PrediccionFinanciera
+
+    inicio = time.perf_counter()
+    datos = calcular_predicciones(horizonte, meses_historia)
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+
+    with transaction.atomic():
+        prediccion = PrediccionFinanciera.objects.create(
+            horizonte=horizonte,
+            meses_historia=meses_historia,
+            duracion_ms=duracion_ms,
+            datos=datos,
+        )
+        antiguas = PrediccionFinanciera.objects.values_list('pk', flat=True)[conservar:]
+        PrediccionFinanciera.objects.filter(pk__in=list(antiguas)).delete()
+    return prediccion
+
+
+def ultima_prediccion():
+    """
+    Lee la predicción más reciente, o None si todavía no hay ninguna. El
+    request nunca entrena el modelo: eso lo hace calcular_predicciones.
+    """
+    from .models import PrediccionFinanciera
+
+    return PrediccionFinanciera.objects.only('datos', 'fecha_calculo').first()
+
+
+def prediccion_pendiente():
+    """Respuesta del dashboard mientras no se haya calculado ninguna predicción."""
+    return {
+        'pendiente': True,
+        'mensaje': 'Las predicciones todavía no se calcularon (python manage.py calcular_predicciones)',
+        'generado': None,
+        'fecha_calculo': None,
+        'tendencia_pagos': None,
+        'proyeccion': [],
+        'propietarios_en_riesgo': [],
+        'alertas_futuras': [],
+    }
@@ -0,0 +1,252 @@
+"""
+Cálculo de la tabla RiesgoPropietario.
+
+recalcular(ids) obtiene los indicadores de los propietarios indicados con
+tres consultas agrupadas (expensas, accesos denegados y reportes), calcula
+el puntaje y guarda todas las filas con un solo upsert. Los signals de
+gestion.signals acumulan los propietarios modificados en la transacción y
+los recalculan al confirmar; el comando recalcular_riesgos recorre todos
+los propietarios por lotes (por ejemplo cada noche, para actualizar los
+días de mora y la ventana de accesos denegados).
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from condominio.transacciones import LoteEnCommit, lote_en_commit
+
+DIAS_ACCESOS = 90
+ESTADOS_REPORTE_ABIERTO = ['pendiente', 'en_proceso']
+
+# Peso de cada indicador en el puntaje (suman 100) y valor con el que
+# el indicador alcanza su peso completo
+PESOS = {
+    'expensas_vencidas': (35, 6),
+    'dias_mora': (25, 180),
+    'deuda_total': (20, 5000),
+    'accesos_denegados': (10, 5),
+    'reportes_abiertos': (10, 3),
+}
+UMBRAL_ALTO = 60
+UMBRAL_MEDIO = 30
+
+CAMPOS = [
+    'expensas_impagas', 'expensas_vencidas', 'vencimiento_mas_antiguo', 'deuda_total',
+    'accesos_denegados', 'reportes_abiertos', 'puntaje', 'nivel',
+]
+
+
+def calcular_puntaje(indicadores, hoy):
+    """Retorna (puntaje, nivel) a partir de los indicadores de un propietario."""
+    valores = dict(indicadores)
+    vencimiento = indicadores.get('vencimiento_mas_antiguo')
+    valores['dias_mora'] = (hoy - vencimiento).days if vencimiento and vencimiento < hoy else 0
+
+    puntaje = sum(
+        peso * min(float(valores[campo] or 0) / tope, 1)
+        for campo, (peso, tope) in PESOS.items()
+    )
+    nivel = 'alto' if puntaje >= UMBRAL_ALTO else 'medio' if puntaje >= UMBRAL_MEDIO else 'bajo'
+    return round(puntaje, 2), nivel
+
+
+def calcular_indicadores(propietario_ids, hoy=None):
+    """
+    Indicadores de los propietarios indicados con una consulta por tabla.
+
+    Returns:
+        Dict {propietario_id: indicadores}
+    """
+    from finanzas.models import Expensa
+    from mantenimiento.models import Reporte
+    from seguridad.models import PlateRecognitionLog
+
+    hoy = hoy or timezone.localdate()
+    indicadores = {
+        pk: {
+            'expensas_impagas': 0, 'expensas_vencidas': 0, 'vencimiento_mas_antiguo': None,
+            'deuda_total': Decimal('0'), 'accesos_denegados': 0, 'reportes_abiertos': 0,
+        }
+        for pk in propietario_ids
+    }
+
+    filas = (
+        Expensa.objects.filter(propietario_id__in=propietario_ids, pagada=False)
+        .order_by()
+        .values('propietario_id')
+        .annotate(
+            impagas=Count('id'),
+            vencidas=Count('id', filter=Q(fecha_vencimiento__lt=hoy)),
+            mas_antiguo=Min('fecha_vencimiento'),
+            deuda=Sum('monto_total'),
+        )
+    )
+    for fila in filas:
+        datos = indicadores[fila['propietario_id']]
+        datos['expensas_impagas'] = fila['impagas']
+        datos['expensas_vencidas'] = fila['vencidas']
+        datos['vencimiento_mas_antiguo'] = fila['mas_antiguo']
+        datos['deuda_total'] = fila['deuda'] or Decimal('0')
+
+    desde = timezone.now() - timedelta(days=DIAS_ACCESOS)
+    filas = (
+        PlateRecognitionLog.objects.filter(
+            unidad__propietario_id__in=propietario_ids,
+            acceso_permitido=False,
+            fecha_reconocimiento__gte=desde,
+        )
+        .order_by()
+        .values('unidad__propietario_id')
+        .annotate(total=Count('id'))
+    )
+    for fila in filas:
+        indicadores[fila['unidad__propietario_id']]['accesos_denegados'] = fila['total']
+
+    filas = (
+        Reporte.objects.filter(propietario_id__in=propietario_ids, estado__in=ESTADOS_REPORTE_ABIERTO)
+        .order_by()
+        .values('propietario_id')
+        .annotate(total=Count('id'))
+    )
+    for fila in filas:
+        indicadores[fila['propietario_id']]['reportes_abiertos'] = fila['total']
+
+    return indicadores
+
+
+def recalcular(propietario_ids=None, tamano_lote=1000):
+    """
+    Recalcula y guarda el riesgo de los propietarios indicados (o de todos).
+
+    Returns:
+        Cantidad de propietarios actualizados
+    """
+    from .models import Propietario, RiesgoPropietario
+
+    hoy = timezone.localdate()
+    existentes = Propietario.objects.order_by('pk').values_list('pk', flat=True)
+    if propietario_ids is not None:
+        existentes = existentes.filter(pk__in=list(propietario_ids))
+
+    total = 0
+    lote = []
+    for pk in existentes.iterator(chunk_size=tamano_lote):
+        lote.append(pk)
+        if len(lote) >= tamano_lote:
+            total += _guardar_lote(lote, hoy, RiesgoPropietario)
+            lote = []
+    if lote:
+        total += _guardar_lote(lote, hoy, RiesgoPropietario)
+    return total
+
+
+def _guardar_lote(propietario_ids, hoy, RiesgoPropietario):
+    filas = []
+    for pk, indicadores in calcular_indicadores(propietario_ids, hoy).items():
+        puntaje, nivel = calcular_puntaje(indicadores, hoy)
+        filas.append(RiesgoPropietario(propietario_id=pk, puntaje=puntaje, nivel=nivel, **indicadores))
+
+    RiesgoPropietario.objects.bulk_create(
+        filas,
+        update_conflicts=True,
+        unique_fields=['propietario'],
+        update_fields=CAMPOS + ['fecha_actualizacion'],
+    )
+    return len(filas)
+
+
+class _RecalculoPendiente(LoteEnCommit):
+    """Propietarios modificados en una transacción, recalculados al confirmar."""
+
+    descripcion = 'el recálculo de riesgos de propietarios'
+
+    def procesar(self, propietarios):
+        recalcular(propietarios)
+
+
+def programar_recalculo(*propietario_ids, using='default'):
+    """
+    Programa el recálculo de los propietarios al confirmar la transacción
+    actual, o lo ejecuta de inmediato fuera de un bloque atómico.
+    """
+    ids = {pk for pk in propietario_ids if pk}
+    if ids:
+        lote_en_commit(_RecalculoPendiente, using).agregar(ids)
+
+
+def ranking(limite=10, puntaje_minimo=None, nivel=None):
+    """Propietarios de mayor riesgo, leídos de la tabla de riesgos por su índice."""
+    from .models import RiesgoPropietario
+
+    filas = RiesgoPropietario.objects.order_by('-puntaje')
+    if puntaje_minimo is not None:
+        filas = filas.filter(puntaje__gte=puntaje_minimo)
+    if nivel:
+        filas = filas.filter(nivel=nivel)
+    filas = filas.values(
+        'propietario_id', 'propietario__user__first_name', 'propietario__user__last_name',
+        'propietario__unidad__numero', 'propietario__unidad__edificio', *CAMPOS,
+    )[:limite]
+
+    hoy = timezone.localdate()
+    return [_a_dict(fila, hoy) for fila in filas]
+
+
+def detalle(propietario_id):
+    """
+    Riesgo de un propietario con sus expensas impagas, reportes abiertos
+    y accesos denegados recientes. Retorna None si no tiene fila de riesgo.
+    """
+    from finanzas.models import Expensa
+    from mantenimiento.models import Reporte
+    from seguridad.models import PlateRecognitionLog
+    from .models import RiesgoPropietario
+
+    fila = RiesgoPropietario.objects.filter(propietario_id=propietario_id).values(
+        'propietario_id', 'propietario__user__first_name', 'propietario__user__last_name',
+        'propietario__unidad__numero', 'propietario__unidad__edificio', *CAMPOS,
+    ).first()
+    if not fila:
+        return None
+
+    datos = _a_dict(fila, timezone.localdate())
+    datos['expensas'] = list(
+        Expensa.objects.filter(propietario_id=propietario_id, pagada=False)
+        .order_by('fecha_vencimiento')
+        .values('id', 'mes_referencia', 'monto_total', 'fecha_vencimiento')[:24]
+    )
+    datos['reportes'] = list(
+        Reporte.objects.filter(propietario_id=propietario_id, estado__in=ESTADOS_REPORTE_ABIERTO)
+        .order_by('-prioridad', '-fecha_reporte')
+        .values('id', 'titulo', 'tipo', 'estado', 'prioridad', 'fecha_reporte')[:20]
+    )
+    datos['accesos'] = list(
+        PlateRecognitionLog.objects.filter(
+            unidad__propietario_id=propietario_id,
+            acceso_permitido=False,
+            fecha_reconocimiento__gte=timezone.now() - timedelta(days=DIAS_ACCESOS),
+        )
+        .values('id', 'plate_number', 'tipo_acceso', 'fecha_reconocimiento')[:20]
+    )
+    return datos
+
+
+def _a_dict(fila, hoy):
+    vencimiento = fila['vencimiento_mas_antiguo']
+    nombre = f"{fila['propietario__user__first_name']} {fila['propietario__user__last_name']}".strip()
+    return {
+        'propietario_id': fila['propietario_id'],
+        'nombre': nombre,
+        'unidad': fila['propietario__unidad__numero'],
+        'edificio': fila['propietario__unidad__edificio'],
+        'puntaje': fila['puntaje'],
+        'nivel': fila['nivel'],
+        'expensas_impagas': fila['expensas_impagas'],
+        'expensas_vencidas': fila['expensas_vencidas'],
+        'dias_mora': (hoy - vencimiento).days if vencimiento and vencimiento < hoy else 0,
+        'deuda_total': float(fila['deuda_total']),
+        'accesos_denegados': fila['accesos_denegados'],
+        'reportes_abiertos': fila['reportes_abiertos'],
+    }
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from .models import Propietario, UnidadHabitacional, Vehiculo, Mascota
+from condominio.media_proxy import MediaURLMixin
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -49,13 +50,16 @@ class PropietarioSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         # Actualizar usuario si se proporcionan datos
         user = instance.user
-        if 'email' in validated_data:
-            user.email = validated_data.pop('email')
-        if 'first_name' in validated_data:
-            user.first_name = validated_data.pop('first_name')
-        if 'last_name' in validated_data:
-            user.last_name = validated_data.pop('last_name')
-        user.save()
+        campos_user = [
+            campo for campo in ('email', 'first_name', 'last_name')
+            if campo in validated_data and getattr(user, campo) != validated_data[campo]
+        ]
+        for campo in ('email', 'first_name', 'last_name'):
+            valor = validated_data.pop(campo, None)
+            if campo in campos_user:
+                setattr(user, campo, valor)
+        if campos_user:
+            user.save(update_fields=campos_user)
         
         # Actualizar propietario
         return super().update(instance, validated_data)
@@ -78,7 +82,7 @@ class UnidadHabitacionalSerializer(serializers.ModelSerializer):
         return value
 
 
-class VehiculoSerializer(serializers.ModelSerializer):
+class VehiculoSerializer(MediaURLMixin, serializers.ModelSerializer):
     propietario_nombre = serializers.CharField(source='propietario.user.get_full_name', read_only=True)
     unidad_numero = serializers.CharField(source='propietario.unidad.numero', read_only=True)
     tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
@@ -91,11 +95,11 @@ class VehiculoSerializer(serializers.ModelSerializer):
         read_only_fields = ['fecha_registro']
 
 
-class MascotaSerializer(serializers.ModelSerializer):
+class MascotaSerializer(MediaURLMixin, serializers.ModelSerializer):
     propietario_nombre = serializers.CharField(source='propietario.user.get_full_name', read_only=True)
     unidad = serializers.CharField(source='propietario.unidad.numero', read_only=True)
     
     class Meta:
         model = Mascota
         fields = ['id', 'propietario', 'propietario_nombre', 'unidad',
-                  'nombre', 'tipo', 'raza', 'descripcion']
+                  'nombre', 'tipo', 'raza', 'foto_url', 'fecha_registro']
@@ -0,0 +1,77 @@
+"""
+Signals para invalidar la caché del dashboard, mantener los riesgos de
+propietarios y el texto de búsqueda cuando cambian los datos.
+"""
+from django.db.models.signals import pre_save, post_save, post_delete
+
+from finanzas.models import Expensa, Pago
+from mantenimiento.models import Reporte
+from seguridad.models import PlateRecognitionLog, Visita
+from .models import Propietario, UnidadHabitacional, Vehiculo
+from .dashboard import invalidar_resumen
+from .riesgos import programar_recalculo
+from condominio.search import connect_signals as connect_busqueda
+
+MODELOS_RESUMEN = [UnidadHabitacional, Propietario, Vehiculo, Expensa, Reporte, Visita]
+
+
+def invalidar_cache_resumen(sender, **kwargs):
+    """Invalida el resumen del dashboard al crear, editar o eliminar filas."""
+    invalidar_resumen()
+
+
+for modelo in MODELOS_RESUMEN:
+    post_save.connect(invalidar_cache_resumen, sender=modelo, dispatch_uid=f'dashboard_resumen_save_{modelo.__name__}')
+    post_delete.connect(invalidar_cache_resumen, sender=modelo, dispatch_uid=f'dashboard_resumen_delete_{modelo.__name__}')
+
+
+# El histórico mensual lo invalida finanzas.resumen.aplicar con el mes
+# anterior (capturado en pre_save) y el nuevo de cada expensa o pago
+
+
+def capturar_propietario_anterior(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Guarda el propietario que tenía la fila antes del cambio."""
+    instance._propietario_riesgo_anterior = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and 'propietario' not in update_fields:
+        return
+    instance._propietario_riesgo_anterior = (
+        sender.objects.filter(pk=instance.pk).values_list('propietario_id', flat=True).first()
+    )
+
+
+def recalcular_riesgo_propietario(sender, instance, **kwargs):
+    """
+    Recalcula el riesgo del propietario de la expensa, reporte o unidad
+    modificada, y el del propietario anterior si cambió.
+    """
+    programar_recalculo(instance.propietario_id, getattr(instance, '_propietario_riesgo_anterior', None))
+
+
+def recalcular_riesgo_pago(sender, instance, **kwargs):
+    programar_recalculo(
+        Expensa.objects.filter(pk=instance.expensa_id).values_list('propietario_id', flat=True).first()
+    )
+
+
+def recalcular_riesgo_acceso(sender, instance, created=False, **kwargs):
+    """Cuenta los reconocimientos de placa denegados en el riesgo del propietario de la unidad."""
+    if not created or instance.acceso_permitido or not instance.unidad_id:
+        return
+    programar_recalculo(
+        UnidadHabitacional.objects.filter(pk=instance.unidad_id).values_list('propietario_id', flat=True).first()
+    )
+
+
+for modelo in [Expensa, Reporte, UnidadHabitacional]:
+    pre_save.connect(capturar_propietario_anterior, sender=modelo, dispatch_uid=f'riesgo_pre_save_{modelo.__name__}')
+    post_save.connect(recalcular_riesgo_propietario, sender=modelo, dispatch_uid=f'riesgo_save_{modelo.__name__}')
+    post_delete.connect(recalcular_riesgo_propietario, sender=modelo, dispatch_uid=f'riesgo_delete_{modelo.__name__}')
+
+post_save.connect(recalcular_riesgo_pago, sender=Pago, dispatch_uid='riesgo_save_pago')
+post_save.connect(recalcular_riesgo_acceso, sender=PlateRecognitionLog, dispatch_uid='riesgo_save_acceso')
+
+
+# Texto de búsqueda de propietarios, unidades, vehículos y expensas
+connect_busqueda()
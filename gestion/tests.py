@@ -1,3 +1,179 @@
-from django.test import TestCase
+import io
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from condominio.pruebas import ConsultasAcotadasTestCase
+from finanzas.models import Expensa
+from gestion.dashboard import mes_cache_key
+from gestion.importacion import Importador
+from gestion.models import Mascota, Propietario, RiesgoPropietario, Vehiculo
+from gestion.predicciones import generar
+from gestion.riesgos import _RecalculoPendiente
+
+
+class ConsultasGestionTests(ConsultasAcotadasTestCase):
+    def test_propietarios(self):
+        self.assertConsultasAcotadas('/api/propietarios/', 1)
+        self.assertConsultasMaximas(f'/api/propietarios/{self.propietario.pk}/', 1)
+
+    def test_unidades(self):
+        self.assertConsultasAcotadas('/api/unidades/', 1)
+        self.assertConsultasMaximas(f'/api/unidades/{self.propietario.unidad.pk}/', 1)
+
+    def test_vehiculos(self):
+        self.assertConsultasAcotadas('/api/vehiculos/', 1)
+        self.assertConsultasMaximas(f'/api/vehiculos/{Vehiculo.objects.first().pk}/', 1)
+
+    def test_mascotas(self):
+        self.assertConsultasAcotadas('/api/mascotas/', 1)
+        self.assertConsultasMaximas(f'/api/mascotas/{Mascota.objects.first().pk}/', 1)
+
+    def _importar(self, cantidad, inicio):
+        filas = ['first_name,last_name,documento_identidad,telefono,unidad,edificio,tipo_unidad,placa,marca,modelo,color']
+        filas += [
+            f'Nombre,Apellido,IMP{n},70000000,I{n},Torre A,departamento,IMP{n},Toyota,Yaris,Rojo'
+            for n in range(inicio, inicio + cantidad)
+        ]
+        archivo = SimpleUploadedFile('propietarios.csv', '\n'.join(filas).encode(), content_type='text/csv')
+        with CaptureQueriesContext(connection) as contexto:
+            response = self.client.post('/api/propietarios/importar/', {'archivo': archivo}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.content[:500])
+        self.assertEqual(response.data['creados'], cantidad, response.data)
+        return len(contexto.captured_queries)
+
+    def test_importar(self):
+        # La primera importación crea el rol y el grupo de propietarios
+        self._importar(1, 0)
+        # Un lote: las consultas no dependen de la cantidad de filas del archivo
+        pocas = self._importar(3, 10)
+        muchas = self._importar(12, 100)
+        self.assertEqual(pocas, muchas)
+        self.assertLessEqual(muchas, 25)
+
+    @override_settings(IMPORTACION_MAX_FILAS=2)
+    def test_importar_maximo_de_filas(self):
+        filas = ['first_name,documento_identidad'] + [f'Nombre,MAX{n}' for n in range(3)]
+        archivo = SimpleUploadedFile('propietarios.csv', '\n'.join(filas).encode(), content_type='text/csv')
+        response = self.client.post('/api/propietarios/importar/', {'archivo': archivo}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Propietario.objects.filter(documento_identidad__startswith='MAX').exists())
+
+    def test_importar_conflicto_concurrente(self):
+        filas = [
+            (n, {'first_name': 'Nombre', 'documento_identidad': f'CON{n}', 'telefono': '70000000',
+                 'placa': f'CON{n}', 'marca': 'Toyota', 'modelo': 'Yaris', 'color': 'Rojo'})
+            for n in range(3)
+        ]
+
+        def hashear(passwords, procesos=None):
+            # Otra importación guarda la placa de la fila 1 después de la validación
+            Vehiculo.objects.create(propietario=self.propietario, placa='CON1', marca='Kia', modelo='Rio', color='Gris')
+            return [make_password(p) for p in passwords]
+
+        with mock.patch('administracion.credenciales.hashear_passwords', hashear):
+            reporte = Importador(procesos=1).importar(filas)
+        self.assertEqual(reporte['creados'], 2)
+        self.assertEqual([error['fila'] for error in reporte['errores']], [1])
+        self.assertEqual(
+            set(Propietario.objects.filter(documento_identidad__startswith='CON').values_list('documento_identidad', flat=True)),
+            {'CON0', 'CON2'},
+        )
+
+    def test_importar_username_tomado(self):
+        User.objects.create_user('USR1')
+        filas = [
+            (1, {'first_name': 'Nombre', 'documento_identidad': 'USR1', 'telefono': '70000000'}),
+            (2, {'first_name': 'Nombre', 'documento_identidad': 'USR2', 'telefono': '70000000', 'username': 'USR12'}),
+            (3, {'first_name': 'Nombre', 'documento_identidad': 'USR3', 'telefono': '70000000', 'username': 'USR1'}),
+        ]
+        reporte = Importador(procesos=1).importar(filas)
+        # Sin username se usa el documento con el primer sufijo libre; uno explícito tomado es un error
+        self.assertEqual(reporte['creados'], 2, reporte)
+        self.assertEqual([error['fila'] for error in reporte['errores']], [3])
+        self.assertEqual(
+            Propietario.objects.get(documento_identidad='USR1').user.username, 'USR13',
+        )
+
+
+class ConsultasDashboardTests(ConsultasAcotadasTestCase):
+    def test_resumen(self):
+        self.assertConsultasAcotadas('/api/dashboard/resumen/', 1)
+
+    def test_finanzas(self):
+        self.assertConsultasAcotadas('/api/dashboard/finanzas/', 1)
+        self.assertConsultasAcotadas('/api/dashboard/finanzas/?months=24', 1)
+
+    def test_finanzas_cambio_de_mes(self):
+        expensa = Expensa.objects.first()
+        anterior, nuevo = '2020-01', '2020-02'
+        expensa.mes_referencia = anterior
+        expensa.save()
+        cache.set_many({mes_cache_key(anterior): {}, mes_cache_key(nuevo): {}})
+        with self.captureOnCommitCallbacks(execute=True):
+            expensa.mes_referencia = nuevo
+            expensa.save()
+        self.assertIsNone(cache.get(mes_cache_key(anterior)))
+        self.assertIsNone(cache.get(mes_cache_key(nuevo)))
+
+    def _deuda(self, propietario):
+        return RiesgoPropietario.objects.get(propietario=propietario).deuda_total
+
+    def test_riesgo_cambio_de_propietario(self):
+        anterior, nuevo = self.propietarios[:2]
+        with self.captureOnCommitCallbacks(execute=True):
+            expensa = Expensa.objects.create(
+                propietario=anterior, mes_referencia='2020-01', monto_total=1000, cuota_basica=1000,
+                fecha_vencimiento=date(2020, 2, 1),
+            )
+        deudas = self._deuda(anterior), self._deuda(nuevo)
+        with self.captureOnCommitCallbacks(execute=True):
+            expensa.propietario = nuevo
+            expensa.save()
+        self.assertEqual(self._deuda(anterior), deudas[0] - 1000)
+        self.assertEqual(self._deuda(nuevo), deudas[1] + 1000)
+
+    def test_riesgo_savepoint_revertido(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Expensa.objects.create(
+                propietario=self.propietario, mes_referencia='2020-01', monto_total=1000, cuota_basica=1000,
+                fecha_vencimiento=date(2020, 2, 1),
+            )
+            try:
+                with transaction.atomic():
+                    Expensa.objects.create(
+                        propietario=self.propietarios[1], mes_referencia='2020-01', monto_total=1000,
+                        cuota_basica=1000, fecha_vencimiento=date(2020, 2, 1),
+                    )
+                    raise ValueError
+            except ValueError:
+                pass
+        lotes = [c.__self__ for c in callbacks if isinstance(getattr(c, '__self__', None), _RecalculoPendiente)]
+        self.assertEqual([list(lote.elementos) for lote in lotes], [[self.propietario.pk]])
+
+    def test_areas_comunes(self):
+        self.assertConsultasAcotadas('/api/dashboard/areas-comunes/', 3)
+
+    def test_riesgos(self):
+        self.assertConsultasAcotadas('/api/dashboard/riesgos/', 4)
+        self.assertConsultasMaximas(f'/api/dashboard/riesgos/?propietario={self.propietario.pk}', 5)
+
+    def test_riesgos_solo_administradores(self):
+        self.assertEqual(self.client.get('/api/dashboard/riesgos/?propietario=abc').status_code, 400)
+        self.client.force_authenticate(self.propietario.user)
+        self.assertEqual(self.client.get('/api/dashboard/riesgos/').status_code, 403)
+        self.assertEqual(self.client.get(f'/api/dashboard/riesgos/?propietario={self.propietario.pk}').status_code, 403)
+
+    def test_predicciones(self):
+        # Sin predicción calculada el endpoint no entrena el modelo
+        self.assertConsultasMaximas('/api/dashboard/predicciones/', 1)
+        self.assertTrue(self.client.get('/api/dashboard/predicciones/').data['pendiente'])
+        generar()
+        self.assertConsultasAcotadas('/api/dashboard/predicciones/', 1)
@@ -1,33 +1,69 @@
-from rest_framework import viewsets, filters
+from itertools import islice
+
+from rest_framework import viewsets, filters, status
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
+from condominio.search import BusquedaFilter
+from django.conf import settings
 from django.db.models import Sum, Count, Q, Avg
 from django.utils import timezone
-from datetime import timedelta
-from .models import Propietario, UnidadHabitacional, Vehiculo, Mascota
+from .models import Propietario, UnidadHabitacional, Vehiculo, Mascota, RiesgoPropietario
 from .serializers import (
     PropietarioSerializer, UnidadHabitacionalSerializer, 
     VehiculoSerializer, MascotaSerializer
 )
+from .dashboard import get_resumen, get_historico_finanzas
+from .predicciones import prediccion_pendiente, ultima_prediccion
+from .riesgos import ranking as ranking_riesgos, detalle as detalle_riesgo
+from .importacion import Importador, leer_filas
 
 
 class PropietarioViewSet(viewsets.ModelViewSet):
-    queryset = Propietario.objects.all().select_related('user')
+    queryset = Propietario.objects.all().select_related('user').defer('texto_busqueda', 'vector_busqueda')
     serializer_class = PropietarioSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BusquedaFilter, filters.OrderingFilter]
     search_fields = ['user__first_name', 'user__last_name', 'documento_identidad', 'telefono']
     ordering_fields = ['fecha_registro', 'user__first_name']
     ordering = ['-fecha_registro']
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAdminUser], parser_classes=[MultiPartParser])
+    def importar(self, request):
+        """
+        Importa propietarios, unidades y vehículos desde un CSV o XLSX
+        (campo 'archivo'). Con ?validar=1 solo valida, sin guardar.
+
+        Acepta hasta IMPORTACION_MAX_FILAS filas y calcula las contraseñas
+        en el proceso del request; los archivos grandes se importan con
+        python manage.py importar_propietarios, que las calcula en paralelo.
+        """
+        archivo = request.FILES.get('archivo')
+        if not archivo:
+            return Response({'error': 'Debe enviar el archivo en el campo "archivo"'}, status=status.HTTP_400_BAD_REQUEST)
+
+        solo_validar = request.query_params.get('validar') in ('1', 'true')
+        maximo = settings.IMPORTACION_MAX_FILAS
+        try:
+            filas = list(islice(leer_filas(archivo.file, archivo.name), maximo + 1))
+        except (ValueError, UnicodeDecodeError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if len(filas) > maximo:
+            return Response(
+                {'error': f'El archivo supera las {maximo} filas; use python manage.py importar_propietarios'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        reporte = Importador(procesos=1, solo_validar=solo_validar).importar(filas)
+        return Response(reporte)
+
 
 class UnidadHabitacionalViewSet(viewsets.ModelViewSet):
-    queryset = UnidadHabitacional.objects.all().select_related('propietario__user')
+    queryset = UnidadHabitacional.objects.all().select_related('propietario__user').defer('texto_busqueda', 'vector_busqueda')
     serializer_class = UnidadHabitacionalSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BusquedaFilter, filters.OrderingFilter]
     filterset_fields = ['tipo', 'edificio']
     search_fields = ['numero', 'edificio', 'propietario__user__first_name', 'propietario__user__last_name']
     ordering_fields = ['numero', 'piso']
@@ -35,10 +71,10 @@ class UnidadHabitacionalViewSet(viewsets.ModelViewSet):
 
 
 class VehiculoViewSet(viewsets.ModelViewSet):
-    queryset = Vehiculo.objects.all().select_related('propietario__user', 'propietario__unidad')
+    queryset = Vehiculo.objects.all().select_related('propietario__user', 'propietario__unidad').defer('texto_busqueda', 'vector_busqueda')
     serializer_class = VehiculoSerializer
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, BusquedaFilter, filters.OrderingFilter]
     filterset_fields = ['propietario']
     search_fields = ['placa', 'marca', 'modelo', 'color']
     ordering_fields = ['fecha_registro', 'placa']
@@ -108,74 +144,36 @@ class MascotaViewSet(viewsets.ModelViewSet):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_resumen(request):
-    """Resumen general del condominio"""
-    from finanzas.models import Expensa
-    from mantenimiento.models import Reporte
-    from seguridad.models import Visita
-    
-    total_unidades = UnidadHabitacional.objects.count()
-    total_propietarios = Propietario.objects.count()
-    total_vehiculos = Vehiculo.objects.count()
-    
-    # Expensas pendientes
-    expensas_pendientes = Expensa.objects.filter(pagada=False).count()
-    
-    # Reportes pendientes
-    reportes_pendientes = Reporte.objects.filter(estado='pendiente').count()
-    
-    # Visitas hoy
-    hoy = timezone.now().date()
-    visitas_hoy = Visita.objects.filter(fecha_visita=hoy, estado='programada').count()
+    """Resumen general del condominio (una consulta, cacheado)"""
+    datos, hit, query_ms = get_resumen()
     
-    return Response({
-        'total_unidades': total_unidades,
-        'total_propietarios': total_propietarios,
-        'total_vehiculos': total_vehiculos,
-        'expensas_pendientes': expensas_pendientes,
-        'reportes_pendientes': reportes_pendientes,
-        'visitas_hoy': visitas_hoy,
-    })
+    response = Response(datos)
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    response['Server-Timing'] = f'db;dur={query_ms:.2f}'
+    return response
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_finanzas(request):
-    """Datos financieros para el dashboard"""
-    from finanzas.models import Expensa, Pago
-    
-    # Total facturado este mes
-    hoy = timezone.now()
-    mes_actual = hoy.strftime('%Y-%m')
-    
-    expensas_mes = Expensa.objects.filter(mes_referencia=mes_actual)
-    total_facturado = expensas_mes.aggregate(total=Sum('monto_total'))['total'] or 0
-    total_cobrado = expensas_mes.filter(pagada=True).aggregate(total=Sum('monto_total'))['total'] or 0
-    pendiente_cobro = total_facturado - total_cobrado
-    
-    # Tasa de morosidad
-    total_expensas = expensas_mes.count()
-    expensas_pagas = expensas_mes.filter(pagada=True).count()
-    tasa_morosidad = ((total_expensas - expensas_pagas) / total_expensas * 100) if total_expensas > 0 else 0
+    """
+    Datos financieros para el dashboard.
+    GET /api/dashboard/finanzas/?months=6
+    """
+    try:
+        cantidad = min(max(int(request.query_params.get('months', 6)), 1), 60)
+    except ValueError:
+        cantidad = 6
     
-    # Últimos 6 meses
-    meses_data = []
-    for i in range(5, -1, -1):
-        fecha = hoy - timedelta(days=i*30)
-        mes = fecha.strftime('%Y-%m')
-        total = Expensa.objects.filter(mes_referencia=mes).aggregate(total=Sum('monto_total'))['total'] or 0
-        cobrado = Expensa.objects.filter(mes_referencia=mes, pagada=True).aggregate(total=Sum('monto_total'))['total'] or 0
-        meses_data.append({
-            'mes': mes,
-            'facturado': float(total),
-            'cobrado': float(cobrado)
-        })
+    historico = get_historico_finanzas(cantidad)
+    mes_actual = historico[-1]
     
     return Response({
-        'total_facturado': float(total_facturado),
-        'total_cobrado': float(total_cobrado),
-        'pendiente_cobro': float(pendiente_cobro),
-        'tasa_morosidad': round(tasa_morosidad, 2),
-        'historico': meses_data
+        'total_facturado': mes_actual['facturado'],
+        'total_cobrado': mes_actual['cobrado'],
+        'pendiente_cobro': mes_actual['facturado'] - mes_actual['cobrado'],
+        'tasa_morosidad': mes_actual['tasa_morosidad'],
+        'historico': historico
     })
 
 
@@ -210,16 +208,39 @@ def dashboard_areas_comunes(request):
 
 
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsAdminUser])
 def dashboard_riesgos(request):
-    """Análisis de riesgos"""
-    from finanzas.models import Expensa
+    """
+    Análisis de riesgos desde la tabla de riesgos por propietario.
+    Solo administradores: incluye deudas, reportes y accesos de cada propietario.
+    GET /api/dashboard/riesgos/?limit=10&min_puntaje=30&nivel=alto
+    GET /api/dashboard/riesgos/?propietario=<id>  (detalle)
+    """
     from mantenimiento.models import Reporte
     
+    propietario_id = request.query_params.get('propietario')
+    if propietario_id:
+        try:
+            propietario_id = int(propietario_id)
+        except ValueError:
+            return Response({'error': 'propietario debe ser un número'}, status=status.HTTP_400_BAD_REQUEST)
+        datos = detalle_riesgo(propietario_id)
+        if datos is None:
+            return Response({'error': 'Propietario sin datos de riesgo'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(datos)
+    
+    try:
+        limite = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        puntaje_minimo = request.query_params.get('min_puntaje')
+        puntaje_minimo = float(puntaje_minimo) if puntaje_minimo else None
+    except ValueError:
+        return Response({'error': 'Parámetros inválidos'}, status=status.HTTP_400_BAD_REQUEST)
+    
     # Propietarios con múltiples expensas pendientes
-    propietarios_riesgo = Propietario.objects.annotate(
-        expensas_pendientes=Count('expensa', filter=Q(expensa__pagada=False))
-    ).filter(expensas_pendientes__gte=2).count()
+    propietarios_riesgo = RiesgoPropietario.objects.filter(expensas_impagas__gte=2).count()
+    distribucion = dict(
+        RiesgoPropietario.objects.order_by().values_list('nivel').annotate(total=Count('pk'))
+    )
     
     # Reportes de alta prioridad sin resolver
     reportes_criticos = Reporte.objects.filter(
@@ -230,18 +251,20 @@ def dashboard_riesgos(request):
     return Response({
         'propietarios_en_riesgo': propietarios_riesgo,
         'reportes_criticos': reportes_criticos,
-        'nivel_alerta': 'alto' if reportes_criticos > 5 else 'medio' if reportes_criticos > 2 else 'bajo'
+        'nivel_alerta': 'alto' if reportes_criticos > 5 else 'medio' if reportes_criticos > 2 else 'bajo',
+        'distribucion': {nivel: distribucion.get(nivel, 0) for nivel, _ in RiesgoPropietario.NIVEL_CHOICES},
+        'ranking': ranking_riesgos(limite, puntaje_minimo, request.query_params.get('nivel')),
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def dashboard_predicciones(request):
-    """Predicciones y tendencias"""
-    # Datos simulados - aquí se pueden implementar modelos de ML reales
-    return Response({
-        'tendencia_pagos': 'estable',
-        'ocupacion_proyectada': 95.5,
-        'ingresos_proyectados': 150000.00,
-        'alertas_futuras': []
-    })
+    """
+    Predicciones y tendencias precalculadas por el comando
+    calcular_predicciones (ver gestion.predicciones).
+    """
+    prediccion = ultima_prediccion()
+    if prediccion is None:
+        return Response(prediccion_pendiente())
+    return Response({**prediccion.datos, 'fecha_calculo': prediccion.fecha_calculo})
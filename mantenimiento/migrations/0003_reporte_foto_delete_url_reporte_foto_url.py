@@ -0,0 +1,23 @@
+# Generated by Django 5.1.12 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mantenimiento', '0002_alter_reporte_descripcion_alter_reporte_propietario_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reporte',
+            name='foto_delete_url',
+            field=models.URLField(blank=True, help_text='URL para eliminar foto de ImgBB', max_length=500, null=True),
+        ),
+        migrations.AddField(
+            model_name='reporte',
+            name='foto_url',
+            field=models.URLField(blank=True, help_text='URL de foto en ImgBB', max_length=500, null=True),
+        ),
+    ]
@@ -24,6 +24,8 @@ class Reporte(models.Model):
     descripcion = models.TextField(blank=True)
     ubicacion = models.CharField(max_length=100, blank=True)
     foto = models.ImageField(upload_to='reportes/', null=True, blank=True)
+    foto_url = models.URLField(max_length=500, blank=True, null=True, help_text='URL de foto en ImgBB')
+    foto_delete_url = models.URLField(max_length=500, blank=True, null=True, help_text='URL para eliminar foto de ImgBB')
     fecha_reporte = models.DateTimeField(auto_now_add=True)
     estado = models.CharField(max_length=20, choices=ESTADO_REPORTE, default='pendiente')
     prioridad = models.IntegerField(default=1)  # 1-5, siendo 5 la más alta
@@ -1,8 +1,9 @@
 from rest_framework import serializers
 from .models import Reporte
+from condominio.media_proxy import MediaURLMixin
 
 
-class ReporteSerializer(serializers.ModelSerializer):
+class ReporteSerializer(MediaURLMixin, serializers.ModelSerializer):
     propietario_nombre = serializers.SerializerMethodField(read_only=True)
     unidad = serializers.CharField(source='propietario.unidad.numero', read_only=True, allow_null=True)
     created_at = serializers.DateTimeField(source='fecha_reporte', read_only=True)
@@ -1,3 +1,8 @@
-from django.test import TestCase
+from condominio.pruebas import ConsultasAcotadasTestCase
+from mantenimiento.models import Reporte
 
-# Create your tests here.
+
+class ConsultasMantenimientoTests(ConsultasAcotadasTestCase):
+    def test_reportes(self):
+        self.assertConsultasAcotadas('/api/reportes/', 1)
+        self.assertConsultasMaximas(f'/api/reportes/{Reporte.objects.first().pk}/', 1)
@@ -42,7 +42,7 @@ class PagoSerializer(serializers.ModelSerializer):
         if obj.reserva:
             return {
                 'id': obj.reserva.id,
-                'area': obj.reserva.area_comun.nombre,
+                'area': obj.reserva.area.nombre,
                 'fecha': obj.reserva.fecha.isoformat(),
                 'hora_inicio': str(obj.reserva.hora_inicio),
                 'hora_fin': str(obj.reserva.hora_fin),
@@ -3,6 +3,8 @@ from django.conf import settings
 from decimal import Decimal
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE
 
 
 class StripeService:
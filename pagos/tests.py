@@ -0,0 +1,7 @@
+from condominio.pruebas import ConsultasAcotadasTestCase
+
+
+class ConsultasPagosTests(ConsultasAcotadasTestCase):
+    def test_historial(self):
+        self.client.force_authenticate(self.propietario.user)
+        self.assertConsultasAcotadas(f'/api/pagos/historial/?propietario={self.propietario.pk}', 3)
@@ -12,6 +12,7 @@ from django.conf import settings
 
 import stripe
 import os
+import logging
 from dotenv import load_dotenv
 
 from .models import Pago
@@ -22,45 +23,45 @@ from .serializers import (
 )
 from gestion.models import Propietario
 from areas_comunes.models import ReservaAreaComun
-from administracion.models import PerfilUsuario
+from administracion.permissions import EsResidente, propietario_usuario
+
+logger = logging.getLogger(__name__)
 
 # ============================
 # CONFIGURACIÓN STRIPE
 # ============================
 load_dotenv()
 stripe.api_key = getattr(settings, "STRIPE_SECRET_KEY", None) or os.getenv("STRIPE_SECRET_KEY")
+if settings.STRIPE_API_BASE:
+    stripe.api_base = settings.STRIPE_API_BASE
 
 
 # ============================
 # CREAR PAYMENT INTENT
 # ============================
 class CreatePaymentIntentView(APIView):
-    permission_classes = [IsAuthenticated]
+    # El rol y el propietario vienen en los claims del token
+    permission_classes = [IsAuthenticated, EsResidente]
+
+    def permission_denied(self, request, message=None, code=None):
+        if request.user and request.user.is_authenticated:
+            message = {"success": False, "message": "No autorizado"}
+        super().permission_denied(request, message, code)
 
     def post(self, request):
         try:
-            print("🔵 CREATE PAYMENT INTENT")
-
-            # ✅ VALIDAR PERFIL Y ROL
-            try:
-                perfil = PerfilUsuario.objects.get(user=request.user)
-                rol_nombre = perfil.rol.nombre if perfil.rol else None
-            except PerfilUsuario.DoesNotExist:
-                return Response({"success": False, "message": "Perfil no encontrado"}, status=403)
-
-            if rol_nombre not in ["PROPIETARIO", "INQUILINO"]:
-                return Response({"success": False, "message": "No autorizado"}, status=403)
-
             # ✅ VALIDAR DATOS
             serializer = CreatePaymentIntentSerializer(data=request.data)
             if not serializer.is_valid():
                 return Response({"success": False, "errors": serializer.errors}, status=400)
 
-            propietario = Propietario.objects.get(user=request.user)
+            propietario_id = propietario_usuario(request.user)
+            if propietario_id is None:
+                return Response({"success": False, "message": "Propietario no encontrado"}, status=403)
             reserva_id = serializer.validated_data["reserva_id"]
-            reserva = get_object_or_404(ReservaAreaComun, id=reserva_id)
+            reserva = get_object_or_404(ReservaAreaComun.objects.select_related('area'), id=reserva_id)
 
-            if reserva.propietario != propietario:
+            if reserva.propietario_id != propietario_id:
                 return Response({"success": False, "message": "Reserva no pertenece al usuario"}, status=403)
 
             if reserva.estado != "pendiente":
@@ -79,14 +80,14 @@ class CreatePaymentIntentView(APIView):
                 payment_method_types=["card"],
                 metadata={
                     "reserva_id": reserva.id,
-                    "propietario_id": propietario.id
+                    "propietario_id": propietario_id
                 }
             )
 
-            area_nombre = reserva.area_comun.nombre if reserva.area_comun else "Área"
+            area_nombre = reserva.area.nombre if reserva.area else "Área"
 
             pago = Pago.objects.create(
-                propietario=propietario,
+                propietario_id=propietario_id,
                 reserva=reserva,
                 tipo_pago="reserva",
                 monto=amount,
@@ -96,7 +97,10 @@ class CreatePaymentIntentView(APIView):
                 descripcion=f"Pago de reserva - {area_nombre}"
             )
 
-            print("✅ PAYMENT INTENT CREADO:", payment_intent.id)
+            logger.info(
+                "Payment intent creado",
+                extra={"payment_intent_id": payment_intent.id, "pago_id": pago.id, "reserva_id": reserva.id},
+            )
 
             return Response({
                 "success": True,
@@ -107,7 +111,7 @@ class CreatePaymentIntentView(APIView):
             }, status=200)
 
         except Exception as e:
-            print("❌ ERROR CREATE PAYMENT:", str(e))
+            logger.exception("Error al crear el payment intent")
             return Response({
                 "success": False,
                 "message": "Error interno al crear el pago",
@@ -175,7 +179,7 @@ class ConfirmPaymentView(APIView):
             return Response({"success": False, "message": e.user_message}, status=400)
 
         except Exception as e:
-            print("❌ ERROR CONFIRM PAYMENT:", str(e))
+            logger.exception("Error al confirmar el pago")
             return Response({"success": False, "message": "Error interno", "error": str(e)}, status=500)
 
 
@@ -196,11 +200,15 @@ def payment_history(request):
         if propietario.user != request.user:
             return Response({"success": False, "message": "No autorizado"}, status=403)
 
-        pagos = Pago.objects.filter(propietario=propietario).order_by("-fecha_creacion")
+        pagos = (
+            Pago.objects.filter(propietario=propietario)
+            .select_related("propietario__user", "reserva__area")
+            .order_by("-fecha_creacion")
+        )
         serializer = PagoSerializer(pagos, many=True)
 
         return Response({"success": True, "data": serializer.data})
 
     except Exception as e:
-        print("❌ ERROR HISTORIAL:", str(e))
+        logger.exception("Error al obtener el historial de pagos")
         return Response({"success": False, "message": "Error interno"}, status=500)
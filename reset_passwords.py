@@ -4,17 +4,16 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'condominio.settings')
 django.setup()
 
-from django.contrib.auth.models import User
-from gestion.models import Propietario
+from administracion.credenciales import resetear_passwords_propietarios
 
-# Resetear contraseñas de usuarios propietarios
+# Resetear contraseñas de usuarios propietarios (contraseña = documento de identidad).
+# Equivale a: python manage.py resetear_passwords
 print("=== RESETEANDO CONTRASEÑAS ===")
 
-for propietario in Propietario.objects.all():
-    user = propietario.user
-    password = propietario.documento_identidad
-    user.set_password(password)
-    user.save()
-    print(f"\n✓ Usuario '{user.username}' actualizado")
-    print(f"  - Nueva contraseña: {password}")
-    print(f"  - Verificando: {user.check_password(password)}")
+
+def progreso(procesados, total):
+    print(f"  {procesados}/{total} usuarios")
+
+
+actualizados = resetear_passwords_propietarios(progreso=progreso)
+print(f"\n✓ {actualizados} usuarios actualizados")
@@ -1,12 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import User
 from gestion.models import Propietario, Vehiculo, UnidadHabitacional
+from condominio.dirty_fields import DirtyFieldsMixin
 import uuid
 import qrcode
 from io import BytesIO
 from django.core.files import File
 
-class Visita(models.Model):
+class Visita(DirtyFieldsMixin, models.Model):
     ESTADO_VISITA = (
         ('programada', 'Programada'),
         ('en_progreso', 'En Progreso'),
@@ -55,12 +56,12 @@ class Visita(models.Model):
         img.save(buffer)
         
         self.qr_code.save(f'qr_visita_{self.codigo_acceso}.png', File(buffer), save=False)
-        self.save()
+        self.save(update_fields=['qr_code'])
     
     def __str__(self):
         return f"{self.nombre_visitante} - {self.fecha_visita}"
 
-class RegistroVisita(models.Model):
+class RegistroVisita(DirtyFieldsMixin, models.Model):
     visita = models.ForeignKey(Visita, on_delete=models.CASCADE)
     hora_entrada = models.DateTimeField()
     hora_salida = models.DateTimeField(null=True, blank=True)
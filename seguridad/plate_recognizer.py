@@ -1,8 +1,13 @@
+import logging
+import time
+
 import requests
 from django.conf import settings
 from typing import Dict, Optional
 import base64
 
+logger = logging.getLogger(__name__)
+
 
 class PlateRecognizerService:
     """
@@ -11,7 +16,7 @@ class PlateRecognizerService:
     """
     
     def __init__(self):
-        self.api_url = "https://api.platerecognizer.com/v1/plate-reader/"
+        self.api_url = settings.PLATE_RECOGNIZER_API_URL
         self.api_token = getattr(settings, 'PLATE_RECOGNIZER_API_KEY', None)
         
     def recognize_plate(self, image_file) -> Dict:
@@ -51,6 +56,7 @@ class PlateRecognizerService:
             }
             
             # Hacer la petición a la API
+            inicio = time.perf_counter()
             response = requests.post(
                 self.api_url,
                 headers=headers,
@@ -58,6 +64,10 @@ class PlateRecognizerService:
                 data=data,
                 timeout=30
             )
+            logger.info(
+                "Llamada a Plate Recognizer",
+                extra={'status': response.status_code, 'duracion_ms': round((time.perf_counter() - inicio) * 1000, 1)},
+            )
             
             if response.status_code == 201:
                 result = response.json()
@@ -70,16 +80,19 @@ class PlateRecognizerService:
                 }
                 
         except requests.exceptions.Timeout:
+            logger.warning("Timeout en la llamada a Plate Recognizer")
             return {
                 'success': False,
                 'error': 'Timeout: La API tardó demasiado en responder'
             }
         except requests.exceptions.RequestException as e:
+            logger.warning("Error de conexión con Plate Recognizer: %s", e)
             return {
                 'success': False,
                 'error': f'Error de conexión: {str(e)}'
             }
         except Exception as e:
+            logger.exception("Error inesperado en el reconocimiento de placa")
             return {
                 'success': False,
                 'error': f'Error inesperado: {str(e)}'
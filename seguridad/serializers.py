@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Visita, RegistroVisita, Guardia, ComunicacionGuardia, PlateRecognitionLog
 from gestion.models import Vehiculo
+from condominio.media_proxy import build_media_url
 
 
 class VisitaSerializer(serializers.ModelSerializer):
@@ -19,7 +20,7 @@ class VisitaSerializer(serializers.ModelSerializer):
         """Retorna la URL de ImgBB si está disponible, sino la URL local."""
         # Prioridad: URL de ImgBB > URL local
         if hasattr(obj, 'qr_code_url') and obj.qr_code_url:
-            return obj.qr_code_url
+            return build_media_url(self.context.get('request'), obj.qr_code_url)
         elif obj.qr_code:
             request = self.context.get('request')
             if request:
@@ -29,12 +30,11 @@ class VisitaSerializer(serializers.ModelSerializer):
 
 class RegistroVisitaSerializer(serializers.ModelSerializer):
     visita_detalle = serializers.SerializerMethodField()
-    guardia_nombre = serializers.CharField(source='guardia.nombre', read_only=True)
     foto_entrada_url = serializers.SerializerMethodField()
     
     class Meta:
         model = RegistroVisita
-        fields = ['id', 'visita', 'visita_detalle', 'guardia', 'guardia_nombre',
+        fields = ['id', 'visita', 'visita_detalle', 'guardia_registro',
                   'hora_entrada', 'hora_salida', 'foto_entrada', 'foto_entrada_url', 'observaciones']
         read_only_fields = ['hora_entrada', 'foto_entrada_url']
     
@@ -44,7 +44,7 @@ class RegistroVisitaSerializer(serializers.ModelSerializer):
     def get_foto_entrada_url(self, obj):
         """Retorna la URL de ImgBB si está disponible, sino la URL local."""
         if hasattr(obj, 'foto_entrada_url') and obj.foto_entrada_url:
-            return obj.foto_entrada_url
+            return build_media_url(self.context.get('request'), obj.foto_entrada_url)
         elif obj.foto_entrada:
             request = self.context.get('request')
             if request:
@@ -57,18 +57,19 @@ class GuardiaSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Guardia
-        fields = ['id', 'user', 'user_nombre', 'turno', 'telefono', 'activo']
+        fields = ['id', 'user', 'user_nombre', 'documento_identidad', 'turno', 'telefono',
+                  'activo', 'fecha_contratacion']
 
 
 class ComunicacionGuardiaSerializer(serializers.ModelSerializer):
-    guardia_nombre = serializers.CharField(source='guardia.nombre', read_only=True)
+    guardia_nombre = serializers.CharField(source='guardia.user.get_full_name', read_only=True, default=None)
     propietario_nombre = serializers.CharField(source='propietario.user.get_full_name', read_only=True)
     
     class Meta:
         model = ComunicacionGuardia
         fields = ['id', 'guardia', 'guardia_nombre', 'propietario', 'propietario_nombre',
-                  'tipo', 'mensaje', 'fecha_comunicacion', 'leido']
-        read_only_fields = ['fecha_comunicacion']
+                  'tipo', 'mensaje', 'fecha_solicitud', 'fecha_atencion', 'estado', 'respuesta']
+        read_only_fields = ['fecha_solicitud']
 
 
 class PlateRecognitionLogSerializer(serializers.ModelSerializer):
@@ -93,7 +94,7 @@ class PlateRecognitionLogSerializer(serializers.ModelSerializer):
     def get_image_url(self, obj):
         """Retorna la URL de ImgBB si está disponible, sino la URL local."""
         if hasattr(obj, 'image_url') and obj.image_url:
-            return obj.image_url
+            return build_media_url(self.context.get('request'), obj.image_url)
         elif obj.image:
             request = self.context.get('request')
             if request:
@@ -1,3 +1,31 @@
-from django.test import TestCase
+from condominio.pruebas import ConsultasAcotadasTestCase
+from seguridad.models import ComunicacionGuardia, Guardia, PlateRecognitionLog, RegistroVisita, Visita
 
-# Create your tests here.
+
+class ConsultasSeguridadTests(ConsultasAcotadasTestCase):
+    def test_visitas(self):
+        self.assertConsultasAcotadas('/api/seguridad/visitas/', 1)
+        self.assertConsultasMaximas(f'/api/seguridad/visitas/{Visita.objects.first().pk}/', 1)
+
+    def test_registros(self):
+        # visita_detalle recorre visita.propietario.unidad
+        self.assertConsultasAcotadas('/api/seguridad/registros/', 1)
+        self.assertConsultasMaximas(f'/api/seguridad/registros/{RegistroVisita.objects.first().pk}/', 1)
+
+    def test_guardias(self):
+        self.assertConsultasAcotadas('/api/seguridad/guardias/', 1)
+        self.assertConsultasMaximas(f'/api/seguridad/guardias/{Guardia.objects.first().pk}/', 1)
+
+    def test_comunicaciones(self):
+        self.assertConsultasAcotadas('/api/seguridad/comunicaciones/', 1)
+        self.assertConsultasMaximas(f'/api/seguridad/comunicaciones/{ComunicacionGuardia.objects.first().pk}/', 1)
+
+    def test_reconocimientos(self):
+        # unidad_info y vehiculo_info recorren unidad.propietario.user y vehiculo.propietario.user
+        self.assertConsultasAcotadas('/api/seguridad/plate-recognition-logs/', 1)
+        self.assertConsultasMaximas(
+            f'/api/seguridad/plate-recognition-logs/{PlateRecognitionLog.objects.first().pk}/', 1,
+        )
+
+    def test_reconocimientos_stats(self):
+        self.assertConsultasAcotadas('/api/seguridad/plate-recognition-logs/stats/', 4)
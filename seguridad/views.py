@@ -1,3 +1,5 @@
+import logging
+
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -12,6 +14,8 @@ from .serializers import (
 from .plate_recognizer import PlateRecognizerService
 from gestion.models import Vehiculo
 
+logger = logging.getLogger(__name__)
+
 
 class VisitaViewSet(viewsets.ModelViewSet):
     queryset = Visita.objects.all().select_related('propietario__user', 'propietario__unidad')
@@ -30,25 +34,25 @@ class VisitaViewSet(viewsets.ModelViewSet):
         POST /api/seguridad/visitas/recognize_plate/
         Body: multipart/form-data con 'image' file
         """
-        print(f"[PLATE RECOGNIZER] Request FILES: {request.FILES.keys()}")
-        print(f"[PLATE RECOGNIZER] Request DATA: {request.data.keys()}")
-        
         if 'image' not in request.FILES:
             error_msg = 'No se proporcionó ninguna imagen'
-            print(f"[PLATE RECOGNIZER ERROR] {error_msg}")
+            logger.warning(error_msg)
             return Response(
                 {'error': error_msg},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         image_file = request.FILES['image']
-        print(f"[PLATE RECOGNIZER] Imagen recibida: {image_file.name}, tipo: {image_file.content_type}, tamaño: {image_file.size}")
+        logger.debug(
+            "Imagen recibida para reconocimiento de placa",
+            extra={'archivo': image_file.name, 'tipo': image_file.content_type, 'tamano': image_file.size},
+        )
         
         # Validar tipo de archivo
         allowed_types = ['image/jpeg', 'image/jpg', 'image/png']
         if image_file.content_type not in allowed_types:
             error_msg = f'Tipo de archivo no permitido: {image_file.content_type}. Use JPG o PNG'
-            print(f"[PLATE RECOGNIZER ERROR] {error_msg}")
+            logger.warning(error_msg)
             return Response(
                 {'error': error_msg},
                 status=status.HTTP_400_BAD_REQUEST
@@ -57,21 +61,21 @@ class VisitaViewSet(viewsets.ModelViewSet):
         # Validar tamaño (máximo 5MB)
         if image_file.size > 5 * 1024 * 1024:
             error_msg = f'La imagen es demasiado grande: {image_file.size} bytes. Máximo 5MB'
-            print(f"[PLATE RECOGNIZER ERROR] {error_msg}")
+            logger.warning(error_msg)
             return Response(
                 {'error': error_msg},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Procesar imagen con Plate Recognizer
-        print(f"[PLATE RECOGNIZER] Llamando al servicio de reconocimiento...")
         service = PlateRecognizerService()
         result = service.recognize_plate(image_file)
         
-        print(f"[PLATE RECOGNIZER] Resultado del servicio: {result}")
-        
         if not result['success']:
-            print(f"[PLATE RECOGNIZER ERROR] {result.get('error', 'Error desconocido')}")
+            logger.warning(
+                "Reconocimiento de placa fallido: %s", result.get('error', 'Error desconocido'),
+                extra={'detalle': result.get('details')},
+            )
             return Response(result, status=status.HTTP_400_BAD_REQUEST)
         
         # Buscar si el vehículo está registrado
@@ -127,6 +131,17 @@ class VisitaViewSet(viewsets.ModelViewSet):
             guardia=request.user.guardia if hasattr(request.user, 'guardia') else None
         )
         
+        logger.info(
+            "Placa reconocida",
+            extra={
+                'log_id': log.id,
+                'placa': result['plate_number'],
+                'confianza': result.get('confidence_score'),
+                'tipo_acceso': tipo_acceso,
+                'tiempo_api_ms': result.get('processing_time'),
+            },
+        )
+        
         # Preparar respuesta
         response_data = {
             'success': True,
@@ -169,11 +184,11 @@ class VisitaViewSet(viewsets.ModelViewSet):
 
 
 class RegistroVisitaViewSet(viewsets.ModelViewSet):
-    queryset = RegistroVisita.objects.all().select_related('visita__propietario', 'guardia')
+    queryset = RegistroVisita.objects.all().select_related('visita__propietario__unidad')
     serializer_class = RegistroVisitaSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['visita', 'guardia']
+    filterset_fields = ['visita', 'guardia_registro']
     search_fields = ['visita__nombre_visitante', 'observaciones']
     ordering_fields = ['hora_entrada', 'hora_salida']
     ordering = ['-hora_entrada']
@@ -185,19 +200,19 @@ class GuardiaViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['turno', 'activo']
-    search_fields = ['nombre', 'telefono']
-    ordering = ['nombre']
+    search_fields = ['user__first_name', 'user__last_name', 'documento_identidad', 'telefono']
+    ordering = ['user__first_name', 'user__last_name']
 
 
 class ComunicacionGuardiaViewSet(viewsets.ModelViewSet):
-    queryset = ComunicacionGuardia.objects.all().select_related('guardia', 'propietario__user')
+    queryset = ComunicacionGuardia.objects.all().select_related('guardia__user', 'propietario__user')
     serializer_class = ComunicacionGuardiaSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['guardia', 'propietario', 'tipo', 'leido']
+    filterset_fields = ['guardia', 'propietario', 'tipo', 'estado']
     search_fields = ['mensaje']
-    ordering_fields = ['fecha_comunicacion']
-    ordering = ['-fecha_comunicacion']
+    ordering_fields = ['fecha_solicitud', 'fecha_atencion']
+    ordering = ['-fecha_solicitud']
 
 
 class PlateRecognitionLogViewSet(viewsets.ReadOnlyModelViewSet):
@@ -232,22 +247,28 @@ class PlateRecognitionLogViewSet(viewsets.ReadOnlyModelViewSet):
         Estadísticas de reconocimientos de placas
         GET /api/seguridad/plate-recognition-logs/stats/
         """
-        from django.db.models import Count
-        from datetime import datetime, timedelta
+        from django.db.models import Count, Q
+        from django.utils import timezone
+        from datetime import timedelta
         
         # Últimos 30 días
-        fecha_inicio = datetime.now() - timedelta(days=30)
+        fecha_inicio = timezone.now() - timedelta(days=30)
         
         logs = PlateRecognitionLog.objects.filter(
             fecha_reconocimiento__gte=fecha_inicio
         )
         
+        # Los totales en una sola consulta
+        totales = logs.aggregate(
+            total_reconocimientos=Count('id'),
+            vehiculos_registrados=Count('id', filter=Q(is_registered=True)),
+            vehiculos_no_registrados=Count('id', filter=Q(is_registered=False)),
+            accesos_permitidos=Count('id', filter=Q(acceso_permitido=True)),
+            accesos_denegados=Count('id', filter=Q(acceso_permitido=False)),
+        )
+        
         stats = {
-            'total_reconocimientos': logs.count(),
-            'vehiculos_registrados': logs.filter(is_registered=True).count(),
-            'vehiculos_no_registrados': logs.filter(is_registered=False).count(),
-            'accesos_permitidos': logs.filter(acceso_permitido=True).count(),
-            'accesos_denegados': logs.filter(acceso_permitido=False).count(),
+            **totales,
             'por_tipo_acceso': dict(
                 logs.values('tipo_acceso').annotate(count=Count('id')).values_list('tipo_acceso', 'count')
             ),
@@ -255,7 +276,9 @@ class PlateRecognitionLogViewSet(viewsets.ReadOnlyModelViewSet):
                 logs.values('confidence').annotate(count=Count('id')).values_list('confidence', 'count')
             ),
             'ultimos_reconocimientos': PlateRecognitionLogSerializer(
-                logs.order_by('-fecha_reconocimiento')[:10],
+                self.get_queryset().filter(
+                    fecha_reconocimiento__gte=fecha_inicio
+                ).order_by('-fecha_reconocimiento')[:10],
                 many=True,
                 context={'request': request}
             ).data
@@ -1,6 +1,9 @@
 """
 Script de prueba para verificar la integración con ImgBB.
 Ejecutar: python test_imgbb_integration.py
+
+Sin conexión: levantar `python manage.py fake_imgbb` y definir
+IMGBB_API_URL=http://127.0.0.1:8765/1/upload e IMGBB_API_KEY=fake.
 """
 import os
 import sys
@@ -93,17 +96,11 @@ def test_signals():
 def test_models():
     """Verifica que los modelos tengan los campos nuevos."""
     print("\n📊 Verificando modelos...")
-    from seguridad.models import Visita, RegistroVisita, PlateRecognitionLog
-    from administracion.models import PerfilUsuario
-    from gestion.models import Vehiculo, Mascota
+    from condominio.image_sync import IMAGE_REGISTRY
     
     models_to_check = [
-        (Visita, ['qr_code_url', 'qr_code_delete_url']),
-        (RegistroVisita, ['foto_entrada_url', 'foto_entrada_delete_url']),
-        (PlateRecognitionLog, ['image_url', 'image_delete_url']),
-        (PerfilUsuario, ['foto_url', 'foto_delete_url']),
-        (Vehiculo, ['foto_vehiculo_url', 'foto_vehiculo_delete_url']),
-        (Mascota, ['foto_url', 'foto_delete_url']),
+        (spec.get_model(), [spec.url_field, spec.delete_url_field])
+        for spec in IMAGE_REGISTRY
     ]
     
     all_ok = True